@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Cross-Market Arbitrage Graph Benchmark for A1Betting Platform
+
+Measures throughput of the cross-market/triangular/synthetic cover search in
+ArbitrageCalculator, inline and on the process pool, at 10k, 100k and 1M
+quotes.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from arbitrage_engine import ArbitrageCalculator  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+# (market_type, outcome, line, fair probability)
+MENU = [
+    ("1x2", "1", None, 0.40),
+    ("1x2", "x", None, 0.28),
+    ("1x2", "2", None, 0.32),
+    ("double_chance", "1x", None, 0.68),
+    ("double_chance", "x2", None, 0.60),
+    ("spread", "home", -0.5, 0.40),
+    ("spread", "away", 0.5, 0.60),
+    ("spread", "home", 1.5, 0.80),
+    ("spread", "away", -1.5, 0.20),
+    ("totals", "over", 2.5, 0.50),
+    ("totals", "under", 2.5, 0.50),
+    ("alternate_totals", "over", 3.5, 0.30),
+    ("alternate_totals", "under", 3.5, 0.70),
+]
+
+
+def generate_quotes(n_quotes: int, n_books: int = 10, seed: int = 42) -> List[Dict[str, Any]]:
+    """Generate related-market quotes from n_books with a ~4% average margin."""
+    rng = random.Random(seed)
+    quotes: List[Dict[str, Any]] = []
+    event = 0
+    while len(quotes) < n_quotes:
+        for book in range(n_books):
+            for market, outcome, line, probability in MENU:
+                quotes.append(
+                    {
+                        "event_id": f"event_{event}",
+                        "market_type": market,
+                        "outcome": outcome,
+                        "line": line,
+                        "sportsbook": f"book_{book}",
+                        "odds": 1 / (probability * 1.04) * rng.uniform(0.95, 1.05),
+                    }
+                )
+        event += 1
+    return quotes[:n_quotes]
+
+
+async def time_search(calculator: ArbitrageCalculator, quotes: List[Dict[str, Any]]) -> Dict[str, float]:
+    start = time.perf_counter()
+    opportunities = await calculator._detect_graph_arbitrage(quotes)
+    elapsed = time.perf_counter() - start
+    return {
+        "seconds": elapsed,
+        "quotes_per_sec": len(quotes) / elapsed if elapsed else 0.0,
+        "opportunities": len(opportunities),
+    }
+
+
+async def run_benchmark(sizes: List[int], workers: int) -> List[Dict[str, Any]]:
+    inline = ArbitrageCalculator(graph_pool_threshold=sys.maxsize)
+    pooled = ArbitrageCalculator(graph_workers=workers, graph_pool_threshold=0)
+    results = []
+
+    try:
+        # Start the worker processes outside the timed runs
+        await pooled._detect_graph_arbitrage(generate_quotes(1_000))
+
+        for size in sizes:
+            quotes = generate_quotes(size)
+            result = {
+                "quotes": size,
+                "inline": await time_search(inline, quotes),
+                "pool": await time_search(pooled, quotes),
+            }
+            results.append(result)
+            logger.info(
+                f"quotes={size:>9,} inline={result['inline']['quotes_per_sec']:>10,.0f} quotes/s "
+                f"pool({workers})={result['pool']['quotes_per_sec']:>10,.0f} quotes/s "
+                f"opportunities={result['inline']['opportunities']}"
+            )
+    finally:
+        pooled.close()
+
+    return results
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Cross-market arbitrage graph benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Quote counts to search")
+    parser.add_argument("--workers", type=int, default=4, help="Process pool size")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.sizes, args.workers))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Arbitrage Scan Benchmark for A1Betting Platform
+
+Compares the vectorised best-price scan in ArbitrageCalculator with the
+pairwise per-market path at 10k, 100k and 1M quotes, and measures per-tick
+latency of incremental detection against a rescan of the full slate.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from arbitrage_engine import ArbitrageCalculator, IncrementalArbitrageTracker  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+MARKETS = {
+    "totals": ("over", "under"),
+    "moneyline": ("home", "away"),
+    "match_result": ("home", "draw", "away"),
+}
+
+
+def generate_quotes(n_quotes: int, n_books: int = 30, seed: int = 42) -> List[Dict[str, Any]]:
+    """Generate quotes from n_books sportsbooks with a ~4% average margin."""
+    rng = random.Random(seed)
+    quotes: List[Dict[str, Any]] = []
+    event = 0
+    while len(quotes) < n_quotes:
+        for market, outcomes in MARKETS.items():
+            for book in range(n_books):
+                for outcome in outcomes:
+                    quotes.append(
+                        {
+                            "event_id": f"event_{event}",
+                            "market_type": market,
+                            "outcome": outcome,
+                            "sportsbook": f"book_{book}",
+                            "odds": len(outcomes) / 1.04 * rng.uniform(0.92, 1.08),
+                        }
+                    )
+        event += 1
+    return quotes[:n_quotes]
+
+
+async def time_scan(calculator: ArbitrageCalculator, quotes: List[Dict[str, Any]]) -> Dict[str, float]:
+    start = time.perf_counter()
+    opportunities = await calculator.detect_arbitrage_opportunities(quotes)
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "opportunities": len(opportunities)}
+
+
+def time_ticks(quotes: List[Dict[str, Any]], n_ticks: int, seed: int = 7) -> Dict[str, float]:
+    """Seed a tracker with quotes, then time single-quote odds ticks."""
+    rng = random.Random(seed)
+    tracker = IncrementalArbitrageTracker(ArbitrageCalculator())
+    tracker.apply_quotes(quotes)
+
+    latencies = []
+    for _ in range(n_ticks):
+        quote = dict(rng.choice(quotes))
+        quote["odds"] *= rng.uniform(0.97, 1.03)
+        start = time.perf_counter()
+        tracker.apply_quote(quote)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+    return {
+        "ticks": n_ticks,
+        "p50_us": latencies[len(latencies) // 2] * 1e6,
+        "p99_us": latencies[int(len(latencies) * 0.99)] * 1e6,
+        "max_us": latencies[-1] * 1e6,
+    }
+
+
+async def run_benchmark(sizes: List[int], legacy_limit: int, ticks: int) -> List[Dict[str, Any]]:
+    vectorized = ArbitrageCalculator(use_vectorized=True)
+    pairwise = ArbitrageCalculator(use_vectorized=False)
+    results = []
+
+    for size in sizes:
+        quotes = generate_quotes(size)
+        result: Dict[str, Any] = {"quotes": size, "vectorized": await time_scan(vectorized, quotes)}
+        if size <= legacy_limit:
+            result["pairwise"] = await time_scan(pairwise, quotes)
+            result["speedup"] = result["pairwise"]["seconds"] / max(result["vectorized"]["seconds"], 1e-9)
+        if ticks:
+            result["incremental"] = time_ticks(quotes, ticks)
+        results.append(result)
+
+        message = f"quotes={size:>9,} vectorized={result['vectorized']['seconds'] * 1000:>10.1f} ms"
+        if "pairwise" in result:
+            message += (
+                f" pairwise={result['pairwise']['seconds'] * 1000:>10.1f} ms"
+                f" speedup={result['speedup']:.1f}x"
+            )
+        if "incremental" in result:
+            message += (
+                f" tick_p50={result['incremental']['p50_us']:.1f} us"
+                f" tick_p99={result['incremental']['p99_us']:.1f} us"
+            )
+        logger.info(message)
+
+    return results
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Arbitrage scan benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="Quote counts to scan")
+    parser.add_argument(
+        "--legacy-limit",
+        type=int,
+        default=100_000,
+        help="Skip the O(n^2) pairwise path above this many quotes",
+    )
+    parser.add_argument("--ticks", type=int, default=10_000, help="Incremental odds ticks to time (0 to skip)")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_benchmark(args.sizes, args.legacy_limit, args.ticks))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
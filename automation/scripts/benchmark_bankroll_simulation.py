@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Bankroll Simulation Benchmark for A1Betting Platform
+
+Compares paths per second for bankroll simulation:
+
+- the per-bet Python loop the bankroll-simulation endpoint used (one path,
+  random.choice / random.uniform per round)
+- BankrollSimulator in one process, chunked NumPy blocks
+- BankrollSimulator with chunks spread over a ProcessTaskPool
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from bankroll_simulation import BankrollSimulator, SimulationPosition, StakingRule  # noqa: E402
+from process_pool import ProcessTaskPool  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+SLATE = [
+    SimulationPosition(odds=2.1, win_probability=0.5, stake=20.0),
+    SimulationPosition(odds=1.8, win_probability=0.58, stake=30.0),
+    SimulationPosition(odds=3.5, win_probability=0.3, stake=10.0),
+]
+
+
+def loop_path(rounds: int, stake: float = 50.0) -> float:
+    """The previous endpoint's simulation of one path"""
+    bankroll = 1000.0
+    history = []
+    for _ in range(rounds):
+        win = random.choice([True, False])
+        odds = random.uniform(1.5, 3.0)
+        profit = stake * (odds - 1) if win else -stake
+        bankroll += profit
+        history.append(bankroll)
+    return bankroll
+
+
+def run_benchmark(paths: int, rounds: int, workers: int, seed: int) -> Dict[str, Any]:
+    loop_paths = max(1, paths // 100)
+    start = time.perf_counter()
+    for _ in range(loop_paths):
+        loop_path(rounds)
+    loop_rate = loop_paths / (time.perf_counter() - start)
+
+    results = {"paths": paths, "rounds": rounds, "loop_paths_per_second": loop_rate}
+    for staking in (StakingRule.FLAT, StakingRule.KELLY):
+        simulator = BankrollSimulator(SLATE, 1000.0, staking)
+        serial = simulator.run(paths, rounds, seed)
+
+        async def parallel(simulator=simulator):
+            pool = ProcessTaskPool(workers=workers)
+            await pool.start()
+            try:
+                return await simulator.run_parallel(pool, paths, rounds, seed)
+            finally:
+                pool.close()
+
+        pooled = asyncio.run(parallel())
+        results[staking.value] = {
+            "serial_paths_per_second": serial.paths_per_second,
+            "pool_paths_per_second": pooled.paths_per_second,
+            "serial_speedup": serial.paths_per_second / loop_rate,
+            "pool_speedup": pooled.paths_per_second / loop_rate,
+            "identical": pooled.mean_final_bankroll == serial.mean_final_bankroll,
+            "ruin_probability": serial.ruin_probability,
+            "max_drawdown_quantiles": serial.max_drawdown_quantiles,
+            "rounds_to_ruin_quantiles": serial.rounds_to_ruin_quantiles,
+        }
+    return results
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Bankroll simulation benchmark")
+    parser.add_argument("--paths", type=int, default=200_000, help="Simulated paths")
+    parser.add_argument("--rounds", type=int, default=250, help="Rounds per path")
+    parser.add_argument("--workers", type=int, default=4, help="Process pool workers")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.paths, args.rounds, args.workers, args.seed)
+    logger.info(
+        f"{result['paths']:,} paths x {result['rounds']} rounds; "
+        f"Python loop {result['loop_paths_per_second']:,.0f} paths/s"
+    )
+    for staking in (StakingRule.FLAT.value, StakingRule.KELLY.value):
+        row = result[staking]
+        logger.info(
+            f"{staking:<5} serial {row['serial_paths_per_second']:,.0f} paths/s "
+            f"({row['serial_speedup']:,.0f}x), pool {row['pool_paths_per_second']:,.0f} paths/s "
+            f"({row['pool_speedup']:,.0f}x, identical: {row['identical']}), "
+            f"ruin {row['ruin_probability']:.2%}"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
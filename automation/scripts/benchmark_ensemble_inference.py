@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Ensemble Inference Benchmark for A1Betting Platform
+
+Compares looping UltraAdvancedEnsembleEngine.predict over a batch of events
+with one predict_batch call, which builds a single feature matrix, maps
+columns per model and runs the selected models in parallel. Feature
+preprocessing is replaced by a pass-through so only inference is measured.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import joblib
+import numpy as np
+from sklearn.ensemble import ExtraTreesRegressor, GradientBoostingRegressor, RandomForestRegressor
+from sklearn.linear_model import Ridge
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from ensemble_engine import (  # noqa: E402
+    ModelType,
+    PredictionContext,
+    UltraAdvancedEnsembleEngine,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+FEATURES = [f"feature_{i}" for i in range(24)]
+
+
+class PassThroughFeatures:
+    """Skips feature engineering so both paths see identical rows"""
+
+    def preprocess_features(self, features: Dict[str, float]) -> Dict[str, Any]:
+        return {"features": features}
+
+
+async def build_engine(model_dir: Path, seed: int) -> UltraAdvancedEnsembleEngine:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(3_000, len(FEATURES)))
+    y = X @ rng.normal(size=len(FEATURES)) + rng.normal(scale=0.1, size=len(X))
+    models = {
+        "random_forest": (ModelType.RANDOM_FOREST, RandomForestRegressor(n_estimators=50, max_depth=10, n_jobs=1)),
+        "extra_trees": (ModelType.RANDOM_FOREST, ExtraTreesRegressor(n_estimators=50, max_depth=10, n_jobs=1)),
+        "gradient_boosting": (ModelType.GRADIENT_BOOSTING, GradientBoostingRegressor(n_estimators=100, max_depth=3)),
+        "ridge": (ModelType.LINEAR_REGRESSION, Ridge()),
+    }
+
+    engine = UltraAdvancedEnsembleEngine()
+    engine.feature_engineer = PassThroughFeatures()
+    engine.cache_enabled = False
+    engine.model_registry.models_directory = model_dir
+    for offset, (name, (model_type, model)) in enumerate(models.items()):
+        # Each model sees a different, shuffled subset of the features
+        names = list(rng.permutation(FEATURES)[: len(FEATURES) - offset * 2])
+        columns = [FEATURES.index(feature) for feature in names]
+        model.fit(X[:, columns], y)
+        joblib.dump(model, model_dir / f"{name}.joblib")
+        await engine.model_registry.register_model(
+            name,
+            model_type,
+            f"{name}.joblib",
+            {"feature_names": names, "cv_scores": list(rng.uniform(0.6, 0.9, size=5))},
+        )
+    return engine
+
+
+async def run_benchmark(n_events: int, seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed + 1)
+    events: List[Dict[str, float]] = [
+        dict(zip(FEATURES, map(float, row))) for row in rng.normal(size=(n_events, len(FEATURES)))
+    ]
+    context = PredictionContext.PRE_GAME
+
+    with tempfile.TemporaryDirectory() as model_dir:
+        engine = await build_engine(Path(model_dir), seed)
+        await engine.predict_batch(events[:8], context)  # Load models, warm caches
+
+        start = time.perf_counter()
+        looped = [await engine.predict(event, context) for event in events]
+        loop_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        batched = await engine.predict_batch(events, context)
+        batch_s = time.perf_counter() - start
+
+    difference = max(
+        abs(single.predicted_value - batch.predicted_value)
+        for single, batch in zip(looped, batched)
+    )
+    return {
+        "events": n_events,
+        "models": len(batched[0].metadata["selected_models"]),
+        "loop_predict": {"seconds": loop_s, "events_per_sec": n_events / loop_s},
+        "predict_batch": {"seconds": batch_s, "events_per_sec": n_events / batch_s},
+        "speedup": loop_s / batch_s,
+        "max_abs_difference": difference,
+    }
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Ensemble batch inference benchmark")
+    parser.add_argument("--events", type=int, default=1_000, help="Events per batch")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args.events, args.seed))
+    logger.info(
+        f"{result['events']} events x {result['models']} models: "
+        f"loop {result['loop_predict']['events_per_sec']:,.0f} events/s, "
+        f"batch {result['predict_batch']['events_per_sec']:,.0f} events/s "
+        f"({result['speedup']:.1f}x, max |diff| {result['max_abs_difference']:.2e})"
+    )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Feature Layout Benchmark for A1Betting Platform
+
+Compares the per-request feature preparation that model_service used to do
+(a Python loop over the model's feature names, a warning per missing feature
+and np.array on the list) with a FeatureLayout compiled at model load, for
+single requests and for batches. Reports latency and the peak transient
+bytes allocated per request as seen by tracemalloc.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from feature_layout import FeatureLayout  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+# The legacy path logs every miss; send it to a formatted handler on devnull
+# so its cost is counted without flooding the console
+legacy_logger = logging.getLogger("benchmark_feature_layout.legacy")
+legacy_logger.propagate = False
+legacy_handler = logging.StreamHandler(open(os.devnull, "w"))
+legacy_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+legacy_logger.addHandler(legacy_handler)
+logging.getLogger("feature_layout").setLevel(logging.ERROR)
+
+
+def legacy_prepare(features: Dict[str, float], expected_features: List[str]) -> np.ndarray:
+    """The loop model_service ran per request before layouts"""
+    feature_vector = []
+    for feature_name in expected_features:
+        if feature_name in features:
+            feature_vector.append(float(features[feature_name]))
+        else:
+            legacy_logger.warning(f"Missing feature: {feature_name}")
+            feature_vector.append(0.0)
+    return np.array(feature_vector).reshape(1, -1)
+
+
+def build_requests(n_requests: int, n_features: int, missing_rate: float, seed: int):
+    rng = np.random.default_rng(seed)
+    names = [f"feature_{i}" for i in range(n_features)]
+    values = rng.normal(size=(n_requests, n_features))
+    keep = rng.random(size=(n_requests, n_features)) >= missing_rate
+    requests = [
+        {name: float(value) for name, value, present in zip(names, row, mask) if present}
+        for row, mask in zip(values, keep)
+    ]
+    return names, requests
+
+
+def measure(prepare: Callable[[Any], Any], units: List[Any], per_unit: int) -> Dict[str, float]:
+    """Latency over all units and the peak transient bytes of preparing one unit"""
+    for unit in units[:10]:
+        prepare(unit)  # Warm up
+    start = time.perf_counter()
+    for unit in units:
+        prepare(unit)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    peaks = []
+    for unit in units[:200]:
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        prepare(unit)
+        peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+    tracemalloc.stop()
+    requests = len(units) * per_unit
+    return {
+        "us_per_request": elapsed / requests * 1e6,
+        "requests_per_sec": requests / elapsed,
+        "peak_bytes_per_request": float(np.median(peaks)) / per_unit,
+    }
+
+
+def run_benchmark(
+    n_requests: int, n_features: int, missing_rate: float, batch_size: int, dtype: str, seed: int
+) -> Dict[str, Any]:
+    names, requests = build_requests(n_requests, n_features, missing_rate, seed)
+    layout = FeatureLayout(names, dtype=dtype)
+
+    batches = [requests[i : i + batch_size] for i in range(0, n_requests, batch_size)]
+
+    def legacy_batch(batch):
+        return np.vstack([legacy_prepare(request, names) for request in batch])
+
+    np.testing.assert_allclose(
+        np.vstack([legacy_prepare(request, names) for request in requests]),
+        layout.matrix(requests),
+        rtol=1e-6 if dtype == "float32" else 0,
+    )
+
+    report: Dict[str, Any] = {
+        "requests": n_requests,
+        "features": n_features,
+        "missing_rate": missing_rate,
+        "batch_size": batch_size,
+        "dtype": dtype,
+    }
+    report["paths"] = {
+        "legacy_single": measure(lambda request: legacy_prepare(request, names), requests, 1),
+        "layout_single": measure(layout.row, requests, 1),
+        "legacy_batch": measure(legacy_batch, batches, batch_size),
+        "layout_batch": measure(layout.matrix, batches, batch_size),
+    }
+
+    paths = report["paths"]
+    report["single_speedup"] = paths["legacy_single"]["us_per_request"] / paths["layout_single"]["us_per_request"]
+    report["batch_speedup"] = paths["legacy_batch"]["us_per_request"] / paths["layout_batch"]["us_per_request"]
+    report["layout_stats"] = {
+        key: value for key, value in layout.get_stats().items() if key != "missing"
+    }
+    return report
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Feature layout benchmark")
+    parser.add_argument("--requests", type=int, default=20_000, help="Requests to prepare")
+    parser.add_argument("--features", type=int, default=64, help="Features per model")
+    parser.add_argument("--missing-rate", type=float, default=0.05, help="Share of absent features")
+    parser.add_argument("--batch-size", type=int, default=256, help="Requests per batch")
+    parser.add_argument("--dtype", choices=["float32", "float64"], default="float64")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    result = run_benchmark(
+        args.requests, args.features, args.missing_rate, args.batch_size, args.dtype, args.seed
+    )
+    for name, row in result["paths"].items():
+        logger.info(
+            f"{name:<14} {row['us_per_request']:>7.2f} us/request "
+            f"({row['requests_per_sec']:>10,.0f}/s), peak {row['peak_bytes_per_request']:>7,.0f} B/request"
+        )
+    logger.info(
+        f"{result['features']} features, {result['missing_rate']:.0%} missing: "
+        f"single {result['single_speedup']:.1f}x, batch {result['batch_speedup']:.1f}x"
+    )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Joint Kelly Benchmark for A1Betting Platform
+
+Solve time for simultaneous batches of 10, 100 and 500 bets with
+JointKellySolver (half Kelly, the engine's default caps), against sizing
+each bet alone at half Kelly with only the per-position cap, as
+calculate_optimal_position_size does one opportunity at a time.
+
+Slates are player props and sides spread over events, so legs of one
+event are correlated; the latent correlation is the portfolio heuristic,
+repaired. Both stake sets are scored on a fresh scenario sample: total
+stake, expected log-growth and the chance of losing over a fifth of the
+bankroll in one settlement.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from joint_kelly import JointKellySolver, KellyBet, sample_scenarios  # noqa: E402
+from portfolio_correlation import heuristic_correlation, nearest_correlation  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+KELLY_MULTIPLIER = 0.5
+MAX_POSITION = 0.05
+EVALUATION_SAMPLES = 20_000
+
+
+def build_slate(n: int, rng: np.random.Generator) -> List[Dict[str, Any]]:
+    """Positive-edge opportunities, about five per event"""
+    slate = []
+    for i in range(n):
+        probability = float(rng.uniform(0.3, 0.7))
+        slate.append(
+            {
+                "id": f"o{i}",
+                "probability": probability,
+                "odds": float(rng.uniform(1.01, 1.1) / probability),
+                "event_id": f"e{rng.integers(max(1, n // 5))}",
+                "sport": "nba",
+                "market_type": ["prop", "spread", "total"][rng.integers(3)],
+                "player": f"p{i}",
+            }
+        )
+    return slate
+
+
+def single_bet_fractions(bets: List[KellyBet]) -> np.ndarray:
+    """Each bet sized alone: capped fractional Kelly"""
+    p = np.array([bet.win_probability for bet in bets])
+    b = np.array([bet.odds for bet in bets]) - 1.0
+    full = np.clip(p - (1.0 - p) / b, 0.0, None)
+    return np.minimum(KELLY_MULTIPLIER * full, MAX_POSITION)
+
+
+def score(fractions: np.ndarray, returns: np.ndarray) -> Dict[str, float]:
+    change = returns @ fractions
+    wealth = 1.0 + change
+    return {
+        "total_fraction": float(fractions.sum()),
+        "expected_log_growth": float(np.mean(np.log(np.maximum(wealth, 1e-12)))),
+        "loss_over_20pct": float(np.mean(change < -0.2)),
+    }
+
+
+def run_size(n: int, solver: JointKellySolver, rng: np.random.Generator, seed: int) -> Dict[str, Any]:
+    slate = build_slate(n, rng)
+    bets = [KellyBet(odds=opp["odds"], win_probability=opp["probability"], cluster=opp["event_id"]) for opp in slate]
+    start = time.perf_counter()
+    correlation, _ = nearest_correlation(heuristic_correlation(slate))
+    correlation_ms = (time.perf_counter() - start) * 1e3
+    result = solver.solve(bets, correlation, seed=seed)
+
+    start = time.perf_counter()
+    single = single_bet_fractions(bets)
+    single_ms = (time.perf_counter() - start) * 1e3
+
+    wins, _ = sample_scenarios(bets, EVALUATION_SAMPLES, correlation, seed=seed + 1)
+    returns = np.where(wins, np.array([bet.odds for bet in bets]) - 1.0, -1.0)
+    return {
+        "bets": n,
+        "method": result.method,
+        "scenarios": result.scenarios,
+        "iterations": result.iterations,
+        "converged": result.converged,
+        "correlation_ms": correlation_ms,
+        "joint_ms": result.elapsed_seconds * 1e3,
+        "single_ms": single_ms,
+        "joint": score(result.fractions, returns),
+        "single": score(single, returns),
+    }
+
+
+def run_benchmark(sizes: List[int], samples: int, seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    solver = JointKellySolver(kelly_multiplier=KELLY_MULTIPLIER, max_position=MAX_POSITION, samples=samples)
+    independent = [KellyBet(odds=2.0 + 0.1 * i, win_probability=0.5) for i in range(10)]
+    enumerated = solver.solve(independent)
+    return {
+        "samples": samples,
+        "independent_10": {"method": enumerated.method, "joint_ms": enumerated.elapsed_seconds * 1e3},
+        "results": [run_size(n, solver, rng, seed) for n in sizes],
+    }
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Joint Kelly benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500], help="Bets per batch")
+    parser.add_argument("--samples", type=int, default=10_000, help="Scenarios for sampled solves")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.sizes, args.samples, args.seed)
+    independent = result["independent_10"]
+    logger.info(f"10 independent bets: {independent['method']} in {independent['joint_ms']:.1f} ms")
+    for row in result["results"]:
+        joint, single = row["joint"], row["single"]
+        logger.info(
+            f"n={row['bets']:>4}: joint {row['joint_ms']:8.1f} ms ({row['method']}, "
+            f"{row['scenarios']} scenarios, {row['iterations']} it) + correlation "
+            f"{row['correlation_ms']:.1f} ms; one by one {row['single_ms']:.2f} ms"
+        )
+        logger.info(
+            f"        staked joint {joint['total_fraction']:.1%} vs alone {single['total_fraction']:.1%}; "
+            f"log-growth {joint['expected_log_growth']:+.5f} vs {single['expected_log_growth']:+.5f}; "
+            f"P(loss > 20%) {joint['loss_over_20pct']:.2%} vs {single['loss_over_20pct']:.2%}"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
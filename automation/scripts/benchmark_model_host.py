@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Model Host Benchmark for A1Betting Platform
+
+Serves single-row predictions over a zoo of random forests from several
+worker processes and compares:
+
+- per-worker: every worker loads the whole zoo (memory-mapped where joblib
+  allows, as ModelLoader does) and predicts in its own thread pool
+- host: one ModelHostServer process owns the zoo and workers send requests
+  over its Unix socket, coalesced per model
+
+Reports total proportional set size (PSS) across all processes, startup
+time, and p50/p99 request latency under concurrent load (Linux).
+"""
+
+import argparse
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 20
+
+COMMON = textwrap.dedent(
+    """
+    import asyncio, json, sys, time
+    import numpy as np
+    sys.path.insert(0, sys.argv[1])
+    from model_residency import load_model_file
+
+    def load_zoo(paths):
+        return {f"m{i}": load_model_file(path) for i, path in enumerate(paths)}
+
+    async def drive(predict, names, requests, concurrency, seed):
+        rng = np.random.default_rng(seed)
+        latencies = []
+
+        async def stream(n):
+            for _ in range(n):
+                name = names[rng.integers(len(names))]
+                row = rng.normal(size=(1, %d))
+                start = time.perf_counter()
+                await predict(name, row)
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[stream(requests // concurrency) for _ in range(concurrency)])
+        return latencies, time.perf_counter() - start
+    """
+    % N_FEATURES
+)
+
+# argv: backend_dir, mode, socket, requests, concurrency, seed, *paths
+WORKER = COMMON + textwrap.dedent(
+    """
+    async def main():
+        mode, socket_path = sys.argv[2], sys.argv[3]
+        requests, concurrency, seed = map(int, sys.argv[4:7])
+        paths = sys.argv[7:]
+        names = [f"m{i}" for i in range(len(paths))]
+        start = time.perf_counter()
+        if mode == "host":
+            from model_host import ModelHostClient
+            client = ModelHostClient(socket_path)
+            predict = client.predict
+        else:
+            models = load_zoo(paths)
+            loop = asyncio.get_running_loop()
+
+            async def predict(name, row):
+                return await loop.run_in_executor(None, models[name].predict, row)
+        ready = time.perf_counter() - start
+        latencies, elapsed = await drive(predict, names, requests, concurrency, seed)
+        print(json.dumps({"ready": ready, "latencies": latencies, "elapsed": elapsed}), flush=True)
+        sys.stdin.read()  # Stay alive until the parent has measured memory
+
+    asyncio.run(main())
+    """
+)
+
+# argv: backend_dir, socket, window_ms, *paths
+HOST = COMMON + textwrap.dedent(
+    """
+    from model_host import ModelHostServer
+
+    async def main():
+        start = time.perf_counter()
+        models = load_zoo(sys.argv[4:])
+        loop = asyncio.get_running_loop()
+
+        async def predict_rows(name, rows):
+            return await loop.run_in_executor(None, models[name].predict, rows)
+
+        server = ModelHostServer(predict_rows, sys.argv[2], window=float(sys.argv[3]) / 1000)
+        await server.start()
+        print(json.dumps({"ready": time.perf_counter() - start}), flush=True)
+        await loop.run_in_executor(None, sys.stdin.read)
+        print(json.dumps(server.get_stats()), flush=True)
+        await server.close()
+
+    asyncio.run(main())
+    """
+)
+
+
+def build_zoo(model_dir: Path, n_models: int, n_estimators: int, seed: int) -> List[str]:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(5_000, N_FEATURES))
+    y = X @ rng.normal(size=N_FEATURES) + rng.normal(size=len(X))
+    paths = []
+    for i in range(n_models):
+        model = RandomForestRegressor(n_estimators=n_estimators, max_depth=12, random_state=i, n_jobs=1)
+        path = model_dir / f"model_{i}.joblib"
+        joblib.dump(model.fit(X, y), path)
+        paths.append(str(path))
+    return paths
+
+
+def pss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Pss:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_mode(
+    mode: str, paths: List[str], workers: int, requests: int, concurrency: int, window_ms: float
+) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        socket_path = str(Path(tmp) / "host.sock")
+        host = None
+        host_ready = 0.0
+        if mode == "host":
+            host = subprocess.Popen(
+                [sys.executable, "-c", HOST, str(BACKEND_DIR), socket_path, str(window_ms), *paths],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            host_ready = json.loads(host.stdout.readline())["ready"]
+
+        start = time.perf_counter()
+        procs = [
+            subprocess.Popen(
+                [
+                    sys.executable, "-c", WORKER, str(BACKEND_DIR), mode, socket_path,
+                    str(requests), str(concurrency), str(seed), *paths,
+                ],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                text=True,
+            )
+            for seed in range(workers)
+        ]
+        reports = [json.loads(proc.stdout.readline()) for proc in procs]
+        wall = time.perf_counter() - start
+
+        everyone = procs + ([host] if host else [])
+        total_pss = sum(pss_mb(proc.pid) for proc in everyone)
+        host_stats = {}
+        for proc in everyone:
+            out, _ = proc.communicate("", timeout=60)
+            if proc is host and out.strip():
+                host_stats = json.loads(out.strip().splitlines()[-1])
+
+    latencies = np.concatenate([report["latencies"] for report in reports]) * 1e3
+    return {
+        "total_pss_mb": total_pss,
+        "startup_seconds": host_ready + max(report["ready"] for report in reports),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "throughput_rps": len(latencies) / wall,
+        "avg_rows_per_model_call": host_stats.get("avg_rows_per_call"),
+    }
+
+
+def run_benchmark(
+    n_models: int, n_estimators: int, workers: int, requests: int, concurrency: int, window_ms: float, seed: int
+) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = build_zoo(Path(tmp), n_models, n_estimators, seed)
+        return {
+            "models": n_models,
+            "zoo_mb": sum(Path(path).stat().st_size for path in paths) / 1024**2,
+            "workers": workers,
+            "requests_per_worker": requests,
+            "per_worker": run_mode("per_worker", paths, workers, requests, concurrency, window_ms),
+            "host": run_mode("host", paths, workers, requests, concurrency, window_ms),
+        }
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Shared model host benchmark")
+    parser.add_argument("--models", type=int, default=8, help="Models in the zoo")
+    parser.add_argument("--estimators", type=int, default=100, help="Trees per forest")
+    parser.add_argument("--workers", type=int, default=4, help="API worker processes")
+    parser.add_argument("--requests", type=int, default=2_000, help="Requests per worker")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent requests per worker")
+    parser.add_argument("--window-ms", type=float, default=2.0, help="Host batching window")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    if not Path("/proc/self/smaps_rollup").exists():
+        raise SystemExit("This benchmark reads /proc/<pid>/smaps_rollup (Linux only)")
+
+    result = run_benchmark(
+        args.models, args.estimators, args.workers, args.requests, args.concurrency, args.window_ms, args.seed
+    )
+    logger.info(f"{result['models']} models ({result['zoo_mb']:,.0f} MB), {result['workers']} workers")
+    for label in ("per_worker", "host"):
+        row = result[label]
+        batching = (
+            f", {row['avg_rows_per_model_call']:.1f} rows per model call"
+            if row["avg_rows_per_model_call"]
+            else ""
+        )
+        logger.info(
+            f"{label:<10} PSS {row['total_pss_mb']:,.0f} MB, startup {row['startup_seconds']:.2f} s, "
+            f"p50 {row['p50_ms']:.2f} ms, p99 {row['p99_ms']:.2f} ms, "
+            f"{row['throughput_rps']:,.0f} req/s{batching}"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Model Residency Benchmark for A1Betting Platform
+
+Builds a zoo of joblib-dumped models (linear models with large fitted arrays
+and random forests), then compares:
+
+- startup: eagerly joblib.load-ing every model vs preloading a few through
+  ModelResidency and loading the rest on demand
+- memory: private vs memory-mapped bytes with and without mmap, and the
+  private RSS of several worker processes loading the same zoo (Linux)
+- a skewed request stream under a byte budget smaller than the unmapped
+  zoo: hit rate, loads, evictions and mean load latency
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import Ridge
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from model_residency import ModelResidency  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+logging.getLogger("model_residency").setLevel(logging.WARNING)
+
+WORKER = textwrap.dedent(
+    """
+    import sys
+    sys.path.insert(0, sys.argv[1])
+    from model_residency import load_model_file
+    mmap_mode = sys.argv[2] or None
+    models = [load_model_file(path, mmap_mode) for path in sys.argv[3:]]
+    for model in models:  # Touch every array so mapped pages are resident
+        for value in vars(model).values():
+            if hasattr(value, "sum"):
+                value.sum()
+    rollup = dict(
+        (line.split(":")[0], int(line.split()[1]))
+        for line in open("/proc/self/smaps_rollup") if line.strip().endswith("kB")
+    )
+    print(rollup.get("Private_Clean", 0) + rollup.get("Private_Dirty", 0),
+          rollup.get("Shared_Clean", 0) + rollup.get("Shared_Dirty", 0))
+    """
+)
+
+
+def build_zoo(model_dir: Path, n_models: int, array_mb: float, seed: int) -> List[Path]:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(2_000, 20))
+    y = X @ rng.normal(size=20)
+    paths = []
+    for i in range(n_models):
+        if i % 4 == 3:
+            model = RandomForestRegressor(n_estimators=20, max_depth=8, n_jobs=1).fit(X, y)
+        else:
+            model = Ridge().fit(X, y)
+            # Stand-in for embedding tables and other large fitted arrays
+            model.lookup_ = rng.normal(size=int(array_mb * 1024**2 / 8))
+        path = model_dir / f"model_{i}.joblib"
+        joblib.dump(model, path)
+        paths.append(path)
+    return paths
+
+
+def worker_memory(paths: List[Path], mmap_mode: str, workers: int) -> Dict[str, float]:
+    if not Path("/proc/self/smaps_rollup").exists():
+        return {}
+    procs = [
+        subprocess.Popen(
+            [sys.executable, "-c", WORKER, str(BACKEND_DIR), mmap_mode, *map(str, paths)],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(workers)
+    ]
+    private_kb = shared_kb = 0
+    for proc in procs:
+        out, _ = proc.communicate(timeout=300)
+        private, shared = map(int, out.split())
+        private_kb += private
+        shared_kb += shared
+    return {"private_mb_all_workers": private_kb / 1024, "shared_mb_all_workers": shared_kb / 1024}
+
+
+async def run_requests(
+    paths: List[Path], budget_bytes: int, n_requests: int, preload: int, seed: int
+) -> Dict[str, Any]:
+    # Unmapped, so every model counts in full and the LRU has to work
+    residency = ModelResidency(budget_bytes=budget_bytes, mmap_mode=None)
+    start = time.perf_counter()
+    for path in paths[:preload]:
+        await residency.load(path.stem, str(path))
+    startup_s = time.perf_counter() - start
+
+    # Zipf-like popularity: a few models serve most requests
+    rng = np.random.default_rng(seed)
+    popularity = 1.0 / np.arange(1, len(paths) + 1) ** 1.2
+    picks = rng.choice(len(paths), size=n_requests, p=popularity / popularity.sum())
+    start = time.perf_counter()
+    for index in picks:
+        await residency.load(paths[index].stem, str(paths[index]))
+    requests_s = time.perf_counter() - start
+
+    stats = residency.get_stats()
+    stats.pop("models")
+    lookups = stats["hits"] + stats["misses"]
+    return {
+        "startup_seconds": startup_s,
+        "requests_seconds": requests_s,
+        "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+        **stats,
+    }
+
+
+def run_benchmark(
+    n_models: int, array_mb: float, budget_fraction: float, workers: int, seed: int
+) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = build_zoo(Path(tmp), n_models, array_mb, seed)
+
+        start = time.perf_counter()
+        eager = [joblib.load(path) for path in paths]
+        eager_s = time.perf_counter() - start
+        del eager
+
+        footprints = {}
+        for label, mmap_mode in (("mmap", "r"), ("no_mmap", None)):
+            residency = ModelResidency(budget_bytes=1 << 62, mmap_mode=mmap_mode)
+
+            async def load_all(residency=residency):
+                for path in paths:
+                    await residency.load(path.stem, str(path))
+
+            start = time.perf_counter()
+            asyncio.run(load_all())
+            footprints[label] = {
+                "load_all_seconds": time.perf_counter() - start,
+                "private_mb": residency.resident_bytes / 1024**2,
+                "mapped_mb": residency.mapped_bytes / 1024**2,
+            }
+
+        total_private = footprints["no_mmap"]["private_mb"] * 1024**2
+        budget = int(total_private * budget_fraction)
+        requests = asyncio.run(run_requests(paths, budget, 5_000, preload=2, seed=seed))
+
+        return {
+            "models": n_models,
+            "zoo_mb": sum(path.stat().st_size for path in paths) / 1024**2,
+            "eager_startup_seconds": eager_s,
+            "footprints": footprints,
+            "workers": {
+                "count": workers,
+                "mmap": worker_memory(paths, "r", workers),
+                "no_mmap": worker_memory(paths, "", workers),
+            },
+            "budgeted_requests": {"budget_mb": budget / 1024**2, **requests},
+        }
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Model residency benchmark")
+    parser.add_argument("--models", type=int, default=16, help="Models in the zoo")
+    parser.add_argument("--array-mb", type=float, default=16.0, help="Fitted array size per linear model")
+    parser.add_argument(
+        "--budget-fraction", type=float, default=0.3, help="Budget as a share of the unmapped zoo"
+    )
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes for the RSS check")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.models, args.array_mb, args.budget_fraction, args.workers, args.seed)
+    requests = result["budgeted_requests"]
+    logger.info(
+        f"{result['models']} models ({result['zoo_mb']:,.0f} MB): eager startup "
+        f"{result['eager_startup_seconds']:.2f} s vs preload-2 {requests['startup_seconds']:.2f} s"
+    )
+    for label, row in result["footprints"].items():
+        logger.info(
+            f"{label:<8} load all {row['load_all_seconds']:.2f} s, private {row['private_mb']:,.1f} MB, "
+            f"mapped {row['mapped_mb']:,.1f} MB"
+        )
+    for label in ("mmap", "no_mmap"):
+        memory = result["workers"][label]
+        if memory:
+            logger.info(
+                f"{result['workers']['count']} workers {label:<8} private {memory['private_mb_all_workers']:,.0f} MB, "
+                f"shared {memory['shared_mb_all_workers']:,.0f} MB"
+            )
+    logger.info(
+        f"Budget {requests['budget_mb']:,.1f} MB: hit rate {requests['hit_rate']:.1%}, "
+        f"{requests['loads']} loads, {requests['evictions']} evictions, "
+        f"avg load {requests['avg_load_seconds'] * 1e3:.1f} ms"
+    )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Model Selection Benchmark for A1Betting Platform
+
+Registers a synthetic zoo of models and compares per-request selection cost:
+
+- the per-model loop: composite score per model (context history mean,
+  recency decay, feature-set intersection) and pairwise CV correlations for
+  the diversity pass
+- ModelSelectionIndex, cold (new context each time) and memoised (repeated
+  context and feature schema)
+"""
+
+import argparse
+import json
+import logging
+import math
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from model_selection import ModelSelectionIndex  # noqa: E402
+from utils.prediction_utils import feature_compatibility, model_correlation  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+N_FEATURES = 40
+MAX_MODELS = 10
+THRESHOLD = 0.1
+HALF_LIFE = 72.0
+
+
+def build_models(n_models: int, seed: int) -> Dict[str, Dict[str, Any]]:
+    rng = np.random.default_rng(seed)
+    now = time.time()
+    features = [f"f{i}" for i in range(N_FEATURES)]
+    return {
+        f"model_{i}": {
+            "performance": rng.uniform(),
+            "uncertainty": rng.uniform(),
+            "updated_at": now - rng.uniform(0, 300) * 3600,
+            "cv_scores": rng.uniform(0.4, 0.9, size=5).tolist(),
+            "feature_names": rng.choice(features, size=20, replace=False).tolist(),
+        }
+        for i in range(n_models)
+    }
+
+
+def loop_select(models: Dict[str, Dict[str, Any]], history, schema) -> list:
+    now = time.time()
+    scores = {}
+    for name, model in models.items():
+        recent = history.get(name, [])[-10:]
+        scores[name] = (
+            model["performance"] * 0.4
+            + (np.mean(recent) if recent else 0.5) * 0.25
+            + feature_compatibility(model["feature_names"], schema) * 0.15
+            + math.exp(-(now - model["updated_at"]) / 3600 / HALF_LIFE) * 0.1
+            + model["uncertainty"] * 0.1
+        )
+    ranked = [name for name, _ in sorted(scores.items(), key=lambda x: x[1], reverse=True)][:MAX_MODELS]
+    kept = [ranked[0]]
+    for name in ranked[1:]:
+        if all(
+            model_correlation(models[name]["cv_scores"], models[other]["cv_scores"]) <= 1 - THRESHOLD
+            for other in kept
+        ):
+            kept.append(name)
+    return kept
+
+
+def run_benchmark(n_models: int, iterations: int, seed: int) -> Dict[str, Any]:
+    models = build_models(n_models, seed)
+    schema = [f"f{i}" for i in range(0, N_FEATURES, 2)]
+    history = {name: [0.6, 0.7] for name in list(models)[::5]}
+
+    start = time.perf_counter()
+    index = ModelSelectionIndex()
+    for name, model in models.items():
+        index.upsert(name, **model)
+    build_s = time.perf_counter() - start
+    for name, outcomes in history.items():
+        for outcome in outcomes:
+            index.record_context_score("pre_game", name, outcome)
+
+    def select(context):
+        return index.select(
+            context,
+            schema,
+            strategy="performance",
+            max_models=MAX_MODELS,
+            min_models=2,
+            diversity_threshold=THRESHOLD,
+            half_life_hours=HALF_LIFE,
+        )
+
+    loop_iterations = max(1, iterations // 100)
+    start = time.perf_counter()
+    for _ in range(loop_iterations):
+        expected = loop_select(models, history, schema)
+    loop_us = (time.perf_counter() - start) / loop_iterations * 1e6
+
+    start = time.perf_counter()
+    for n in range(loop_iterations):
+        select(f"cold-{n}")
+    cold_us = (time.perf_counter() - start) / loop_iterations * 1e6
+
+    selected = select("pre_game").models
+    start = time.perf_counter()
+    for _ in range(iterations):
+        select("pre_game")
+    warm_us = (time.perf_counter() - start) / iterations * 1e6
+
+    return {
+        "models": n_models,
+        "index_build_seconds": build_s,
+        "loop_us": loop_us,
+        "index_cold_us": cold_us,
+        "index_memoised_us": warm_us,
+        "speedup_cold": loop_us / cold_us,
+        "speedup_memoised": loop_us / warm_us,
+        "same_selection": selected == expected,
+        "stats": index.get_stats(),
+    }
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Model selection benchmark")
+    parser.add_argument("--models", type=int, default=500, help="Registered models")
+    parser.add_argument("--iterations", type=int, default=100_000, help="Memoised selections timed")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.models, args.iterations, args.seed)
+    logger.info(
+        f"{result['models']} models: index built in {result['index_build_seconds'] * 1e3:.1f} ms, "
+        f"same selection as loop: {result['same_selection']}"
+    )
+    logger.info(
+        f"Per selection: loop {result['loop_us']:,.0f} us, index cold {result['index_cold_us']:,.1f} us "
+        f"({result['speedup_cold']:.0f}x), memoised {result['index_memoised_us']:.2f} us "
+        f"({result['speedup_memoised']:,.0f}x)"
+    )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
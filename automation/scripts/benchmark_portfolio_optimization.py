@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Portfolio Optimization Benchmark for A1Betting Platform
+
+Solve time against the number of opportunities for the problems
+PortfolioOptimizer poses, on a fixed (already repaired) correlation matrix:
+
+- mean-variance: the previous SLSQP path (numerical gradients, equal-weight
+  start) against the box-and-budget QP solver, cold and warm-started from
+  the previous solution after a small change in expected values
+- risk parity: SLSQP against Newton on the log-barrier formulation
+- batched: many users' mean-variance problems in one solve against one by one
+
+SLSQP is skipped above --slsqp-max opportunities, where it takes minutes.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import scipy.optimize as opt
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from portfolio_qp import (  # noqa: E402
+    risk_parity_objective,
+    solve_box_budget_qp,
+    solve_box_budget_qp_batch,
+    solve_risk_parity,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+RISK_AVERSION = 5.0
+MAX_WEIGHT = 0.5
+
+
+def build_problem(n: int, rng: np.random.Generator):
+    """Factor-model covariance (events and sports as factors) and expected values"""
+    factors = rng.normal(size=(n, max(2, n // 20))) * rng.uniform(0.2, 0.8, size=(n, 1))
+    correlations = factors @ factors.T + np.eye(n)
+    scale = 1.0 / np.sqrt(np.diag(correlations))
+    risks = rng.uniform(0.1, 0.5, n)
+    cov = correlations * np.outer(scale, scale) * np.outer(risks, risks)
+    return cov, rng.normal(0.03, 0.05, n)
+
+
+def slsqp_mean_variance(cov: np.ndarray, mu: np.ndarray) -> np.ndarray:
+    """The previous _mean_variance_optimization solve"""
+    n = len(mu)
+
+    def objective(weights):
+        return -(weights @ mu - 0.5 * RISK_AVERSION * weights @ cov @ weights)
+
+    result = opt.minimize(
+        objective,
+        np.ones(n) / n,
+        method="SLSQP",
+        bounds=[(0, MAX_WEIGHT)] * n,
+        constraints=[{"type": "eq", "fun": lambda x: np.sum(x) - 1.0}],
+    )
+    return result.x
+
+
+def slsqp_risk_parity(cov: np.ndarray) -> np.ndarray:
+    """The previous _risk_parity_optimization solve"""
+    n = len(cov)
+    result = opt.minimize(
+        risk_parity_objective,
+        np.ones(n) / n,
+        args=(cov,),
+        method="SLSQP",
+        bounds=[(1e-6, MAX_WEIGHT)] * n,
+        constraints=[{"type": "eq", "fun": lambda x: np.sum(x) - 1.0}],
+    )
+    return result.x
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    value = fn(*args, **kwargs)
+    return value, (time.perf_counter() - start) * 1e3
+
+
+def mean_variance_objective(weights: np.ndarray, cov: np.ndarray, mu: np.ndarray) -> float:
+    return float(weights @ mu - 0.5 * RISK_AVERSION * weights @ cov @ weights)
+
+
+def run_size(n: int, slsqp_max: int, rng: np.random.Generator) -> Dict[str, Any]:
+    cov, mu = build_problem(n, rng)
+    lower, upper = np.zeros(n), np.full(n, MAX_WEIGHT)
+    cold, cold_ms = timed(solve_box_budget_qp, RISK_AVERSION * cov, mu, lower, upper)
+    nudged = mu + rng.normal(0, 0.002, n)
+    warm, warm_ms = timed(solve_box_budget_qp, RISK_AVERSION * cov, nudged, lower, upper, x0=cold.weights)
+    parity, parity_ms = timed(solve_risk_parity, cov, 1e-6, MAX_WEIGHT)
+    row: Dict[str, Any] = {
+        "opportunities": n,
+        "qp_ms": cold_ms,
+        "qp_iterations": cold.iterations,
+        "qp_exact": cold.exact,
+        "qp_warm_ms": warm_ms,
+        "qp_warm_iterations": warm.iterations,
+        "risk_parity_newton_ms": parity_ms,
+        "risk_parity_exact": parity.exact,
+        "slsqp_ms": None,
+        "slsqp_risk_parity_ms": None,
+        "objective_gap": None,
+    }
+    if n <= slsqp_max:
+        reference, row["slsqp_ms"] = timed(slsqp_mean_variance, cov, mu)
+        _, row["slsqp_risk_parity_ms"] = timed(slsqp_risk_parity, cov)
+        # Positive when the QP solution is better than SLSQP's
+        row["objective_gap"] = mean_variance_objective(cold.weights, cov, mu) - mean_variance_objective(
+            reference, cov, mu
+        )
+    return row
+
+
+def run_batch(users: int, size: int, rng: np.random.Generator) -> Dict[str, Any]:
+    problems = [build_problem(int(rng.integers(size // 2, size + 1)), rng) for _ in range(users)]
+    Qs = [RISK_AVERSION * cov for cov, _ in problems]
+    cs = [mu for _, mu in problems]
+    lowers = [np.zeros(len(mu)) for mu in cs]
+    uppers = [np.full(len(mu), MAX_WEIGHT) for mu in cs]
+    _, batch_ms = timed(solve_box_budget_qp_batch, Qs, cs, lowers, uppers, [1.0] * users)
+    start = time.perf_counter()
+    for Q, c, lower, upper in zip(Qs, cs, lowers, uppers):
+        solve_box_budget_qp(Q, c, lower, upper)
+    sequential_ms = (time.perf_counter() - start) * 1e3
+    return {"users": users, "max_opportunities": size, "batch_ms": batch_ms, "sequential_ms": sequential_ms}
+
+
+def run_benchmark(
+    sizes: List[int], slsqp_max: int, users: int, batch_size: int, seed: int
+) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    return {
+        "results": [run_size(n, slsqp_max, rng) for n in sizes],
+        "batch": run_batch(users, batch_size, rng),
+    }
+
+
+def _ms(value: Optional[float]) -> str:
+    return f"{value:9.1f}" if value is not None else "      n/a"
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Portfolio optimization benchmark")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 30, 100, 300, 1000, 2000], help="Opportunities"
+    )
+    parser.add_argument("--slsqp-max", type=int, default=300, help="Largest size to run SLSQP on")
+    parser.add_argument("--users", type=int, default=64, help="Portfolios in the batched solve")
+    parser.add_argument("--batch-size", type=int, default=40, help="Largest portfolio in the batch")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.sizes, args.slsqp_max, args.users, args.batch_size, args.seed)
+    for row in result["results"]:
+        gap = f", QP - SLSQP objective {row['objective_gap']:+.2e}" if row["objective_gap"] is not None else ""
+        logger.info(
+            f"n={row['opportunities']:>5}: mean-variance SLSQP {_ms(row['slsqp_ms'])} ms, "
+            f"QP {row['qp_ms']:8.1f} ms ({row['qp_iterations']} it), "
+            f"warm {row['qp_warm_ms']:7.1f} ms ({row['qp_warm_iterations']} it); "
+            f"risk parity SLSQP {_ms(row['slsqp_risk_parity_ms'])} ms, "
+            f"Newton {row['risk_parity_newton_ms']:8.1f} ms{gap}"
+        )
+    batch = result["batch"]
+    logger.info(
+        f"{batch['users']} portfolios of up to {batch['max_opportunities']} opportunities: "
+        f"batched {batch['batch_ms']:.1f} ms, one by one {batch['sequential_ms']:.1f} ms"
+    )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Prediction Trigger Batching Benchmark for A1Betting Platform
+
+Compares one task and one single-row model call per prediction trigger with
+the MicroBatcher dispatch used by the real-time engine, which runs one
+inference over a 2-D feature matrix per batch.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from micro_batcher import MicroBatcher  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+FEATURES = ["team_1_score", "team_2_score", "time_remaining", "total_possessions", "pace"]
+
+
+def train_models(n_models: int = 3, seed: int = 42) -> List[RandomForestRegressor]:
+    rng = np.random.default_rng(seed)
+    X = rng.normal(size=(2_000, len(FEATURES)))
+    y = X @ rng.normal(size=len(FEATURES)) + rng.normal(scale=0.1, size=len(X))
+    return [
+        RandomForestRegressor(n_estimators=20, max_depth=8, random_state=i, n_jobs=1).fit(X, y)
+        for i in range(n_models)
+    ]
+
+
+def make_triggers(n_triggers: int, n_events: int, seed: int = 42) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    return [
+        {
+            "event_id": f"event_{rng.randrange(n_events)}",
+            "features": {name: rng.gauss(0, 1) for name in FEATURES},
+        }
+        for _ in range(n_triggers)
+    ]
+
+
+async def run_per_trigger(models, triggers) -> Dict[str, Any]:
+    results = []
+
+    async def handle(trigger):
+        row = np.array([[trigger["features"][name] for name in FEATURES]])
+        results.append(float(np.mean([model.predict(row)[0] for model in models])))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(asyncio.create_task(handle(trigger)) for trigger in triggers))
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "predictions": len(results), "model_calls": len(results) * len(models)}
+
+
+async def run_batched(models, triggers, window: float, max_batch: int) -> Dict[str, Any]:
+    results = []
+
+    async def process(batch):
+        matrix = np.array([[trigger["features"][name] for name in FEATURES] for trigger in batch])
+        results.extend(np.mean([model.predict(matrix) for model in models], axis=0))
+
+    batcher = MicroBatcher(process, window=window, max_batch=max_batch, max_pending=4 * max_batch)
+    batcher.start()
+    start = time.perf_counter()
+    for trigger in triggers:
+        await batcher.submit(trigger["event_id"], trigger)
+    while len(batcher) or batcher.get_stats()["dispatched"] > len(results):
+        await asyncio.sleep(window)
+    elapsed = time.perf_counter() - start
+    stats = batcher.get_stats()
+    batcher.close()
+    return {
+        "seconds": elapsed,
+        "predictions": len(results),
+        "model_calls": stats["batches"] * len(models),
+        "batcher": stats,
+    }
+
+
+async def run_benchmark(n_triggers: int, n_events: int, window: float, max_batch: int) -> Dict[str, Any]:
+    models = train_models()
+    triggers = make_triggers(n_triggers, n_events)
+    per_trigger = await run_per_trigger(models, triggers)
+    batched = await run_batched(models, triggers, window, max_batch)
+    return {
+        "triggers": n_triggers,
+        "events": n_events,
+        "per_trigger": per_trigger,
+        "batched": batched,
+        "speedup": per_trigger["seconds"] / batched["seconds"] if batched["seconds"] else 0.0,
+    }
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Prediction trigger batching benchmark")
+    parser.add_argument("--triggers", type=int, default=2_000, help="Triggers in the burst")
+    parser.add_argument("--events", type=int, default=1_000, help="Distinct events triggering")
+    parser.add_argument("--window-ms", type=float, default=5.0, help="Batch window")
+    parser.add_argument("--max-batch", type=int, default=256, help="Triggers per batch")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    result = asyncio.run(
+        run_benchmark(args.triggers, args.events, args.window_ms / 1000, args.max_batch)
+    )
+    logger.info(
+        f"triggers={result['triggers']:,} per-trigger={result['per_trigger']['seconds']:.2f}s "
+        f"({result['per_trigger']['model_calls']:,} model calls) "
+        f"batched={result['batched']['seconds']:.2f}s ({result['batched']['model_calls']:,} model calls, "
+        f"{result['batched']['predictions']:,} predictions after dedup) speedup={result['speedup']:.1f}x"
+    )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2, default=float))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
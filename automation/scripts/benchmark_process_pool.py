@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+CPU Task Process Pool Benchmark for A1Betting Platform
+
+Trains a batch of random forest models through ProcessTaskPool with 1..N
+worker processes, passing the training matrix through shared memory, and
+reports wall time and speedup over a single worker.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from process_pool import ProcessTaskPool  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+async def time_training(
+    workers: int, n_models: int, features: np.ndarray, targets: np.ndarray, n_estimators: int
+) -> Dict[str, Any]:
+    pool = ProcessTaskPool(workers=workers, initializers=["cpu_tasks:warm_up"])
+    try:
+        await pool.start()  # Spawn and warm outside the timed region
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(
+                pool.run(
+                    "cpu_tasks:model_training_task",
+                    (f"model_{i}", {"features": features, "targets": targets}),
+                    {"n_estimators": n_estimators, "random_state": i},
+                )
+                for i in range(n_models)
+            )
+        )
+        elapsed = time.perf_counter() - start
+        return {
+            "workers": workers,
+            "seconds": elapsed,
+            "models_per_sec": n_models / elapsed,
+            "mean_accuracy": float(np.mean([r["accuracy"] for r in results])),
+            "shared_mb": pool.get_stats()["shared_bytes"] / 1e6,
+        }
+    finally:
+        pool.close()
+
+
+async def run_benchmark(
+    worker_counts: List[int], n_models: int, rows: int, cols: int, n_estimators: int
+) -> List[Dict[str, Any]]:
+    rng = np.random.default_rng(42)
+    features = rng.normal(size=(rows, cols))
+    targets = features[:, :5] @ rng.normal(size=5) + rng.normal(scale=0.5, size=rows)
+
+    results = []
+    for workers in worker_counts:
+        result = await time_training(workers, n_models, features, targets, n_estimators)
+        result["speedup"] = results[0]["seconds"] / result["seconds"] if results else 1.0
+        results.append(result)
+        logger.info(
+            f"workers={workers} {result['seconds']:.2f}s "
+            f"({result['models_per_sec']:.2f} models/s) speedup={result['speedup']:.2f}x "
+            f"shared={result['shared_mb']:.0f} MB"
+        )
+    return results
+
+
+def main():
+    """Main execution function."""
+    cpus = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description="CPU task process pool benchmark")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, cpus} & set(range(1, cpus + 1))),
+        help="Worker counts to compare",
+    )
+    parser.add_argument("--models", type=int, default=8, help="Models to train per run")
+    parser.add_argument("--rows", type=int, default=20_000, help="Training rows")
+    parser.add_argument("--cols", type=int, default=20, help="Feature columns")
+    parser.add_argument("--estimators", type=int, default=50, help="Trees per model")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    results = asyncio.run(
+        run_benchmark(args.workers, args.models, args.rows, args.cols, args.estimators)
+    )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
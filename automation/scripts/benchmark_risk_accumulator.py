@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Streaming Risk Metrics Benchmark for A1Betting Platform
+
+Latency of the return-based portfolio risk metrics (VaR 95/99, expected
+shortfall, max drawdown, Sharpe, Sortino, Calmar, confidence interval) as
+the history grows:
+
+- full: the previous path, converting the whole historical_returns list to
+  an array and recomputing every metric from it
+- add: one settled return into the portfolio's RiskAccumulator
+- metrics: reading the metrics from the accumulator
+- assess: RiskAssessmentEngine.assess_portfolio_risk for a known portfolio
+  after one more settled return is recorded for it
+
+Also reports the serialised accumulator size and the VaR / ES error of the
+sketch against the exact values.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from risk_accumulator import RiskAccumulator  # noqa: E402
+from risk_management import RiskAssessmentEngine  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def full_recompute(historical_returns: List[float]) -> Dict[str, Any]:
+    """The metrics from the whole history, as assess_portfolio_risk used to"""
+    returns = np.array(historical_returns)
+    var_95 = float(np.percentile(returns, 5))
+    var_99 = float(np.percentile(returns, 1))
+    tail = returns[returns <= var_95]
+    cumulative = np.cumprod(1 + returns)
+    running_max = np.maximum.accumulate(cumulative)
+    max_drawdown = float(np.min((cumulative - running_max) / running_max))
+    excess = np.mean(returns) - 0.02 / 252
+    std = np.std(returns)
+    downside = np.std(returns[returns < 0])
+    return {
+        "value_at_risk_95": var_95,
+        "value_at_risk_99": var_99,
+        "expected_shortfall_95": float(np.mean(tail)),
+        "max_drawdown": max_drawdown,
+        "sharpe_ratio": float(excess / std * np.sqrt(252)),
+        "sortino_ratio": float(excess / downside * np.sqrt(252)),
+        "calmar_ratio": float(np.mean(returns) * 252 / abs(max_drawdown)),
+        "confidence_interval": (float(np.percentile(returns, 2.5)), float(np.percentile(returns, 97.5))),
+    }
+
+
+def mean_us(fn: Callable[[], Any], repeats: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats * 1e6
+
+
+def run_size(n: int, repeats: int, rng: np.random.Generator) -> Dict[str, Any]:
+    # Small daily returns around a slight edge, as a bankroll fraction
+    history = list(rng.normal(0.0005, 0.01, n))
+    engine = RiskAssessmentEngine()
+    positions = [{"stake": 10.0, "market_type": "standard"}]
+    engine.record_returns("p", history)
+    accumulator = engine.accumulators["p"]
+
+    full_repeats = max(1, min(repeats, 2_000_000 // n))
+    full_us = mean_us(lambda: full_recompute(history), full_repeats)
+    new_returns = iter(rng.normal(0.0005, 0.01, 10 * repeats))
+    add_us = mean_us(lambda: accumulator.add(next(new_returns)), repeats)
+    metrics_us = mean_us(accumulator.metrics, repeats)
+
+    # Back in step with the history for the end-to-end assessment
+    engine.accumulators["p"] = accumulator = RiskAccumulator()
+    accumulator.update(history)
+
+    async def assess_growing():
+        value = float(next(new_returns))
+        history.append(value)
+        engine.record_return("p", value)
+        await engine.assess_portfolio_risk(positions, 1000.0, portfolio_id="p")
+
+    loop = asyncio.new_event_loop()
+    try:
+        assess_us = mean_us(lambda: loop.run_until_complete(assess_growing()), repeats)
+    finally:
+        loop.close()
+
+    exact = full_recompute(history)
+    metrics = accumulator.metrics()
+    return {
+        "history": n,
+        "full_us": full_us,
+        "add_us": add_us,
+        "metrics_us": metrics_us,
+        "assess_us": assess_us,
+        "state_bytes": len(accumulator.to_bytes()),
+        "var_95_error": abs(metrics.value_at_risk_95 - exact["value_at_risk_95"]),
+        "es_95_error": abs(metrics.expected_shortfall_95 - exact["expected_shortfall_95"]),
+    }
+
+
+def run_benchmark(sizes: List[int], repeats: int, seed: int) -> Dict[str, Any]:
+    rng = np.random.default_rng(seed)
+    return {"repeats": repeats, "results": [run_size(n, repeats, rng) for n in sizes]}
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Streaming risk metrics benchmark")
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000], help="History lengths"
+    )
+    parser.add_argument("--repeats", type=int, default=200, help="Timed operations per size")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.sizes, args.repeats, args.seed)
+    for row in result["results"]:
+        logger.info(
+            f"history={row['history']:>9,}: full recompute {row['full_us'] / 1e3:9.2f} ms; "
+            f"accumulator add {row['add_us']:5.1f} us, metrics {row['metrics_us']:6.1f} us, "
+            f"assess {row['assess_us']:7.1f} us; state {row['state_bytes']:,} B; "
+            f"|VaR err| {row['var_95_error']:.1e}, |ES err| {row['es_95_error']:.1e}"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
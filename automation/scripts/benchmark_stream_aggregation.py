@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Stream Aggregation Benchmark for A1Betting Platform
+
+Drives StreamAggregator with a bursty odds feed and reports per-message cost,
+buffered keys and deadline flush latency of the timer-wheel tick.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from realtime_engine import (  # noqa: E402
+    StreamAggregator,
+    StreamMessage,
+    StreamType,
+    UpdatePriority,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+async def run_benchmark(
+    messages: int, keys: int, burst: int, pause: float, seed: int = 42
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    flushed = []
+
+    async def on_flush(message: StreamMessage):
+        flushed.append(message)
+
+    aggregator = StreamAggregator(on_flush=on_flush)
+    ticker = asyncio.create_task(aggregator.run())
+
+    costs = []
+    sent = 0
+    while sent < messages:
+        # Bursts concentrate on a few hot markets, as around line moves
+        hot = rng.sample(range(keys), max(1, keys // 20))
+        for _ in range(min(burst, messages - sent)):
+            key = rng.choice(hot) if rng.random() < 0.8 else rng.randrange(keys)
+            message = StreamMessage(
+                id=str(uuid.uuid4()),
+                stream_type=StreamType.BETTING_ODDS,
+                priority=UpdatePriority.HIGH,
+                data={
+                    "market_type": "moneyline",
+                    "sportsbook": f"book_{key % 10}",
+                    "odds": rng.uniform(1.5, 3.0),
+                },
+                timestamp=datetime.now(timezone.utc),
+                source="benchmark",
+                event_id=f"event_{key // 10}",
+            )
+            start = time.perf_counter()
+            await aggregator.process_message(message)
+            costs.append(time.perf_counter() - start)
+            sent += 1
+        await asyncio.sleep(pause)
+
+    peak = aggregator.get_stats()
+    await asyncio.sleep(1.2)  # Let every open window reach its deadline
+    ticker.cancel()
+    stats = aggregator.get_stats()
+
+    costs.sort()
+    return {
+        "messages": messages,
+        "flushed": len(flushed),
+        "process_p50_us": costs[len(costs) // 2] * 1e6,
+        "process_p99_us": costs[int(len(costs) * 0.99)] * 1e6,
+        "buffered_keys_last_burst": peak["buffered_keys"],
+        "aggregator": stats,
+    }
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Stream aggregation benchmark")
+    parser.add_argument("--messages", type=int, default=200_000, help="Odds updates to feed")
+    parser.add_argument("--keys", type=int, default=5_000, help="Distinct event/market/book keys")
+    parser.add_argument("--burst", type=int, default=5_000, help="Messages per burst")
+    parser.add_argument("--pause", type=float, default=0.05, help="Seconds between bursts")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    result = asyncio.run(run_benchmark(args.messages, args.keys, args.burst, args.pause))
+    latency = result["aggregator"]["flush_latency_ms"]
+    logger.info(
+        f"messages={result['messages']:,} flushed={result['flushed']:,} "
+        f"process p50={result['process_p50_us']:.1f} us p99={result['process_p99_us']:.1f} us "
+        f"buffered_keys={result['buffered_keys_last_burst']:,} "
+        f"flush latency avg={latency['avg']:.1f} ms p99={latency['p99']:.1f} ms"
+    )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Stream Fan-out Benchmark for A1Betting Platform
+
+Measures RealTimeStreamManager broadcast latency with thousands of WebSocket
+subscribers, a share of which are slow or hung clients.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from realtime_engine import (  # noqa: E402
+    RealTimeStreamManager,
+    StreamMessage,
+    StreamType,
+    UpdatePriority,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+class FakeWebSocket:
+    """WebSocket stand-in with a fixed send delay."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.received = 0
+
+    async def send(self, payload: str):
+        await asyncio.sleep(self.delay)
+        self.received += 1
+
+
+async def run_benchmark(
+    subscribers: int,
+    messages: int,
+    events: int,
+    slow_share: float,
+    seed: int = 42,
+) -> Dict[str, Any]:
+    rng = random.Random(seed)
+    manager = RealTimeStreamManager()
+    sockets = []
+
+    for i in range(subscribers):
+        socket = FakeWebSocket(delay=5.0 if rng.random() < slow_share else 0.0)
+        sockets.append(socket)
+        filters = {}
+        if rng.random() < 0.5:
+            filters["event_ids"] = [f"event_{rng.randrange(events)}"]
+        await manager.subscribe(
+            f"subscriber_{i}",
+            [StreamType.BETTING_ODDS, StreamType.OPPORTUNITIES],
+            filters=filters,
+            websocket=socket,
+            queue_size=64,
+        )
+
+    latencies = []
+    for n in range(messages):
+        message = StreamMessage(
+            id=str(uuid.uuid4()),
+            stream_type=StreamType.BETTING_ODDS,
+            priority=UpdatePriority.HIGH,
+            data={
+                "market_type": "moneyline",
+                "sportsbook": f"book_{n % 10}",
+                "outcome": "home",
+                "odds": rng.uniform(1.5, 3.0),
+            },
+            timestamp=datetime.now(timezone.utc),
+            source="benchmark",
+            event_id=f"event_{rng.randrange(events)}",
+        )
+        start = time.perf_counter()
+        await manager._broadcast_message(message)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(0)  # Let send queues drain between ticks
+
+    await asyncio.sleep(0.1)
+    stats = manager._fanout_stats()
+    await manager.shutdown()
+
+    latencies.sort()
+    return {
+        "subscribers": subscribers,
+        "messages": messages,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "max_ms": latencies[-1] * 1000,
+        "fanout": stats,
+    }
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Real-time stream fan-out benchmark")
+    parser.add_argument("--subscribers", type=int, default=10_000, help="Concurrent WebSocket subscribers")
+    parser.add_argument("--messages", type=int, default=1_000, help="Messages to broadcast")
+    parser.add_argument("--events", type=int, default=100, help="Distinct events in the feed")
+    parser.add_argument("--slow-share", type=float, default=0.01, help="Share of hung clients")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    result = asyncio.run(
+        run_benchmark(args.subscribers, args.messages, args.events, args.slow_share)
+    )
+    logger.info(
+        f"subscribers={result['subscribers']:,} broadcast p50={result['p50_ms']:.2f} ms "
+        f"p99={result['p99_ms']:.2f} ms max={result['max_ms']:.2f} ms "
+        f"sent={result['fanout']['sent']:,} dropped={result['fanout']['dropped']:,} "
+        f"conflated={result['fanout']['conflated']:,}"
+    )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Task Queue Benchmark for A1Betting Platform
+
+Measures TaskWorker throughput (tasks/sec) and enqueue-to-start latency with
+the scripted batch claim and blocking wake-up, against fakeredis by default
+or a real Redis server via --redis-url.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from task_processor import (  # noqa: E402
+    TaskDefinition,
+    TaskPriority,
+    TaskQueue,
+    TaskType,
+    TaskWorker,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def make_client_factory(redis_url: str = None):
+    if redis_url:
+        import redis.asyncio as redis
+
+        return lambda: redis.from_url(redis_url, decode_responses=False)
+
+    import fakeredis
+
+    server = fakeredis.FakeServer()
+    return lambda: fakeredis.FakeAsyncRedis(server=server)
+
+
+def percentile(values: List[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(int(len(values) * q), len(values) - 1)] * 1000 if values else 0.0
+
+
+async def run_benchmark(
+    n_tasks: int, n_workers: int, concurrency: int, batch: int, trickle: int, redis_url: str = None
+) -> Dict[str, Any]:
+    client = make_client_factory(redis_url)
+    queue_name = f"bench_{uuid.uuid4().hex[:8]}"
+    latencies: List[float] = []
+
+    def record(enqueued_at: float):
+        latencies.append(time.time() - enqueued_at)
+
+    workers = []
+    for i in range(n_workers):
+        worker = TaskWorker(
+            f"bench_worker_{i}",
+            concurrency=concurrency,
+            task_queue=TaskQueue(queue_name, redis_client=client()),
+            claim_batch_size=batch,
+            claim_timeout=1.0,
+        )
+        worker.register_task("record", record)
+        workers.append(worker)
+    producer = TaskQueue(queue_name, redis_client=client())
+    await producer.initialize()
+
+    def task(priority: TaskPriority) -> TaskDefinition:
+        return TaskDefinition(
+            id=str(uuid.uuid4()),
+            task_type=TaskType.ANALYTICS_COMPUTATION,
+            priority=priority,
+            function_name="record",
+            args=[time.time()],
+        )
+
+    # Throughput: preload a backlog, then start the workers
+    priorities = list(TaskPriority)
+    for n in range(n_tasks):
+        await producer.enqueue(task(priorities[n % len(priorities)]))
+    runners = [asyncio.create_task(worker.start()) for worker in workers]
+    start = time.perf_counter()
+    while sum(w.tasks_processed for w in workers) < n_tasks:
+        await asyncio.sleep(0.005)
+    throughput = n_tasks / (time.perf_counter() - start)
+
+    # Latency: trickle tasks into idle, blocked workers
+    latencies.clear()
+    for _ in range(trickle):
+        await producer.enqueue(task(TaskPriority.HIGH))
+        await asyncio.sleep(0.01)
+    while len(latencies) < trickle:
+        await asyncio.sleep(0.005)
+
+    for worker in workers:
+        await worker.stop()
+    for runner in runners:
+        runner.cancel()
+    await asyncio.gather(*runners, return_exceptions=True)
+
+    return {
+        "backend": "redis" if redis_url else "fakeredis",
+        "tasks": n_tasks,
+        "workers": n_workers,
+        "concurrency": concurrency,
+        "claim_batch_size": batch,
+        "tasks_per_sec": throughput,
+        "enqueue_to_start_ms": {
+            "p50": percentile(latencies, 0.5),
+            "p99": percentile(latencies, 0.99),
+        },
+    }
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Task queue claim benchmark")
+    parser.add_argument("--tasks", type=int, default=5_000, help="Backlog size for throughput")
+    parser.add_argument("--workers", type=int, default=4, help="TaskWorker instances")
+    parser.add_argument("--concurrency", type=int, default=8, help="Slots per worker")
+    parser.add_argument("--batch", type=int, default=8, help="Max tasks per claim")
+    parser.add_argument("--trickle", type=int, default=200, help="Tasks for the latency run")
+    parser.add_argument("--redis-url", help="Benchmark a real Redis server instead of fakeredis")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    result = asyncio.run(
+        run_benchmark(
+            args.tasks, args.workers, args.concurrency, args.batch, args.trickle, args.redis_url
+        )
+    )
+    logger.info(
+        f"{result['backend']}: {result['tasks_per_sec']:,.0f} tasks/s "
+        f"(workers={result['workers']} concurrency={result['concurrency']} batch={result['claim_batch_size']}) "
+        f"enqueue-to-start p50={result['enqueue_to_start_ms']['p50']:.1f} ms "
+        f"p99={result['enqueue_to_start_ms']['p99']:.1f} ms"
+    )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
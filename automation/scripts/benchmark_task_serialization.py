@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Task Serialization Benchmark for A1Betting Platform
+
+Compares stored bytes and encode/decode time of the msgpack task envelopes
+against pickling whole TaskDefinition/TaskResult dataclasses, for a mix of
+prediction batches, arbitrage scans sharing one market snapshot, training
+jobs with NumPy features and large analytics results.
+"""
+
+import argparse
+import json
+import logging
+import pickle
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+from task_codec import TaskCodec  # noqa: E402
+from task_processor import (  # noqa: E402
+    TaskDefinition,
+    TaskPriority,
+    TaskResult,
+    TaskStatus,
+    TaskType,
+)
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def build_mix(fanout: int, rng: np.random.Generator) -> Dict[str, List[Any]]:
+    market_data = [
+        {
+            "event_id": f"evt_{i // 4}",
+            "sportsbook": f"book_{i % 4}",
+            "market": "moneyline",
+            "odds": {"home": float(rng.uniform(1.5, 3)), "away": float(rng.uniform(1.5, 3))},
+            "timestamp": time.time(),
+        }
+        for i in range(4000)
+    ]
+
+    def task(task_type, function_name, args=None, kwargs=None):
+        return TaskDefinition(
+            id=str(uuid.uuid4()),
+            task_type=task_type,
+            priority=TaskPriority.HIGH,
+            function_name=function_name,
+            args=args or [],
+            kwargs=kwargs or {},
+        )
+
+    return {
+        "prediction_batch": [
+            task(
+                TaskType.PREDICTION_BATCH,
+                "prediction_batch_task",
+                args=[[f"evt_{i}_{j}" for j in range(200)]],
+            )
+            for i in range(fanout)
+        ],
+        # The same snapshot fanned out to one scan per strategy
+        "arbitrage_scan": [
+            task(
+                TaskType.ARBITRAGE_SCAN,
+                "arbitrage_scan_task",
+                args=[market_data],
+                kwargs={"strategy": f"s{i}"},
+            )
+            for i in range(fanout)
+        ],
+        "model_training": [
+            task(
+                TaskType.MODEL_TRAINING,
+                "model_training_task",
+                args=[f"model_{i}"],
+                kwargs={
+                    "training_data": {
+                        "features": rng.normal(size=(2000, 30)),
+                        "targets": rng.normal(size=2000),
+                    }
+                },
+            )
+            for i in range(max(fanout // 8, 1))
+        ],
+        "analytics_result": [
+            TaskResult(
+                task_id=str(uuid.uuid4()),
+                status=TaskStatus.COMPLETED,
+                result={
+                    "metrics": {f"metric_{m}": float(rng.normal()) for m in range(500)},
+                    "equity_curve": rng.normal(size=50_000).cumsum(),
+                },
+            )
+            for _ in range(max(fanout // 8, 1))
+        ],
+    }
+
+
+def measure(
+    items: List[Any], encode: Callable[[Any], Any], decode: Callable[[Any], Any], size: Callable
+) -> Dict[str, float]:
+    start = time.perf_counter()
+    encoded = [encode(item) for item in items]
+    encode_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for payload in encoded:
+        decode(payload)
+    decode_s = time.perf_counter() - start
+    return {
+        "bytes": size(encoded),
+        "encode_us": encode_s / len(items) * 1e6,
+        "decode_us": decode_s / len(items) * 1e6,
+    }
+
+
+def run_benchmark(fanout: int, seed: int) -> Dict[str, Any]:
+    codec = TaskCodec()
+    mix = build_mix(fanout, np.random.default_rng(seed))
+    report: Dict[str, Any] = {"fanout": fanout, "workloads": {}}
+
+    for name, items in mix.items():
+        is_result = isinstance(items[0], TaskResult)
+        baseline = measure(
+            items,
+            pickle.dumps,
+            pickle.loads,
+            lambda payloads: sum(len(payload) for payload in payloads),
+        )
+
+        if is_result:
+            envelope = measure(
+                items,
+                codec.encode_result,
+                lambda payload: codec.decode_result(payload, TaskResult),
+                lambda payloads: sum(len(payload) for payload in payloads),
+            )
+        else:
+
+            blob_cache: Dict[str, Any] = {}
+
+            def decode(encoded):
+                # A claim batch fetches and decodes each shared blob once
+                task = codec.decode_task(encoded.payload, TaskDefinition)
+                for digest, blob in encoded.blobs.items():
+                    if digest not in blob_cache:
+                        blob_cache[digest] = codec.decode_blob(blob)
+                return codec.resolve(task, blob_cache)
+
+            def stored_bytes(encoded_items):
+                # Blobs are content addressed, so a shared one is stored once
+                blobs = {}
+                for encoded in encoded_items:
+                    blobs.update(encoded.blobs)
+                envelopes = sum(len(encoded.payload) for encoded in encoded_items)
+                return envelopes + sum(len(blob) for blob in blobs.values())
+
+            envelope = measure(items, codec.encode_task, decode, stored_bytes)
+
+        report["workloads"][name] = {
+            "items": len(items),
+            "pickle": baseline,
+            "msgpack": envelope,
+            "size_ratio": envelope["bytes"] / baseline["bytes"],
+        }
+
+    return report
+
+
+def main():
+    """Main execution function."""
+    parser = argparse.ArgumentParser(description="Task serialization benchmark")
+    parser.add_argument("--fanout", type=int, default=64, help="Tasks per workload")
+    parser.add_argument("--seed", type=int, default=7, help="Random seed")
+    parser.add_argument("--output", help="Optional JSON report path")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.fanout, args.seed)
+    for name, row in result["workloads"].items():
+        logger.info(
+            f"{name:<18} pickle {row['pickle']['bytes'] / 1024:>9,.0f} KiB "
+            f"enc {row['pickle']['encode_us']:>8,.0f} us dec {row['pickle']['decode_us']:>8,.0f} us | "
+            f"msgpack {row['msgpack']['bytes'] / 1024:>9,.0f} KiB "
+            f"enc {row['msgpack']['encode_us']:>8,.0f} us dec {row['msgpack']['decode_us']:>8,.0f} us "
+            f"({row['size_ratio']:.0%} of pickle)"
+        )
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        logger.info(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,14 +2,21 @@
 Real-time arbitrage detection, market making opportunities, and inefficiency exploitation
 """
 
+import asyncio
+import heapq
 import logging
+import os
+import time
 from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
 import numpy as np
+from arbitrage_graph import CoverCycle, GraphQuote, find_cover_cycles
 
 logger = logging.getLogger(__name__)
 
@@ -39,6 +46,14 @@ class MarketInefficiencyType(str, Enum):
     REVERSE_LINE = "reverse_line"  # Line moving against public money
 
 
+class ArbitrageEventType(str, Enum):
+    """Lifecycle events emitted by incremental arbitrage tracking"""
+
+    OPENED = "opened"
+    UPDATED = "updated"  # Still open, but legs or prices changed
+    CLOSED = "closed"
+
+
 @dataclass
 class ArbitrageOpportunity:
     """Comprehensive arbitrage opportunity"""
@@ -133,10 +148,297 @@ class MarketInefficiency:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+# Opposite outcome labels for two-way markets: label -> (pair id, side)
+TWO_WAY_OUTCOME_SIDES = {
+    "over": (0, 0),
+    "under": (0, 1),
+    "yes": (1, 0),
+    "no": (1, 1),
+    "home": (2, 0),
+    "away": (2, 1),
+    "win": (3, 0),
+    "loss": (3, 1),
+    "back": (4, 0),
+    "lay": (4, 1),
+}
+
+
+
+def _two_way_pair_labels() -> Dict[int, Tuple[str, str]]:
+    """Invert TWO_WAY_OUTCOME_SIDES into pair id -> (side 0, side 1) labels"""
+    labels: Dict[int, List[str]] = defaultdict(lambda: ["", ""])
+    for label, (pair, side) in TWO_WAY_OUTCOME_SIDES.items():
+        labels[pair][side] = label
+    return {pair: tuple(sides) for pair, sides in labels.items()}
+
+
+TWO_WAY_PAIR_LABELS = _two_way_pair_labels()
+
+
+@dataclass
+class QuoteBook:
+    """Columnar view of one scan's quotes"""
+
+    group: np.ndarray  # (event, market) code per quote
+    outcome: np.ndarray  # outcome label code per quote
+    book: np.ndarray  # sportsbook code per quote
+    odds: np.ndarray  # decimal odds per quote
+    source_index: np.ndarray  # row in the original odds list
+    group_keys: List[Tuple[Any, Any]]
+    outcome_labels: List[str]
+
+    @property
+    def size(self) -> int:
+        return len(self.odds)
+
+
+@dataclass
+class BestPriceHit:
+    """Arbitrage found by the best-price scan, before materialisation"""
+
+    arbitrage_type: ArbitrageType
+    quote_indexes: List[int]  # rows in the original odds list
+    inverse_sum: float
+
+
+@dataclass
+class ArbitrageEvent:
+    """Arbitrage opening, changing or closing after an odds tick"""
+
+    event_type: ArbitrageEventType
+    arbitrage_type: ArbitrageType
+    event_id: str
+    market_type: str
+    outcomes: Tuple[str, ...]
+    inverse_sum: Optional[float]  # Best executable legs; None when there are none
+    opportunity: Optional[ArbitrageOpportunity]  # Last known opportunity when closed
+    timestamp: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+
+class BestPriceArbitrageScanner:
+    """Vectorised two-way and three-way arbitrage detection
+
+    Loads all quotes of a scan into NumPy arrays, reduces them to the best
+    price per (event, market, outcome) and flags arbitrage where the inverse
+    best odds sum below 1. Only hits are turned back into quote dicts.
+    """
+
+    def load(self, odds_data: List[Dict[str, Any]]) -> QuoteBook:
+        """Encode quotes into integer category codes and float odds"""
+        group_codes: Dict[Tuple[Any, Any], int] = {}
+        outcome_codes: Dict[str, int] = {}
+        book_codes: Dict[Any, int] = {}
+
+        n = len(odds_data)
+        group = np.empty(n, dtype=np.int64)
+        outcome = np.empty(n, dtype=np.int64)
+        book = np.empty(n, dtype=np.int64)
+        odds = np.empty(n, dtype=np.float64)
+
+        for i, quote in enumerate(odds_data):
+            group_key = (quote.get("event_id"), quote.get("market_type"))
+            group[i] = group_codes.setdefault(group_key, len(group_codes))
+            label = str(quote.get("outcome", "unknown")).lower()
+            outcome[i] = outcome_codes.setdefault(label, len(outcome_codes))
+            book[i] = book_codes.setdefault(quote.get("sportsbook"), len(book_codes))
+            odds[i] = quote.get("odds") or 0.0
+
+        valid = odds > 1.0
+        return QuoteBook(
+            group=group[valid],
+            outcome=outcome[valid],
+            book=book[valid],
+            odds=odds[valid],
+            source_index=np.flatnonzero(valid),
+            group_keys=list(group_codes),
+            outcome_labels=list(outcome_codes),
+        )
+
+    def best_prices(
+        self, quotes: QuoteBook
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Best quote per (group, outcome)
+
+        Returns the (group, outcome) cell codes, the quote row holding the
+        highest odds for each cell and the runner-up row (-1 if none).
+        """
+        n_outcomes = max(len(quotes.outcome_labels), 1)
+        cell = quotes.group * n_outcomes + quotes.outcome
+        # Sort by cell, then by descending odds; the first row per cell wins
+        order = np.lexsort((-quotes.odds, cell))
+        sorted_cells = cell[order]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = sorted_cells[1:] != sorted_cells[:-1]
+
+        first_pos = np.flatnonzero(first)
+        next_pos = np.minimum(first_pos + 1, len(order) - 1)
+        has_second = (first_pos + 1 < len(order)) & (
+            sorted_cells[next_pos] == sorted_cells[first_pos]
+        )
+        second_rows = np.where(has_second, order[next_pos], -1)
+        return sorted_cells[first_pos], order[first_pos], second_rows
+
+    def scan(self, odds_data: List[Dict[str, Any]]) -> List[BestPriceHit]:
+        """Find best-price two-way and three-way arbitrage in one pass"""
+        quotes = self.load(odds_data)
+        if quotes.size < 2:
+            return []
+
+        cells, best_rows, second_rows = self.best_prices(quotes)
+        n_outcomes = max(len(quotes.outcome_labels), 1)
+        n_groups = len(quotes.group_keys)
+        best_group = cells // n_outcomes
+        best_outcome = cells % n_outcomes
+        best_inverse = 1.0 / quotes.odds[best_rows]
+
+        hits = self._scan_two_way(
+            quotes,
+            best_group,
+            best_outcome,
+            best_rows,
+            second_rows,
+            best_inverse,
+            n_groups,
+        )
+        hits.extend(
+            self._scan_three_way(quotes, best_group, best_rows, best_inverse, n_groups)
+        )
+        return hits
+
+    def _scan_two_way(
+        self,
+        quotes: QuoteBook,
+        best_group: np.ndarray,
+        best_outcome: np.ndarray,
+        best_rows: np.ndarray,
+        second_rows: np.ndarray,
+        best_inverse: np.ndarray,
+        n_groups: int,
+    ) -> List[BestPriceHit]:
+        n_pairs = len({pair for pair, _ in TWO_WAY_OUTCOME_SIDES.values()})
+        pair_of = np.full(len(quotes.outcome_labels), -1, dtype=np.int64)
+        side_of = np.zeros(len(quotes.outcome_labels), dtype=np.int64)
+        for code, label in enumerate(quotes.outcome_labels):
+            if label in TWO_WAY_OUTCOME_SIDES:
+                pair_of[code], side_of[code] = TWO_WAY_OUTCOME_SIDES[label]
+
+        pair = pair_of[best_outcome]
+        mask = pair >= 0
+        if not mask.any():
+            return []
+
+        slot = best_group[mask] * n_pairs + pair[mask]
+        side = side_of[best_outcome[mask]]
+        size = n_groups * n_pairs
+        inverse_by_side = np.full((2, size), np.inf)
+        row_by_side = np.full((2, size), -1, dtype=np.int64)
+        second_by_side = np.full((2, size), -1, dtype=np.int64)
+        inverse_by_side[side, slot] = best_inverse[mask]
+        row_by_side[side, slot] = best_rows[mask]
+        second_by_side[side, slot] = second_rows[mask]
+
+        total = inverse_by_side[0] + inverse_by_side[1]
+        hit_slots = np.flatnonzero(total < 1.0)
+
+        hits = []
+        for hit in hit_slots:
+            legs = self._select_two_way_legs(
+                quotes,
+                row_by_side[0, hit],
+                row_by_side[1, hit],
+                second_by_side[0, hit],
+                second_by_side[1, hit],
+            )
+            if legs is None:
+                continue
+            row0, row1 = legs
+            hits.append(
+                BestPriceHit(
+                    arbitrage_type=ArbitrageType.TWO_WAY,
+                    quote_indexes=[
+                        int(quotes.source_index[row0]),
+                        int(quotes.source_index[row1]),
+                    ],
+                    inverse_sum=float(1 / quotes.odds[row0] + 1 / quotes.odds[row1]),
+                )
+            )
+        return hits
+
+    def _select_two_way_legs(
+        self,
+        quotes: QuoteBook,
+        best0: int,
+        best1: int,
+        second0: int,
+        second1: int,
+    ) -> Optional[Tuple[int, int]]:
+        """Pick the most profitable legs placed at two different books"""
+        if quotes.book[best0] != quotes.book[best1]:
+            return best0, best1
+
+        # Both best prices at one book cannot be executed as arbitrage; pair
+        # each best price with the other side's runner-up instead
+        candidates = [
+            (row0, row1)
+            for row0, row1 in ((best0, second1), (second0, best1))
+            if row0 >= 0 and row1 >= 0
+        ]
+        if not candidates:
+            return None
+        row0, row1 = min(
+            candidates, key=lambda legs: 1 / quotes.odds[legs[0]] + 1 / quotes.odds[legs[1]]
+        )
+        if 1 / quotes.odds[row0] + 1 / quotes.odds[row1] >= 1.0:
+            return None
+        return row0, row1
+
+    def _scan_three_way(
+        self,
+        quotes: QuoteBook,
+        best_group: np.ndarray,
+        best_rows: np.ndarray,
+        best_inverse: np.ndarray,
+        n_groups: int,
+    ) -> List[BestPriceHit]:
+        outcome_counts = np.bincount(best_group, minlength=n_groups)
+        inverse_sums = np.bincount(best_group, weights=best_inverse, minlength=n_groups)
+        hit_groups = np.flatnonzero((outcome_counts == 3) & (inverse_sums < 1.0))
+        if len(hit_groups) == 0:
+            return []
+
+        # Best rows are ordered by group, so each hit group is a 3-row slice
+        starts = np.searchsorted(best_group, hit_groups)
+        hits = []
+        for group_code, start in zip(hit_groups, starts):
+            rows = best_rows[start : start + 3]
+            hits.append(
+                BestPriceHit(
+                    arbitrage_type=ArbitrageType.THREE_WAY,
+                    quote_indexes=[int(i) for i in quotes.source_index[rows]],
+                    inverse_sum=float(inverse_sums[group_code]),
+                )
+            )
+        return hits
+
+
 class ArbitrageCalculator:
     """Advanced arbitrage calculation engine"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        use_vectorized: bool = True,
+        max_cycle_depth: int = 4,
+        graph_workers: Optional[int] = None,
+        graph_pool_threshold: int = 20000,
+    ):
+        self.use_vectorized = use_vectorized
+        self.max_cycle_depth = max_cycle_depth
+        self.graph_workers = graph_workers or min(4, os.cpu_count() or 1)
+        # Slates with fewer graph quotes are searched in a thread off the event
+        # loop; pool start-up and pickling cost more than they save on small inputs
+        self.graph_pool_threshold = graph_pool_threshold
+        self._graph_pool: Optional[ProcessPoolExecutor] = None
+        self.best_price_scanner = BestPriceArbitrageScanner()
         self.calculation_methods = {
             ArbitrageType.TWO_WAY: self._calculate_two_way_arbitrage,
             ArbitrageType.THREE_WAY: self._calculate_three_way_arbitrage,
@@ -144,6 +446,14 @@ class ArbitrageCalculator:
             ArbitrageType.TRIANGULAR: self._calculate_triangular_arbitrage,
             ArbitrageType.SYNTHETIC: self._calculate_synthetic_arbitrage,
         }
+        # Handled in bulk by the best-price scanner when vectorised
+        self.vectorized_types = {ArbitrageType.TWO_WAY, ArbitrageType.THREE_WAY}
+        # Span markets, so searched per event rather than per market group
+        self.graph_types = {
+            ArbitrageType.CROSS_MARKET,
+            ArbitrageType.TRIANGULAR,
+            ArbitrageType.SYNTHETIC,
+        }
 
     async def detect_arbitrage_opportunities(
         self, odds_data: List[Dict[str, Any]]
@@ -152,6 +462,11 @@ class ArbitrageCalculator:
         opportunities = []
 
         try:
+            if self.use_vectorized:
+                opportunities.extend(self._detect_best_price_arbitrage(odds_data))
+
+            opportunities.extend(await self._detect_graph_arbitrage(odds_data))
+
             # Group odds by event and market
             grouped_odds = self._group_odds_data(odds_data)
 
@@ -161,6 +476,10 @@ class ArbitrageCalculator:
 
                 # Check for different types of arbitrage
                 for arb_type in ArbitrageType:
+                    if self.use_vectorized and arb_type in self.vectorized_types:
+                        continue
+                    if arb_type in self.graph_types:
+                        continue
                     if arb_type in self.calculation_methods:
                         arb_ops = await self.calculation_methods[arb_type](odds_list)
                         opportunities.extend(arb_ops)
@@ -174,6 +493,25 @@ class ArbitrageCalculator:
             logger.error("Arbitrage detection failed: {e!s}")
             return []
 
+    def _detect_best_price_arbitrage(
+        self, odds_data: List[Dict[str, Any]]
+    ) -> List[ArbitrageOpportunity]:
+        """Run the vectorised scan and materialise only its hits"""
+        opportunities = []
+
+        for hit in self.best_price_scanner.scan(odds_data):
+            quotes = [odds_data[i] for i in hit.quote_indexes]
+            if hit.arbitrage_type == ArbitrageType.TWO_WAY:
+                opportunity = self._build_two_way_opportunity(quotes[0], quotes[1])
+            else:
+                opportunity = self._build_three_way_opportunity(
+                    {quote.get("outcome", "unknown"): quote for quote in quotes}
+                )
+            if opportunity:
+                opportunities.append(opportunity)
+
+        return opportunities
+
     def _group_odds_data(
         self, odds_data: List[Dict[str, Any]]
     ) -> Dict[str, List[Dict]]:
@@ -201,52 +539,8 @@ class ArbitrageCalculator:
 
                     # Check if they're for opposite outcomes
                     if self._are_opposite_outcomes(odds1, odds2):
-                        arb_result = self._calculate_two_way_math(odds1, odds2)
-
-                        if arb_result and arb_result["profit_percentage"] > 0:
-                            opportunity = ArbitrageOpportunity(
-                                id=f"arb_2way_{odds1['event_id']}_{int(datetime.now().timestamp())}",
-                                arbitrage_type=ArbitrageType.TWO_WAY,
-                                sportsbooks=[odds1["sportsbook"], odds2["sportsbook"]],
-                                event_id=odds1["event_id"],
-                                market_type=odds1["market_type"],
-                                guaranteed_profit=arb_result["guaranteed_profit"],
-                                profit_percentage=arb_result["profit_percentage"],
-                                total_stake_required=arb_result["total_stake"],
-                                stake_distribution={
-                                    odds1["sportsbook"]: arb_result["stake1"],
-                                    odds2["sportsbook"]: arb_result["stake2"],
-                                },
-                                roi=arb_result["profit_percentage"],
-                                execution_risk=self._calculate_execution_risk(
-                                    [odds1, odds2]
-                                ),
-                                liquidity_risk=self._calculate_liquidity_risk(
-                                    [odds1, odds2]
-                                ),
-                                timing_risk=self._calculate_timing_risk([odds1, odds2]),
-                                credit_risk=0.1,  # Default credit risk
-                                regulatory_risk=0.05,  # Default regulatory risk
-                                odds_data=[odds1, odds2],
-                                implied_probabilities=[
-                                    1 / odds1["odds"],
-                                    1 / odds2["odds"],
-                                ],
-                                theoretical_probability=0.5,  # For two-way markets
-                                market_efficiency=arb_result["market_efficiency"],
-                                optimal_stakes=arb_result["optimal_stakes"],
-                                execution_window=timedelta(minutes=5),
-                                minimum_profit=arb_result["guaranteed_profit"] * 0.5,
-                                maximum_exposure=arb_result["total_stake"] * 2,
-                                confidence_score=arb_result["confidence"],
-                                detection_time=datetime.now(timezone.utc),
-                                expiry_time=datetime.now(timezone.utc) + timedelta(minutes=30),
-                                source_quality=min(
-                                    odds1.get("quality", 0.8), odds2.get("quality", 0.8)
-                                ),
-                                historical_success_rate=0.85,  # Historical average
-                                metadata=arb_result.get("metadata", {}),
-                            )
+                        opportunity = self._build_two_way_opportunity(odds1, odds2)
+                        if opportunity:
                             opportunities.append(opportunity)
 
             return opportunities
@@ -255,6 +549,53 @@ class ArbitrageCalculator:
             logger.error("Two-way arbitrage calculation failed: {e!s}")
             return []
 
+    def _build_two_way_opportunity(
+        self, odds1: Dict[str, Any], odds2: Dict[str, Any]
+    ) -> Optional[ArbitrageOpportunity]:
+        """Build a two-way opportunity from a pair of opposite quotes"""
+        arb_result = self._calculate_two_way_math(odds1, odds2)
+
+        if not arb_result or arb_result["profit_percentage"] <= 0:
+            return None
+
+        return ArbitrageOpportunity(
+            id=f"arb_2way_{odds1['event_id']}_{int(datetime.now().timestamp())}",
+            arbitrage_type=ArbitrageType.TWO_WAY,
+            sportsbooks=[odds1["sportsbook"], odds2["sportsbook"]],
+            event_id=odds1["event_id"],
+            market_type=odds1["market_type"],
+            guaranteed_profit=arb_result["guaranteed_profit"],
+            profit_percentage=arb_result["profit_percentage"],
+            total_stake_required=arb_result["total_stake"],
+            stake_distribution={
+                odds1["sportsbook"]: arb_result["stake1"],
+                odds2["sportsbook"]: arb_result["stake2"],
+            },
+            roi=arb_result["profit_percentage"],
+            execution_risk=self._calculate_execution_risk([odds1, odds2]),
+            liquidity_risk=self._calculate_liquidity_risk([odds1, odds2]),
+            timing_risk=self._calculate_timing_risk([odds1, odds2]),
+            credit_risk=0.1,  # Default credit risk
+            regulatory_risk=0.05,  # Default regulatory risk
+            odds_data=[odds1, odds2],
+            implied_probabilities=[
+                1 / odds1["odds"],
+                1 / odds2["odds"],
+            ],
+            theoretical_probability=0.5,  # For two-way markets
+            market_efficiency=arb_result["market_efficiency"],
+            optimal_stakes=arb_result["optimal_stakes"],
+            execution_window=timedelta(minutes=5),
+            minimum_profit=arb_result["guaranteed_profit"] * 0.5,
+            maximum_exposure=arb_result["total_stake"] * 2,
+            confidence_score=arb_result["confidence"],
+            detection_time=datetime.now(timezone.utc),
+            expiry_time=datetime.now(timezone.utc) + timedelta(minutes=30),
+            source_quality=min(odds1.get("quality", 0.8), odds2.get("quality", 0.8)),
+            historical_success_rate=0.85,  # Historical average
+            metadata=arb_result.get("metadata", {}),
+        )
+
     def _calculate_two_way_math(
         self, odds1: Dict[str, Any], odds2: Dict[str, Any]
     ) -> Optional[Dict[str, Any]]:
@@ -328,80 +669,15 @@ class ArbitrageCalculator:
             if len(outcome_groups) != 3:
                 return opportunities
 
-            outcome_types = list(outcome_groups.keys())
-
             # Find best odds for each outcome across all sportsbooks
-            best_odds = {}
-            for outcome in outcome_types:
-                best = max(outcome_groups[outcome], key=lambda x: x["odds"])
-                best_odds[outcome] = best
-
-            # Calculate three-way arbitrage
-            odds_values = [best_odds[outcome]["odds"] for outcome in outcome_types]
-            sportsbooks = [
-                best_odds[outcome]["sportsbook"] for outcome in outcome_types
-            ]
-
-            arbitrage_percentage = sum(1 / odds for odds in odds_values)
-
-            if arbitrage_percentage < 1.0:
-                # Arbitrage exists
-                total_stake = 100.0
-                stakes = [
-                    total_stake / (arbitrage_percentage * odds) for odds in odds_values
-                ]
+            best_odds = {
+                outcome: max(quotes, key=lambda x: x["odds"])
+                for outcome, quotes in outcome_groups.items()
+            }
 
-                guaranteed_profit = min(
-                    stakes[i] * odds_values[i] - total_stake for i in range(3)
-                )
-
-                if guaranteed_profit > 0:
-                    opportunity = ArbitrageOpportunity(
-                        id=f"arb_3way_{odds_list[0]['event_id']}_{int(datetime.now().timestamp())}",
-                        arbitrage_type=ArbitrageType.THREE_WAY,
-                        sportsbooks=sportsbooks,
-                        event_id=odds_list[0]["event_id"],
-                        market_type=odds_list[0]["market_type"],
-                        guaranteed_profit=guaranteed_profit,
-                        profit_percentage=guaranteed_profit / total_stake * 100,
-                        total_stake_required=sum(stakes),
-                        stake_distribution={
-                            sportsbooks[i]: stakes[i] for i in range(3)
-                        },
-                        roi=guaranteed_profit / total_stake * 100,
-                        execution_risk=self._calculate_execution_risk(
-                            list(best_odds.values())
-                        ),
-                        liquidity_risk=self._calculate_liquidity_risk(
-                            list(best_odds.values())
-                        ),
-                        timing_risk=self._calculate_timing_risk(
-                            list(best_odds.values())
-                        ),
-                        credit_risk=0.15,  # Higher for three-way
-                        regulatory_risk=0.05,
-                        odds_data=list(best_odds.values()),
-                        implied_probabilities=[1 / odds for odds in odds_values],
-                        theoretical_probability=1.0,
-                        market_efficiency=arbitrage_percentage,
-                        optimal_stakes={sportsbooks[i]: stakes[i] for i in range(3)},
-                        execution_window=timedelta(minutes=3),
-                        minimum_profit=guaranteed_profit * 0.5,
-                        maximum_exposure=sum(stakes) * 2,
-                        confidence_score=0.8,
-                        detection_time=datetime.now(timezone.utc),
-                        expiry_time=datetime.now(timezone.utc) + timedelta(minutes=20),
-                        source_quality=min(
-                            odds.get("quality", 0.8) for odds in best_odds.values()
-                        ),
-                        historical_success_rate=0.75,
-                        metadata={
-                            "calculation_method": "three_way_standard",
-                            "outcome_types": outcome_types,
-                            "arbitrage_percentage": arbitrage_percentage,
-                        },
-                    )
-                    opportunities.append(opportunity)
+            opportunity = self._build_three_way_opportunity(best_odds)
+            if opportunity:
+                opportunities.append(opportunity)
 
             return opportunities
 
@@ -409,29 +685,272 @@ class ArbitrageCalculator:
             logger.error("Three-way arbitrage calculation failed: {e!s}")
             return []
 
+    def _build_three_way_opportunity(
+        self, best_odds: Dict[str, Dict[str, Any]]
+    ) -> Optional[ArbitrageOpportunity]:
+        """Build a three-way opportunity from the best quote per outcome"""
+        outcome_types = list(best_odds.keys())
+        best_quotes = list(best_odds.values())
+        odds_values = [quote["odds"] for quote in best_quotes]
+        sportsbooks = [quote["sportsbook"] for quote in best_quotes]
+
+        arbitrage_percentage = sum(1 / odds for odds in odds_values)
+        if arbitrage_percentage >= 1.0:
+            return None
+
+        # Arbitrage exists
+        total_stake = 100.0
+        stakes = [total_stake / (arbitrage_percentage * odds) for odds in odds_values]
+
+        guaranteed_profit = min(
+            stakes[i] * odds_values[i] - total_stake for i in range(3)
+        )
+        if guaranteed_profit <= 0:
+            return None
+
+        return ArbitrageOpportunity(
+            id=f"arb_3way_{best_quotes[0]['event_id']}_{int(datetime.now().timestamp())}",
+            arbitrage_type=ArbitrageType.THREE_WAY,
+            sportsbooks=sportsbooks,
+            event_id=best_quotes[0]["event_id"],
+            market_type=best_quotes[0]["market_type"],
+            guaranteed_profit=guaranteed_profit,
+            profit_percentage=guaranteed_profit / total_stake * 100,
+            total_stake_required=sum(stakes),
+            stake_distribution={sportsbooks[i]: stakes[i] for i in range(3)},
+            roi=guaranteed_profit / total_stake * 100,
+            execution_risk=self._calculate_execution_risk(best_quotes),
+            liquidity_risk=self._calculate_liquidity_risk(best_quotes),
+            timing_risk=self._calculate_timing_risk(best_quotes),
+            credit_risk=0.15,  # Higher for three-way
+            regulatory_risk=0.05,
+            odds_data=best_quotes,
+            implied_probabilities=[1 / odds for odds in odds_values],
+            theoretical_probability=1.0,
+            market_efficiency=arbitrage_percentage,
+            optimal_stakes={sportsbooks[i]: stakes[i] for i in range(3)},
+            execution_window=timedelta(minutes=3),
+            minimum_profit=guaranteed_profit * 0.5,
+            maximum_exposure=sum(stakes) * 2,
+            confidence_score=0.8,
+            detection_time=datetime.now(timezone.utc),
+            expiry_time=datetime.now(timezone.utc) + timedelta(minutes=20),
+            source_quality=min(quote.get("quality", 0.8) for quote in best_quotes),
+            historical_success_rate=0.75,
+            metadata={
+                "calculation_method": "three_way_standard",
+                "outcome_types": outcome_types,
+                "arbitrage_percentage": arbitrage_percentage,
+            },
+        )
+
     async def _calculate_cross_market_arbitrage(
         self, odds_list: List[Dict[str, Any]]
     ) -> List[ArbitrageOpportunity]:
         """Calculate cross-market arbitrage opportunities"""
-        # Implementation for cross-market arbitrage
-        # This would involve finding arbitrage across different market types
-        return []
+        return self._graph_opportunities_of_type(odds_list, ArbitrageType.CROSS_MARKET)
 
     async def _calculate_triangular_arbitrage(
         self, odds_list: List[Dict[str, Any]]
     ) -> List[ArbitrageOpportunity]:
         """Calculate triangular arbitrage opportunities"""
-        # Implementation for triangular arbitrage
-        # This would involve three related markets forming a triangle
-        return []
+        return self._graph_opportunities_of_type(odds_list, ArbitrageType.TRIANGULAR)
 
     async def _calculate_synthetic_arbitrage(
         self, odds_list: List[Dict[str, Any]]
     ) -> List[ArbitrageOpportunity]:
         """Calculate synthetic arbitrage using combinations"""
-        # Implementation for synthetic arbitrage
-        # This would involve creating synthetic positions using multiple markets
-        return []
+        return self._graph_opportunities_of_type(odds_list, ArbitrageType.SYNTHETIC)
+
+    def _graph_opportunities_of_type(
+        self, odds_list: List[Dict[str, Any]], arbitrage_type: ArbitrageType
+    ) -> List[ArbitrageOpportunity]:
+        try:
+            cycles = find_cover_cycles(self._graph_quotes(odds_list), self.max_cycle_depth)
+            return [
+                opportunity
+                for opportunity in self._build_graph_opportunities(odds_list, cycles)
+                if opportunity.arbitrage_type == arbitrage_type
+            ]
+
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"{arbitrage_type.value} arbitrage calculation failed: {e!s}")
+            return []
+
+    async def _detect_graph_arbitrage(
+        self, odds_data: List[Dict[str, Any]]
+    ) -> List[ArbitrageOpportunity]:
+        """Cross-market, triangular and synthetic arbitrage for every event"""
+        graph_quotes = self._graph_quotes(odds_data)
+        if len(graph_quotes) >= self.graph_pool_threshold:
+            cycles = await self._find_cycles_in_pool(graph_quotes)
+        else:
+            cycles = await self._find_cycles_in_thread(graph_quotes)
+        return self._build_graph_opportunities(odds_data, cycles)
+
+    def _graph_quotes(self, odds_data: List[Dict[str, Any]]) -> List[GraphQuote]:
+        """Compact picklable quote tuples for the graph search"""
+        return [
+            (
+                i,
+                quote.get("event_id"),
+                quote.get("market_type"),
+                quote.get("outcome", "unknown"),
+                quote.get("line"),
+                quote.get("odds") or 0.0,
+            )
+            for i, quote in enumerate(odds_data)
+            if (quote.get("odds") or 0.0) > 1.0
+        ]
+
+    async def _find_cycles_in_pool(
+        self, graph_quotes: List[GraphQuote]
+    ) -> List[CoverCycle]:
+        """Spread the per-event search over worker processes"""
+        by_event: Dict[Any, List[GraphQuote]] = defaultdict(list)
+        for quote in graph_quotes:
+            by_event[quote[1]].append(quote)
+
+        # A few chunks per worker evens out slates with uneven event sizes
+        chunks: List[List[GraphQuote]] = [[] for _ in range(self.graph_workers * 4)]
+        for i, quotes in enumerate(by_event.values()):
+            chunks[i % len(chunks)].extend(quotes)
+
+        try:
+            if self._graph_pool is None:
+                self._graph_pool = ProcessPoolExecutor(max_workers=self.graph_workers)
+            loop = asyncio.get_running_loop()
+            results = await asyncio.gather(
+                *[
+                    loop.run_in_executor(
+                        self._graph_pool, find_cover_cycles, chunk, self.max_cycle_depth
+                    )
+                    for chunk in chunks
+                    if chunk
+                ]
+            )
+        except (BrokenProcessPool, OSError) as e:
+            logger.warning(f"Arbitrage graph pool unavailable, searching in a thread: {e!s}")
+            self.close()
+            return await self._find_cycles_in_thread(graph_quotes)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # e.g. a chunk that fails to pickle; the pool itself is still usable
+            logger.error(f"Pooled arbitrage graph search failed, searching in a thread: {e!s}")
+            return await self._find_cycles_in_thread(graph_quotes)
+
+        return [cycle for cycles in results for cycle in cycles]
+
+    async def _find_cycles_in_thread(
+        self, graph_quotes: List[GraphQuote]
+    ) -> List[CoverCycle]:
+        """Search in the default executor so the event loop keeps serving"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            None, find_cover_cycles, graph_quotes, self.max_cycle_depth
+        )
+
+    def _build_graph_opportunities(
+        self, odds_data: List[Dict[str, Any]], cycles: List[CoverCycle]
+    ) -> List[ArbitrageOpportunity]:
+        opportunities = []
+        for cycle in cycles:
+            opportunity = self._build_cover_opportunity(
+                self._classify_cover(cycle),
+                [odds_data[i] for i in cycle.quote_indexes],
+                cycle,
+            )
+            if opportunity:
+                opportunities.append(opportunity)
+        return opportunities
+
+    def _classify_cover(self, cycle: CoverCycle) -> ArbitrageType:
+        """Name a cover by its shape
+
+        Two legs from different markets are cross-market, three are
+        triangular; longer covers, or covers built from several lines of one
+        market, are synthetic positions.
+        """
+        if len(set(cycle.market_types)) == 1:
+            return ArbitrageType.SYNTHETIC
+        if len(cycle.quote_indexes) == 2:
+            return ArbitrageType.CROSS_MARKET
+        if len(cycle.quote_indexes) == 3:
+            return ArbitrageType.TRIANGULAR
+        return ArbitrageType.SYNTHETIC
+
+    def _build_cover_opportunity(
+        self,
+        arbitrage_type: ArbitrageType,
+        legs: List[Dict[str, Any]],
+        cycle: CoverCycle,
+    ) -> Optional[ArbitrageOpportunity]:
+        """Build an opportunity from legs that together cover every result"""
+        implied_total = cycle.implied_total
+        if implied_total >= 1.0:
+            return None
+
+        # Equal payout on every leg; overlapping legs only add to it
+        total_stake = 100.0
+        stakes = [total_stake / (implied_total * leg["odds"]) for leg in legs]
+        guaranteed_profit = total_stake / implied_total - total_stake
+
+        sportsbooks = list(dict.fromkeys(leg["sportsbook"] for leg in legs))
+        stake_distribution: Dict[str, float] = defaultdict(float)
+        for leg, stake in zip(legs, stakes):
+            stake_distribution[leg["sportsbook"]] += stake
+
+        return ArbitrageOpportunity(
+            id=f"arb_{arbitrage_type.value}_{cycle.event_id}_{int(datetime.now().timestamp())}",
+            arbitrage_type=arbitrage_type,
+            sportsbooks=sportsbooks,
+            event_id=cycle.event_id,
+            market_type="+".join(dict.fromkeys(cycle.market_types)),
+            guaranteed_profit=guaranteed_profit,
+            profit_percentage=guaranteed_profit / total_stake * 100,
+            total_stake_required=total_stake,
+            stake_distribution=dict(stake_distribution),
+            roi=guaranteed_profit / total_stake * 100,
+            execution_risk=self._calculate_execution_risk(legs),
+            liquidity_risk=self._calculate_liquidity_risk(legs),
+            timing_risk=self._calculate_timing_risk(legs),
+            credit_risk=0.15,  # Legs settle in different markets
+            regulatory_risk=0.05,
+            odds_data=legs,
+            implied_probabilities=[1 / leg["odds"] for leg in legs],
+            theoretical_probability=1.0,
+            market_efficiency=implied_total,
+            optimal_stakes=dict(stake_distribution),
+            execution_window=timedelta(minutes=3),
+            minimum_profit=guaranteed_profit * 0.5,
+            maximum_exposure=total_stake * 2,
+            confidence_score=0.7,
+            detection_time=datetime.now(timezone.utc),
+            expiry_time=datetime.now(timezone.utc) + timedelta(minutes=20),
+            source_quality=min(leg.get("quality", 0.8) for leg in legs),
+            historical_success_rate=0.7,
+            metadata={
+                "calculation_method": "cover_graph",
+                "axis": cycle.axis,
+                "arbitrage_percentage": implied_total,
+                "legs": [
+                    {
+                        "sportsbook": leg["sportsbook"],
+                        "market_type": leg.get("market_type"),
+                        "outcome": leg.get("outcome"),
+                        "line": leg.get("line"),
+                        "odds": leg["odds"],
+                        "stake": stake,
+                    }
+                    for leg, stake in zip(legs, stakes)
+                ],
+            },
+        )
+
+    def close(self):
+        """Shut down the graph search worker pool; it restarts on the next large search"""
+        if self._graph_pool is not None:
+            self._graph_pool.shutdown(wait=False, cancel_futures=True)
+            self._graph_pool = None
 
     def _are_opposite_outcomes(
         self, odds1: Dict[str, Any], odds2: Dict[str, Any]
@@ -516,6 +1035,272 @@ class ArbitrageCalculator:
         return timing_risk
 
 
+class BestPriceHeap:
+    """Max-heap of one outcome's quotes across sportsbooks
+
+    Uses lazy deletion: an update pushes a new entry and leaves the old one
+    behind, stale entries are dropped when they surface at the top, and the
+    heap is rebuilt once they outnumber live quotes.
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[float, int, Any]] = []  # (-odds, sequence, book)
+        self._live: Dict[Any, Tuple[int, Dict[str, Any]]] = {}  # book -> (sequence, quote)
+        self._sequence = 0
+
+    def __len__(self) -> int:
+        return len(self._live)
+
+    def update(self, book: Any, quote: Dict[str, Any]):
+        """Insert or replace a sportsbook's quote"""
+        self._sequence += 1
+        self._live[book] = (self._sequence, quote)
+        heapq.heappush(self._heap, (-quote["odds"], self._sequence, book))
+        self._maybe_rebuild()
+
+    def remove(self, book: Any) -> bool:
+        """Withdraw a sportsbook's quote"""
+        if self._live.pop(book, None) is None:
+            return False
+        self._maybe_rebuild()
+        return True
+
+    def best(self) -> Optional[Dict[str, Any]]:
+        """Highest-odds quote"""
+        self._prune()
+        return self._live[self._heap[0][2]][1] if self._heap else None
+
+    def top_two(self) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+        """Highest-odds quote and runner-up"""
+        self._prune()
+        if not self._heap:
+            return None, None
+        first = heapq.heappop(self._heap)
+        second = self.best()
+        heapq.heappush(self._heap, first)
+        return self._live[first[2]][1], second
+
+    def _prune(self):
+        heap = self._heap
+        while heap:
+            _, sequence, book = heap[0]
+            live = self._live.get(book)
+            if live is not None and live[0] == sequence:
+                return
+            heapq.heappop(heap)
+
+    def _maybe_rebuild(self):
+        if len(self._heap) > 2 * len(self._live) + 8:
+            self._heap = [
+                (-quote["odds"], sequence, book)
+                for book, (sequence, quote) in self._live.items()
+            ]
+            heapq.heapify(self._heap)
+
+
+class IncrementalArbitrageTracker:
+    """Best-price arbitrage maintained one odds tick at a time
+
+    Keeps a BestPriceHeap per (event, market, outcome). A tick re-evaluates
+    only the two-way pair of the touched outcome and the market's three-way
+    book, so it costs O(log books) rather than a full scan. Detection rules
+    match BestPriceArbitrageScanner.
+    """
+
+    def __init__(self, calculator: ArbitrageCalculator):
+        self.calculator = calculator
+        self.markets: Dict[Tuple[Any, Any], Dict[str, BestPriceHeap]] = {}
+        # (event, market, type, pair) -> (leg signature, opportunity)
+        self.open_arbitrage: Dict[Tuple, Tuple[Tuple, ArbitrageOpportunity]] = {}
+        self.stats = {
+            "ticks": 0,
+            "events": 0,
+            "total_latency_us": 0.0,
+            "max_latency_us": 0.0,
+        }
+
+    def apply_quote(self, quote: Dict[str, Any]) -> List[ArbitrageEvent]:
+        """Apply one quote update; odds of 1.0 or less withdraw the quote"""
+        start = time.perf_counter()
+
+        group = (quote.get("event_id"), quote.get("market_type"))
+        label = str(quote.get("outcome", "unknown")).lower()
+        book = quote.get("sportsbook")
+        odds = quote.get("odds") or 0.0
+
+        market = self.markets.get(group)
+        if odds > 1.0:
+            if market is None:
+                market = self.markets[group] = {}
+            heap = market.get(label)
+            if heap is None:
+                heap = market[label] = BestPriceHeap()
+            heap.update(book, quote)
+        elif market is not None and label in market:
+            market[label].remove(book)
+            if not market[label]:
+                del market[label]
+            if not market:
+                del self.markets[group]
+        else:
+            market = None
+
+        events = self._evaluate(group, label, market) if market is not None else []
+
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        self.stats["ticks"] += 1
+        self.stats["events"] += len(events)
+        self.stats["total_latency_us"] += elapsed_us
+        self.stats["max_latency_us"] = max(self.stats["max_latency_us"], elapsed_us)
+        return events
+
+    def apply_quotes(self, quotes: List[Dict[str, Any]]) -> List[ArbitrageEvent]:
+        """Apply a batch of quote updates in order"""
+        events = []
+        for quote in quotes:
+            events.extend(self.apply_quote(quote))
+        return events
+
+    def remove_quote(
+        self, event_id: str, market_type: str, outcome: str, sportsbook: str
+    ) -> List[ArbitrageEvent]:
+        """Withdraw a suspended or pulled quote"""
+        return self.apply_quote(
+            {
+                "event_id": event_id,
+                "market_type": market_type,
+                "outcome": outcome,
+                "sportsbook": sportsbook,
+                "odds": 0.0,
+            }
+        )
+
+    def open_opportunities(self) -> List[ArbitrageOpportunity]:
+        """Currently open arbitrage, most profitable first"""
+        opportunities = [opportunity for _, opportunity in self.open_arbitrage.values()]
+        opportunities.sort(key=lambda x: x.profit_percentage, reverse=True)
+        return opportunities
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Tracker size and per-tick latency"""
+        ticks = self.stats["ticks"]
+        return {
+            "markets_tracked": len(self.markets),
+            "open_arbitrage": len(self.open_arbitrage),
+            "ticks": ticks,
+            "events": self.stats["events"],
+            "avg_latency_us": self.stats["total_latency_us"] / ticks if ticks else 0.0,
+            "max_latency_us": self.stats["max_latency_us"],
+        }
+
+    def _evaluate(
+        self, group: Tuple[Any, Any], label: str, market: Dict[str, BestPriceHeap]
+    ) -> List[ArbitrageEvent]:
+        events = []
+        side = TWO_WAY_OUTCOME_SIDES.get(label)
+        if side is not None:
+            pair = side[0]
+            events.extend(
+                self._transition(
+                    (*group, ArbitrageType.TWO_WAY, pair),
+                    self._two_way_legs(market, pair),
+                )
+            )
+        events.extend(
+            self._transition(
+                (*group, ArbitrageType.THREE_WAY, None), self._three_way_legs(market)
+            )
+        )
+        return events
+
+    def _two_way_legs(
+        self, market: Dict[str, BestPriceHeap], pair: int
+    ) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+        """Best executable legs of a two-way pair and their inverse odds sum"""
+        label0, label1 = TWO_WAY_PAIR_LABELS[pair]
+        heap0, heap1 = market.get(label0), market.get(label1)
+        if heap0 is None or heap1 is None:
+            return None
+
+        best0, second0 = heap0.top_two()
+        best1, second1 = heap1.top_two()
+        if best0["sportsbook"] != best1["sportsbook"]:
+            candidates = [(best0, best1)]
+        else:
+            # Both best prices at one book; pair each with the other side's runner-up
+            candidates = [
+                (leg0, leg1)
+                for leg0, leg1 in ((best0, second1), (second0, best1))
+                if leg0 is not None and leg1 is not None
+            ]
+        if not candidates:
+            return None
+
+        leg0, leg1 = min(candidates, key=lambda legs: 1 / legs[0]["odds"] + 1 / legs[1]["odds"])
+        return [leg0, leg1], 1 / leg0["odds"] + 1 / leg1["odds"]
+
+    def _three_way_legs(
+        self, market: Dict[str, BestPriceHeap]
+    ) -> Optional[Tuple[List[Dict[str, Any]], float]]:
+        """Best quote per outcome of a market with exactly three outcomes"""
+        if len(market) != 3:
+            return None
+        legs = [market[label].best() for label in sorted(market)]
+        return legs, sum(1 / leg["odds"] for leg in legs)
+
+    def _transition(
+        self, key: Tuple, legs: Optional[Tuple[List[Dict[str, Any]], float]]
+    ) -> List[ArbitrageEvent]:
+        """Diff a market's current best legs against its open arbitrage"""
+        event_id, market_type, arbitrage_type, _ = key
+        previous = self.open_arbitrage.get(key)
+        inverse_sum = legs[1] if legs is not None else None
+
+        opportunity = None
+        if legs is not None and inverse_sum < 1.0:
+            signature = tuple((leg["sportsbook"], leg["odds"]) for leg in legs[0])
+            if previous is not None and previous[0] == signature:
+                return []
+            opportunity = self._build_opportunity(arbitrage_type, legs[0])
+
+        if opportunity is None:
+            if previous is None:
+                return []
+            del self.open_arbitrage[key]
+            event_type = ArbitrageEventType.CLOSED
+            opportunity = previous[1]
+        else:
+            self.open_arbitrage[key] = (signature, opportunity)
+            event_type = (
+                ArbitrageEventType.UPDATED
+                if previous is not None
+                else ArbitrageEventType.OPENED
+            )
+
+        return [
+            ArbitrageEvent(
+                event_type=event_type,
+                arbitrage_type=arbitrage_type,
+                event_id=event_id,
+                market_type=market_type,
+                outcomes=tuple(
+                    str(leg.get("outcome", "unknown")) for leg in opportunity.odds_data
+                ),
+                inverse_sum=inverse_sum,
+                opportunity=opportunity,
+            )
+        ]
+
+    def _build_opportunity(
+        self, arbitrage_type: ArbitrageType, legs: List[Dict[str, Any]]
+    ) -> Optional[ArbitrageOpportunity]:
+        if arbitrage_type == ArbitrageType.TWO_WAY:
+            return self.calculator._build_two_way_opportunity(legs[0], legs[1])
+        return self.calculator._build_three_way_opportunity(
+            {leg.get("outcome", "unknown"): leg for leg in legs}
+        )
+
+
 class MarketInefficiencyDetector:
     """Advanced market inefficiency detection engine"""
 
@@ -1054,6 +1839,9 @@ class UltraArbitrageEngine:
 
     def __init__(self):
         self.arbitrage_calculator = ArbitrageCalculator()
+        self.incremental_tracker = IncrementalArbitrageTracker(
+            self.arbitrage_calculator
+        )
         self.inefficiency_detector = MarketInefficiencyDetector()
         self.opportunity_history = deque(maxlen=10000)
         self.execution_tracker = defaultdict(list)
@@ -1065,6 +1853,10 @@ class UltraArbitrageEngine:
             "average_roi": 0.0,
         }
 
+    def close(self):
+        """Release the calculator's graph search workers"""
+        self.arbitrage_calculator.close()
+
     async def scan_for_opportunities(
         self,
         market_data: List[Dict[str, Any]],
@@ -1125,6 +1917,27 @@ class UltraArbitrageEngine:
                 "error": str(e),
             }
 
+    def apply_odds_update(self, quote: Dict[str, Any]) -> List[ArbitrageEvent]:
+        """Apply a single odds tick and return arbitrage opened/updated/closed by it
+
+        Only the quote's market is re-evaluated; use this for streaming odds
+        and scan_for_opportunities for full batch scans.
+        """
+        try:
+            events = self.incremental_tracker.apply_quote(quote)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"Incremental arbitrage update failed: {e!s}")
+            return []
+
+        for event in events:
+            if event.event_type == ArbitrageEventType.OPENED:
+                self.performance_metrics["opportunities_detected"] += 1
+                self.opportunity_history.append(
+                    {"type": "arbitrage", "data": event.opportunity, "timestamp": event.timestamp}
+                )
+
+        return events
+
     async def get_engine_health(self) -> Dict[str, Any]:
         """Get arbitrage engine health status"""
         return {
@@ -1133,6 +1946,7 @@ class UltraArbitrageEngine:
             "performance_metrics": self.performance_metrics,
             "execution_tracker_size": len(self.execution_tracker),
             "arbitrage_calculator_status": "operational",
+            "incremental_tracker": self.incremental_tracker.get_stats(),
             "inefficiency_detector_status": "operational",
             "last_health_check": datetime.now(timezone.utc).isoformat(),
         }
@@ -0,0 +1,197 @@
+"""Cross-Market Arbitrage Graph Search
+Maps quotes from related markets (moneyline, 1X2, double chance, spreads,
+totals) onto intervals of a shared outcome axis and searches for Dutch-book
+covers with a depth-bounded Bellman-Ford relaxation.
+
+Kept free of engine imports so worker processes load it cheaply.
+"""
+
+import math
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+INF = math.inf
+
+# Market type -> outcome axis. "margin" is home score minus away score
+MARGIN_MARKETS = {"moneyline", "h2h", "match_result", "1x2", "double_chance"}
+SPREAD_MARKETS = {"spread", "spreads", "handicap", "alternate_spreads"}
+TOTAL_MARKETS = {"totals", "total", "over_under", "alternate_totals"}
+
+# Margin intervals of fixed-outcome labels; margins are integers, so cuts sit
+# on half points and every interval is free of pushes
+MARGIN_OUTCOMES = {
+    "home": (0.5, INF),
+    "1": (0.5, INF),
+    "away": (-INF, -0.5),
+    "2": (-INF, -0.5),
+    "draw": (-0.5, 0.5),
+    "x": (-0.5, 0.5),
+    "home_or_draw": (-0.5, INF),
+    "1x": (-0.5, INF),
+    "draw_or_away": (-INF, 0.5),
+    "x2": (-INF, 0.5),
+}
+
+# Raw quote tuple shipped to workers: (index, event_id, market_type, outcome, line, odds)
+GraphQuote = Tuple[int, Any, str, str, Optional[float], float]
+
+
+@dataclass
+class CoverCycle:
+    """Legs whose winning intervals cover the whole axis for less than 1 unit"""
+
+    event_id: Any
+    axis: str
+    quote_indexes: List[int]  # rows in the original odds list
+    implied_total: float  # sum of 1/odds; the cycle gain is 1 - implied_total
+    market_types: List[str]
+
+
+def _half_point(line: Any) -> Optional[float]:
+    """Return line if it is a half-point (push-free) handicap, else None"""
+    try:
+        value = float(line)
+    except (TypeError, ValueError):
+        return None
+    doubled = value * 2
+    if abs(doubled - round(doubled)) > 1e-9 or round(doubled) % 2 == 0:
+        return None
+    return value
+
+
+def quote_interval(
+    market_type: str, outcome: str, line: Any
+) -> Optional[Tuple[str, float, float]]:
+    """Axis and (low, high) interval on which a quote wins, if it maps onto one"""
+    market = str(market_type).lower()
+    label = str(outcome).lower()
+
+    if market in MARGIN_MARKETS:
+        interval = MARGIN_OUTCOMES.get(label)
+        return ("margin", *interval) if interval else None
+
+    if market in SPREAD_MARKETS:
+        handicap = _half_point(line)
+        if handicap is None:
+            return None
+        # line is the handicap on the quoted side: home covers margin > -line
+        if label in ("home", "1"):
+            return "margin", -handicap, INF
+        if label in ("away", "2"):
+            return "margin", -INF, handicap
+        return None
+
+    if label in ("over", "under"):
+        total = _half_point(line)
+        if total is None:
+            return None
+        # Unknown over/under markets (player props) each get their own axis
+        axis = "total" if market in TOTAL_MARKETS else f"total:{market}"
+        return (axis, total, INF) if label == "over" else (axis, -INF, total)
+
+    return None
+
+
+def find_cover_cycles(quotes: Sequence[GraphQuote], max_depth: int = 4) -> List[CoverCycle]:
+    """Best profitable cover per event axis and leg count
+
+    Each quote is an edge from the low to the high end of its interval,
+    weighted by implied probability; a path from -inf to +inf is a set of
+    bets of which at least one always wins. Closing it with a settle edge
+    (+inf -> -inf, weight -1) gives a negative cycle exactly when the legs
+    cost less than the unit payout. Covers drawn from a single market at a
+    single line are left to the two-way/three-way scanners.
+    """
+    axes: Dict[Tuple[Any, str], Dict[Tuple, Tuple[float, int, str]]] = defaultdict(dict)
+
+    for index, event_id, market_type, outcome, line, odds in quotes:
+        if not odds or odds <= 1.0:
+            continue
+        interval = quote_interval(market_type, outcome, line)
+        if interval is None:
+            continue
+        axis, low, high = interval
+        handicap = _half_point(line)
+        family = (str(market_type).lower(), abs(handicap) if handicap is not None else None)
+        edge_key = (low, high, family)
+        edges = axes[(event_id, axis)]
+        weight = 1.0 / odds
+        if edge_key not in edges or weight < edges[edge_key][0]:
+            edges[edge_key] = (weight, index, family[0])
+
+    cycles = []
+    for (event_id, axis), edges in axes.items():
+        cycles.extend(_search_axis(event_id, axis, edges, max_depth))
+    return cycles
+
+
+_MIXED = "mixed"
+
+
+def _search_axis(
+    event_id: Any,
+    axis: str,
+    edges: Dict[Tuple, Tuple[float, int, str]],
+    max_depth: int,
+) -> List[CoverCycle]:
+    """Depth-bounded Bellman-Ford from -inf to +inf over one event axis"""
+    cuts = sorted({point for low, high, _ in edges for point in (low, high)})
+    if len(cuts) < 3:
+        return []
+    if cuts[0] != -INF or cuts[-1] != INF:
+        return []  # Nothing open-ended, so no cover is possible
+    node = {point: i for i, point in enumerate(cuts)}
+    start, end = 0, len(cuts) - 1
+
+    # (low node, high node, weight, family, quote index, market type)
+    edge_list = sorted(
+        (
+            (node[low], node[high], weight, family, index, market_type)
+            for (low, high, family), (weight, index, market_type) in edges.items()
+        ),
+        key=lambda edge: edge[:3],
+    )
+
+    # States: node covered up to -> family -> (cost, legs). A family is the
+    # (market, |line|) shared by all legs so far, or _MIXED once they differ
+    layer: Dict[int, Dict[Any, Tuple[float, Tuple]]] = {start: {None: (0.0, ())}}
+    best: Dict[int, Tuple[float, Tuple]] = {}  # leg count -> best mixed cover
+
+    for depth in range(1, max_depth + 1):
+        next_layer: Dict[int, Dict[Any, Tuple[float, Tuple]]] = defaultdict(dict)
+        for covered, states in layer.items():
+            for low, high, weight, family, index, market_type in edge_list:
+                if low > covered:
+                    break  # Sorted by low node; the rest would leave a gap
+                if high <= covered:
+                    continue  # Adds no coverage
+                for state, (cost, legs) in states.items():
+                    total = cost + weight
+                    if total >= 1.0:
+                        continue  # Weights are positive, so this can never pay
+                    new_state = family if state in (None, family) else _MIXED
+                    current = next_layer[high].get(new_state)
+                    if current is None or total < current[0]:
+                        next_layer[high][new_state] = (
+                            total,
+                            legs + ((index, market_type),),
+                        )
+
+        finished = next_layer.pop(end, {})
+        if _MIXED in finished:
+            best[depth] = finished[_MIXED]
+        layer = next_layer
+        if not layer:
+            break
+
+    return [
+        CoverCycle(
+            event_id=event_id,
+            axis=axis,
+            quote_indexes=[index for index, _ in legs],
+            implied_total=cost,
+            market_types=[market_type for _, market_type in legs],
+        )
+        for cost, legs in best.values()
+    ]
@@ -0,0 +1,265 @@
+"""Bankroll Simulation
+Monte Carlo bankroll paths over a slate of positions, settled once per round
+under a staking rule. Each chunk of paths is a single NumPy block: win draws
+for every path, round and position, one matrix product for the round
+profits, and a cumulative sum (flat stakes) or product (stakes proportional
+to the bankroll) for the paths. Chunks are sized to a memory cap, seeded
+from one SeedSequence so results do not depend on how chunks are scheduled,
+and can run across a ProcessTaskPool.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+DRAWDOWN_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+RUIN_TIME_QUANTILES = (0.1, 0.5, 0.9)
+BANKROLL_QUANTILES = (0.05, 0.5, 0.95)
+
+
+class StakingRule(str, Enum):
+    """How much goes on each position every round"""
+
+    FLAT = "flat"  # The position's own stake
+    FRACTION = "fraction"  # A fixed share of the current bankroll per position
+    KELLY = "kelly"  # A multiple of the position's Kelly fraction of the bankroll
+
+
+@dataclass
+class SimulationPosition:
+    """A bet settled every round: decimal odds, win probability and flat stake"""
+
+    odds: float
+    win_probability: float
+    stake: float = 0.0
+
+
+@dataclass
+class SimulationResult:
+    """Outcome distribution over all simulated paths"""
+
+    paths: int
+    rounds: int
+    ruin_probability: float
+    profit_probability: float
+    mean_final_bankroll: float
+    final_bankroll_quantiles: Dict[str, float]
+    mean_max_drawdown: float
+    max_drawdown_quantiles: Dict[str, float]
+    mean_rounds_to_ruin: Optional[float]
+    rounds_to_ruin_quantiles: Optional[Dict[str, float]]
+    elapsed_seconds: float
+    paths_per_second: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def simulate_chunk(
+    spec: Dict[str, Any], paths: int, rounds: int, seed: np.random.SeedSequence
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(rounds to ruin or -1, max drawdown, final bankroll) for each path
+
+    spec comes from BankrollSimulator.spec(). A path is ruined once its
+    bankroll is at or below the ruin level, or for flat staking can no
+    longer cover the slate; it then stays at that bankroll.
+    """
+    bankroll, any_ruin, first = _bankroll_paths(spec, paths, rounds, seed)
+    start = float(spec["bankroll"])
+    peak = np.maximum.accumulate(bankroll, axis=1)
+    np.maximum(peak, start, out=peak)
+    max_drawdown = (1.0 - bankroll / peak).max(axis=1)
+    rounds_to_ruin = np.where(any_ruin, first + 1, -1).astype(np.int32)
+    return rounds_to_ruin, max_drawdown, bankroll[:, -1].copy()
+
+
+def _bankroll_paths(
+    spec: Dict[str, Any], paths: int, rounds: int, seed: np.random.SeedSequence
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(bankroll after each round, ruined, first ruined round) per path
+
+    Draws are laid out path by path, so the first path of a chunk does not
+    depend on how many paths the chunk holds.
+    """
+    probabilities = np.asarray(spec["probabilities"], dtype=np.float32)
+    payouts = np.asarray(spec["payouts"], dtype=np.float32)  # Returned per unit win
+    outlay = float(spec["outlay"])
+    start = float(spec["bankroll"])
+    rng = np.random.default_rng(seed)
+
+    wins = rng.random((paths * rounds, len(probabilities)), dtype=np.float32) < probabilities
+    round_returns = (wins @ payouts).reshape(paths, rounds)
+    del wins
+    if spec["proportional"]:
+        # Bankroll multiplies by 1 - sum(f) + sum(f * odds over winners) each round
+        round_returns += np.float32(1.0 - outlay)
+        bankroll = np.cumprod(round_returns, axis=1, dtype=np.float64)
+        bankroll *= start
+        ruined = bankroll <= spec["ruin_level"]
+    else:
+        round_returns -= np.float32(outlay)
+        bankroll = np.cumsum(round_returns, axis=1, dtype=np.float64)
+        bankroll += start
+        ruined = bankroll < max(spec["ruin_level"], outlay)
+    del round_returns
+
+    any_ruin = ruined.any(axis=1)
+    first = ruined.argmax(axis=1)
+    del ruined
+    rows = np.flatnonzero(any_ruin)
+    if len(rows):
+        # Freeze ruined paths at the bankroll they were ruined with
+        frozen = np.arange(rounds) > first[rows, None]
+        bankroll[rows] = np.where(frozen, bankroll[rows, first[rows]][:, None], bankroll[rows])
+    return bankroll, any_ruin, first
+
+
+def _quantiles(values: np.ndarray, levels: Sequence[float]) -> Dict[str, float]:
+    return {f"p{round(q * 100)}": float(v) for q, v in zip(levels, np.quantile(values, levels))}
+
+
+class BankrollSimulator:
+    """Monte Carlo ruin, drawdown and final-bankroll distributions for a slate
+
+    fraction is the bankroll share per position under FRACTION staking and
+    kelly_multiplier scales each position's Kelly fraction under KELLY
+    staking; proportional stakes summing past max_exposure of the bankroll
+    are scaled down to it. ruin_fraction sets ruin as a share of the
+    starting bankroll.
+    """
+
+    def __init__(
+        self,
+        positions: Sequence[SimulationPosition],
+        bankroll: float,
+        staking: StakingRule = StakingRule.FLAT,
+        fraction: float = 0.02,
+        kelly_multiplier: float = 0.25,
+        max_exposure: float = 0.5,
+        ruin_fraction: float = 0.01,
+        max_chunk_bytes: int = 64 * 1024**2,
+    ):
+        if not positions:
+            raise ValueError("At least one position is required")
+        if bankroll <= 0:
+            raise ValueError("Bankroll must be positive")
+        self.odds = np.array([p.odds for p in positions], dtype=np.float64)
+        self.probabilities = np.array([p.win_probability for p in positions], dtype=np.float64)
+        if np.any(self.odds <= 1.0) or np.any((self.probabilities < 0) | (self.probabilities > 1)):
+            raise ValueError("Odds must exceed 1.0 and probabilities lie in [0, 1]")
+        self.stakes = np.array([p.stake for p in positions], dtype=np.float64)
+        self.bankroll = float(bankroll)
+        self.staking = StakingRule(staking)
+        self.fraction = fraction
+        self.kelly_multiplier = kelly_multiplier
+        self.max_exposure = max_exposure
+        self.ruin_fraction = ruin_fraction
+        self.max_chunk_bytes = max_chunk_bytes
+
+        if self.staking == StakingRule.FLAT and self.stakes.sum() > self.bankroll:
+            raise ValueError("Bankroll cannot cover the positions' stakes")
+
+    def stake_fractions(self) -> np.ndarray:
+        """Bankroll share staked on each position under proportional staking"""
+        if self.staking == StakingRule.FRACTION:
+            fractions = np.full(len(self.odds), self.fraction)
+        else:
+            edge = (self.probabilities * self.odds - 1.0) / (self.odds - 1.0)
+            fractions = self.kelly_multiplier * np.clip(edge, 0.0, None)
+        total = fractions.sum()
+        if total > self.max_exposure:
+            fractions *= self.max_exposure / total
+        return fractions
+
+    def spec(self) -> Dict[str, Any]:
+        """Plain-data description of the slate, as passed to simulate_chunk"""
+        proportional = self.staking != StakingRule.FLAT
+        stakes = self.stake_fractions() if proportional else self.stakes
+        return {
+            "probabilities": self.probabilities.tolist(),
+            "payouts": (stakes * self.odds).tolist(),
+            "outlay": float(stakes.sum()),
+            "bankroll": self.bankroll,
+            "proportional": proportional,
+            "ruin_level": self.ruin_fraction * self.bankroll,
+        }
+
+    def chunks(
+        self, paths: int, rounds: int, seed: Optional[int]
+    ) -> List[Tuple[int, np.random.SeedSequence]]:
+        """(paths, seed) per chunk; the split depends only on the arguments"""
+        # Uniform draws, win flags and about four float64 path arrays per cell
+        bytes_per_path = rounds * (5 * len(self.odds) + 40)
+        size = max(1, min(paths, self.max_chunk_bytes // bytes_per_path))
+        counts = [size] * (paths // size) + ([paths % size] if paths % size else [])
+        return list(zip(counts, np.random.SeedSequence(seed).spawn(len(counts))))
+
+    def run(self, paths: int = 100_000, rounds: int = 250, seed: Optional[int] = None) -> SimulationResult:
+        """Simulate in this process, chunk by chunk"""
+        start = time.perf_counter()
+        spec = self.spec()
+        parts = [
+            simulate_chunk(spec, count, rounds, chunk_seed)
+            for count, chunk_seed in self.chunks(paths, rounds, seed)
+        ]
+        return self._summarise(parts, rounds, time.perf_counter() - start)
+
+    async def run_parallel(
+        self, pool, paths: int = 100_000, rounds: int = 250, seed: Optional[int] = None
+    ) -> SimulationResult:
+        """Simulate chunks across a ProcessTaskPool; same result as run() for a seed"""
+        start = time.perf_counter()
+        spec = self.spec()
+        parts = await asyncio.gather(
+            *[
+                pool.run("bankroll_simulation:simulate_chunk", (spec, count, rounds, chunk_seed))
+                for count, chunk_seed in self.chunks(paths, rounds, seed)
+            ]
+        )
+        return self._summarise(parts, rounds, time.perf_counter() - start, workers=pool.workers)
+
+    def sample_path(self, rounds: int, seed: Optional[int] = None) -> np.ndarray:
+        """Bankroll after each round for one path, ruin included
+
+        With the same seed this is the first path run() simulates, so it is
+        drawn from the distribution run() reports.
+        """
+        _, chunk_seed = self.chunks(1, rounds, seed)[0]
+        bankroll, _, _ = _bankroll_paths(self.spec(), 1, rounds, chunk_seed)
+        return bankroll[0]
+
+    def _summarise(
+        self,
+        parts: List[Tuple[np.ndarray, np.ndarray, np.ndarray]],
+        rounds: int,
+        elapsed: float,
+        workers: int = 1,
+    ) -> SimulationResult:
+        rounds_to_ruin = np.concatenate([part[0] for part in parts])
+        max_drawdown = np.concatenate([part[1] for part in parts])
+        final = np.concatenate([part[2] for part in parts])
+        ruin_times = rounds_to_ruin[rounds_to_ruin >= 0]
+        return SimulationResult(
+            paths=len(final),
+            rounds=rounds,
+            ruin_probability=len(ruin_times) / len(final),
+            profit_probability=float(np.mean(final > self.bankroll)),
+            mean_final_bankroll=float(final.mean()),
+            final_bankroll_quantiles=_quantiles(final, BANKROLL_QUANTILES),
+            mean_max_drawdown=float(max_drawdown.mean()),
+            max_drawdown_quantiles=_quantiles(max_drawdown, DRAWDOWN_QUANTILES),
+            mean_rounds_to_ruin=float(ruin_times.mean()) if len(ruin_times) else None,
+            rounds_to_ruin_quantiles=(
+                _quantiles(ruin_times, RUIN_TIME_QUANTILES) if len(ruin_times) else None
+            ),
+            elapsed_seconds=elapsed,
+            paths_per_second=len(final) / elapsed if elapsed > 0 else float("inf"),
+            metadata={
+                "staking": self.staking.value,
+                "positions": len(self.odds),
+                "chunks": len(parts),
+                "workers": workers,
+            },
+        )
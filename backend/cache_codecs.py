@@ -0,0 +1,281 @@
+"""Cache Value Codecs
+Single-pass serialization and compression for cache entries. The encoded bytes
+are reused for size accounting, L1 compressed storage and Redis payloads.
+"""
+
+import gzip
+import logging
+import pickle
+import struct
+import threading
+import zlib
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    import lz4.frame as lz4_frame
+except ImportError:
+    lz4_frame = None
+
+
+class CompressionType(str, Enum):
+    """Data compression types"""
+
+    NONE = "none"
+    GZIP = "gzip"
+    ZLIB = "zlib"
+    PICKLE = "pickle"  # Legacy: pickled without compression
+    ZSTD = "zstd"
+    LZ4 = "lz4"
+
+
+class SerializerType(str, Enum):
+    """Value serialization formats"""
+
+    PICKLE = "pickle"  # Protocol 5 with out-of-band buffers
+    MSGPACK = "msgpack"
+
+
+# Frame layout: magic (2) | version (1) | serializer id (1) | compression id (1) | body
+FRAME_MAGIC = b"\xa1\xcc"
+FRAME_VERSION = 1
+_HEADER = struct.Struct("<2sBBB")
+
+_SERIALIZER_IDS = {SerializerType.PICKLE: 0, SerializerType.MSGPACK: 1}
+_SERIALIZERS_BY_ID = {v: k for k, v in _SERIALIZER_IDS.items()}
+_COMPRESSION_IDS = {
+    CompressionType.NONE: 0,
+    CompressionType.GZIP: 1,
+    CompressionType.ZLIB: 2,
+    CompressionType.ZSTD: 3,
+    CompressionType.LZ4: 4,
+}
+_COMPRESSIONS_BY_ID = {v: k for k, v in _COMPRESSION_IDS.items()}
+
+
+def compression_available(compression: CompressionType) -> bool:
+    """Check whether the library backing a compression type is installed"""
+    if compression == CompressionType.ZSTD:
+        return zstandard is not None
+    if compression == CompressionType.LZ4:
+        return lz4_frame is not None
+    return True
+
+
+def resolve_compression(preferred: CompressionType) -> CompressionType:
+    """Pick preferred compression, degrading zstd/lz4 to zlib when missing"""
+    if preferred == CompressionType.PICKLE:
+        return CompressionType.NONE
+    if compression_available(preferred):
+        return preferred
+    logger.info(f"{preferred.value} compression unavailable, falling back to zlib")
+    return CompressionType.ZLIB
+
+
+@dataclass
+class EncodedValue:
+    """Serialized cache value ready for storage"""
+
+    payload: bytes
+    raw_size: int
+    compression_type: CompressionType
+    serializer: SerializerType
+
+    @property
+    def size(self) -> int:
+        """Stored size in bytes"""
+        return len(self.payload)
+
+    @property
+    def compressed(self) -> bool:
+        """Whether the payload body is compressed"""
+        return self.compression_type != CompressionType.NONE
+
+
+class CacheCodec:
+    """Serialize once, optionally compress, and decode self-describing frames
+
+    Payloads carry a small header naming serializer and compression, so any
+    process can decode them regardless of its own codec settings. Payloads
+    without the header are treated as legacy plain pickles.
+    """
+
+    def __init__(
+        self,
+        serializer: SerializerType = SerializerType.PICKLE,
+        compression: CompressionType = CompressionType.ZSTD,
+        compression_threshold: int = 1024,
+        compression_level: Optional[int] = None,
+    ):
+        if serializer == SerializerType.MSGPACK and msgpack is None:
+            logger.info("msgpack unavailable, cache codec using pickle")
+            serializer = SerializerType.PICKLE
+        self.serializer = serializer
+        self.compression = resolve_compression(compression)
+        self.compression_threshold = compression_threshold
+        self.compression_level = compression_level
+        # zstd contexts are not safe for concurrent use; keep one per thread
+        self._zstd = threading.local()
+
+    def encode(self, value: Any, compress: Optional[bool] = None) -> EncodedValue:
+        """Encode value into a framed payload
+
+        ``compress`` forces compression on/off; by default bodies larger than
+        ``compression_threshold`` are compressed when that makes them smaller.
+        """
+        serializer, body = self._serialize(value)
+        return self._frame(serializer, body, compress)
+
+    def compress_encoded(self, encoded: EncodedValue) -> EncodedValue:
+        """Compress an uncompressed encoding as encode would have, without reserializing"""
+        if encoded.compressed:
+            return encoded
+        return self._frame(encoded.serializer, memoryview(encoded.payload)[_HEADER.size :])
+
+    def _frame(self, serializer: SerializerType, body, compress: Optional[bool] = None) -> EncodedValue:
+        raw_size = len(body)
+
+        compression = CompressionType.NONE
+        should_compress = (
+            compress
+            if compress is not None
+            else raw_size > self.compression_threshold
+        )
+        if should_compress and self.compression != CompressionType.NONE:
+            packed = self.compress(body, self.compression)
+            if len(packed) < raw_size:
+                body = packed
+                compression = self.compression
+
+        header = _HEADER.pack(
+            FRAME_MAGIC,
+            FRAME_VERSION,
+            _SERIALIZER_IDS[serializer],
+            _COMPRESSION_IDS[compression],
+        )
+        return EncodedValue(
+            payload=header + bytes(body),
+            raw_size=raw_size,
+            compression_type=compression,
+            serializer=serializer,
+        )
+
+    def decode(self, payload: bytes) -> Any:
+        """Decode a payload produced by encode (or a legacy pickle)"""
+        if not payload.startswith(FRAME_MAGIC):
+            return pickle.loads(payload)
+
+        _, version, serializer_id, compression_id = _HEADER.unpack_from(payload)
+        if version != FRAME_VERSION:
+            raise ValueError(f"Unsupported cache frame version {version}")
+
+        body = memoryview(payload)[_HEADER.size :]
+        compression = _COMPRESSIONS_BY_ID[compression_id]
+        if compression != CompressionType.NONE:
+            body = memoryview(self.decompress(body, compression))
+
+        return self._deserialize(_SERIALIZERS_BY_ID[serializer_id], body)
+
+    def _serialize(self, value: Any):
+        if self.serializer == SerializerType.MSGPACK:
+            try:
+                return SerializerType.MSGPACK, msgpack.packb(value, use_bin_type=True)
+            except (TypeError, ValueError, OverflowError):
+                pass  # Types msgpack cannot represent fall back to pickle
+        return SerializerType.PICKLE, _pickle_with_buffers(value)
+
+    def _deserialize(self, serializer: SerializerType, body: memoryview) -> Any:
+        if serializer == SerializerType.MSGPACK:
+            if msgpack is None:
+                raise RuntimeError("msgpack payload received but msgpack is not installed")
+            # Non-string keys (e.g. ints) are valid in cached dicts
+            return msgpack.unpackb(body, raw=False, strict_map_key=False)
+        return _unpickle_with_buffers(body)
+
+    def compress(self, data: bytes, compression: CompressionType) -> bytes:
+        """Compress a body with the given algorithm"""
+        if compression == CompressionType.ZSTD:
+            compressor = getattr(self._zstd, "compressor", None)
+            if compressor is None:
+                compressor = self._zstd.compressor = zstandard.ZstdCompressor(
+                    level=self.compression_level or 3
+                )
+            return compressor.compress(data)
+        if compression == CompressionType.LZ4:
+            return lz4_frame.compress(data)
+        if compression == CompressionType.GZIP:
+            return gzip.compress(data, compresslevel=self.compression_level or 6)
+        return zlib.compress(data, self.compression_level or 6)
+
+    def decompress(self, data: memoryview, compression: CompressionType) -> bytes:
+        """Inverse of compress"""
+        if compression == CompressionType.ZSTD:
+            if zstandard is None:
+                raise RuntimeError("zstd payload received but zstandard is not installed")
+            decompressor = getattr(self._zstd, "decompressor", None)
+            if decompressor is None:
+                decompressor = self._zstd.decompressor = zstandard.ZstdDecompressor()
+            return decompressor.decompress(data)
+        if compression == CompressionType.LZ4:
+            if lz4_frame is None:
+                raise RuntimeError("lz4 payload received but lz4 is not installed")
+            return lz4_frame.decompress(data)
+        if compression == CompressionType.GZIP:
+            return gzip.decompress(data)
+        return zlib.decompress(data)
+
+
+# Pickle body layout: buffer count (4) | buffer lengths (8 each) | pickle length (8)
+# | pickle stream | raw buffers
+_COUNT = struct.Struct("<I")
+_LENGTH = struct.Struct("<Q")
+
+
+def _pickle_with_buffers(value: Any) -> bytes:
+    """Pickle with protocol 5, keeping large buffers (NumPy arrays) out of band"""
+    buffers: List[pickle.PickleBuffer] = []
+    stream = pickle.dumps(value, protocol=5, buffer_callback=buffers.append)
+    raw_buffers = [buffer.raw() for buffer in buffers]
+
+    parts = [_COUNT.pack(len(raw_buffers))]
+    parts.extend(_LENGTH.pack(buffer.nbytes) for buffer in raw_buffers)
+    parts.append(_LENGTH.pack(len(stream)))
+    parts.append(stream)
+    parts.extend(raw_buffers)
+    return b"".join(parts)
+
+
+def _unpickle_with_buffers(body: memoryview) -> Any:
+    """Inverse of _pickle_with_buffers; buffers are zero-copy views (read-only)"""
+    (count,) = _COUNT.unpack_from(body)
+    offset = _COUNT.size
+    lengths = []
+    for _ in range(count):
+        lengths.append(_LENGTH.unpack_from(body, offset)[0])
+        offset += _LENGTH.size
+    (stream_length,) = _LENGTH.unpack_from(body, offset)
+    offset += _LENGTH.size
+
+    stream = body[offset : offset + stream_length]
+    offset += stream_length
+    buffers = []
+    for length in lengths:
+        buffers.append(body[offset : offset + length])
+        offset += length
+    return pickle.loads(stream, buffers=buffers)
+
+
+default_codec = CacheCodec()
@@ -0,0 +1,332 @@
+"""Cache Eviction Policies
+O(1) eviction bookkeeping (LRU, FIFO, LFU, W-TinyLFU) for the in-process cache tiers
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EvictionPolicy(ABC):
+    """Base class for eviction bookkeeping
+
+    A policy only tracks keys; the owning cache stores the values and asks the
+    policy which key to drop next. Every operation is O(1) (amortised).
+    """
+
+    name = "base"
+
+    def __init__(self, capacity: int):
+        self.capacity = max(1, int(capacity))
+
+    @abstractmethod
+    def record_insert(self, key: str):
+        """Register a newly inserted key; caches remove() a key before re-inserting it"""
+
+    @abstractmethod
+    def record_access(self, key: str):
+        """Register a cache hit for key"""
+
+    @abstractmethod
+    def remove(self, key: str):
+        """Forget key (explicit delete, expiry or eviction)"""
+
+    @abstractmethod
+    def select_victim(self) -> Optional[str]:
+        """Return the key that should be evicted next, or None if empty"""
+
+    @abstractmethod
+    def clear(self):
+        """Forget all keys"""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of tracked keys"""
+
+    @abstractmethod
+    def __contains__(self, key: str) -> bool:
+        """Whether key is tracked"""
+
+
+class LRUPolicy(EvictionPolicy):
+    """Least Recently Used eviction backed by an ordered dict"""
+
+    name = "lru"
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self._order: "OrderedDict[str, None]" = OrderedDict()
+
+    def record_insert(self, key: str):
+        self._order[key] = None
+        self._order.move_to_end(key)
+
+    def record_access(self, key: str):
+        if key in self._order:
+            self._order.move_to_end(key)
+
+    def remove(self, key: str):
+        self._order.pop(key, None)
+
+    def select_victim(self) -> Optional[str]:
+        return next(iter(self._order), None)
+
+    def clear(self):
+        self._order.clear()
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._order
+
+
+class FIFOPolicy(LRUPolicy):
+    """First In First Out eviction (hits do not refresh position)"""
+
+    name = "fifo"
+
+    def record_access(self, key: str):
+        return None
+
+
+class LFUPolicy(EvictionPolicy):
+    """Least Frequently Used eviction with O(1) frequency buckets
+
+    Keys are grouped into per-frequency ordered buckets; ties within the
+    lowest frequency are broken by recency (oldest first).
+    """
+
+    name = "lfu"
+
+    def __init__(self, capacity: int):
+        super().__init__(capacity)
+        self._key_freq: Dict[str, int] = {}
+        self._buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self._min_freq = 0
+
+    def _bucket(self, freq: int) -> "OrderedDict[str, None]":
+        bucket = self._buckets.get(freq)
+        if bucket is None:
+            bucket = self._buckets[freq] = OrderedDict()
+        return bucket
+
+    def _unlink(self, key: str, freq: int):
+        bucket = self._buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self._buckets[freq]
+            if self._min_freq == freq:
+                self._min_freq = freq + 1
+
+    def record_insert(self, key: str):
+        self._key_freq[key] = 1
+        self._bucket(1)[key] = None
+        self._min_freq = 1
+
+    def record_access(self, key: str):
+        freq = self._key_freq.get(key)
+        if freq is None:
+            return
+        self._unlink(key, freq)
+        self._key_freq[key] = freq + 1
+        self._bucket(freq + 1)[key] = None
+
+    def remove(self, key: str):
+        freq = self._key_freq.pop(key, None)
+        if freq is None:
+            return
+        self._unlink(key, freq)
+        if not self._key_freq:
+            self._min_freq = 0
+
+    def select_victim(self) -> Optional[str]:
+        if not self._key_freq:
+            return None
+        bucket = self._buckets.get(self._min_freq)
+        if not bucket:
+            # The lowest bucket was emptied by remove(); rescan is bounded by
+            # the number of distinct frequencies, not the number of keys
+            self._min_freq = min(self._buckets)
+            bucket = self._buckets[self._min_freq]
+        return next(iter(bucket))
+
+    def frequency(self, key: str) -> int:
+        """Get access frequency tracked for key"""
+        return self._key_freq.get(key, 0)
+
+    def clear(self):
+        self._key_freq.clear()
+        self._buckets.clear()
+        self._min_freq = 0
+
+    def __len__(self) -> int:
+        return len(self._key_freq)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._key_freq
+
+
+class FrequencySketch:
+    """Count-min sketch with 4-bit saturating counters and periodic aging"""
+
+    DEPTH = 4
+    MAX_COUNT = 15
+    _SEEDS = (0x9E3779B1, 0x85EBCA77, 0xC2B2AE3D, 0x27D4EB2F)
+    _HALVE = bytes(i >> 1 for i in range(256))
+
+    def __init__(self, capacity: int):
+        width = 16
+        while width < capacity:
+            width <<= 1
+        self.width = width
+        self._mask = width - 1
+        self._rows = [bytearray(width) for _ in range(self.DEPTH)]
+        self.sample_size = 10 * max(1, capacity)
+        self.additions = 0
+
+    def _indexes(self, key: str):
+        h = hash(key)
+        mask = self._mask
+        return [((h * seed) >> 16) & mask for seed in self._SEEDS]
+
+    def estimate(self, key: str) -> int:
+        """Estimated access frequency of key"""
+        rows = self._rows
+        return min(rows[i][idx] for i, idx in enumerate(self._indexes(key)))
+
+    def increment(self, key: str):
+        """Record one access of key"""
+        rows = self._rows
+        added = False
+        for i, idx in enumerate(self._indexes(key)):
+            if rows[i][idx] < self.MAX_COUNT:
+                rows[i][idx] += 1
+                added = True
+        if added:
+            self.additions += 1
+            if self.additions >= self.sample_size:
+                self._reset()
+
+    def _reset(self):
+        """Halve all counters so old popularity decays"""
+        for row in self._rows:
+            row[:] = row.translate(self._HALVE)
+        self.additions //= 2
+
+    def clear(self):
+        for row in self._rows:
+            row[:] = bytes(len(row))
+        self.additions = 0
+
+
+class WTinyLFUPolicy(EvictionPolicy):
+    """Window TinyLFU eviction
+
+    New keys enter a small LRU window (1% of capacity). Keys leaving the
+    window compete with the main region's probation victim and are only
+    admitted when the frequency sketch says they are more popular. The main
+    region is a segmented LRU (20% probation, 80% protected).
+    """
+
+    name = "w_tinylfu"
+
+    def __init__(self, capacity: int, window_ratio: float = 0.01):
+        super().__init__(capacity)
+        self.window_capacity = max(1, int(self.capacity * window_ratio))
+        main_capacity = max(1, self.capacity - self.window_capacity)
+        self.protected_capacity = max(1, int(main_capacity * 0.8))
+        self._window: "OrderedDict[str, None]" = OrderedDict()
+        self._probation: "OrderedDict[str, None]" = OrderedDict()
+        self._protected: "OrderedDict[str, None]" = OrderedDict()
+        self.sketch = FrequencySketch(self.capacity)
+
+    def record_insert(self, key: str):
+        self.sketch.increment(key)
+        self._window[key] = None
+        # Overflowing window entries graduate into probation; admission
+        # against the main region only happens when the cache must evict
+        while len(self._window) > self.window_capacity:
+            graduate, _ = self._window.popitem(last=False)
+            self._probation[graduate] = None
+
+    def record_access(self, key: str):
+        self.sketch.increment(key)
+        self._touch(key)
+
+    def _touch(self, key: str):
+        if key in self._window:
+            self._window.move_to_end(key)
+        elif key in self._probation:
+            del self._probation[key]
+            self._protected[key] = None
+            if len(self._protected) > self.protected_capacity:
+                demoted, _ = self._protected.popitem(last=False)
+                self._probation[demoted] = None
+        elif key in self._protected:
+            self._protected.move_to_end(key)
+
+    def remove(self, key: str):
+        if key in self._window:
+            del self._window[key]
+        elif key in self._probation:
+            del self._probation[key]
+        else:
+            self._protected.pop(key, None)
+
+    def select_victim(self) -> Optional[str]:
+        main_victim = next(iter(self._probation), None)
+        if main_victim is None:
+            main_victim = next(iter(self._protected), None)
+
+        candidate = next(iter(self._window), None)
+        if candidate is None:
+            return main_victim
+        if main_victim is None:
+            return candidate
+
+        # TinyLFU admission: the window candidate replaces the main victim
+        # only if it is estimated to be accessed more often
+        if self.sketch.estimate(candidate) > self.sketch.estimate(main_victim):
+            del self._window[candidate]
+            self._probation[candidate] = None
+            return main_victim
+        return candidate
+
+    def clear(self):
+        self._window.clear()
+        self._probation.clear()
+        self._protected.clear()
+        self.sketch.clear()
+
+    def __len__(self) -> int:
+        return len(self._window) + len(self._probation) + len(self._protected)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._window or key in self._probation or key in self._protected
+
+
+EVICTION_POLICIES = {
+    "lru": LRUPolicy,
+    "fifo": FIFOPolicy,
+    "lfu": LFUPolicy,
+    "adaptive": WTinyLFUPolicy,
+}
+
+
+def create_eviction_policy(strategy: str, capacity: int) -> EvictionPolicy:
+    """Create eviction policy for a CacheStrategy value
+
+    ``adaptive`` maps to W-TinyLFU. Strategies without a dedicated policy
+    (``ttl``, ``random``) fall back to LRU ordering, since expiry is already
+    enforced per entry on access.
+    """
+    strategy_value = getattr(strategy, "value", strategy)
+    policy_cls = EVICTION_POLICIES.get(strategy_value)
+    if policy_cls is None:
+        logger.debug(f"No dedicated eviction policy for {strategy_value}, using LRU")
+        policy_cls = LRUPolicy
+    return policy_cls(capacity)
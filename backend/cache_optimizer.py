@@ -3,21 +3,22 @@ Multi-tier caching system with intelligent cache warming, eviction policies, and
 """
 
 import asyncio
-import gzip
 import hashlib
-import json
 import logging
-import pickle
+import os
+import threading
 import time
 from collections import defaultdict, deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum
 from functools import wraps
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 import redis.asyncio as redis
+from cache_codecs import CacheCodec, CompressionType, EncodedValue, default_codec
+from cache_eviction import EvictionPolicy, create_eviction_policy
 from config import config_manager
 
 logger = logging.getLogger(__name__)
@@ -43,15 +44,6 @@ class CacheStrategy(str, Enum):
     ADAPTIVE = "adaptive"  # Adaptive based on access patterns
 
 
-class CompressionType(str, Enum):
-    """Data compression types"""
-
-    NONE = "none"
-    GZIP = "gzip"
-    ZLIB = "zlib"
-    PICKLE = "pickle"
-
-
 @dataclass
 class CacheMetrics:
     """Cache performance metrics"""
@@ -97,14 +89,23 @@ class CacheEntry:
 
 
 class InMemoryCache:
-    """High-performance in-memory cache with LRU eviction"""
+    """High-performance in-memory cache with pluggable O(1) eviction"""
 
-    def __init__(self, max_size: int = 10000, max_memory_mb: int = 512):
+    def __init__(
+        self,
+        max_size: int = 10000,
+        max_memory_mb: float = 512,
+        strategy: CacheStrategy = CacheStrategy.LRU,
+        codec: Optional[CacheCodec] = None,
+    ):
         self.max_size = max_size
         self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self.strategy = strategy
+        self.codec = codec or default_codec
         self.cache: Dict[str, CacheEntry] = {}
-        self.access_order = deque()
-        self.frequency_counter = defaultdict(int)
+        self.eviction_policy: EvictionPolicy = create_eviction_policy(
+            strategy, max_size
+        )
         self.current_memory = 0
         self.metrics = CacheMetrics()
 
@@ -125,17 +126,16 @@ class InMemoryCache:
                 # Update access info
                 entry.last_accessed = datetime.now(timezone.utc)
                 entry.access_count += 1
-                self.frequency_counter[key] += 1
+                self.eviction_policy.record_access(key)
 
-                # Move to end for LRU
-                if key in self.access_order:
-                    self.access_order.remove(key)
-                self.access_order.append(key)
+                value = entry.value
+                if entry.compressed:
+                    value = self.codec.decode(value)
 
                 self.metrics.hits += 1
                 self._update_access_time(time.time() - start_time)
 
-                return entry.value
+                return value
             else:
                 self.metrics.misses += 1
                 return None
@@ -146,38 +146,50 @@ class InMemoryCache:
             return None
 
     def set(
-        self, key: str, value: Any, ttl: Optional[int] = None, compress: bool = False
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        compress: bool = False,
+        encoded: Optional[EncodedValue] = None,
     ) -> bool:
-        """Set value in cache"""
+        """Set value in cache
+
+        ``encoded`` lets callers that already serialized the value (e.g. for
+        Redis) reuse those bytes for size accounting and compressed storage.
+        """
         try:
-            # Compress if requested
             actual_value = value
             compression_type = CompressionType.NONE
             compressed = False
 
-            if compress and self._should_compress(value):
+            if encoded is None:
                 try:
-                    if isinstance(value, (dict, list)):
-                        serialized = json.dumps(value).encode("utf-8")
-                        actual_value = gzip.compress(serialized)
-                        compression_type = CompressionType.GZIP
-                        compressed = True
-                    elif isinstance(value, str):
-                        actual_value = gzip.compress(value.encode("utf-8"))
-                        compression_type = CompressionType.GZIP
-                        compressed = True
+                    encoded = self.codec.encode(value)
                 except Exception as e:  # pylint: disable=broad-exception-caught
-                    logger.warning("Compression failed for key {key}: {e!s}")
+                    logger.debug(f"Could not encode value for key {key}: {e!s}")
+
+            if encoded is None:
+                entry_size = 1024  # Default estimate for unserializable values
+            elif compress and encoded.compressed:
+                # Keep only the compressed payload; get() decodes it
+                actual_value = encoded.payload
+                compression_type = encoded.compression_type
+                compressed = True
+                entry_size = encoded.size
+            else:
+                entry_size = encoded.raw_size
 
-            # Calculate size
-            entry_size = self._calculate_size(actual_value)
+            # Remove existing entry so it does not count against capacity
+            if key in self.cache:
+                self._evict_key(key)
 
             # Check if we need to evict entries
             while (
                 len(self.cache) >= self.max_size
                 or self.current_memory + entry_size > self.max_memory_bytes
             ):
-                if not self._evict_oldest():
+                if not self._evict_next():
                     break  # No more entries to evict
 
             # Create cache entry
@@ -193,13 +205,9 @@ class InMemoryCache:
                 compression_type=compression_type,
             )
 
-            # Remove existing entry if present
-            if key in self.cache:
-                self._evict_key(key)
-
             # Add new entry
             self.cache[key] = entry
-            self.access_order.append(key)
+            self.eviction_policy.record_insert(key)
             self.current_memory += entry_size
             self.metrics.writes += 1
             self.metrics.total_size += 1
@@ -226,8 +234,7 @@ class InMemoryCache:
     def clear(self):
         """Clear all cache entries"""
         self.cache.clear()
-        self.access_order.clear()
-        self.frequency_counter.clear()
+        self.eviction_policy.clear()
         self.current_memory = 0
         self.metrics = CacheMetrics()
 
@@ -237,47 +244,24 @@ class InMemoryCache:
             entry = self.cache[key]
             self.current_memory -= entry.size
             del self.cache[key]
-
-            if key in self.access_order:
-                self.access_order.remove(key)
-
-            if key in self.frequency_counter:
-                del self.frequency_counter[key]
+            self.eviction_policy.remove(key)
 
             self.metrics.evictions += 1
             self.metrics.total_size -= 1
 
-    def _evict_oldest(self) -> bool:
-        """Evict oldest entry based on LRU"""
-        if not self.access_order:
+    def _evict_next(self) -> bool:
+        """Evict the entry chosen by the eviction policy"""
+        victim_key = self.eviction_policy.select_victim()
+        if victim_key is None:
             return False
 
-        oldest_key = self.access_order[0]
-        self._evict_key(oldest_key)
+        if victim_key in self.cache:
+            self._evict_key(victim_key)
+        else:
+            # Policy drifted from storage; drop the stale key and keep going
+            self.eviction_policy.remove(victim_key)
         return True
 
-    def _should_compress(self, value: Any) -> bool:
-        """Determine if value should be compressed"""
-        if isinstance(value, (dict, list)):
-            return len(json.dumps(value)) > 1024  # Compress if > 1KB
-        elif isinstance(value, str):
-            return len(value) > 1024
-        return False
-
-    def _calculate_size(self, value: Any) -> int:
-        """Calculate approximate size of value"""
-        try:
-            if isinstance(value, bytes):
-                return len(value)
-            elif isinstance(value, str):
-                return len(value.encode("utf-8"))
-            elif isinstance(value, (dict, list)):
-                return len(json.dumps(value).encode("utf-8"))
-            else:
-                return len(str(value).encode("utf-8"))
-        except:
-            return 1024  # Default estimate
-
     def _update_access_time(self, access_time: float):
         """Update average access time"""
         total_operations = self.metrics.hits + self.metrics.misses
@@ -306,15 +290,158 @@ class InMemoryCache:
             "avg_access_time_ms": self.metrics.avg_access_time * 1000,
             "max_size": self.max_size,
             "max_memory_mb": self.max_memory_bytes / (1024 * 1024),
+            "eviction_strategy": self.eviction_policy.name,
+        }
+
+
+class ShardedInMemoryCache:
+    """Lock-striped in-memory cache split into independent shards
+
+    Each shard is an InMemoryCache with its own eviction state, memory budget
+    and lock, so the asyncio loop and worker threads only contend when they
+    touch keys that hash to the same shard.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10000,
+        max_memory_mb: int = 512,
+        num_shards: Optional[int] = None,
+        strategy: CacheStrategy = CacheStrategy.LRU,
+        codec: Optional[CacheCodec] = None,
+    ):
+        if num_shards is None:
+            num_shards = min(64, max(4, (os.cpu_count() or 1) * 2))
+        self.num_shards = max(1, num_shards)
+        self.max_size = max_size
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024
+        self.strategy = strategy
+
+        shard_size = max(1, -(-max_size // self.num_shards))
+        shard_memory_mb = max_memory_mb / self.num_shards
+        self.shards: List[InMemoryCache] = [
+            InMemoryCache(
+                max_size=shard_size,
+                max_memory_mb=shard_memory_mb,
+                strategy=strategy,
+                codec=codec,
+            )
+            for _ in range(self.num_shards)
+        ]
+        self._locks = [threading.Lock() for _ in range(self.num_shards)]
+
+    def _shard_index(self, key: str) -> int:
+        """Map key to its shard"""
+        return hash(key) % self.num_shards
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get value from the owning shard"""
+        index = self._shard_index(key)
+        with self._locks[index]:
+            return self.shards[index].get(key)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        compress: bool = False,
+        encoded: Optional[EncodedValue] = None,
+    ) -> bool:
+        """Set value in the owning shard"""
+        index = self._shard_index(key)
+        with self._locks[index]:
+            return self.shards[index].set(key, value, ttl, compress, encoded)
+
+    def delete(self, key: str) -> bool:
+        """Delete key from the owning shard"""
+        index = self._shard_index(key)
+        with self._locks[index]:
+            return self.shards[index].delete(key)
+
+    def clear(self):
+        """Clear all shards"""
+        for lock, shard in zip(self._locks, self.shards):
+            with lock:
+                shard.clear()
+
+    def __contains__(self, key: str) -> bool:
+        index = self._shard_index(key)
+        with self._locks[index]:
+            return key in self.shards[index].cache
+
+    def __len__(self) -> int:
+        return sum(len(shard.cache) for shard in self.shards)
+
+    @property
+    def current_memory(self) -> int:
+        """Total bytes accounted across shards"""
+        return sum(shard.current_memory for shard in self.shards)
+
+    def get_shard_stats(self) -> List[Dict[str, Any]]:
+        """Get per-shard statistics"""
+        shard_stats = []
+        for index, (lock, shard) in enumerate(zip(self._locks, self.shards)):
+            with lock:
+                stats = shard.get_stats()
+            stats["shard"] = index
+            shard_stats.append(stats)
+        return shard_stats
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get aggregate cache statistics with a per-shard breakdown"""
+        shard_stats = self.get_shard_stats()
+        hits = sum(stats["hits"] for stats in shard_stats)
+        misses = sum(stats["misses"] for stats in shard_stats)
+        total_operations = hits + misses
+        current_memory = self.current_memory
+        avg_access_time_ms = (
+            sum(
+                stats["avg_access_time_ms"] * (stats["hits"] + stats["misses"])
+                for stats in shard_stats
+            )
+            / total_operations
+            if total_operations > 0
+            else 0.0
+        )
+        entries = [stats["total_entries"] for stats in shard_stats]
+
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": (hits / total_operations * 100) if total_operations > 0 else 0,
+            "evictions": sum(stats["evictions"] for stats in shard_stats),
+            "writes": sum(stats["writes"] for stats in shard_stats),
+            "errors": sum(stats["errors"] for stats in shard_stats),
+            "total_entries": sum(entries),
+            "memory_usage_mb": current_memory / (1024 * 1024),
+            "memory_usage_percent": (current_memory / self.max_memory_bytes) * 100
+            if self.max_memory_bytes
+            else 0,
+            "avg_access_time_ms": avg_access_time_ms,
+            "max_size": self.max_size,
+            "max_memory_mb": self.max_memory_bytes / (1024 * 1024),
+            "eviction_strategy": self.shards[0].eviction_policy.name,
+            "num_shards": self.num_shards,
+            "shard_imbalance": (max(entries) / (sum(entries) / len(entries)))
+            if sum(entries) > 0
+            else 1.0,
+            "shards": shard_stats,
         }
 
 
 class RedisCache:
     """Redis-based distributed cache"""
 
-    def __init__(self, redis_url: str, key_prefix: str = "a1betting"):
+    def __init__(
+        self,
+        redis_url: str,
+        key_prefix: str = "a1betting",
+        codec: Optional[CacheCodec] = None,
+    ):
         self.redis_url = redis_url
         self.key_prefix = key_prefix
+        self.codec = codec or default_codec
         self.redis_client: Optional[redis.Redis] = None
         self.metrics = CacheMetrics()
 
@@ -352,7 +479,7 @@ class RedisCache:
             if data:
                 try:
                     # Try to deserialize
-                    value = pickle.loads(data)
+                    value = self.codec.decode(data)
                     self.metrics.hits += 1
                     self._update_access_time(time.time() - start_time)
                     return value
@@ -371,7 +498,13 @@ class RedisCache:
             logger.error("Redis cache get error for key {key}: {e!s}")
             return None
 
-    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> bool:
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[int] = None,
+        encoded: Optional[EncodedValue] = None,
+    ) -> bool:
         """Set value in Redis cache"""
         try:
             if not self.redis_client:
@@ -379,9 +512,9 @@ class RedisCache:
 
             redis_key = self._make_key(key)
 
-            # Serialize value
+            # Serialize value (once; callers may pass pre-encoded bytes)
             try:
-                data = pickle.dumps(value)
+                data = (encoded or self.codec.encode(value)).payload
             except Exception as e:  # pylint: disable=broad-exception-caught
                 logger.error("Failed to serialize value for key {key}: {e!s}")
                 self.metrics.errors += 1
@@ -482,12 +615,28 @@ class RedisCache:
 class MultiTierCache:
     """Multi-tier cache system with automatic promotion/demotion"""
 
-    def __init__(self):
-        self.l1_cache = InMemoryCache(max_size=5000, max_memory_mb=256)
-        self.l2_cache = RedisCache(config_manager.get_redis_url())
+    def __init__(
+        self, l1_shards: Optional[int] = None, codec: Optional[CacheCodec] = None
+    ):
+        self.codec = codec or default_codec
+        self.l1_cache = ShardedInMemoryCache(
+            max_size=5000, max_memory_mb=256, num_shards=l1_shards, codec=self.codec
+        )
+        self.l2_cache = RedisCache(config_manager.get_redis_url(), codec=self.codec)
         self.access_patterns = defaultdict(int)
         self.promotion_threshold = 5  # Access count for L2->L1 promotion
         self.demotion_threshold = 100  # Age in seconds for L1->L2 demotion
+        # Single-flight state: one compute task per missing/stale key
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._fresh_until: Dict[str, Tuple[float, float]] = {}
+        self._fresh_prune_at = 1024
+        self.flight_stats = {
+            "computations": 0,
+            "coalesced_requests": 0,
+            "stale_served": 0,
+            "compute_failures": 0,  # Misses with nothing stale to serve
+            "refresh_failures": 0,  # Background refreshes of a stale value
+        }
 
     async def initialize(self):
         """Initialize all cache layers"""
@@ -526,24 +675,135 @@ class MultiTierCache:
         """Set value in appropriate cache tier"""
         success = False
 
+        # Serialize once; the bytes size L1 entries and are compressed only for Redis
+        try:
+            encoded = self.codec.encode(value, compress=False)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"Failed to encode value for key {key}: {e!s}")
+            return False
+
         # If tier specified, use only that tier
         if tier == CacheLayer.L1_MEMORY:
-            success = self.l1_cache.set(key, value, ttl)
+            success = self.l1_cache.set(key, value, ttl, encoded=encoded)
         elif tier == CacheLayer.L2_REDIS:
-            success = await self.l2_cache.set(key, value, ttl)
+            success = await self.l2_cache.set(
+                key, value, ttl, encoded=self.codec.compress_encoded(encoded)
+            )
         else:
             # Auto-select tier based on value characteristics
-            value_size = self._estimate_size(value)
-
-            if value_size < 10240:  # < 10KB, use L1
-                success = self.l1_cache.set(key, value, ttl)
+            if encoded.raw_size < 10240:  # < 10KB, use L1
+                success = self.l1_cache.set(key, value, ttl, encoded=encoded)
                 if not success:  # L1 full, fallback to L2
-                    success = await self.l2_cache.set(key, value, ttl)
+                    success = await self.l2_cache.set(
+                        key, value, ttl, encoded=self.codec.compress_encoded(encoded)
+                    )
             else:  # Large values go to L2
-                success = await self.l2_cache.set(key, value, ttl)
+                success = await self.l2_cache.set(
+                    key, value, ttl, encoded=self.codec.compress_encoded(encoded)
+                )
 
         return success
 
+    async def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        tier: Optional[CacheLayer] = None,
+        stale_ttl: int = 0,
+    ) -> Any:
+        """Get value or compute it once for all concurrent callers
+
+        Concurrent misses for the same key await a single compute task instead
+        of each recomputing. With ``stale_ttl`` the value is kept for that many
+        seconds past ``ttl`` and an expired value is served immediately while
+        one background task refreshes it (stale-while-revalidate).
+        """
+        value = await self.get(key)
+        if value is not None:
+            deadlines = self._fresh_until.get(key)
+            if deadlines is not None and time.time() > deadlines[0]:
+                self.flight_stats["stale_served"] += 1
+                self._start_flight(key, compute, ttl, tier, stale_ttl, refresh=True)
+            return value
+
+        return await asyncio.shield(
+            self._start_flight(key, compute, ttl, tier, stale_ttl)
+        )
+
+    def _start_flight(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int],
+        tier: Optional[CacheLayer],
+        stale_ttl: int,
+        refresh: bool = False,
+    ) -> asyncio.Task:
+        """Join the in-flight computation for key or start a new one"""
+        task = self._inflight.get(key)
+        if task is not None:
+            self.flight_stats["coalesced_requests"] += 1
+            return task
+
+        # Running compute in its own task means a cancelled caller does not
+        # cancel the computation the other waiters depend on
+        task = asyncio.ensure_future(
+            self._compute_and_store(key, compute, ttl, tier, stale_ttl)
+        )
+        self._inflight[key] = task
+        task.add_done_callback(
+            lambda done, k=key: self._finish_flight(k, done, refresh)
+        )
+        return task
+
+    async def _compute_and_store(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: Optional[int],
+        tier: Optional[CacheLayer],
+        stale_ttl: int,
+    ) -> Any:
+        """Compute value and write it through the cache tiers"""
+        self.flight_stats["computations"] += 1
+        value = await compute()
+        if value is not None:
+            storage_ttl = ttl + stale_ttl if ttl and stale_ttl else ttl
+            await self.set(key, value, ttl=storage_ttl, tier=tier)
+            if ttl and stale_ttl:
+                now = time.time()
+                self._fresh_until[key] = (now + ttl, now + storage_ttl)
+                if len(self._fresh_until) >= self._fresh_prune_at:
+                    self._prune_fresh_index(now)
+            else:
+                self._fresh_until.pop(key, None)
+        return value
+
+    def _prune_fresh_index(self, now: float):
+        """Drop freshness deadlines for keys whose stale window has passed"""
+        self._fresh_until = {
+            key: deadlines
+            for key, deadlines in self._fresh_until.items()
+            if deadlines[1] > now
+        }
+        self._fresh_prune_at = max(1024, len(self._fresh_until) * 2)
+
+    def _finish_flight(self, key: str, task: asyncio.Task, refresh: bool):
+        """Clear in-flight marker and count failed computes and refreshes apart"""
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is not None:
+            if refresh:
+                self.flight_stats["refresh_failures"] += 1
+                logger.warning(f"Cache refresh failed for key {key}: {error!s}")
+            else:
+                self.flight_stats["compute_failures"] += 1
+                logger.warning(f"Cache computation failed for key {key}: {error!s}")
+
     async def delete(self, key: str) -> bool:
         """Delete key from all cache tiers"""
         l1_result = self.l1_cache.delete(key)
@@ -551,6 +811,7 @@ class MultiTierCache:
 
         if key in self.access_patterns:
             del self.access_patterns[key]
+        self._fresh_until.pop(key, None)
 
         return l1_result or l2_result
 
@@ -559,20 +820,7 @@ class MultiTierCache:
         self.l1_cache.clear()
         await self.l2_cache.clear(pattern)
         self.access_patterns.clear()
-
-    def _estimate_size(self, value: Any) -> int:
-        """Estimate size of value"""
-        try:
-            if isinstance(value, bytes):
-                return len(value)
-            elif isinstance(value, str):
-                return len(value.encode("utf-8"))
-            elif isinstance(value, (dict, list)):
-                return len(json.dumps(value).encode("utf-8"))
-            else:
-                return len(str(value).encode("utf-8"))
-        except:
-            return 1024  # Default estimate
+        self._fresh_until.clear()
 
     async def get_comprehensive_stats(self) -> Dict[str, Any]:
         """Get statistics from all cache tiers"""
@@ -592,6 +840,10 @@ class MultiTierCache:
                 ),
                 "access_patterns_tracked": len(self.access_patterns),
             },
+            "single_flight": {
+                **self.flight_stats,
+                "inflight_keys": len(self._inflight),
+            },
             "l1_memory": l1_stats,
             "l2_redis": l2_stats,
             "access_distribution": {
@@ -666,8 +918,14 @@ def cached(
     ttl: int = 3600,
     key_generator: Optional[Callable] = None,
     tier: Optional[CacheLayer] = None,
+    single_flight: bool = True,
+    stale_ttl: int = 0,
 ):
-    """Decorator for caching function results"""
+    """Decorator for caching function results
+
+    With ``single_flight`` concurrent misses for the same key share one call
+    of the wrapped function; ``stale_ttl`` enables stale-while-revalidate.
+    """
 
     def decorator(func: Callable):
         @wraps(func)
@@ -682,6 +940,15 @@ def cached(
                 key_parts.extend([f"{k}={v}" for k, v in sorted(kwargs.items())])
                 cache_key = hashlib.md5(":".join(key_parts).encode()).hexdigest()
 
+            if single_flight:
+                return await ultra_cache_optimizer.cache.get_or_compute(
+                    cache_key,
+                    lambda: func(*args, **kwargs),
+                    ttl=ttl,
+                    tier=tier,
+                    stale_ttl=stale_ttl,
+                )
+
             # Try to get from cache
             cached_result = await ultra_cache_optimizer.cache.get(cache_key)
             if cached_result is not None:
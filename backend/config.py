@@ -59,6 +59,18 @@ class BackendConfig(BaseSettings):
         "random_forest": 0.2,
         "neural_net": 0.2,
     }
+    # Model residency
+    model_memory_budget_mb: float = 2048.0  # private bytes of resident models
+    model_mmap: bool = True  # memory-map model arrays so workers share pages
+    model_preload_count: int = 4  # models warmed at startup, best first
+    # Shared model host: when set, API workers send inference to the
+    # process started with `python model_host.py` instead of loading models
+    model_host_socket: Optional[str] = None
+    model_host_batch_window_ms: float = 2.0  # how long host batches stay open
+    # Real-time prediction trigger batching
+    prediction_batch_window_ms: float = 5.0  # how long a batch stays open
+    prediction_batch_size: int = 256  # triggers per batched inference
+    prediction_batch_max_pending: int = 4096  # queued events before backpressure
     # Local LLM Settings (Ollama or LM Studio)
     llm_provider: str = "ollama"  # 'ollama' or 'lmstudio'
     llm_endpoint: str = "http://127.0.0.1:11434"  # Ollama default
@@ -0,0 +1,140 @@
+"""CPU-bound Background Tasks
+Module-level task functions that TaskWorker runs in its process pool. They
+are referenced by importable name, so they must not close over worker state.
+"""
+
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    """Import heavy libraries once per worker process, before any memory cap"""
+    import sklearn.ensemble  # noqa: F401
+
+
+def model_training_task(model_name: str, training_data: Dict[str, Any], **kwargs):
+    """Model training task
+
+    Fits a random forest when training_data carries "features" and "targets"
+    arrays; otherwise simulates training for training_duration seconds.
+    """
+    logger.info(f"Executing model training task for {model_name}")
+
+    try:
+        features = training_data.get("features")
+        targets = training_data.get("targets")
+        if features is None or targets is None:
+            # Simulate model training
+            time.sleep(kwargs.get("training_duration", 10))  # Simulate training time
+            return {
+                "status": "success",
+                "model_name": model_name,
+                "training_samples": training_data.get("sample_count", 0),
+                "accuracy": 0.85 + (hash(model_name) % 100) / 1000,  # Mock accuracy
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
+
+        from sklearn.ensemble import RandomForestRegressor
+
+        features = np.asarray(features)
+        targets = np.asarray(targets)
+        split = int(len(features) * (1 - kwargs.get("validation_split", 0.2)))
+        model = RandomForestRegressor(
+            n_estimators=kwargs.get("n_estimators", 100),
+            max_depth=kwargs.get("max_depth"),
+            random_state=kwargs.get("random_state", 42),
+            n_jobs=1,  # The pool provides the parallelism
+        )
+        model.fit(features[:split], targets[:split])
+        score = (
+            float(model.score(features[split:], targets[split:]))
+            if split < len(features)
+            else float(model.score(features, targets))
+        )
+
+        if kwargs.get("model_path"):
+            import joblib
+
+            joblib.dump(model, kwargs["model_path"])
+
+        return {
+            "status": "success",
+            "model_name": model_name,
+            "training_samples": split,
+            "accuracy": score,
+            "model_path": kwargs.get("model_path"),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+    except MemoryError:
+        raise  # Let the pool report the memory cap
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error(f"Model training task failed: {e!s}")
+        return {"status": "failed", "error": str(e)}
+
+
+def performance_analysis_task(analysis_type: str, **kwargs):
+    """Performance analysis task"""
+    logger.info(f"Executing performance analysis task: {analysis_type}")
+
+    try:
+        returns = kwargs.get("returns")
+        if returns is None:
+            # Simulate performance analysis
+            time.sleep(kwargs.get("analysis_duration", 5))
+            return {
+                "status": "success",
+                "analysis_type": analysis_type,
+                "metrics_computed": kwargs.get("metrics_count", 10),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
+
+        returns = np.asarray(returns, dtype=float)
+        equity = np.cumprod(1 + returns, axis=-1)
+        drawdown = 1 - equity / np.maximum.accumulate(equity, axis=-1)
+        std = returns.std(axis=-1)
+        sharpe = np.divide(
+            returns.mean(axis=-1), std, out=np.zeros_like(std), where=std > 0
+        )
+        return {
+            "status": "success",
+            "analysis_type": analysis_type,
+            "metrics_computed": 3,
+            "total_return": (equity[..., -1] - 1).tolist(),
+            "max_drawdown": drawdown.max(axis=-1).tolist(),
+            "sharpe_ratio": sharpe.tolist(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+    except MemoryError:
+        raise
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error(f"Performance analysis task failed: {e!s}")
+        return {"status": "failed", "error": str(e)}
+
+
+def analytics_computation_task(metrics: List[str], **kwargs):
+    """Analytics computation task"""
+    logger.info(f"Executing analytics computation task for {len(metrics)} metrics")
+
+    try:
+        # Simulate analytics computation
+        computation_time = len(metrics) * kwargs.get("time_per_metric", 1)
+        time.sleep(computation_time)
+
+        return {
+            "status": "success",
+            "metrics_computed": len(metrics),
+            "computation_time": computation_time,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+
+    except Exception as e:  # pylint: disable=broad-exception-caught
+        logger.error(f"Analytics computation task failed: {e!s}")
+        return {"status": "failed", "error": str(e)}
@@ -0,0 +1,192 @@
+"""Cron and Interval Schedules
+Parses cron expressions (5 fields, or 6 with a leading seconds field), the
+usual @macros and "@every <n>s|m|h|d" intervals, and computes next fire times
+directly instead of scanning minute by minute. All times are UTC epochs.
+"""
+
+import bisect
+import re
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Sequence, Union
+
+MACROS = {
+    "@yearly": "0 0 1 1 *",
+    "@annually": "0 0 1 1 *",
+    "@monthly": "0 0 1 * *",
+    "@weekly": "0 0 * * 0",
+    "@daily": "0 0 * * *",
+    "@midnight": "0 0 * * *",
+    "@hourly": "0 * * * *",
+}
+
+MONTH_NAMES = {
+    name: index
+    for index, name in enumerate(
+        ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"],
+        start=1,
+    )
+}
+DAY_NAMES = {
+    name: index
+    for index, name in enumerate(["sun", "mon", "tue", "wed", "thu", "fri", "sat"])
+}
+INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Give up if no fire time exists within this many years (e.g. "0 0 30 2 *")
+MAX_YEARS_AHEAD = 8
+
+
+def _parse_field(field: str, low: int, high: int, names: Optional[dict] = None) -> List[int]:
+    """Expand one cron field into its sorted allowed values"""
+    values = set()
+    for part in field.lower().split(","):
+        if names:
+            for name, number in names.items():
+                part = part.replace(name, str(number))
+
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step <= 0:
+                raise ValueError(f"Invalid step in cron field '{field}'")
+
+        if part in ("*", "?"):
+            start, end = low, high
+        elif "-" in part:
+            start_text, end_text = part.split("-", 1)
+            start, end = int(start_text), int(end_text)
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+
+        if start < low or end > high or start > end:
+            raise ValueError(f"Cron field '{field}' out of range {low}-{high}")
+        values.update(range(start, end + 1, step))
+    return sorted(values)
+
+
+class CronSchedule:
+    """Cron expression with seconds precision
+
+    Day-of-month and day-of-week follow Vixie cron: when both are
+    restricted, a day matches if either does.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        text = MACROS.get(expression.strip().lower(), expression)
+        fields = text.split()
+        if len(fields) == 5:
+            fields = ["0"] + fields
+        if len(fields) != 6:
+            raise ValueError(f"Cron expression needs 5 or 6 fields: '{expression}'")
+
+        self.seconds = _parse_field(fields[0], 0, 59)
+        self.minutes = _parse_field(fields[1], 0, 59)
+        self.hours = _parse_field(fields[2], 0, 23)
+        self.days = _parse_field(fields[3], 1, 31)
+        self.months = _parse_field(fields[4], 1, 12, MONTH_NAMES)
+        weekdays = _parse_field(fields[5], 0, 7, DAY_NAMES)
+        self.weekdays = sorted({day % 7 for day in weekdays})  # 7 is Sunday too
+        self.days_restricted = self._restricts(fields[3], self.days, 31)
+        self.weekdays_restricted = self._restricts(fields[5], self.weekdays, 7)
+
+    def __repr__(self) -> str:
+        return f"CronSchedule({self.expression!r})"
+
+    @staticmethod
+    def _restricts(field: str, values: List[int], size: int) -> bool:
+        """Whether a day field restricts days; a "*" prefix ("*/2") never does, as in Vixie cron"""
+        return not field.startswith(("*", "?")) and len(values) < size
+
+    def next_after(self, timestamp: float) -> float:
+        """First fire time strictly after timestamp"""
+        moment = datetime.fromtimestamp(int(timestamp) + 1, tz=timezone.utc)
+        limit_year = moment.year + MAX_YEARS_AHEAD
+
+        while moment.year <= limit_year:
+            if moment.month not in self.months:
+                moment = self._next_month(moment)
+                continue
+            if not self._day_matches(moment):
+                moment = self._start_of_day(moment) + timedelta(days=1)
+                continue
+
+            hour = self._next_value(self.hours, moment.hour)
+            if hour is None:
+                moment = self._start_of_day(moment) + timedelta(days=1)
+                continue
+            if hour != moment.hour:
+                moment = moment.replace(hour=hour, minute=0, second=0)
+
+            minute = self._next_value(self.minutes, moment.minute)
+            if minute is None:
+                moment = moment.replace(minute=0, second=0) + timedelta(hours=1)
+                continue
+            if minute != moment.minute:
+                moment = moment.replace(minute=minute, second=0)
+
+            second = self._next_value(self.seconds, moment.second)
+            if second is None:
+                moment = moment.replace(second=0) + timedelta(minutes=1)
+                continue
+            return moment.replace(second=second).timestamp()
+
+        raise ValueError(f"Cron expression never fires: '{self.expression}'")
+
+    def _day_matches(self, moment: datetime) -> bool:
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self.days_restricted and self.weekdays_restricted:
+            return day_ok or weekday_ok
+        return day_ok and weekday_ok
+
+    def _next_month(self, moment: datetime) -> datetime:
+        month = self._next_value(self.months, moment.month + 1) if moment.month < 12 else None
+        if month is None:
+            return datetime(moment.year + 1, self.months[0], 1, tzinfo=timezone.utc)
+        return datetime(moment.year, month, 1, tzinfo=timezone.utc)
+
+    @staticmethod
+    def _start_of_day(moment: datetime) -> datetime:
+        return moment.replace(hour=0, minute=0, second=0)
+
+    @staticmethod
+    def _next_value(allowed: Sequence[int], current: int) -> Optional[int]:
+        index = bisect.bisect_left(allowed, current)
+        return allowed[index] if index < len(allowed) else None
+
+
+class IntervalSchedule:
+    """Fixed interval anchored to the epoch, so every replica agrees on fire times"""
+
+    def __init__(self, seconds: float, expression: Optional[str] = None):
+        if seconds <= 0:
+            raise ValueError("Interval must be positive")
+        self.seconds = seconds
+        self.expression = expression or f"@every {seconds}s"
+
+    def __repr__(self) -> str:
+        return f"IntervalSchedule({self.seconds!r})"
+
+    def next_after(self, timestamp: float) -> float:
+        """First fire time strictly after timestamp"""
+        return (timestamp // self.seconds + 1) * self.seconds
+
+
+Schedule = Union[CronSchedule, IntervalSchedule]
+
+_EVERY = re.compile(r"^@every\s+(\d+(?:\.\d+)?)\s*([smhd]?)$", re.IGNORECASE)
+
+
+def parse_schedule(expression: str) -> Schedule:
+    """Parse a cron expression, @macro or "@every <n>s|m|h|d" interval"""
+    match = _EVERY.match(expression.strip())
+    if match:
+        amount, unit = match.groups()
+        return IntervalSchedule(
+            float(amount) * INTERVAL_UNITS[(unit or "s").lower()], expression
+        )
+    return CronSchedule(expression)
+
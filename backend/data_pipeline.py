@@ -275,9 +275,11 @@ class DataPipeline:
             "requests_successful": 0,
             "requests_failed": 0,
             "cache_hits": 0,
+            "coalesced_requests": 0,
             "average_latency": 0.0,
         }
         self.data_callbacks: Dict[DataSourceType, List[Callable]] = {}
+        self._inflight_requests: Dict[str, asyncio.Task] = {}
         self._initialize_connectors()
 
     def _initialize_connectors(self):
@@ -336,6 +338,23 @@ class DataPipeline:
                 cache_hit=True,
             )
 
+        # Identical requests already in flight share one upstream call
+        inflight = self._inflight_requests.get(cache_key)
+        if inflight is not None:
+            self.pipeline_stats["coalesced_requests"] += 1
+            return await asyncio.shield(inflight)
+
+        task = asyncio.ensure_future(self._fetch_from_source(request, cache_key))
+        self._inflight_requests[cache_key] = task
+        task.add_done_callback(
+            lambda done, key=cache_key: self._inflight_requests.pop(key, None)
+        )
+        return await asyncio.shield(task)
+
+    async def _fetch_from_source(
+        self, request: DataRequest, cache_key: str
+    ) -> DataResponse:
+        """Fetch data from the connector and update cache and stats"""
         # Get connector
         connector = self.connectors.get(request.source)
         if not connector:
@@ -4,7 +4,6 @@ Intelligent model selection, dynamic weighting, and meta-learning for optimal pr
 
 import asyncio
 import logging
-import math
 import os
 import time
 from collections import defaultdict, deque
@@ -15,20 +14,18 @@ from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple
 
-import joblib
 import numpy as np
-from cachetools import TTLCache
+import redis.asyncio as aioredis
 from config import config_manager
 from database import db_manager
 from feature_engineering import FeatureEngineering
-from prometheus_client import Counter, Histogram
+from feature_layout import FeatureLayoutRegistry
+from model_residency import ModelResidency
+from model_selection import ModelSelectionIndex
+from prediction_cache import PredictionCache, fingerprint, prediction_cache_key
+from prometheus_client import Counter, Gauge, Histogram
 from sklearn.ensemble import RandomForestRegressor
-from utils.prediction_utils import (
-    calculate_confidence,
-    calculate_uncertainty,
-    feature_compatibility,
-    model_correlation,
-)
+from utils.prediction_utils import calculate_confidence, calculate_uncertainty
 
 logger = logging.getLogger(__name__)
 
@@ -50,13 +47,22 @@ prediction_latency = Histogram(
 cache_hit_counter = Counter(
     "ensemble_prediction_cache_hits_total",
     "Cache hits for ensemble predictions",
-    ["context"],
+    ["context", "tier"],
 )
 cache_miss_counter = Counter(
     "ensemble_prediction_cache_misses_total",
     "Cache misses for ensemble predictions",
     ["context"],
 )
+resident_model_bytes = Gauge(
+    "ensemble_resident_model_bytes",
+    "Bytes held by resident models (private heap or shared file mappings)",
+    ["kind"],
+)
+model_eviction_counter = Counter(
+    "ensemble_model_evictions_total",
+    "Models unloaded to stay within the memory budget",
+)
 
 
 class ModelType(str, Enum):
@@ -72,6 +78,7 @@ class ModelType(str, Enum):
     PROPHET = "prophet"
     ARIMA = "arima"
     LSTM = "lstm"
+    ENSEMBLE = "ensemble"  # Combined output of the models above
 
 
 class PredictionContext(str, Enum):
@@ -162,8 +169,16 @@ class ModelRegistry:
         self.model_lineage: Dict[str, List[str]] = {}
         # dynamically size executor based on CPU cores
         self.executor = ThreadPoolExecutor(max_workers=(os.cpu_count() or 1) * 2)
-        # cache for loaded models to avoid repeated disk I/O
-        self._model_cache: Dict[str, Any] = {}
+        # loaded models, memory-mapped where possible and bounded by a byte budget
+        self.residency = ModelResidency(
+            budget_bytes=int(config_manager.config.model_memory_budget_mb * 1024**2),
+            mmap_mode="r" if config_manager.config.model_mmap else None,
+        )
+        self._reported_evictions = 0
+        # digest of the registered model set, reset on registration
+        self._model_set_version: Optional[str] = None
+        # selection score components and CV correlations, kept current per model
+        self.selection_index = ModelSelectionIndex()
         # schedule periodic hyperparameter tuning
         try:
             loop = asyncio.get_event_loop()
@@ -197,11 +212,13 @@ class ModelRegistry:
                 "hyperparameters": metadata.get("hyperparameters", {}),
                 "cross_validation_scores": metadata.get("cv_scores", []),
                 "feature_names": metadata.get("feature_names", []),
+                "feature_defaults": metadata.get("feature_defaults", {}),
                 "is_active": True,
                 "deployment_stage": metadata.get("stage", "development"),
             }
 
             self.models[model_name] = model_info
+            self._model_set_version = None
 
             # Initialize metrics
             self.model_metrics[model_name] = ModelMetrics(
@@ -226,6 +243,7 @@ class ModelRegistry:
                 model_confidence=0.0,
                 last_updated=datetime.now(timezone.utc),
             )
+            self._index_model(model_name)
 
             logger.info("Registered model {model_name} with type {model_type}")
 
@@ -234,12 +252,11 @@ class ModelRegistry:
             raise
 
     async def load_model(self, model_name: str) -> Any:
-        """Load model with caching and error handling"""
+        """Return a resident model, loading it on first use or after eviction"""
         try:
-            # Instrument and return cached model if already loaded
-            if model_name in self._model_cache:
-                model_load_counter.labels(model_name=model_name).inc()
-                return self._model_cache[model_name]
+            model = self.residency.get(model_name)
+            if model is not None:
+                return model
 
             if model_name not in self.models:
                 raise ValueError(f"Model {model_name} not registered")
@@ -250,25 +267,32 @@ class ModelRegistry:
             if not model_path.exists():
                 raise FileNotFoundError(f"Model file not found: {model_path}")
 
-            # Load model based on type
-            # Increment load counter and measure latency
+            # joblib maps arrays of uncompressed dumps; concurrent callers share one load
+            loads = self.residency.stats["loads"]
             with model_load_latency.labels(model_name=model_name).time():
+                model = await self.residency.load(model_name, str(model_path), self.executor)
+            if self.residency.stats["loads"] > loads:
                 model_load_counter.labels(model_name=model_name).inc()
-                loop = asyncio.get_event_loop()
-
-                # Use joblib for all model loading for safety
-                model = await loop.run_in_executor(
-                    self.executor, joblib.load, str(model_path)
-                )
-
-            # cache and return the loaded model
-            self._model_cache[model_name] = model
+            self._update_residency_metrics()
             return model
 
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Error loading model {model_name}: {e!s}")
             raise
 
+    def unload_model(self, model_name: str):
+        """Drop a model from memory; it reloads on next use"""
+        self.residency.discard(model_name)
+        self._update_residency_metrics()
+
+    def _update_residency_metrics(self):
+        resident_model_bytes.labels(kind="private").set(self.residency.resident_bytes)
+        resident_model_bytes.labels(kind="mapped").set(self.residency.mapped_bytes)
+        evictions = self.residency.stats["evictions"]
+        if evictions > self._reported_evictions:
+            model_eviction_counter.inc(evictions - self._reported_evictions)
+            self._reported_evictions = evictions
+
     async def _hyperparameter_tuning_loop(self):
         """Periodically run hyperparameter tuning for registered models"""
         interval = config_manager.get("hyperparameter_tuning_interval_hours", 24)
@@ -284,6 +308,43 @@ class ModelRegistry:
                 logger.error("Error in hyperparameter tuning loop: {e}")
                 await asyncio.sleep(3600)
 
+    def model_set_version(self) -> str:
+        """Digest of registered models and their versions, stable across processes"""
+        if self._model_set_version is None:
+            self._model_set_version = fingerprint(
+                sorted(
+                    (name, info["version"], info["path"], info["is_active"])
+                    for name, info in self.models.items()
+                )
+            )
+        return self._model_set_version
+
+    def _index_model(self, model_name: str):
+        info = self.models[model_name]
+        self.selection_index.upsert(
+            model_name,
+            **self._score_components(self.model_metrics[model_name]),
+            cv_scores=info["cross_validation_scores"],
+            feature_names=info["feature_names"],
+            active=info["is_active"],
+        )
+
+    @staticmethod
+    def _score_components(metrics: ModelMetrics) -> Dict[str, float]:
+        """Metric-derived parts of the selection score"""
+        return {
+            "performance": (
+                metrics.accuracy * 0.3
+                + metrics.r2_score * 0.2
+                + (1 - metrics.mse) * 0.2  # Normalized MSE
+                + metrics.consistency_score * 0.15
+                + metrics.robustness_score * 0.15
+            ),
+            # Lower uncertainty is better
+            "uncertainty": 1.0 - metrics.model_confidence,
+            "updated_at": metrics.last_updated.timestamp(),
+        }
+
     def get_active_models(self, model_type: Optional[ModelType] = None) -> List[str]:
         """Get list of active models, optionally filtered by type"""
         models = [
@@ -297,6 +358,7 @@ class ModelRegistry:
         """Update model performance metrics"""
         if model_name in self.model_metrics:
             self.model_metrics[model_name] = metrics
+            self.selection_index.update_metrics(model_name, **self._score_components(metrics))
 
             # Store in database for persistence
             async with db_manager.get_session() as session:
@@ -310,10 +372,6 @@ class IntelligentModelSelector:
     def __init__(self, model_registry: ModelRegistry):
         self.model_registry: ModelRegistry = model_registry
         self.selection_history: deque[dict[str, Any]] = deque(maxlen=1000)
-        self.context_performance: defaultdict[
-            PredictionContext, defaultdict[str, list[float]]
-        ] = defaultdict(lambda: defaultdict(list))
-        self.diversity_matrix: dict[tuple[str, str], float] = {}
 
     async def select_models(
         self,
@@ -321,32 +379,24 @@ class IntelligentModelSelector:
         features: Dict[str, float],
         ensemble_config: EnsembleConfiguration,
     ) -> List[str]:
-        """Select optimal models for given context and features"""
-        try:
-            available_models = self.model_registry.get_active_models()
-
-            if len(available_models) <= ensemble_config.min_models:
-                return available_models
-
-            # Score models based on multiple criteria
-            model_scores = {}
+        """Select optimal models for given context and features
 
-            for model_name in available_models:
-                score = await self._score_model(
-                    model_name, context, features, ensemble_config
-                )
-                model_scores[model_name] = score
-
-            # Apply selection strategy
-            selected_models = await self._apply_selection_strategy(
-                model_scores, ensemble_config
+        Scores are computed over every model at once from the registry's
+        selection index, and repeated selections for the same context and
+        feature schema are served from its memo.
+        """
+        try:
+            index = self.model_registry.selection_index
+            selection = index.select(
+                context,
+                tuple(features),
+                strategy=ensemble_config.weighting_strategy,
+                max_models=ensemble_config.max_models,
+                min_models=ensemble_config.min_models,
+                diversity_threshold=ensemble_config.diversity_threshold,
+                half_life_hours=ensemble_config.half_life_hours,
             )
-
-            # Ensure diversity
-            if len(selected_models) > 1:
-                selected_models = await self._ensure_diversity(
-                    selected_models, ensemble_config.diversity_threshold
-                )
+            selected_models = list(selection.models)
 
             # Log selection decision
             self.selection_history.append(
@@ -354,206 +404,43 @@ class IntelligentModelSelector:
                     "timestamp": datetime.now(timezone.utc),
                     "context": context,
                     "selected_models": selected_models,
-                    "scores": {model: model_scores[model] for model in selected_models},
+                    "scores": dict(zip(selection.models, selection.scores)),
                 }
             )
 
-            return selected_models[: ensemble_config.max_models]
+            return selected_models
 
         except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.error("Model selection failed: {e!s}")
+            logger.error(f"Model selection failed: {e!s}")
             # Fallback to top performing models
             return self._get_fallback_models(ensemble_config)
 
-    async def _score_model(
-        self,
-        model_name: str,
-        context: PredictionContext,
-        features: Dict[str, float],
-        config: EnsembleConfiguration,
-    ) -> float:
-        """Score a model based on multiple criteria"""
-        try:
-            metrics = self.model_registry.model_metrics[model_name]
-
-            # Base performance score
-            performance_score = (
-                metrics.accuracy * 0.3
-                + metrics.r2_score * 0.2
-                + (1 - metrics.mse) * 0.2  # Normalized MSE
-                + metrics.consistency_score * 0.15
-                + metrics.robustness_score * 0.15
-            )
-
-            # Context-specific performance
-            context_performance = (
-                np.mean(
-                    self.context_performance[context][model_name][
-                        -10:
-                    ]  # Last 10 predictions
-                )
-                if self.context_performance[context][model_name]
-                else 0.5
-            )
-
-            # Recent performance weight
-            recency_weight = self._calculate_recency_weight(
-                metrics.last_updated, config.half_life_hours
-            )
-
-            # Feature compatibility score
-            feature_compatibility = await self._calculate_feature_compatibility(
-                model_name, features
-            )
-
-            # Uncertainty score (lower uncertainty is better)
-            uncertainty_score = 1.0 - metrics.model_confidence
-
-            # Composite score
-            composite_score = (
-                performance_score * 0.4
-                + context_performance * 0.25
-                + feature_compatibility * 0.15
-                + recency_weight * 0.1
-                + uncertainty_score * 0.1
-            )
-
-            return composite_score
-
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.warning("Error scoring model {model_name}: {e!s}")
-            return 0.0
-
-    def _calculate_recency_weight(
-        self, last_updated: datetime, half_life_hours: float
-    ) -> float:
-        """Calculate weight based on how recently the model was updated"""
-        # Use timezone-aware UTC
-        age_hours = (datetime.now(timezone.utc) - last_updated).total_seconds() / 3600
-        return math.exp(-age_hours / half_life_hours)  # Exponential decay
-
-    async def _calculate_feature_compatibility(
-        self, model_name: str, features: Dict[str, float]
-    ) -> float:
-        """Delegate feature compatibility to shared util"""
+    def record_context_performance(
+        self, context: PredictionContext, model_name: str, score: float
+    ):
+        """Feed a model's outcome in a context into its rolling context score"""
+        self.model_registry.selection_index.record_context_score(context, model_name, score)
+
+    def predicted_models(self, context: PredictionContext, limit: int) -> List[str]:
+        """Models most often selected for a context recently, most frequent first"""
+        counts: Dict[str, int] = defaultdict(int)
+        for entry in list(self.selection_history)[-200:]:
+            if entry["context"] == context:
+                for model_name in entry["selected_models"]:
+                    counts[model_name] += 1
+        return sorted(counts, key=counts.get, reverse=True)[:limit]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Selection index size and memo hit rate"""
+        return self.model_registry.selection_index.get_stats()
+
+    def _get_fallback_models(self, config: EnsembleConfiguration) -> List[str]:
+        """Active models with the best mean CV score"""
         try:
-            expected = self.model_registry.models[model_name].get("feature_names", [])
-            provided = list(features.keys())
-            return feature_compatibility(expected, provided)
+            return self.model_registry.selection_index.top_by_cv(config.max_models)
         except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.warning("Feature compatibility failed: {e!s}")
-            return 0.5
-
-    async def _apply_selection_strategy(
-        self, model_scores: Dict[str, float], config: EnsembleConfiguration
-    ) -> List[str]:
-        """Apply the configured selection strategy"""
-        # stacking strategy: combine base scores with CV-based weights
-        if config.weighting_strategy == "stacking":
-            import numpy as np  # local import for stacking
-
-            # retrieve mean CV score or default
-            cv_means: dict[str, float] = {
-                m: float(
-                    np.mean(
-                        self.model_registry.models[m].get(
-                            "cross_validation_scores", [0.0]
-                        )
-                    )
-                )
-                for m in model_scores
-            }
-            # blend base score with cv mean equally
-            stacking_scores: dict[str, float] = {
-                m: model_scores[m] * 0.5 + cv_means.get(m, 0.0) * 0.5
-                for m in model_scores
-            }
-            selected: list[tuple[str, float]] = sorted(
-                stacking_scores.items(), key=lambda x: x[1], reverse=True
-            )
-            return [m for m, _ in selected[: config.max_models]]
-        # performance-only strategy
-        if config.weighting_strategy == "performance":
-            # Select top performers
-            sorted_models = sorted(
-                model_scores.items(), key=lambda x: x[1], reverse=True
-            )
-            return [model for model, score in sorted_models[: config.max_models]]
-
-        elif config.weighting_strategy == "dynamic":
-            # Dynamic selection based on recent performance trends
-            return await self._dynamic_selection(model_scores, config)
-
-        elif config.weighting_strategy == "bayesian":
-            # Bayesian model selection with uncertainty
-            return await self._bayesian_selection(model_scores, config)
-
-        else:
-            # Default: top performers
-            sorted_models = sorted(
-                model_scores.items(), key=lambda x: x[1], reverse=True
-            )
-            return [model for model, score in sorted_models[: config.max_models]]
-
-    async def _dynamic_selection(
-        self, model_scores: Dict[str, float], config: EnsembleConfiguration
-    ) -> List[str]:
-        """Dynamic model selection based on performance trends"""
-        # Implement trend analysis and adaptive selection
-        # For now, use performance-based selection
-        sorted_models: list[tuple[str, float]] = sorted(
-            model_scores.items(), key=lambda x: x[1], reverse=True
-        )
-        return [model for model, score in sorted_models[: config.max_models]]
-
-    async def _bayesian_selection(
-        self, model_scores: Dict[str, float], config: EnsembleConfiguration
-    ) -> List[str]:
-        """Bayesian model selection with uncertainty quantification"""
-        # Implement Bayesian selection
-        # For now, use performance-based selection
-        sorted_models = sorted(model_scores.items(), key=lambda x: x[1], reverse=True)
-        return [model for model, score in sorted_models[: config.max_models]]
-
-    async def _ensure_diversity(
-        self, selected_models: List[str], diversity_threshold: float
-    ) -> List[str]:
-        """Ensure model diversity to avoid correlation"""
-        if len(selected_models) <= 2:
-            return selected_models
-
-        # Calculate pairwise correlations (simplified)
-        diverse_models = [selected_models[0]]  # Start with best model
-
-        for model in selected_models[1:]:
-            is_diverse = True
-            for existing_model in diverse_models:
-                correlation = await self._calculate_model_correlation(
-                    model, existing_model
-                )
-                if correlation > (1 - diversity_threshold):
-                    is_diverse = False
-                    break
-
-            if is_diverse:
-                diverse_models.append(model)
-
-        return diverse_models
-
-    async def _calculate_model_correlation(self, model1: str, model2: str) -> float:
-        """Delegate model correlation to shared util"""
-        # Always create a tuple of exactly length 2 for the key
-        sorted_pair: tuple[str, str] = tuple(sorted((model1, model2)))  # type: ignore
-        if len(sorted_pair) != 2:
-            raise ValueError("Model correlation key must be a tuple of length 2")
-        key: tuple[str, str] = (sorted_pair[0], sorted_pair[1])
-        if key in self.diversity_matrix:
-            return self.diversity_matrix[key]
-        cv1 = self.model_registry.models[model1].get("cross_validation_scores", [])
-        cv2 = self.model_registry.models[model2].get("cross_validation_scores", [])
-        corr = model_correlation(cv1, cv2)
-        self.diversity_matrix[key] = corr
-        return corr
+            logger.error(f"Fallback model selection failed: {e!s}")
+            return self.model_registry.get_active_models()[: config.max_models]
 
 
 class DynamicWeightingEngine:
@@ -822,6 +709,11 @@ class MetaLearningEngine:
             return None
 
 
+def _predict_rows(model: Any, features: np.ndarray) -> np.ndarray:
+    """Run one model over a feature matrix (executor side)"""
+    return np.asarray(model.predict(features), dtype=float).reshape(-1)
+
+
 class UltraAdvancedEnsembleEngine:
     """Ultra-advanced ensemble engine with intelligent model selection and weighting"""
 
@@ -831,11 +723,22 @@ class UltraAdvancedEnsembleEngine:
         self.weighting_engine = DynamicWeightingEngine()
         self.meta_learner = MetaLearningEngine()
         self.feature_engineer = FeatureEngineering()
-        self.loaded_models: Dict[str, Any] = {}
+        self.redis_client = None
         self.prediction_cache = deque(maxlen=1000)
-        # TTL cache for ensemble predictions
-        ttl_seconds = config_manager.get("prediction_cache_ttl_seconds", 300)
-        self.prediction_result_cache = TTLCache(maxsize=1000, ttl=ttl_seconds)
+        # Selected models run side by side; sklearn releases the GIL in predict
+        self.inference_executor = ThreadPoolExecutor(
+            max_workers=os.cpu_count() or 1, thread_name_prefix="ensemble-inference"
+        )
+        # Feature order and defaults per model, compiled when the model loads
+        self.feature_layouts = FeatureLayoutRegistry()
+        # Background reload of models the selector keeps choosing
+        self._prefetch_task: Optional[asyncio.Task] = None
+        # Local TTL/LRU tier for ensemble predictions; shares Redis once initialized
+        self.prediction_result_cache = PredictionCache(
+            local_max_size=config_manager.get("prediction_cache_max_size", 1000),
+            ttl_seconds=config_manager.get("prediction_cache_ttl_seconds", 300),
+        )
+        self.cache_key_decimals = config_manager.get("prediction_cache_decimals", 6)
         # Limit concurrent predictions
         self._predict_semaphore = asyncio.Semaphore(
             config_manager.get("max_concurrent_predictions", 10)
@@ -867,13 +770,43 @@ class UltraAdvancedEnsembleEngine:
         )
 
     async def _get_or_load_model(self, model_name: str) -> Any:
-        """Helper to retrieve loaded model from cache or load it via registry"""
-        if model_name in self.loaded_models:
-            return self.loaded_models[model_name]
+        """Helper to retrieve a resident model or load it via the registry"""
         model = await self.model_registry.load_model(model_name)
-        self.loaded_models[model_name] = model
+        if model_name not in self.feature_layouts:
+            model_info = self.model_registry.models.get(model_name, {})
+            self.feature_layouts.register(
+                model_name, model_info.get("feature_names"), model_info.get("feature_defaults")
+            )
         return model
 
+    def _prefetch_models(self, context: PredictionContext, selected: List[str]):
+        """Reload, in the background, models this context keeps selecting
+
+        Only models whose last footprint fits in the free budget are loaded,
+        so prefetching never evicts a model to make room.
+        """
+        if self._prefetch_task is not None and not self._prefetch_task.done():
+            return
+        residency = self.model_registry.residency
+        wanted = [
+            name
+            for name in self.model_selector.predicted_models(
+                context, self.default_config.max_models
+            )
+            if name not in residency and name not in selected
+        ]
+        if wanted:
+            self._prefetch_task = asyncio.create_task(self._prefetch(wanted))
+
+    async def _prefetch(self, model_names: List[str]):
+        for model_name in model_names:
+            if not self.model_registry.residency.fits(model_name):
+                break
+            try:
+                await self._get_or_load_model(model_name)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.debug(f"Prefetch of {model_name} failed: {e!s}")
+
     async def initialize(self):
         """Initialize the ensemble engine"""
         try:
@@ -885,11 +818,12 @@ class UltraAdvancedEnsembleEngine:
             # Setup Redis cache if configured
             redis_url = getattr(config_manager.config, "redis_url", None)
             if redis_url:
-                self.redis_client = await aioredis.from_url(
+                self.redis_client = aioredis.from_url(
                     redis_url, encoding="utf-8", decode_responses=False
                 )
             else:
                 self.redis_client = None
+            self.prediction_result_cache.redis_client = self.redis_client
 
             # Start background tasks based on config toggles
             if self.rebalancing_enabled:
@@ -924,24 +858,26 @@ class UltraAdvancedEnsembleEngine:
                     # Feature preprocessing
                     engineered = self.feature_engineer.preprocess_features(features)
                     processed = engineered.get("features", features)
-                    # Cache lookup
-                    key = self._make_cache_key(processed, context, config)
-                    # Try Redis cache first
-                    if self.redis_client:
-                        cached = await self.redis_client.get(key)
-                        if cached:
-                            return pickle.loads(cached)
-                    # Fallback to local cache
-                    if self.cache_enabled and key in self.prediction_result_cache:
-                        return self.prediction_result_cache[key]
-                    if self.metrics_enabled:
-                        cache_miss_counter.labels(context=context.value).inc()
+                    # Cache lookup: local tier, then Redis shared across workers
+                    if self.cache_enabled:
+                        key = self._make_cache_key(processed, context, config)
+                        cached, tier = await self.prediction_result_cache.get(
+                            key, context.value
+                        )
+                        if self.metrics_enabled:
+                            if cached is None:
+                                cache_miss_counter.labels(context=context.value).inc()
+                            else:
+                                cache_hit_counter.labels(context=context.value, tier=tier).inc()
+                        if cached is not None:
+                            return cached
                     # Model selection
                     selected = await self.model_selector.select_models(
                         context, processed, config
                     )
                     if not selected:
                         raise ValueError("No models available for prediction")
+                    self._prefetch_models(context, selected)
                     # Individual predictions
                     outputs = await self._generate_model_predictions(
                         selected, processed, context
@@ -981,12 +917,8 @@ class UltraAdvancedEnsembleEngine:
                         timestamp=datetime.now(timezone.utc),
                     )
                     # Store in cache and history
-                    data = pickle.dumps(output)
-                    if self.redis_client:
-                        ttl = config_manager.get("prediction_cache_ttl_seconds", 300)
-                        await self.redis_client.set(key, data, ex=ttl)
                     if self.cache_enabled:
-                        self.prediction_result_cache[key] = output
+                        await self.prediction_result_cache.set(key, output)
                     self.prediction_cache.append(
                         {
                             "features": processed,
@@ -1006,6 +938,162 @@ class UltraAdvancedEnsembleEngine:
             logger.error("Ensemble prediction failed: {e}")
             raise
 
+    async def predict_batch(
+        self,
+        features_list: List[Dict[str, float]],
+        context: PredictionContext = PredictionContext.PRE_GAME,
+        ensemble_config: Optional[EnsembleConfiguration] = None,
+    ) -> List[PredictionOutput]:
+        """Generate ensemble predictions for many feature rows at once
+
+        Rows are stacked into one matrix, each selected model reads its
+        columns through a cached column map and all models run in parallel
+        on the inference pool. Weights, ensemble values and spreads are
+        computed for the whole batch at once. Results skip the per-row
+        prediction cache.
+        """
+        if not features_list:
+            return []
+        try:
+            async with self._predict_semaphore:
+                if self.metrics_enabled:
+                    prediction_counter.labels(context=context.value).inc(len(features_list))
+                with prediction_latency.labels(context=context.value).time():
+                    start_ts = time.time()
+                    config = ensemble_config or self.default_config
+                    engineered = [
+                        self.feature_engineer.preprocess_features(features)
+                        for features in features_list
+                    ]
+                    processed = [
+                        result.get("features", features)
+                        for result, features in zip(engineered, features_list)
+                    ]
+                    matrix, columns = self._batch_matrix(processed)
+                    # Select once against every feature name present in the batch
+                    batch_features = dict.fromkeys(columns or (), 0.0)
+                    selected = await self.model_selector.select_models(
+                        context, batch_features, config
+                    )
+                    if not selected:
+                        raise ValueError("No models available for prediction")
+                    self._prefetch_models(context, selected)
+
+                    model_names, values = await self._run_models_batch(
+                        selected, matrix, columns
+                    )
+                    if not model_names:
+                        raise ValueError("No model produced a prediction")
+
+                    recent = list(self.prediction_cache)[-50:]
+                    weights = await self.weighting_engine.calculate_weights(
+                        model_names, context, recent
+                    )
+                    weight_vector = np.array(
+                        [weights.get(name, 1.0) for name in model_names]
+                    )
+                    ensemble_values = weight_vector @ values
+                    stds = (
+                        values.std(axis=0)
+                        if len(model_names) > 1
+                        else np.zeros(values.shape[1])
+                    )
+
+                    elapsed = time.time() - start_ts
+                    timestamp = datetime.now(timezone.utc)
+                    return [
+                        PredictionOutput(
+                            model_name="ensemble",
+                            model_type=ModelType.ENSEMBLE,
+                            predicted_value=float(value),
+                            confidence_interval=(
+                                float(value - 1.96 * std),
+                                float(value + 1.96 * std),
+                            ),
+                            prediction_probability=0.0,
+                            feature_importance=result.get("feature_importance", {}),
+                            shap_values=result.get("shap_values", {}),
+                            uncertainty_metrics={"std_dev": float(std)},
+                            model_agreement=1 - float(std),
+                            prediction_context=context,
+                            metadata={
+                                "selected_models": model_names,
+                                "model_weights": weights,
+                                "ensemble_config": config.__dict__,
+                                "batch_size": len(features_list),
+                            },
+                            processing_time=elapsed,
+                            timestamp=timestamp,
+                        )
+                        for value, std, result in zip(ensemble_values, stds, engineered)
+                    ]
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"Batch ensemble prediction failed: {e!s}")
+            raise
+
+    @staticmethod
+    def _batch_matrix(
+        rows: List[Any],
+    ) -> Tuple[np.ndarray, Optional[Tuple[str, ...]]]:
+        """Stack preprocessed rows into a matrix, naming its columns for dict rows
+
+        Features a dict row lacks are NaN, so each model's layout fills them
+        with its own defaults.
+        """
+        if all(isinstance(row, dict) for row in rows):
+            # First-seen order matches the single-row path for uniform rows
+            columns = tuple(dict.fromkeys(name for row in rows for name in row))
+            matrix = np.array(
+                [[row.get(name, np.nan) for name in columns] for row in rows], dtype=float
+            )
+            return matrix.reshape(len(rows), len(columns)), columns
+        return np.vstack([np.asarray(row, dtype=float).reshape(-1) for row in rows]), None
+
+    def _model_features(
+        self, model_name: str, matrix: np.ndarray, columns: Optional[Tuple[str, ...]]
+    ) -> np.ndarray:
+        """A model's view of a batch matrix, in its feature order with defaults filled"""
+        layout = self.feature_layouts.get(model_name)
+        if columns is None:
+            return matrix  # Preprocessed arrays are already in model order
+        if layout is None:
+            return np.nan_to_num(matrix, nan=0.0)  # The model consumes the layout as is
+        return layout.gather(matrix, columns)
+
+    async def _run_models_batch(
+        self,
+        model_names: List[str],
+        matrix: np.ndarray,
+        columns: Optional[Tuple[str, ...]],
+    ) -> Tuple[List[str], np.ndarray]:
+        """Run every model once over the batch in parallel; returns models x rows"""
+        loop = asyncio.get_running_loop()
+        names, jobs = [], []
+        for model_name in model_names:
+            try:
+                model = await self._get_or_load_model(model_name)
+                if model is None:
+                    continue
+                features = self._model_features(model_name, matrix, columns)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning(f"Model {model_name} batch prediction failed: {e!s}")
+                continue
+            names.append(model_name)
+            jobs.append(
+                loop.run_in_executor(self.inference_executor, _predict_rows, model, features)
+            )
+
+        results = await asyncio.gather(*jobs, return_exceptions=True)
+        model_names_ok, rows = [], []
+        for model_name, result in zip(names, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Model {model_name} batch prediction failed: {result!s}")
+                continue
+            model_names_ok.append(model_name)
+            rows.append(result)
+        values = np.vstack(rows) if rows else np.empty((0, len(matrix)))
+        return model_names_ok, values
+
     async def _periodic_rebalancing(self):
         """Background task: periodically rebalance ensemble based on new metrics"""
         interval = self.default_config.rebalance_frequency * 3600
@@ -1050,18 +1138,18 @@ class UltraAdvancedEnsembleEngine:
         context: PredictionContext,
         config: EnsembleConfiguration,
     ) -> str:
-        """Generate a cache key based on features, context, and config"""
-        # Sort features for consistent ordering
-        feat_items = tuple(sorted(features.items()))
-        # Use config parameters affecting output
-        config_items = (
-            config.weighting_strategy,
-            config.diversity_threshold,
-            config.confidence_threshold,
-            config.max_models,
+        """Generate a cache key based on features, context, config and model set
+
+        The key is a blake2b digest of rounded feature values, so it is the
+        same in every worker process and survives restarts.
+        """
+        return prediction_cache_key(
+            features,
+            context.value,
+            fingerprint(config.__dict__),
+            self.model_registry.model_set_version(),
+            self.cache_key_decimals,
         )
-        key = (context.value, feat_items, config_items)
-        return str(hash(key))
 
     async def _generate_model_predictions(
         self,
@@ -1069,26 +1157,22 @@ class UltraAdvancedEnsembleEngine:
         features: Dict[str, float],
         context: PredictionContext,
     ) -> List[PredictionOutput]:
-        """Generate predictions from selected models"""
-        predictions = []
+        """Generate predictions from selected models in parallel"""
 
-        for model_name in model_names:
+        async def run(model_name: str) -> Optional[PredictionOutput]:
             try:
                 model = await self._get_or_load_model(model_name)
                 if model is None:
-                    continue
-
-                prediction = await self._predict_single_model(
+                    return None
+                return await self._predict_single_model(
                     model, model_name, features, context
                 )
-                if prediction:
-                    predictions.append(prediction)
-
             except Exception as e:  # pylint: disable=broad-exception-caught
-                logger.warning("Model {model_name} prediction failed: {e!s}")
-                continue
+                logger.warning(f"Model {model_name} prediction failed: {e!s}")
+                return None
 
-        return predictions
+        predictions = await asyncio.gather(*(run(name) for name in model_names))
+        return [prediction for prediction in predictions if prediction]
 
     async def _predict_single_model(
         self,
@@ -1103,15 +1187,20 @@ class UltraAdvancedEnsembleEngine:
 
             # Prepare feature vector
             feature_names = model_info.get("feature_names", [])
-            if feature_names:
-                feature_vector = [features.get(name, 0.0) for name in feature_names]
+            layout = self.feature_layouts.get(model_name)
+            if layout is not None and isinstance(features, dict):
+                feature_array = layout.row(features)
             else:
-                feature_vector = list(features.values())
-
-            feature_array = np.array(feature_vector).reshape(1, -1)
+                feature_array = self._model_features(model_name, *self._batch_matrix([features]))
 
-            # Make prediction
-            predicted_value = float(model.predict(feature_array)[0])
+            # Make prediction off the event loop so models run side by side
+            predicted_value = float(
+                (
+                    await asyncio.get_running_loop().run_in_executor(
+                        self.inference_executor, _predict_rows, model, feature_array
+                    )
+                )[0]
+            )
 
             # Calculate confidence and uncertainty
             conf = calculate_confidence(model, feature_array, model_info["type"])
@@ -1302,11 +1391,15 @@ class UltraAdvancedEnsembleEngine:
             health_status = {
                 "status": "healthy",
                 "total_models": len(active_models),
-                "loaded_models": len(self.loaded_models),
+                "loaded_models": len(self.model_registry.residency.resident_models()),
                 "recent_predictions": len(self.prediction_cache),
                 "model_health": {},
                 "performance_metrics": {},
                 "ensemble_config": self.default_config.__dict__,
+                "feature_layouts": self.feature_layouts.get_stats(),
+                "prediction_cache": self.prediction_result_cache.get_stats(),
+                "model_residency": self.model_registry.residency.get_stats(),
+                "model_selection": self.model_selector.get_stats(),
             }
 
             # Check individual model health
@@ -1318,7 +1411,7 @@ class UltraAdvancedEnsembleEngine:
                             "accuracy": metrics.accuracy,
                             "confidence": metrics.model_confidence,
                             "last_updated": metrics.last_updated.isoformat(),
-                            "is_loaded": model_name in self.loaded_models,
+                            "is_loaded": model_name in self.model_registry.residency,
                         }
                 except Exception as e:  # pylint: disable=broad-exception-caught
                     health_status["model_health"][model_name] = {
@@ -1353,13 +1446,22 @@ class UltraAdvancedEnsembleEngine:
             logger.error("Model discovery failed: {e}")
 
     async def _load_initial_models(self):
-        """Pre-load models into memory for faster first predictions"""
+        """Pre-load the best-scoring models; the rest load on first use"""
         try:
-            active = self.model_registry.get_active_models()
-            tasks = [self._get_or_load_model(name) for name in active]
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            loaded = sum(1 for r in results if not isinstance(r, Exception))
-            logger.info("Loaded initial {loaded}/{len(active)} models into cache")
+            active = self.model_registry.selection_index.top_by_cv(
+                len(self.model_registry.models)
+            )
+            residency = self.model_registry.residency
+            loaded = 0
+            for name in active[: config_manager.config.model_preload_count]:
+                if residency.resident_bytes >= residency.budget_bytes:
+                    break
+                try:
+                    await self._get_or_load_model(name)
+                    loaded += 1
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    logger.warning(f"Could not preload model {name}: {e!s}")
+            logger.info(f"Preloaded {loaded}/{len(active)} models; the rest load on demand")
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Initial model loading failed: {e}")
 
@@ -1388,6 +1490,12 @@ class UltraEnsembleEngine:
         }
         return prediction
 
+    async def predict_batch(
+        self, features_list: List[Dict[str, Any]], context: str
+    ) -> List[Dict[str, Any]]:
+        """Generate predictions for a batch of feature sets."""
+        return [await self.predict(features, context) for features in features_list]
+
 
 # Instantiate the engine
 ultra_ensemble_engine = UltraEnsembleEngine()
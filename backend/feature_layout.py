@@ -0,0 +1,188 @@
+"""Feature Layouts
+Compiles each model's feature_names into an index map once at load time, so
+inference turns request dicts into dense rows with a single gather and counts
+missing features instead of logging them per request.
+"""
+
+import logging
+import math
+from collections import Counter, OrderedDict
+from operator import itemgetter
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class FeatureLayout:
+    """A model's feature order with per-feature defaults
+
+    row() and matrix() pull a request's values with one compiled itemgetter
+    call, so the cost per request is a tuple and its share of one array.
+    Absent features take the layout default and are tallied per feature; the
+    first miss of each feature is logged once.
+    """
+
+    def __init__(
+        self,
+        feature_names: Sequence[str],
+        defaults: Optional[Mapping[str, float]] = None,
+        dtype: Any = np.float64,
+        max_column_maps: int = 64,
+    ):
+        defaults = defaults or {}
+        self.names: Tuple[str, ...] = tuple(feature_names)
+        self.size = len(self.names)
+        self.dtype = np.dtype(dtype)
+        self.position: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.defaults = np.array(
+            [float(defaults.get(name, 0.0)) for name in self.names], dtype=self.dtype
+        )
+        self._default_list: List[float] = self.defaults.tolist()
+        getter = itemgetter(*self.names)
+        self._getter = getter if self.size > 1 else lambda row: (getter(row),)
+        self._name_set = frozenset(self.names)
+        self._column_maps: "OrderedDict[Tuple[str, ...], np.ndarray]" = OrderedDict()
+        self._max_column_maps = max_column_maps
+        self._warned: set = set()
+        self.requests = 0
+        self.rows_with_missing = 0
+        self.missing_counts: Counter = Counter()  # Feature position -> misses
+
+    def row(self, features: Mapping[str, Any]) -> np.ndarray:
+        """Dense 1 x n row for one request"""
+        return self.matrix([features])
+
+    def matrix(self, rows: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """Dense len(rows) x n matrix"""
+        self.requests += len(rows)
+        try:
+            values = np.array(list(map(self._gather_row, rows)), dtype=self.dtype)
+        except (TypeError, ValueError):
+            return self._coerce(rows)  # Non-numeric values
+        if math.isnan(values.sum()):
+            return self._coerce(rows)  # None or NaN values
+        return values.reshape(len(rows), self.size)
+
+    def gather(self, matrix: np.ndarray, columns: Tuple[str, ...]) -> np.ndarray:
+        """Select this layout from a shared batch matrix whose columns are named
+
+        NaN cells and columns the batch lacks take the layout defaults.
+        """
+        index = self.column_index(columns)
+        selected = matrix[:, np.maximum(index, 0)]
+        absent = index < 0
+        if absent.any():
+            selected[:, absent] = np.nan
+        self.requests += len(selected)
+        missing = np.isnan(selected)
+        if missing.any():
+            per_feature = missing.sum(axis=0)
+            positions = np.flatnonzero(per_feature)
+            self.rows_with_missing += int(missing.any(axis=1).sum())
+            self.missing_counts.update(dict(zip(positions.tolist(), per_feature[positions].tolist())))
+            self._warn(positions)
+            selected = np.where(missing, self.defaults, selected)
+        return selected.astype(self.dtype, copy=False)
+
+    def column_index(self, columns: Tuple[str, ...]) -> np.ndarray:
+        """Positions of this layout's features in columns (-1 if absent), cached"""
+        index = self._column_maps.get(columns)
+        if index is None:
+            position = {name: i for i, name in enumerate(columns)}
+            index = np.array([position.get(name, -1) for name in self.names], dtype=np.intp)
+            self._column_maps[columns] = index
+            if len(self._column_maps) > self._max_column_maps:
+                self._column_maps.popitem(last=False)
+        else:
+            self._column_maps.move_to_end(columns)
+        return index
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request and missing-feature counters"""
+        return {
+            "features": self.size,
+            "requests": self.requests,
+            "rows_with_missing": self.rows_with_missing,
+            "missing": {self.names[i]: count for i, count in sorted(self.missing_counts.items())},
+        }
+
+    def _gather_row(self, row: Mapping[str, Any]) -> Sequence[Any]:
+        try:
+            return self._getter(row)
+        except KeyError:
+            self._record_missing(map(self.position.get, self._name_set.difference(row)))
+            return list(map(row.get, self.names, self._default_list))
+
+    def _coerce(self, rows: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        values = np.tile(self.defaults, (len(rows), 1))
+        for r, row in enumerate(rows):
+            unusable = []
+            for i, name in enumerate(self.names):
+                if name not in row:
+                    continue  # Counted when the row was gathered
+                try:
+                    value = float(row[name])
+                except (TypeError, ValueError):
+                    value = math.nan
+                if math.isnan(value):
+                    unusable.append(i)  # None, NaN or non-numeric counts as missing
+                else:
+                    values[r, i] = value
+            if unusable:
+                self._record_missing(unusable)
+        return values
+
+    def _record_missing(self, positions: Iterable[int]):
+        positions = list(positions)
+        self.rows_with_missing += 1
+        self.missing_counts.update(positions)
+        self._warn(positions)
+
+    def _warn(self, positions: Iterable[int]):
+        for i in positions:
+            if i not in self._warned:
+                self._warned.add(i)
+                logger.warning(
+                    f"Feature {self.names[i]} missing from a request; using default "
+                    f"{self._default_list[i]} (further misses are only counted)"
+                )
+
+
+class FeatureLayoutRegistry:
+    """Compiled feature layouts keyed by model name"""
+
+    def __init__(self, dtype: Any = np.float64):
+        self.dtype = dtype
+        self._layouts: Dict[str, FeatureLayout] = {}
+
+    def __contains__(self, model_name: str) -> bool:
+        return model_name in self._layouts
+
+    def register(
+        self,
+        model_name: str,
+        feature_names: Sequence[str],
+        defaults: Optional[Mapping[str, float]] = None,
+        dtype: Any = None,
+    ) -> Optional[FeatureLayout]:
+        """Compile a model's layout; models without feature names get none"""
+        if not feature_names:
+            self._layouts.pop(model_name, None)
+            return None
+        layout = FeatureLayout(feature_names, defaults, dtype or self.dtype)
+        self._layouts[model_name] = layout
+        return layout
+
+    def unregister(self, model_name: str):
+        """Drop a model's layout"""
+        self._layouts.pop(model_name, None)
+
+    def get(self, model_name: str) -> Optional[FeatureLayout]:
+        """Layout of a model, if registered"""
+        return self._layouts.get(model_name)
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model request and missing-feature counters"""
+        return {name: layout.get_stats() for name, layout in self._layouts.items()}
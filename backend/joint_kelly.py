@@ -0,0 +1,449 @@
+"""Joint Kelly
+Stakes for a batch of simultaneous bets that maximise expected log-growth
+over their joint outcomes, instead of sizing each bet alone.
+
+Bets in the same exclusive group cannot both win (the selections of one
+market); groups are otherwise independent or linked through a Gaussian
+copula on a latent correlation matrix. Small independent batches are solved
+over every joint outcome; larger or correlated ones over sampled scenarios
+whose marginals are stratified so each bet wins in its exact share of them.
+The concave growth objective is maximised by accelerated projected gradient
+under per-position, per-cluster and total exposure caps, and fractional
+Kelly stakes a multiple of that joint solution.
+"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+
+MAX_WEALTH_AT_RISK = 0.95  # Total full-Kelly exposure bound; keeps every log finite
+SHRINK_EVERY = 10  # FISTA iterations between checks for a smaller working set
+
+
+@dataclass
+class KellyBet:
+    """A bet to size: decimal odds and win probability
+
+    exclusive_group: bets sharing it are selections of one market (at most
+    one wins). cluster: bets sharing it count against one correlated-exposure
+    cap (e.g. the event). cap: this bet's own bankroll-fraction cap.
+    """
+
+    odds: float
+    win_probability: float
+    exclusive_group: Optional[Hashable] = None
+    cluster: Optional[Hashable] = None
+    cap: Optional[float] = None
+
+
+@dataclass
+class JointKellyResult:
+    """Bankroll fractions for a batch and how they were found"""
+
+    fractions: np.ndarray  # Stake per bet (fractional Kelly, caps applied)
+    full_kelly: np.ndarray  # Joint full-Kelly solution the stakes are scaled from
+    expected_log_growth: float  # Of the recommended stakes, per settlement
+    method: str  # "enumerated" or "sampled"
+    scenarios: int
+    iterations: int
+    converged: bool
+    elapsed_seconds: float
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def _groups(bets: Sequence[KellyBet]) -> Tuple[np.ndarray, int]:
+    """Exclusive-group index per bet; ungrouped bets get their own group"""
+    codes: Dict[Hashable, int] = {}
+    group = np.empty(len(bets), dtype=np.int64)
+    for i, bet in enumerate(bets):
+        key = ("bet", i) if bet.exclusive_group is None else ("group", bet.exclusive_group)
+        group[i] = codes.setdefault(key, len(codes))
+    return group, len(codes)
+
+
+def _win_intervals(
+    bets: Sequence[KellyBet], group: np.ndarray, n_groups: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """[low, high) of the group's uniform draw in which each bet wins
+
+    Selections of a group take consecutive slices of [0, 1); if their
+    probabilities sum past one they are scaled down to fit.
+    """
+    p = np.array([bet.win_probability for bet in bets], dtype=np.float64)
+    totals = np.bincount(group, weights=p, minlength=n_groups)
+    p = p / np.maximum(totals, 1.0)[group]
+    low = np.empty_like(p)
+    filled = np.zeros(n_groups)
+    for i, g in enumerate(group):
+        low[i] = filled[g]
+        filled[g] += p[i]
+    return low, low + p
+
+
+def enumerate_scenarios(
+    bets: Sequence[KellyBet], max_scenarios: int = 4096
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """(win matrix, probabilities) over every joint outcome, or None if too many
+
+    Groups are independent; each either has one winning selection or none.
+    """
+    group, n_groups = _groups(bets)
+    sizes = np.bincount(group, minlength=n_groups) + 1  # Each selection, or none
+    if np.prod(sizes.astype(np.float64)) > max_scenarios:
+        return None
+    low, high = _win_intervals(bets, group, n_groups)
+
+    count = int(np.prod(sizes))
+    strides = np.cumprod(np.concatenate([[1], sizes[:-1]]))
+    outcome = (np.arange(count)[:, None] // strides) % sizes  # Per scenario and group
+    slot = np.zeros(len(bets), dtype=np.int64)  # Position of each bet in its group, from 1
+    seen = np.zeros(n_groups, dtype=np.int64)
+    for i, g in enumerate(group):
+        seen[g] += 1
+        slot[i] = seen[g]
+    wins = outcome[:, group] == slot
+
+    # Outcome 0 is "no selection wins"
+    p = high - low
+    no_win = 1.0 - np.bincount(group, weights=p, minlength=n_groups)
+    outcome_p = np.zeros((n_groups, sizes.max()))
+    outcome_p[np.arange(n_groups), 0] = np.maximum(no_win, 0.0)
+    outcome_p[group, slot] = p
+    probabilities = outcome_p[np.arange(n_groups), outcome].prod(axis=1)
+    return wins, probabilities
+
+
+def sample_scenarios(
+    bets: Sequence[KellyBet],
+    samples: int,
+    correlation: Optional[np.ndarray] = None,
+    seed: Optional[int] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """(win matrix, equal probabilities) for sampled joint outcomes
+
+    Each exclusive group draws one latent normal (correlated across groups
+    by `correlation`, group by group). The uniforms are replaced by their
+    stratified ranks, so marginal win rates are exact to 1/samples while the
+    dependence between groups is kept.
+    """
+    group, n_groups = _groups(bets)
+    rng = np.random.default_rng(seed)
+    # Laid out group by group so each sort runs along contiguous memory
+    strata = np.arange(samples, dtype=np.int32)
+    if correlation is None:
+        # Independent groups: each row is a random ordering of the strata
+        ranks = rng.permuted(np.broadcast_to(strata, (n_groups, samples)), axis=1)
+    else:
+        eigenvalues, eigenvectors = np.linalg.eigh((correlation + correlation.T) / 2)
+        factor = (eigenvectors * np.sqrt(np.clip(eigenvalues, 0.0, None))).astype(np.float32)
+        latent = factor @ rng.standard_normal((n_groups, samples), dtype=np.float32)
+        ranks = np.empty((n_groups, samples), dtype=np.int32)
+        np.put_along_axis(ranks, latent.argsort(axis=1), strata[None, :], axis=1)
+    ranks = ranks.T
+    uniforms = (ranks + rng.random((samples, n_groups))) / samples
+    low, high = _win_intervals(bets, group, n_groups)
+    draws = uniforms[:, group]
+    wins = (draws >= low) & (draws < high)
+    return wins, np.full(samples, 1.0 / samples)
+
+
+def project_capped(
+    v: np.ndarray,
+    upper: np.ndarray,
+    cluster: np.ndarray,
+    cluster_caps: np.ndarray,
+    total_cap: float,
+    max_steps: int = 100,
+) -> np.ndarray:
+    """Euclidean projection onto 0 <= f <= upper, cluster sums <= caps, sum <= total
+
+    The solution is clip(v - mu[cluster] - lam, 0, upper) with multipliers
+    for the binding caps; each level is a monotone root found by Newton
+    steps on its linear piece, safeguarded by bisection.
+    """
+    n_clusters = len(cluster_caps)
+
+    def cluster_shift(w: np.ndarray) -> np.ndarray:
+        mu = np.zeros(n_clusters)
+        totals = np.bincount(cluster, weights=np.clip(w, 0.0, upper), minlength=n_clusters)
+        binding = totals > cluster_caps
+        if not binding.any():
+            return mu
+        low = np.zeros(n_clusters)
+        high = np.zeros(n_clusters)
+        np.maximum.at(high, cluster, w)
+        for _ in range(max_steps):
+            x = np.clip(w - mu[cluster], 0.0, upper)
+            excess = np.bincount(cluster, weights=x, minlength=n_clusters) - cluster_caps
+            excess[~binding] = 0.0
+            if np.all(np.abs(excess) <= 1e-14):
+                break
+            low = np.where(excess > 0, mu, low)
+            high = np.where(excess > 0, high, mu)
+            free = np.bincount(cluster, weights=(x > 0) & (x < upper), minlength=n_clusters)
+            newton = mu + excess / np.maximum(free, 1)
+            inside = (free > 0) & (newton > low) & (newton < high)
+            mu = np.where(binding, np.where(inside, newton, (low + high) / 2), 0.0)
+        return mu
+
+    def project_at(lam: float) -> Tuple[np.ndarray, np.ndarray]:
+        w = v - lam
+        mu = cluster_shift(w)
+        return np.clip(w - mu[cluster], 0.0, upper), mu
+
+    x, mu = project_at(0.0)
+    if x.sum() <= total_cap:
+        return x
+    low, high = 0.0, float(v.max())
+    lam = 0.0
+    for _ in range(max_steps):
+        excess = x.sum() - total_cap
+        if abs(excess) <= 1e-14:
+            break
+        if excess > 0:
+            low = lam
+        else:
+            high = lam
+        # Only weights in clusters whose own cap is slack move with lam
+        free = int(((x > 0) & (x < upper) & (mu[cluster] == 0)).sum())
+        newton = lam + excess / free if free else -1.0
+        lam = newton if low < newton < high else (low + high) / 2
+        x, mu = project_at(lam)
+    return x
+
+
+class JointKellySolver:
+    """Maximises expected log-growth of a batch of simultaneous bets
+
+    kelly_multiplier scales the joint full-Kelly solution (0.5 = half
+    Kelly); the caps bound the scaled stakes. Fixed fractions (open
+    positions) stay in every scenario and use up the total cap.
+    """
+
+    def __init__(
+        self,
+        kelly_multiplier: float = 0.5,
+        max_position: float = 0.05,
+        max_total: float = 0.25,
+        max_cluster: float = 0.15,
+        max_enumerated: int = 4096,
+        samples: int = 10_000,
+        tol: float = 1e-8,
+        max_iter: int = 5000,
+    ):
+        if not 0 < kelly_multiplier <= 1:
+            raise ValueError("kelly_multiplier must be in (0, 1]")
+        self.kelly_multiplier = kelly_multiplier
+        self.max_position = max_position
+        self.max_total = max_total
+        self.max_cluster = max_cluster
+        self.max_enumerated = max_enumerated
+        self.samples = samples
+        self.tol = tol
+        self.max_iter = max_iter
+
+    def scenarios(
+        self,
+        bets: Sequence[KellyBet],
+        correlation: Optional[np.ndarray] = None,
+        seed: Optional[int] = None,
+    ) -> Tuple[np.ndarray, np.ndarray, str]:
+        """(win matrix, probabilities, method) for the batch"""
+        independent = correlation is None or np.allclose(correlation, np.eye(len(correlation)))
+        if independent:
+            enumerated = enumerate_scenarios(bets, self.max_enumerated)
+            if enumerated is not None:
+                return (*enumerated, "enumerated")
+        return (*sample_scenarios(bets, self.samples, None if independent else correlation, seed), "sampled")
+
+    def solve(
+        self,
+        bets: Sequence[KellyBet],
+        correlation: Optional[np.ndarray] = None,
+        fixed: Sequence[Tuple[KellyBet, float]] = (),
+        held: float = 0.0,
+        cluster_used: Optional[Dict[Hashable, float]] = None,
+        seed: Optional[int] = None,
+    ) -> JointKellyResult:
+        """Stakes as bankroll fractions for the bets
+
+        correlation is the latent correlation between exclusive groups, in
+        order of first appearance among bets then fixed positions. fixed are
+        open (bet, fraction) positions priced into every scenario; held and
+        cluster_used are further exposure (e.g. unpriced open positions)
+        counted against the total and per-cluster caps.
+        """
+        start = time.perf_counter()
+        n = len(bets)
+        if n == 0:
+            return JointKellyResult(np.zeros(0), np.zeros(0), 0.0, "none", 0, 0, True, 0.0)
+        everything = list(bets) + [bet for bet, _ in fixed]
+        wins, probabilities, method = self.scenarios(everything, correlation, seed)
+        odds = np.array([bet.odds for bet in everything], dtype=np.float64)
+        returns = np.where(wins, odds - 1.0, -1.0)
+        fixed_fractions = np.array([fraction for _, fraction in fixed], dtype=np.float64)
+        base = 1.0 + returns[:, n:] @ fixed_fractions  # Wealth from open positions alone
+        returns = np.ascontiguousarray(returns[:, :n])
+
+        # Caps on the full-Kelly solution so the scaled stakes meet the limits
+        k = self.kelly_multiplier
+        used = dict(cluster_used or {})
+        for bet, fraction in fixed:
+            if bet.cluster is not None:
+                used[bet.cluster] = used.get(bet.cluster, 0.0) + fraction
+        upper = np.array(
+            [self.max_position if bet.cap is None else min(bet.cap, self.max_position) for bet in bets]
+        ) / k
+        cluster_ids: Dict[Hashable, int] = {}
+        cluster = np.array(
+            [
+                cluster_ids.setdefault(
+                    ("bet", i) if bet.cluster is None else ("cluster", bet.cluster), len(cluster_ids)
+                )
+                for i, bet in enumerate(bets)
+            ]
+        )
+        cluster_caps = np.full(len(cluster_ids), np.inf)
+        for key, index in cluster_ids.items():
+            if key[0] == "cluster":
+                cluster_caps[index] = max(self.max_cluster - used.get(key[1], 0.0), 0.0) / k
+        exposure = held + float(fixed_fractions.sum())
+        total_cap = max(min((self.max_total - exposure) / k, MAX_WEALTH_AT_RISK - exposure), 0.0)
+        upper = np.maximum(upper, 0.0)
+
+        full, iterations, converged = self._maximise(
+            returns, probabilities, base, upper, cluster, cluster_caps, total_cap
+        )
+        full[full <= self.tol] = 0.0  # Projection round-off on exhausted caps
+        fractions = k * full
+        wealth = base + returns @ fractions
+        return JointKellyResult(
+            fractions=fractions,
+            full_kelly=full,
+            expected_log_growth=float(probabilities @ np.log(wealth)),
+            method=method,
+            scenarios=len(probabilities),
+            iterations=iterations,
+            converged=converged,
+            elapsed_seconds=time.perf_counter() - start,
+            metadata={
+                "kelly_multiplier": k,
+                "total_fraction": float(fractions.sum()),
+                "fixed_fraction": float(fixed_fractions.sum()),
+            },
+        )
+
+    def _maximise(
+        self,
+        returns: np.ndarray,
+        probabilities: np.ndarray,
+        base: np.ndarray,
+        upper: np.ndarray,
+        cluster: np.ndarray,
+        cluster_caps: np.ndarray,
+        total_cap: float,
+    ) -> Tuple[np.ndarray, int, bool]:
+        """Projected gradient on -E[log(base + R f)] over a working set of bets
+
+        Most bets of a large batch end at zero, so FISTA runs on the columns
+        of the bets that are staked or would be after a full gradient step;
+        one full step from its solution adds any it missed.
+        """
+        f = project_capped(np.zeros(len(upper)), upper, cluster, cluster_caps, total_cap)
+        lipschitz = self._curvature(returns, probabilities, base)
+        iterations, converged = 0, False
+        working = np.zeros(len(upper), dtype=bool)
+        while iterations < self.max_iter:
+            wealth = base + returns @ f
+            gradient = -(returns.T @ (probabilities / wealth))
+            candidate = project_capped(f - gradient / lipschitz, upper, cluster, cluster_caps, total_cap)
+            entering = (candidate > 0) & ~working
+            if converged and not entering.any():
+                return f, iterations, True
+            # Keep the set once it has converged so it only grows from there
+            working = (working if converged else np.zeros_like(working)) | (f > 0) | (candidate > 0)
+            columns = np.flatnonzero(working)
+            if len(columns) == 0:
+                return np.zeros(len(upper)), iterations, True  # No bet worth a stake
+            f_sub, used, lipschitz, converged = self._fista(
+                np.ascontiguousarray(returns[:, columns]), probabilities, base, f[columns],
+                upper[columns], cluster[columns], cluster_caps, total_cap, lipschitz,
+                self.max_iter - iterations,
+            )
+            f = np.zeros(len(upper))
+            f[columns] = f_sub
+            iterations += used
+        return f, iterations, False
+
+    @staticmethod
+    def _curvature(returns: np.ndarray, probabilities: np.ndarray, base: np.ndarray) -> float:
+        """Hessian norm at f = 0 by power iteration; backtracking raises it where needed"""
+        x = np.ones(returns.shape[1]) / np.sqrt(returns.shape[1])
+        lipschitz = 1.0
+        for _ in range(10):
+            y = returns.T @ (probabilities / base**2 * (returns @ x))
+            lipschitz = float(np.linalg.norm(y))
+            x = y / max(lipschitz, 1e-300)
+        return max(lipschitz, 1e-12)
+
+    def _fista(
+        self,
+        returns: np.ndarray,
+        probabilities: np.ndarray,
+        base: np.ndarray,
+        f: np.ndarray,
+        upper: np.ndarray,
+        cluster: np.ndarray,
+        cluster_caps: np.ndarray,
+        total_cap: float,
+        lipschitz: float,
+        max_iter: int,
+    ) -> Tuple[np.ndarray, int, float, bool]:
+        """FISTA with backtracking and restarts; (f, iterations, lipschitz, converged)
+
+        R y is kept as a combination of R f and R candidate, so each
+        iteration costs one product with R and one with its transpose.
+        Returns early, unconverged, once at most half the columns are
+        staked so the caller can shrink the working set.
+        """
+        f = project_capped(f, upper, cluster, cluster_caps, total_cap)
+        returns_f = returns @ f
+        y, returns_y, momentum = f.copy(), returns_f.copy(), 1.0
+        for iteration in range(1, max_iter + 1):
+            wealth = base + returns_y
+            if wealth.min() <= 0:
+                # Extrapolated past where every outcome keeps some bankroll
+                y, returns_y, momentum = f.copy(), returns_f.copy(), 1.0
+                wealth = base + returns_y
+            f_y = -float(probabilities @ np.log(wealth))
+            gradient = -(returns.T @ (probabilities / wealth))
+            while True:
+                candidate = project_capped(y - gradient / lipschitz, upper, cluster, cluster_caps, total_cap)
+                step = candidate - y
+                returns_c = returns @ candidate
+                wealth_c = base + returns_c
+                if wealth_c.min() > 0 and (
+                    -float(probabilities @ np.log(wealth_c))
+                    <= f_y + gradient @ step + lipschitz / 2 * step @ step + 1e-15
+                ):
+                    break
+                lipschitz *= 2.0
+            change = float(np.abs(candidate - f).max())
+            # Restart momentum when it points uphill
+            if (y - candidate) @ (candidate - f) > 0:
+                momentum = 1.0
+                y, returns_y = candidate.copy(), returns_c.copy()
+            else:
+                momentum_next = (1 + np.sqrt(1 + 4 * momentum**2)) / 2
+                beta = (momentum - 1) / momentum_next
+                y = candidate + beta * (candidate - f)
+                returns_y = returns_c + beta * (returns_c - returns_f)
+                momentum = momentum_next
+            f, returns_f = candidate, returns_c
+            if change <= self.tol:
+                return f, iteration, lipschitz, True
+            if iteration % SHRINK_EVERY == 0 and 2 * np.count_nonzero(f) <= len(f):
+                return f, iteration, lipschitz, False
+        return f, max_iter, lipschitz, False
@@ -13,6 +13,7 @@ This module provides the ultimate sports betting prediction platform with:
 
 import asyncio
 import os
+import secrets
 import sys
 import logging
 from fastapi import FastAPI
@@ -41,7 +42,7 @@ app.add_middleware(
 logger = logging.getLogger(__name__)
 import time
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 import uvicorn
 from fastapi import BackgroundTasks, Depends, HTTPException
@@ -62,6 +63,8 @@ from advanced_feature_engineering import (
     FeatureEngineeringStrategy,
     advanced_feature_engineer,
 )
+from arbitrage_engine import ultra_arbitrage_engine
+from bankroll_simulation import BankrollSimulator, SimulationPosition, StakingRule
 from cache_optimizer import ultra_cache_optimizer
 
 # Import ultra-enhanced systems
@@ -638,20 +641,69 @@ async def bookmaker_odds_reconciliation(event_id: str):
 
 
 # 14. User bankroll simulation endpoint
+def _simulation_positions(user_id: str) -> Tuple[List[SimulationPosition], str]:
+    """The user's open bets priced by matching value bets (else implied odds)."""
+    model_probs = {(b["event"], b["outcome"]): b["model_prob"] for b in _latest_value_bets}
+    bets = [b for b in _user_bets if b["user_id"] == user_id]
+    open_bets = [b for b in bets if b.get("result") not in ("win", "lose")]
+    source = "open_positions" if open_bets else "bet_history" if bets else "profile"
+    if not bets:
+        # No bets yet: one even-money bet at the preferred stake
+        stake = get_user_profile(user_id)["preferred_stake"]
+        return [SimulationPosition(odds=2.0, win_probability=0.5, stake=stake)], source
+    return [
+        SimulationPosition(
+            odds=b["odds"],
+            win_probability=model_probs.get((b["event"], b["outcome"]), 1.0 / b["odds"]),
+            stake=b["stake"],
+        )
+        for b in (open_bets or bets[-50:])
+    ], source
+
+
+# Largest paths * n one request may simulate; the default is 1M
+MAX_SIMULATION_STEPS = 20_000_000
+
+
 @app.get("/api/v4/user/bankroll-simulation")
-async def bankroll_simulation(user_id: str, n: int = 100):
-    """Simulate user bankroll evolution over n random bet outcomes (demo)."""
-    profile = get_user_profile(user_id)
-    bankroll = 1000.0
-    history = []
-    for _ in range(n):
-        stake = profile["preferred_stake"]
-        win = random.choice([True, False])
-        odds = random.uniform(1.5, 3.0)
-        profit = stake * (odds - 1) if win else -stake
-        bankroll += profit
-        history.append(bankroll)
-    return {"user_id": user_id, "final_bankroll": bankroll, "history": history}
+async def bankroll_simulation(
+    user_id: str,
+    n: int = Query(100, ge=1, le=5_000),
+    paths: int = Query(10_000, ge=1, le=200_000),
+    bankroll: float = Query(1000.0, gt=0),
+    staking: StakingRule = StakingRule.FLAT,
+    seed: Optional[int] = None,
+):
+    """Monte Carlo bankroll paths over n rounds of the user's open positions.
+
+    Every round settles the user's open bets again (their recent bets if none
+    are open) under the staking rule; history is one sample path.
+    """
+    if paths * n > MAX_SIMULATION_STEPS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"paths * n must be at most {MAX_SIMULATION_STEPS}, got {paths * n}",
+        )
+    positions, source = _simulation_positions(user_id)
+    try:
+        simulator = BankrollSimulator(positions, bankroll, staking)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if seed is None:
+        # history must come from the run's stream; 53 bits survive a JSON number
+        seed = secrets.randbits(53)
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(None, simulator.run, paths, n, seed)
+    history = simulator.sample_path(n, seed)
+    return {
+        "user_id": user_id,
+        "seed": seed,
+        "positions": len(positions),
+        "positions_source": source,
+        "final_bankroll": float(history[-1]),
+        "history": history.tolist(),
+        "simulation": result.__dict__,
+    }
 
 
 # 15. System resource monitoring endpoint
@@ -943,6 +995,10 @@ async def shutdown_event():
         await data_pipeline.shutdown()
         logger.info("✅ Data pipeline shut down")
 
+        # Stop the arbitrage graph search workers
+        ultra_arbitrage_engine.close()
+        logger.info("✅ Arbitrage engine shut down")
+
         # Dispose database connections
         if db_manager.async_engine:
             await db_manager.async_engine.dispose()
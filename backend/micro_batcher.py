@@ -0,0 +1,169 @@
+"""Micro-batching Dispatcher
+Coalesces keyed work items that arrive within a short window into one bulk
+call, e.g. prediction triggers into a single batched model inference.
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """Collects keyed items for up to window seconds and dispatches them in bulk
+
+    A batch closes when its first item has waited window seconds or when
+    max_batch items are pending. An item whose key is already pending is
+    merged into the pending entry instead of queued again. At most
+    max_pending distinct keys wait at once: submit() blocks until a batch
+    frees room, offer() rejects. Batches run one at a time, so a slow bulk
+    call pushes back on producers rather than piling up concurrent work.
+    """
+
+    def __init__(
+        self,
+        process_batch: Callable[[List[Any]], Awaitable[None]],
+        window: float = 0.005,
+        max_batch: int = 256,
+        max_pending: int = 4096,
+        merge: Optional[Callable[[Any, Any], Any]] = None,
+    ):
+        if max_batch <= 0 or max_pending < max_batch:
+            raise ValueError("max_batch must be positive and no larger than max_pending")
+        self.process_batch = process_batch
+        self.window = window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self.merge = merge
+        self._pending: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._arrivals: Dict[Hashable, float] = {}
+        self._space: Optional[asyncio.Future] = None  # Producers parked while full
+        self._signal: Optional[asyncio.Future] = None  # Worker parked for items/window
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {
+            "submitted": 0,
+            "deduplicated": 0,
+            "rejected": 0,
+            "blocked": 0,
+            "batches": 0,
+            "dispatched": 0,
+            "failed_batches": 0,
+            "max_queue_wait_ms": 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self):
+        """Start the dispatch worker on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    def close(self):
+        """Stop dispatching and discard pending items"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._pending.clear()
+        self._arrivals.clear()
+        self._wake_producers()
+
+    def offer(self, key: Hashable, item: Any) -> bool:
+        """Queue or merge an item without waiting; False if the queue is full"""
+        if key in self._pending:
+            self._merge(key, item)
+            return True
+        if len(self._pending) >= self.max_pending:
+            self.stats["rejected"] += 1
+            return False
+        self._add(key, item)
+        return True
+
+    async def submit(self, key: Hashable, item: Any):
+        """Queue or merge an item, waiting while the queue is full"""
+        while key not in self._pending and len(self._pending) >= self.max_pending:
+            self.stats["blocked"] += 1
+            if self._space is None or self._space.done():
+                self._space = asyncio.get_running_loop().create_future()
+            await asyncio.shield(self._space)
+
+        if key in self._pending:
+            self._merge(key, item)
+        else:
+            self._add(key, item)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Dispatch counters and current queue depth"""
+        batches = self.stats["batches"]
+        return {
+            **self.stats,
+            "pending": len(self._pending),
+            "avg_batch_size": self.stats["dispatched"] / batches if batches else 0.0,
+        }
+
+    def _add(self, key: Hashable, item: Any):
+        self._pending[key] = item
+        self._arrivals[key] = time.perf_counter()
+        self.stats["submitted"] += 1
+        if len(self._pending) == 1 or len(self._pending) >= self.max_batch:
+            self._notify()
+
+    def _merge(self, key: Hashable, item: Any):
+        current = self._pending[key]
+        self._pending[key] = self.merge(current, item) if self.merge else item
+        self.stats["submitted"] += 1
+        self.stats["deduplicated"] += 1
+
+    def _notify(self):
+        signal = self._signal
+        if signal is not None and not signal.done():
+            signal.set_result(None)
+
+    def _wake_producers(self):
+        space = self._space
+        self._space = None
+        if space is not None and not space.done():
+            space.set_result(None)
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._pending:
+                self._signal = loop.create_future()
+                await self._signal
+
+            # Hold the batch open until its oldest item has waited the window,
+            # unless it fills first
+            oldest = next(iter(self._arrivals.values()))
+            remaining = self.window - (time.perf_counter() - oldest)
+            if len(self._pending) < self.max_batch and remaining > 0:
+                self._signal = loop.create_future()
+                timer = loop.call_later(remaining, self._notify)
+                try:
+                    await self._signal
+                finally:
+                    timer.cancel()
+            self._signal = None
+
+            now = time.perf_counter()
+            batch = []
+            while self._pending and len(batch) < self.max_batch:
+                key, item = self._pending.popitem(last=False)
+                wait_ms = (now - self._arrivals.pop(key)) * 1000
+                if wait_ms > self.stats["max_queue_wait_ms"]:
+                    self.stats["max_queue_wait_ms"] = wait_ms
+                batch.append(item)
+            self._wake_producers()
+
+            self.stats["batches"] += 1
+            self.stats["dispatched"] += len(batch)
+            try:
+                await self.process_batch(batch)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                self.stats["failed_batches"] += 1
+                logger.error(f"Batch dispatch failed for {len(batch)} items: {e!s}")
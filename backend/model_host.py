@@ -0,0 +1,292 @@
+"""Model Host
+One process owns the loaded models and serves inference to the API workers
+over a Unix socket, so a multi-worker deployment holds (and warms) each model
+once instead of once per worker. Requests arriving within a short window are
+coalesced per model into one predict call on the stacked rows.
+
+Frames are a 4-byte big-endian length followed by a msgpack array:
+request [id, model_name, rows, cols, float64 bytes], response
+[id, error or None, cols, float64 bytes].
+
+Run the host with `python model_host.py` and set model_host_socket in the
+workers' configuration to the same path.
+"""
+
+import asyncio
+import itertools
+import logging
+import os
+import struct
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+import msgpack
+import numpy as np
+from micro_batcher import MicroBatcher
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+MAX_FRAME_BYTES = 64 * 1024**2
+
+# (model_name, rows) -> one output row per input row
+PredictRows = Callable[[str, np.ndarray], Awaitable[np.ndarray]]
+
+
+class ModelHostError(Exception):
+    """Inference failed inside the model host"""
+
+
+async def _read_frame(reader: asyncio.StreamReader) -> list:
+    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    if size > MAX_FRAME_BYTES:
+        raise ValueError(f"Frame of {size} bytes exceeds {MAX_FRAME_BYTES}")
+    return msgpack.unpackb(await reader.readexactly(size), raw=False)
+
+
+def _frame(message: list) -> bytes:
+    body = msgpack.packb(message, use_bin_type=True)
+    return _HEADER.pack(len(body)) + body
+
+
+def _as_matrix(values: np.ndarray) -> np.ndarray:
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    return values.reshape(len(values), -1)
+
+
+class ModelHostServer:
+    """Serves predict_rows to worker processes over a Unix socket
+
+    predict_rows is awaited once per model per batch and should run the
+    model off the event loop. Connections are pipelined: a worker may have
+    many requests in flight and responses carry the request id.
+    """
+
+    def __init__(
+        self,
+        predict_rows: PredictRows,
+        socket_path: str,
+        window: float = 0.002,
+        max_batch: int = 256,
+    ):
+        self.predict_rows = predict_rows
+        self.socket_path = socket_path
+        self.batcher = MicroBatcher(self._process_batch, window=window, max_batch=max_batch)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.StreamWriter] = set()
+        self._keys = itertools.count()
+        self.stats = {"connections": 0, "requests": 0, "errors": 0, "model_calls": 0, "rows": 0}
+
+    async def start(self):
+        """Listen on the socket, replacing a stale one left by a previous host"""
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self.batcher.start()
+        self._server = await asyncio.start_unix_server(self._serve, path=self.socket_path)
+        logger.info(f"Model host listening on {self.socket_path}")
+
+    async def serve_forever(self):
+        """Start and serve until cancelled"""
+        await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """Stop serving, drop worker connections and remove the socket"""
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.batcher.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request counters and batching effectiveness"""
+        calls = self.stats["model_calls"]
+        return {
+            **self.stats,
+            "avg_rows_per_call": self.stats["rows"] / calls if calls else 0.0,
+            "batcher": self.batcher.get_stats(),
+        }
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.stats["connections"] += 1
+        self._connections.add(writer)
+        pending = set()
+        try:
+            while True:
+                try:
+                    request_id, model_name, rows, cols, data = await _read_frame(reader)
+                except asyncio.IncompleteReadError:
+                    break
+                self.stats["requests"] += 1
+                matrix = np.frombuffer(data, dtype=np.float64).reshape(rows, cols)
+                future = asyncio.get_running_loop().create_future()
+                await self.batcher.submit(next(self._keys), (model_name, matrix, future))
+                task = asyncio.create_task(self._respond(writer, request_id, future))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning(f"Model host connection failed: {e!s}")
+        finally:
+            for task in pending:
+                task.cancel()
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _respond(self, writer: asyncio.StreamWriter, request_id: int, future: asyncio.Future):
+        try:
+            values = await future
+            message = [request_id, None, values.shape[1], values.tobytes()]
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            self.stats["errors"] += 1
+            message = [request_id, f"{type(e).__name__}: {e!s}", 0, b""]
+        writer.write(_frame(message))
+        await writer.drain()
+
+    async def _process_batch(self, items: List[Tuple[str, np.ndarray, asyncio.Future]]):
+        by_model: Dict[str, List[Tuple[np.ndarray, asyncio.Future]]] = {}
+        for model_name, matrix, future in items:
+            by_model.setdefault(model_name, []).append((matrix, future))
+
+        try:
+            for model_name, requests in by_model.items():
+                try:
+                    stacked = np.vstack([matrix for matrix, _ in requests])
+                    values = _as_matrix(await self.predict_rows(model_name, stacked))
+                    if len(values) != len(stacked):
+                        raise ValueError(f"{model_name} returned {len(values)} rows for {len(stacked)}")
+                except Exception as e:  # pylint: disable=broad-exception-caught
+                    for _, future in requests:
+                        if not future.done():
+                            future.set_exception(e)
+                    continue
+                self.stats["model_calls"] += 1
+                self.stats["rows"] += len(stacked)
+                start = 0
+                for matrix, future in requests:
+                    if not future.done():
+                        future.set_result(values[start : start + len(matrix)])
+                    start += len(matrix)
+        finally:
+            # Never leave a request waiting on a batch that stopped early
+            for _, _, future in items:
+                if not future.done():
+                    future.set_exception(RuntimeError("Model host batch aborted"))
+
+
+class ModelHostClient:
+    """Worker-side connection to a ModelHostServer
+
+    Opens the socket on first use and again after the host restarts; requests
+    in flight when the connection drops fail with ConnectionError.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 5.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connecting: Optional[asyncio.Lock] = None
+        self._waiting: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count()
+        self.stats = {"requests": 0, "errors": 0, "reconnects": 0, "latency_seconds": 0.0}
+
+    async def predict(self, model_name: str, rows: np.ndarray) -> np.ndarray:
+        """Outputs of a model for a feature matrix (one row per input row)"""
+        matrix = _as_matrix(rows)
+        writer = await self._connect()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._waiting[request_id] = future
+        start = time.perf_counter()
+        self.stats["requests"] += 1
+        try:
+            writer.write(_frame([request_id, model_name, *matrix.shape, matrix.tobytes()]))
+            await writer.drain()
+            return await asyncio.wait_for(future, self.timeout)
+        except Exception:
+            self.stats["errors"] += 1
+            raise
+        finally:
+            self._waiting.pop(request_id, None)
+            self.stats["latency_seconds"] += time.perf_counter() - start
+
+    async def close(self):
+        """Close the connection"""
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Request counters and mean round-trip latency"""
+        requests = self.stats["requests"]
+        return {
+            **self.stats,
+            "in_flight": len(self._waiting),
+            "avg_latency_seconds": self.stats["latency_seconds"] / requests if requests else 0.0,
+        }
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        if self._writer is not None and not self._writer.is_closing():
+            return self._writer
+        if self._connecting is None:
+            self._connecting = asyncio.Lock()
+        async with self._connecting:
+            if self._writer is None or self._writer.is_closing():
+                if self._reader_task is not None:
+                    self.stats["reconnects"] += 1
+                reader, self._writer = await asyncio.open_unix_connection(self.socket_path)
+                self._reader_task = asyncio.create_task(self._read_responses(reader, self._writer))
+        return self._writer
+
+    async def _read_responses(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                request_id, error, cols, data = await _read_frame(reader)
+                future = self._waiting.get(request_id)
+                if future is None or future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(ModelHostError(error))
+                else:
+                    future.set_result(np.frombuffer(data, dtype=np.float64).reshape(-1, cols))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning(f"Model host connection lost: {e!s}")
+        finally:
+            writer.close()
+            for future in self._waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Model host connection lost"))
+
+
+async def _main():
+    from config import config_manager
+    from model_service import ModelService
+
+    socket_path = config_manager.config.model_host_socket
+    if not socket_path:
+        raise SystemExit("Set model_host_socket to the path workers connect to")
+    service = ModelService(use_model_host=False)
+    await service.initialize()
+    server = ModelHostServer(
+        service.inference_engine.predict_rows,
+        socket_path,
+        window=config_manager.config.model_host_batch_window_ms / 1000,
+    )
+    await server.serve_forever()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    asyncio.run(_main())
@@ -0,0 +1,249 @@
+"""Model Residency
+Byte-budgeted LRU of loaded models. Model files are opened with joblib's
+mmap_mode="r" where the format allows it, so NumPy arrays stay in the page
+cache and are shared by every worker process; only each model's private
+heap bytes count against the budget, and the coldest models are unloaded
+to stay under it.
+"""
+
+import asyncio
+import logging
+import mmap
+import sys
+import time
+import types
+import warnings
+from collections import OrderedDict
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Stop walking very large object graphs; the estimate is already dominated
+# by the arrays found so far
+MAX_FOOTPRINT_OBJECTS = 500_000
+_SKIPPED_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodType,
+)
+
+
+@dataclass
+class ResidentModel:
+    """A loaded model and what keeping it costs"""
+
+    model: Any
+    private_bytes: int
+    mapped_bytes: int
+    load_seconds: float
+    loaded_at: float
+    hits: int = 0
+
+
+def load_model_file(path: str, mmap_mode: Optional[str] = "r") -> Any:
+    """joblib.load, memory-mapping arrays when the file is uncompressed"""
+    with warnings.catch_warnings():
+        # Compressed dumps cannot be mapped; joblib then loads them normally
+        warnings.filterwarnings("ignore", message=".*mmap_mode.*")
+        return joblib.load(path, mmap_mode=mmap_mode)
+
+
+def model_footprint(model: Any) -> Tuple[int, int]:
+    """(private, mapped) bytes reachable from a model
+
+    Arrays backed by a file mapping are counted as mapped; views are counted
+    once through their base. Objects without a __dict__ (e.g. Cython trees)
+    are inspected through __getstate__.
+    """
+    private = mapped = 0
+    seen: Dict[int, Any] = {}  # Holds temporaries (e.g. __getstate__ results) so ids stay unique
+    stack = [model]
+    while stack and len(seen) < MAX_FOOTPRINT_OBJECTS:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIPPED_TYPES):
+            continue
+        seen[id(obj)] = obj
+
+        if isinstance(obj, np.ndarray):
+            base = obj.base
+            if base is None:
+                private += obj.nbytes
+            elif isinstance(base, np.ndarray):
+                stack.append(base)  # Count the owner, not the view
+            elif isinstance(base, mmap.mmap):
+                mapped += obj.nbytes
+            else:
+                private += obj.nbytes  # Buffer owned by another object
+            if obj.dtype.hasobject:
+                stack.extend(obj.ravel().tolist())
+            continue
+
+        private += sys.getsizeof(obj)
+        if isinstance(obj, (str, bytes, bytearray, int, float, complex, bool)):
+            continue
+        if isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+        else:
+            try:
+                state = obj.__getstate__()
+            except Exception:  # pylint: disable=broad-exception-caught
+                continue
+            if state is not None:
+                stack.append(state)
+    return private, mapped
+
+
+class ModelResidency:
+    """LRU of loaded models bounded by their private bytes
+
+    Concurrent requests for a model that is loading share one load, which
+    runs as its own task so a cancelled caller neither cancels it nor the
+    other waiters. A model larger than the whole budget is still kept (alone) so predictions work,
+    and is the first to go when anything else loads.
+    """
+
+    def __init__(self, budget_bytes: int = 2 * 1024**3, mmap_mode: Optional[str] = "r"):
+        self.budget_bytes = budget_bytes
+        self.mmap_mode = mmap_mode
+        self._models: "OrderedDict[str, ResidentModel]" = OrderedDict()
+        self._loading: Dict[str, asyncio.Task] = {}
+        # Last measured private bytes per model, kept after eviction for prefetch
+        self._footprints: Dict[str, int] = {}
+        self.resident_bytes = 0
+        self.mapped_bytes = 0
+        self.stats = {"hits": 0, "misses": 0, "loads": 0, "evictions": 0, "load_seconds": 0.0}
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._models
+
+    def get(self, name: str) -> Optional[Any]:
+        """A resident model, marked most recently used"""
+        entry = self._models.get(name)
+        if entry is None:
+            return None
+        self._models.move_to_end(name)
+        entry.hits += 1
+        self.stats["hits"] += 1
+        return entry.model
+
+    async def load(
+        self,
+        name: str,
+        path: str,
+        executor: Optional[Executor] = None,
+        loader: Optional[Callable[[str], Any]] = None,
+    ) -> Any:
+        """Return a model, loading it off the event loop if it is not resident"""
+        model = self.get(name)
+        if model is not None:
+            return model
+        task = self._loading.get(name)
+        if task is None:
+            self.stats["misses"] += 1
+            task = asyncio.get_running_loop().create_task(self._load(name, path, executor, loader))
+            task.add_done_callback(self._loaded)
+            self._loading[name] = task
+        return await asyncio.shield(task)
+
+    async def _load(
+        self,
+        name: str,
+        path: str,
+        executor: Optional[Executor],
+        loader: Optional[Callable[[str], Any]],
+    ) -> Any:
+        try:
+            start = time.perf_counter()
+            model, private, mapped = await asyncio.get_running_loop().run_in_executor(
+                executor, self._load_and_measure, path, loader
+            )
+            self.put(name, model, private, mapped, time.perf_counter() - start)
+            return model
+        finally:
+            del self._loading[name]
+
+    @staticmethod
+    def _loaded(task: asyncio.Task):
+        if not task.cancelled():
+            task.exception()  # Waiters re-raise; a load nobody awaits any more must not warn
+
+    def put(
+        self,
+        name: str,
+        model: Any,
+        private_bytes: int,
+        mapped_bytes: int = 0,
+        load_seconds: float = 0.0,
+    ):
+        """Make a model resident, unloading the coldest ones to fit the budget"""
+        self.discard(name)
+        while self._models and self.resident_bytes + private_bytes > self.budget_bytes:
+            victim, _ = next(iter(self._models.items()))
+            self.discard(victim)
+            self.stats["evictions"] += 1
+            logger.info(f"Unloaded cold model {victim} to stay within the memory budget")
+        self._models[name] = ResidentModel(
+            model=model,
+            private_bytes=private_bytes,
+            mapped_bytes=mapped_bytes,
+            load_seconds=load_seconds,
+            loaded_at=time.time(),
+        )
+        self._footprints[name] = private_bytes
+        self.resident_bytes += private_bytes
+        self.mapped_bytes += mapped_bytes
+        self.stats["loads"] += 1
+        self.stats["load_seconds"] += load_seconds
+
+    def discard(self, name: str):
+        """Unload a model if resident"""
+        entry = self._models.pop(name, None)
+        if entry is not None:
+            self.resident_bytes -= entry.private_bytes
+            self.mapped_bytes -= entry.mapped_bytes
+
+    def fits(self, name: str) -> bool:
+        """Whether loading a model would not evict anything, by its last footprint"""
+        return self.resident_bytes + self._footprints.get(name, 0) <= self.budget_bytes
+
+    def resident_models(self) -> List[str]:
+        """Resident model names, coldest first"""
+        return list(self._models)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Residency counters and per-model footprints"""
+        loads = self.stats["loads"]
+        return {
+            **self.stats,
+            "avg_load_seconds": self.stats["load_seconds"] / loads if loads else 0.0,
+            "resident_models": len(self._models),
+            "resident_bytes": self.resident_bytes,
+            "mapped_bytes": self.mapped_bytes,
+            "budget_bytes": self.budget_bytes,
+            "models": {
+                name: {
+                    "private_bytes": entry.private_bytes,
+                    "mapped_bytes": entry.mapped_bytes,
+                    "load_seconds": entry.load_seconds,
+                    "hits": entry.hits,
+                }
+                for name, entry in self._models.items()
+            },
+        }
+
+    def _load_and_measure(
+        self, path: str, loader: Optional[Callable[[str], Any]]
+    ) -> Tuple[Any, int, int]:
+        model = loader(path) if loader else load_model_file(path, self.mmap_mode)
+        return (model, *model_footprint(model))
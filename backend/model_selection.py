@@ -0,0 +1,299 @@
+"""Model Selection Index
+Keeps the per-model parts of the ensemble selection score in NumPy arrays,
+updated when models register or their metrics change, together with a
+precomputed CV-score correlation matrix. A selection is then a vectorised
+score, a stable top-k and a greedy diversity pass, memoised per context,
+feature schema and selection settings.
+"""
+
+import math
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Dict, Hashable, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+# Composite score weights
+PERFORMANCE_WEIGHT = 0.4
+CONTEXT_WEIGHT = 0.25
+COMPATIBILITY_WEIGHT = 0.15
+RECENCY_WEIGHT = 0.1
+UNCERTAINTY_WEIGHT = 0.1
+
+DEFAULT_CONTEXT_SCORE = 0.5
+CONTEXT_WINDOW = 10  # Recent outcomes averaged per (context, model)
+MIN_CAPACITY = 16
+
+# Per-model arrays: attribute, dtype and value of a new row
+_ROW_ARRAYS = (
+    ("performance", float, 0.0),
+    ("uncertainty", float, 0.0),
+    ("updated_at", float, 0.0),
+    ("cv_mean", float, 0.0),
+    ("active", bool, True),
+    ("_cv_lengths", np.intp, 0),
+)
+
+
+@dataclass(frozen=True)
+class Selection:
+    """Selected models, best first, with their composite scores"""
+
+    models: List[str]
+    scores: List[float]
+
+
+def cv_correlations(scores: np.ndarray, lengths: np.ndarray, row: np.ndarray, n: int) -> np.ndarray:
+    """Correlation of one model's CV scores (first n of row) with every model's
+
+    Pairs are compared over their common prefix. Like
+    utils.prediction_utils.model_correlation, fewer than two shared folds
+    give 0, results are clipped to [0, 1] and an undefined correlation (a
+    constant series) reads as 1.
+    """
+    out = np.zeros(len(lengths))
+    for common in np.unique(np.minimum(lengths, n)):
+        if common < 2:
+            continue
+        members = np.flatnonzero(np.minimum(lengths, n) == common)
+        others = scores[members, :common]
+        others = others - others.mean(axis=1, keepdims=True)
+        own = row[:common] - row[:common].mean()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = (others @ own) / (np.linalg.norm(others, axis=1) * np.linalg.norm(own))
+        out[members] = np.clip(np.nan_to_num(corr, nan=1.0), 0.0, 1.0)
+    return out
+
+
+class ModelSelectionIndex:
+    """Score components and correlations for every registered model
+
+    Rows are addressed by model name and kept in registration order, which
+    breaks score ties the same way a stable sort over the registry does.
+    Recency decay is evaluated on a clock quantised to recency_resolution
+    seconds so memoised selections stay valid between ticks. The arrays are
+    views of buffers that grow geometrically, so registering a model costs
+    amortised O(n) for its correlation row and column.
+    """
+
+    def __init__(self, recency_resolution: float = 60.0, max_memo: int = 4096, clock=time.time):
+        self.recency_resolution = recency_resolution
+        self.max_memo = max_memo
+        self.clock = clock
+        self.names: List[str] = []
+        self.position: Dict[str, int] = {}
+        self._buffers = {name: np.zeros(0, dtype=dtype) for name, dtype, _ in _ROW_ARRAYS}
+        self._correlation_buffer = np.zeros((0, 0))
+        self._cv_buffer = np.zeros((0, 0))
+        self._refresh_views()
+        self._feature_sets: List[frozenset] = []
+        self._context_scores: Dict[Hashable, np.ndarray] = {}  # Full-capacity buffers
+        self._context_windows: Dict[Tuple[Hashable, str], deque] = {}
+        self._context_versions: Dict[Hashable, int] = {}
+        self._compatibility: Dict[Hashable, np.ndarray] = {}
+        self._memo: Dict[Tuple, Tuple[Tuple[int, int, int], Selection]] = {}
+        self.version = 0
+        self.stats = {"selections": 0, "memo_hits": 0}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def upsert(
+        self,
+        name: str,
+        *,
+        performance: float,
+        uncertainty: float,
+        updated_at: float,
+        cv_scores: Sequence[float] = (),
+        feature_names: Iterable[str] = (),
+        active: bool = True,
+    ):
+        """Add a model or replace its static score components"""
+        i = self.position.get(name)
+        if i is None:
+            i = self._append_row(name)
+        self.performance[i] = performance
+        self.uncertainty[i] = uncertainty
+        self.updated_at[i] = updated_at
+        self.active[i] = active
+        self._feature_sets[i] = frozenset(feature_names)
+        self._set_cv_scores(i, np.asarray(cv_scores, dtype=float).ravel())
+        self._compatibility.clear()
+        self._invalidate()
+
+    def update_metrics(self, name: str, *, performance: float, uncertainty: float, updated_at: float):
+        """Refresh the metric-derived components of one model"""
+        i = self.position[name]
+        self.performance[i] = performance
+        self.uncertainty[i] = uncertainty
+        self.updated_at[i] = updated_at
+        self._invalidate()
+
+    def record_context_score(self, context: Hashable, name: str, score: float):
+        """Add an outcome to a model's rolling performance in a context"""
+        i = self.position[name]
+        window = self._context_windows.get((context, name))
+        if window is None:
+            window = self._context_windows[(context, name)] = deque(maxlen=CONTEXT_WINDOW)
+        window.append(float(score))
+        self._context_row(context)[i] = math.fsum(window) / len(window)
+        self._context_versions[context] = self._context_versions.get(context, 0) + 1
+
+    def scores(self, context: Hashable, schema: Sequence[str], half_life_hours: float) -> np.ndarray:
+        """Composite score of every model (inactive ones included)"""
+        now = math.floor(self.clock() / self.recency_resolution) * self.recency_resolution
+        age_hours = (now - self.updated_at) / 3600.0
+        return (
+            PERFORMANCE_WEIGHT * self.performance
+            + CONTEXT_WEIGHT * self._context_row(context)
+            + COMPATIBILITY_WEIGHT * self._compatibility_row(schema)
+            + RECENCY_WEIGHT * np.exp(-age_hours / half_life_hours)
+            + UNCERTAINTY_WEIGHT * self.uncertainty
+        )
+
+    def select(
+        self,
+        context: Hashable,
+        schema: Sequence[str],
+        *,
+        strategy: str,
+        max_models: int,
+        min_models: int,
+        diversity_threshold: float,
+        half_life_hours: float,
+    ) -> Selection:
+        """Top models by composite score (blended with CV means for stacking), diversified"""
+        self.stats["selections"] += 1
+        schema = tuple(schema)
+        key = (context, schema, strategy, max_models, min_models, diversity_threshold, half_life_hours)
+        epoch = int(self.clock() // self.recency_resolution)
+        stamp = (self.version, self._context_versions.get(context, 0), epoch)
+        cached = self._memo.get(key)
+        if cached is not None and cached[0] == stamp:
+            self.stats["memo_hits"] += 1
+            return cached[1]
+
+        candidates = np.flatnonzero(self.active)
+        composite = self.scores(context, schema, half_life_hours)[candidates]
+        if len(candidates) <= min_models:
+            selection = Selection([self.names[i] for i in candidates], composite.tolist())
+        else:
+            ranking = composite
+            if strategy == "stacking":
+                ranking = composite * 0.5 + self.cv_mean[candidates] * 0.5
+            top = np.argsort(-ranking, kind="stable")[:max_models]
+            chosen = self._diversify(candidates[top], diversity_threshold)
+            lookup = dict(zip(candidates.tolist(), composite.tolist()))
+            selection = Selection([self.names[i] for i in chosen], [lookup[i] for i in chosen])
+
+        if len(self._memo) >= self.max_memo:
+            self._memo.clear()
+        self._memo[key] = (stamp, selection)
+        return selection
+
+    def top_by_cv(self, limit: int) -> List[str]:
+        """Active models with the best mean CV score"""
+        candidates = np.flatnonzero(self.active)
+        order = np.argsort(-self.cv_mean[candidates], kind="stable")[:limit]
+        return [self.names[i] for i in candidates[order]]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Index size and memo effectiveness"""
+        selections = self.stats["selections"]
+        return {
+            **self.stats,
+            "models": len(self.names),
+            "active_models": int(self.active.sum()),
+            "memo_hit_rate": self.stats["memo_hits"] / selections if selections else 0.0,
+            "memo_entries": len(self._memo),
+        }
+
+    def _diversify(self, ranked: np.ndarray, diversity_threshold: float) -> List[int]:
+        """Greedily keep models not too correlated with any better one already kept"""
+        ranked = ranked.tolist()
+        if len(ranked) <= 2:
+            return ranked
+        limit = 1 - diversity_threshold
+        kept = [ranked[0]]
+        for i in ranked[1:]:
+            if self.correlation[i, kept].max() <= limit:
+                kept.append(i)
+        return kept
+
+    def _append_row(self, name: str) -> int:
+        i = len(self.names)
+        if i == len(self._cv_buffer):
+            self._grow(max(MIN_CAPACITY, 2 * i))
+        self.names.append(name)
+        self.position[name] = i
+        for attribute, _, initial in _ROW_ARRAYS:
+            self._buffers[attribute][i] = initial
+        self._cv_buffer[i] = 0.0
+        self._correlation_buffer[i, : i + 1] = 0.0
+        self._correlation_buffer[: i + 1, i] = 0.0
+        self._feature_sets.append(frozenset())
+        for row in self._context_scores.values():
+            row[i] = DEFAULT_CONTEXT_SCORE
+        self._refresh_views()
+        return i
+
+    def _grow(self, capacity: int):
+        """Move every per-model buffer to a larger capacity"""
+        n = len(self.names)
+        for attribute, dtype, _ in _ROW_ARRAYS:
+            buffer = np.zeros(capacity, dtype=dtype)
+            buffer[:n] = self._buffers[attribute][:n]
+            self._buffers[attribute] = buffer
+        correlation = np.zeros((capacity, capacity))
+        correlation[:n, :n] = self._correlation_buffer[:n, :n]
+        self._correlation_buffer = correlation
+        cv = np.zeros((capacity, self._cv_buffer.shape[1]))
+        cv[:n] = self._cv_buffer[:n]
+        self._cv_buffer = cv
+        for context, row in self._context_scores.items():
+            self._context_scores[context] = np.concatenate([row[:n], np.empty(capacity - n)])
+
+    def _refresh_views(self):
+        """Point the public arrays at the registered rows of the buffers"""
+        n = len(self.names)
+        for attribute, _, _ in _ROW_ARRAYS:
+            setattr(self, attribute, self._buffers[attribute][:n])
+        self.correlation = self._correlation_buffer[:n, :n]
+        self._cv_scores = self._cv_buffer[:n]
+
+    def _set_cv_scores(self, i: int, cv: np.ndarray):
+        if len(cv) > self._cv_buffer.shape[1]:
+            self._cv_buffer = np.pad(self._cv_buffer, ((0, 0), (0, len(cv) - self._cv_buffer.shape[1])))
+            self._refresh_views()
+        self._cv_scores[i] = 0.0
+        self._cv_scores[i, : len(cv)] = cv
+        self._cv_lengths[i] = len(cv)
+        self.cv_mean[i] = cv.mean() if len(cv) else 0.0
+        row = cv_correlations(self._cv_scores, self._cv_lengths, self._cv_scores[i], len(cv))
+        self.correlation[i, :] = row
+        self.correlation[:, i] = row
+
+    def _context_row(self, context: Hashable) -> np.ndarray:
+        row = self._context_scores.get(context)
+        if row is None:
+            row = self._context_scores[context] = np.full(len(self._cv_buffer), DEFAULT_CONTEXT_SCORE)
+        return row[: len(self.names)]
+
+    def _compatibility_row(self, schema: Sequence[str]) -> np.ndarray:
+        """Share of each model's expected features present in a request schema"""
+        key = schema if isinstance(schema, tuple) else tuple(schema)
+        row = self._compatibility.get(key)
+        if row is None:
+            provided = frozenset(key)
+            row = np.array(
+                [len(expected & provided) / len(expected) if expected else 1.0 for expected in self._feature_sets]
+            )
+            if len(self._compatibility) >= self.max_memo:
+                self._compatibility.clear()
+            self._compatibility[key] = row
+        return row
+
+    def _invalidate(self):
+        self.version += 1
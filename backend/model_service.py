@@ -13,14 +13,23 @@ from datetime import datetime, timezone, timedelta
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Tuple, Union
 
-import joblib
 import numpy as np
 from config import config_manager
 from database import ModelPerformance, PredictionModel, db_manager
 from feature_engineering import FeatureEngineering
+from feature_layout import FeatureLayoutRegistry
+from model_host import ModelHostClient
+from model_residency import ModelResidency
 
 logger = logging.getLogger(__name__)
 
+JOBLIB_MODEL_TYPES = ("xgboost", "lightgbm", "random_forest")
+
+
+def _load_pickle(path: str) -> Any:
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
 
 @dataclass
 class ModelMetadata:
@@ -80,14 +89,20 @@ class EnsemblePrediction:
 class ModelLoader:
     """Model loading and caching utility"""
 
-    def __init__(self, models_directory: str):
+    def __init__(
+        self, models_directory: str, memory_budget_mb: float = 2048.0, mmap: bool = True
+    ):
         self.models_directory = Path(models_directory)
-        self.loaded_models: Dict[str, Any] = {}
+        # Loaded models: joblib arrays memory-mapped, coldest unloaded past the budget
+        self.residency = ModelResidency(
+            budget_bytes=int(memory_budget_mb * 1024**2), mmap_mode="r" if mmap else None
+        )
         self.model_metadata: Dict[str, ModelMetadata] = {}
+        self.feature_layouts = FeatureLayoutRegistry()
         self.executor = ThreadPoolExecutor(max_workers=4)
 
-    async def load_model(self, metadata: ModelMetadata) -> bool:
-        """Load a model into memory"""
+    async def load_model(self, metadata: ModelMetadata, preload: bool = True) -> bool:
+        """Register a model and load it into memory (on first use if not preload)"""
         try:
             model_path = self.models_directory / metadata.file_path
 
@@ -95,23 +110,20 @@ class ModelLoader:
                 logger.error("Model file not found: {model_path}")
                 return False
 
-            # Load model in thread pool to avoid blocking
-            loop = asyncio.get_event_loop()
-
-            if metadata.model_type in ["xgboost", "lightgbm", "random_forest"]:
-                model = await loop.run_in_executor(
-                    self.executor, joblib.load, str(model_path)
-                )
-            elif metadata.model_type == "neural_net":
-                # For neural networks, you might use different loading
-                model = await loop.run_in_executor(
-                    self.executor, pickle.load, open(model_path, "rb")
-                )
-            else:
+            if metadata.model_type not in (*JOBLIB_MODEL_TYPES, "neural_net"):
                 raise ValueError(f"Unsupported model type: {metadata.model_type}")
 
-            self.loaded_models[metadata.name] = model
+            self.residency.discard(metadata.name)  # A new version replaces the old
             self.model_metadata[metadata.name] = metadata
+            self.feature_layouts.register(
+                metadata.name,
+                metadata.features,
+                metadata.preprocessing_config.get("feature_defaults"),
+                metadata.preprocessing_config.get("dtype"),
+            )
+
+            if preload:
+                await self.acquire(metadata.name)
 
             logger.info("Loaded model {metadata.name} v{metadata.version}")
             return True
@@ -122,29 +134,44 @@ class ModelLoader:
 
     async def unload_model(self, model_name: str):
         """Unload a model from memory"""
-        if model_name in self.loaded_models:
-            del self.loaded_models[model_name]
+        if model_name in self.model_metadata:
             del self.model_metadata[model_name]
+            self.residency.discard(model_name)
+            self.feature_layouts.unregister(model_name)
             logger.info("Unloaded model {model_name}")
 
+    async def acquire(self, model_name: str) -> Optional[Any]:
+        """Get a registered model, loading it off the event loop if not resident"""
+        metadata = self.model_metadata.get(model_name)
+        if metadata is None:
+            return None
+        return await self.residency.load(
+            model_name,
+            str(self.models_directory / metadata.file_path),
+            self.executor,
+            None if metadata.model_type in JOBLIB_MODEL_TYPES else _load_pickle,
+        )
+
     def get_model(self, model_name: str) -> Optional[Any]:
-        """Get loaded model"""
-        return self.loaded_models.get(model_name)
+        """Get model if resident"""
+        return self.residency.get(model_name)
 
     def get_metadata(self, model_name: str) -> Optional[ModelMetadata]:
         """Get model metadata"""
         return self.model_metadata.get(model_name)
 
     def list_loaded_models(self) -> List[str]:
-        """List all loaded models"""
-        return list(self.loaded_models.keys())
+        """List all registered models, resident or loadable on demand"""
+        return list(self.model_metadata.keys())
 
 
 class ModelInferenceEngine:
     """Core model inference engine"""
 
-    def __init__(self, model_loader: ModelLoader):
+    def __init__(self, model_loader: ModelLoader, host_client: Optional[ModelHostClient] = None):
         self.model_loader = model_loader
+        # Set when a shared model host owns the models; only metadata is kept here
+        self.host_client = host_client
         self.feature_engineer = FeatureEngineering()
         self.inference_stats = {
             "total_predictions": 0,
@@ -164,32 +191,40 @@ class ModelInferenceEngine:
         start_time = time.time()
 
         try:
-            model = self.model_loader.get_model(model_name)
             metadata = self.model_loader.get_metadata(model_name)
-
-            if not model or not metadata:
+            if not metadata:
                 logger.error("Model {model_name} not loaded")
                 return None
 
             # Prepare features
-            feature_array = self._prepare_features(features, metadata.features)
+            feature_array = self._prepare_features(model_name, features)
             if feature_array is None:
                 return None
 
-            # Make prediction
-            loop = asyncio.get_event_loop()
-            prediction = await loop.run_in_executor(
-                self.model_loader.executor,
-                self._predict_with_model,
-                model,
-                feature_array,
-                metadata.model_type,
-            )
+            if self.host_client is not None and not require_explanations:
+                # Batched with other workers' requests in the model host
+                result = await self.host_client.predict(model_name, feature_array)
+                prediction, confidence = result[0]
+            else:
+                model = await self.model_loader.acquire(model_name)
+                if not model:
+                    logger.error("Model {model_name} not loaded")
+                    return None
+
+                # Make prediction
+                loop = asyncio.get_event_loop()
+                prediction = await loop.run_in_executor(
+                    self.model_loader.executor,
+                    self._predict_with_model,
+                    model,
+                    feature_array,
+                    metadata.model_type,
+                )
 
-            # Calculate confidence (model-specific logic)
-            confidence = self._calculate_confidence(
-                model, feature_array, metadata.model_type
-            )
+                # Calculate confidence (model-specific logic)
+                confidence = self._calculate_confidence(
+                    model, feature_array, metadata.model_type
+                )
 
             # Feature importance and SHAP values (if requested)
             feature_importance = {}
@@ -214,7 +249,7 @@ class ModelInferenceEngine:
                 model_name=model_name,
                 model_version=metadata.version,
                 predicted_value=float(prediction),
-                confidence=confidence,
+                confidence=float(confidence),
                 feature_importance=feature_importance,
                 shap_values=shap_values,
                 processing_time=processing_time,
@@ -307,61 +342,87 @@ class ModelInferenceEngine:
             raise
 
     def _prepare_features(
-        self, features: Dict[str, Union[float, int]], expected_features: List[str]
+        self, model_name: str, features: Dict[str, Union[float, int]]
     ) -> Optional[np.ndarray]:
         """Prepare features for model input"""
         try:
-            # Ensure all required features are present
-            feature_vector = []
-            for feature_name in expected_features:
-                if feature_name in features:
-                    feature_vector.append(float(features[feature_name]))
-                else:
-                    logger.warning("Missing feature: {feature_name}")
-                    feature_vector.append(0.0)  # Default value
-
-            return np.array(feature_vector).reshape(1, -1)
+            # Layout compiled at load; absent features take its defaults and are counted
+            layout = self.model_loader.feature_layouts.get(model_name)
+            if layout is None:
+                logger.error(f"No feature layout for model {model_name}")
+                return None
+            return layout.row(features)
 
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Error preparing features: {e!s}")
             return None
 
+    async def predict_rows(self, model_name: str, rows: np.ndarray) -> np.ndarray:
+        """(prediction, confidence) per row of prepared features, in one model call
+
+        Served by the model host to every worker's requests for a model.
+        """
+        model = await self.model_loader.acquire(model_name)
+        metadata = self.model_loader.get_metadata(model_name)
+        if not model or not metadata:
+            raise ValueError(f"Model {model_name} not loaded")
+
+        def run() -> np.ndarray:
+            predictions = self._predict_rows_with_model(model, rows, metadata.model_type)
+            confidences = self._confidence_rows(model, rows, metadata.model_type)
+            return np.column_stack([predictions, confidences])
+
+        loop = asyncio.get_event_loop()
+        result = await loop.run_in_executor(self.model_loader.executor, run)
+        usage = self.inference_stats["model_usage"]
+        usage[model_name] = usage.get(model_name, 0) + len(rows)
+        return result
+
     def _predict_with_model(
         self, model: Any, features: np.ndarray, model_type: str
     ) -> float:
         """Make prediction with specific model type"""
+        return float(self._predict_rows_with_model(model, features, model_type)[0])
+
+    def _predict_rows_with_model(
+        self, model: Any, rows: np.ndarray, model_type: str
+    ) -> np.ndarray:
+        """Predictions for every row in one model call"""
         if model_type in ["xgboost", "lightgbm", "random_forest"]:
-            prediction = model.predict(features)[0]
+            predictions = model.predict(rows)
         elif model_type == "neural_net":
-            prediction = model.predict(features)[0][0]  # Assuming single output
+            # Assuming single output
+            predictions = np.asarray(model.predict(rows)).reshape(len(rows), -1)[:, 0]
         else:
             raise ValueError(f"Unsupported model type: {model_type}")
 
-        return float(prediction)
+        return np.asarray(predictions, dtype=np.float64).ravel()
 
     def _calculate_confidence(
         self, model: Any, features: np.ndarray, model_type: str
     ) -> float:
         """Calculate prediction confidence"""
+        return float(self._confidence_rows(model, features, model_type)[0])
+
+    def _confidence_rows(
+        self, model: Any, rows: np.ndarray, model_type: str
+    ) -> np.ndarray:
+        """Prediction confidence for every row"""
         try:
             if model_type == "random_forest":
                 # Use prediction variance across trees
-                predictions = np.array(
-                    [tree.predict(features)[0] for tree in model.estimators_]
-                )
-                variance = np.var(predictions)
-                confidence = max(0.1, 1.0 - min(variance, 1.0))
+                predictions = np.array([tree.predict(rows) for tree in model.estimators_])
+                variance = np.var(predictions, axis=0)
+                return np.maximum(0.1, 1.0 - np.minimum(variance, 1.0))
             elif model_type in ["xgboost", "lightgbm"]:
                 # Use feature importance as proxy for confidence
-                confidence = 0.8  # Default confidence
+                return np.full(len(rows), 0.8)  # Default confidence
             else:
-                confidence = 0.7  # Default confidence
-
-            return float(confidence)
+                return np.full(len(rows), 0.7)  # Default confidence
 
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.warning("Error calculating confidence: {e!s}")
-            return 0.5
+            return np.full(len(rows), 0.5)
 
     async def _get_feature_importance(
         self,
@@ -434,10 +495,17 @@ class ModelInferenceEngine:
 class ModelService:
     """Main model service with health monitoring and persistence"""
 
-    def __init__(self):
+    def __init__(self, use_model_host: bool = True):
         self.config = config_manager
-        self.model_loader = ModelLoader(self.config.config.model_path)
-        self.inference_engine = ModelInferenceEngine(self.model_loader)
+        self.model_loader = ModelLoader(
+            self.config.config.model_path,
+            self.config.config.model_memory_budget_mb,
+            self.config.config.model_mmap,
+        )
+        # Workers defer to a shared model host when one is configured
+        socket_path = self.config.config.model_host_socket if use_model_host else None
+        self.host_client = ModelHostClient(socket_path) if socket_path else None
+        self.inference_engine = ModelInferenceEngine(self.model_loader, self.host_client)
         self._initialized = False
 
     async def initialize(self):
@@ -482,6 +550,9 @@ class ModelService:
             "loaded_models": len(loaded_models),
             "models": {},
             "inference_stats": self.inference_engine.inference_stats,
+            "feature_layouts": self.model_loader.feature_layouts.get_stats(),
+            "model_residency": self.model_loader.residency.get_stats(),
+            "model_host": self.host_client.get_stats() if self.host_client else None,
             "system_resources": await self._get_system_resources(),
         }
 
@@ -511,7 +582,9 @@ class ModelService:
             model_configs = await self._discover_models()
             for config in model_configs:
                 if config.name == model_name:
-                    return await self.model_loader.load_model(config)
+                    return await self.model_loader.load_model(
+                        config, preload=self.host_client is None
+                    )
 
             logger.error("Model configuration not found: {model_name}")
             return False
@@ -521,14 +594,16 @@ class ModelService:
             return False
 
     async def _load_default_models(self):
-        """Load default models on startup"""
-        model_configs = await self._discover_models()
+        """Register models on startup, loading only the highest-weighted ones"""
+        model_configs = [config for config in await self._discover_models() if config.is_active]
+        model_configs.sort(key=lambda config: config.weight, reverse=True)
+        # With a model host, workers only need metadata and feature layouts
+        preload = 0 if self.host_client else self.config.config.model_preload_count
 
-        for config in model_configs:
-            if config.is_active:
-                success = await self.model_loader.load_model(config)
-                if not success:
-                    logger.warning("Failed to load model: {config.name}")
+        for rank, config in enumerate(model_configs):
+            success = await self.model_loader.load_model(config, preload=rank < preload)
+            if not success:
+                logger.warning("Failed to load model: {config.name}")
 
     async def _discover_models(self) -> List[ModelMetadata]:
         """Discover available models from filesystem"""
@@ -608,7 +683,8 @@ class ModelService:
                 for model_name in new_models:
                     config = next(c for c in available_models if c.name == model_name)
                     if config.is_active:
-                        await self.model_loader.load_model(config)
+                        # Behind a model host, workers register metadata only
+                        await self.model_loader.load_model(config, preload=self.host_client is None)
 
                 # Unload removed models
                 removed_models = current_models - available_names
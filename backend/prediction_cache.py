@@ -0,0 +1,141 @@
+"""Prediction Cache
+Two-tier cache for ensemble predictions keyed by content rather than by
+Python's per-process hash(), so workers and restarts share Redis entries.
+Feature values are rounded before hashing so float noise below the
+configured precision still hits.
+"""
+
+import hashlib
+import json
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+from cache_codecs import CacheCodec, default_codec
+from cache_optimizer import CacheStrategy, InMemoryCache
+
+logger = logging.getLogger(__name__)
+
+KEY_VERSION = b"v1"
+
+
+def fingerprint(value: Any) -> str:
+    """Stable digest of a JSON-representable value (enums and dates via str)"""
+    canonical = json.dumps(value, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode(), digest_size=8).hexdigest()
+
+
+def prediction_cache_key(
+    features: Any,
+    context: str,
+    config_fingerprint: str,
+    model_set_version: str,
+    decimals: int = 6,
+) -> str:
+    """Content-addressed key for one prediction request
+
+    Dict features are hashed in name order and arrays in their own order;
+    values are rounded to ``decimals`` places with -0.0 folded into 0.0.
+    """
+    digest = hashlib.blake2b(KEY_VERSION, digest_size=16)
+    digest.update(f"|{context}|{config_fingerprint}|{model_set_version}|".encode())
+    try:
+        if isinstance(features, dict):
+            names = sorted(features)
+            digest.update("\x1f".join(names).encode())
+            values = np.fromiter(map(features.get, names), dtype=np.float64, count=len(names))
+        else:
+            values = np.asarray(features, dtype=np.float64)
+            digest.update(repr(values.shape).encode())
+    except (TypeError, ValueError):
+        # Non-numeric values are hashed verbatim, without rounding
+        digest.update(fingerprint(features).encode())
+        return digest.hexdigest()
+    digest.update((np.round(values, decimals) + 0.0).tobytes())
+    return digest.hexdigest()
+
+
+class PredictionCache:
+    """Bounded local tier in front of an optional shared Redis tier
+
+    Hits and misses are counted per prediction context. A Redis hit is
+    copied into the local tier; Redis errors read as misses so a cache
+    outage never fails a prediction.
+    """
+
+    def __init__(
+        self,
+        redis_client: Any = None,
+        local_max_size: int = 1000,
+        ttl_seconds: int = 300,
+        key_prefix: str = "ensemble:prediction",
+        codec: Optional[CacheCodec] = None,
+    ):
+        self.redis_client = redis_client
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self.codec = codec or default_codec
+        self.local = InMemoryCache(max_size=local_max_size, strategy=CacheStrategy.LRU)
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"local_hits": 0, "redis_hits": 0, "misses": 0, "errors": 0}
+        )
+
+    async def get(self, key: str, context: str) -> Tuple[Optional[Any], Optional[str]]:
+        """Cached value and the tier that served it ("local" or "redis")"""
+        stats = self.stats[context]
+        value = self.local.get(key)
+        if value is not None:
+            stats["local_hits"] += 1
+            return value, "local"
+
+        if self.redis_client is not None:
+            try:
+                payload = await self.redis_client.get(f"{self.key_prefix}:{key}")
+                if payload:
+                    value = self.codec.decode(payload)
+                    self.local.set(key, value, ttl=self.ttl_seconds)
+                    stats["redis_hits"] += 1
+                    return value, "redis"
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                stats["errors"] += 1
+                logger.warning(f"Prediction cache read failed: {e!s}")
+
+        stats["misses"] += 1
+        return None, None
+
+    async def set(self, key: str, value: Any):
+        """Store a value in both tiers, serializing it once"""
+        try:
+            encoded = self.codec.encode(value)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning(f"Prediction not cacheable: {e!s}")
+            return
+        self.local.set(key, value, ttl=self.ttl_seconds, encoded=encoded)
+        if self.redis_client is not None:
+            try:
+                await self.redis_client.set(
+                    f"{self.key_prefix}:{key}", encoded.payload, ex=self.ttl_seconds
+                )
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.warning(f"Prediction cache write failed: {e!s}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hit rates per context plus local tier occupancy"""
+        contexts = {}
+        for context, stats in self.stats.items():
+            hits = stats["local_hits"] + stats["redis_hits"]
+            lookups = hits + stats["misses"]
+            contexts[context] = {
+                **stats,
+                "hit_rate": hits / lookups if lookups else 0.0,
+            }
+        local = self.local.get_stats()
+        return {
+            "contexts": contexts,
+            "local_entries": local["total_entries"],
+            "local_max_size": local["max_size"],
+            "local_evictions": local["evictions"],
+            "ttl_seconds": self.ttl_seconds,
+            "shared": self.redis_client is not None,
+        }
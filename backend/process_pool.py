@@ -0,0 +1,340 @@
+"""Process Pool for CPU-bound Tasks
+Warm worker processes that run task functions by importable name, receive
+large NumPy arguments through shared memory, enforce per-task memory caps and
+can be killed when a task overruns its timeout.
+"""
+
+import asyncio
+import importlib
+import logging
+import multiprocessing as mp
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows: no address-space limits
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# Per-process state filled by preloading in each worker
+worker_state: Dict[str, Any] = {"models": {}}
+
+
+class SharedArray(NamedTuple):
+    """Reference to a NumPy array placed in shared memory"""
+
+    name: str
+    shape: Tuple[int, ...]
+    dtype: str
+
+
+def resolve_function(path: str) -> Callable:
+    """Import "package.module:function" (or "package.module.function")"""
+    module_name, _, attr = path.partition(":") if ":" in path else path.rpartition(".")
+    function = importlib.import_module(module_name)
+    for part in attr.split("."):
+        function = getattr(function, part)
+    return function
+
+
+def preloaded_model(name: str) -> Any:
+    """Model loaded into this worker process at startup"""
+    return worker_state["models"][name]
+
+
+def share_arrays(
+    value: Any, blocks: List[shared_memory.SharedMemory], threshold: int
+) -> Any:
+    """Move arrays of at least threshold bytes into shared memory blocks"""
+    if isinstance(value, np.ndarray) and value.nbytes >= threshold and value.dtype != object:
+        block = shared_memory.SharedMemory(create=True, size=max(value.nbytes, 1))
+        np.ndarray(value.shape, dtype=value.dtype, buffer=block.buf)[...] = value
+        blocks.append(block)
+        return SharedArray(block.name, value.shape, value.dtype.str)
+    if isinstance(value, dict):
+        return {key: share_arrays(item, blocks, threshold) for key, item in value.items()}
+    if isinstance(value, (list, tuple)) and not isinstance(value, SharedArray):
+        return type(value)(share_arrays(item, blocks, threshold) for item in value)
+    return value
+
+
+def attach_arrays(value: Any, blocks: List[shared_memory.SharedMemory]) -> Any:
+    """Replace SharedArray references with zero-copy views"""
+    if isinstance(value, SharedArray):
+        block = shared_memory.SharedMemory(name=value.name)
+        blocks.append(block)
+        return np.ndarray(value.shape, dtype=np.dtype(value.dtype), buffer=block.buf)
+    if isinstance(value, dict):
+        return {key: attach_arrays(item, blocks) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(attach_arrays(item, blocks) for item in value)
+    return value
+
+
+def _address_space_bytes() -> int:
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[0]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@contextmanager
+def _memory_cap(limit_mb: Optional[float]):
+    """Cap address space growth at limit_mb for the duration of a task"""
+    if not limit_mb or resource is None or not os.path.exists("/proc/self/statm"):
+        yield
+        return
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_AS)
+    cap = _address_space_bytes() + int(limit_mb * 1024 * 1024)
+    if hard != resource.RLIM_INFINITY:
+        cap = min(cap, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (cap, hard))
+    try:
+        yield
+    finally:
+        resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
+
+
+def _worker_main(conn, model_paths: Dict[str, str], initializers: Iterable[str]):
+    """Worker process loop: preload, then run tasks sent over the pipe"""
+    try:
+        if model_paths:
+            import joblib
+
+            for name, path in model_paths.items():
+                worker_state["models"][name] = joblib.load(path)
+        for initializer in initializers:
+            resolve_function(initializer)()
+        conn.send(("ready", os.getpid()))
+    except BaseException as e:  # pylint: disable=broad-exception-caught
+        conn.send(("error", f"Worker preload failed: {e!s}", traceback.format_exc()))
+        return
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            return
+        if message is None:
+            return
+
+        function_path, args, kwargs, memory_limit_mb = message
+        blocks: List[shared_memory.SharedMemory] = []
+        try:
+            function = resolve_function(function_path)
+            args = attach_arrays(args, blocks)
+            kwargs = attach_arrays(kwargs, blocks)
+            with _memory_cap(memory_limit_mb):
+                result = function(*args, **kwargs)
+            # Send before closing blocks: the result may view shared arrays
+            conn.send(("ok", result))
+        except BaseException as e:  # pylint: disable=broad-exception-caught
+            conn.send(("error", f"{type(e).__name__}: {e!s}", traceback.format_exc()))
+        finally:
+            args = kwargs = result = None
+            for block in blocks:
+                try:
+                    block.close()
+                except BufferError:
+                    pass  # A view escaped the task; the mapping goes with the process
+
+
+class ProcessTaskError(Exception):
+    """A task raised inside a worker process"""
+
+    def __init__(self, message: str, remote_traceback: str = ""):
+        super().__init__(message)
+        self.remote_traceback = remote_traceback
+
+
+class _WorkerSlot:
+    def __init__(self, index: int):
+        self.index = index
+        self.process: Optional[mp.Process] = None
+        self.conn = None
+        self.pid: Optional[int] = None
+
+
+class ProcessTaskPool:
+    """Pool of warm worker processes for CPU-bound task functions
+
+    Each worker preloads models (joblib paths) and runs initializers once
+    at startup. Arrays of at least share_threshold bytes travel through
+    shared memory instead of the pipe. A task that overruns its timeout, or
+    whose caller is cancelled, has its process killed and replaced, so the
+    pool never keeps running work nobody is waiting for and a late reply
+    can never be read by the slot's next task.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        model_paths: Optional[Dict[str, str]] = None,
+        initializers: Iterable[str] = (),
+        share_threshold: int = 1 << 16,
+        mp_context: Optional[str] = None,
+    ):
+        self.workers = workers or max(1, (os.cpu_count() or 2) // 2)
+        self.model_paths = dict(model_paths or {})
+        self.initializers = tuple(initializers)
+        self.share_threshold = share_threshold
+        self._context = mp.get_context(mp_context)
+        self._slots = [_WorkerSlot(i) for i in range(self.workers)]
+        self._idle: Optional[asyncio.Queue] = None
+        self._io = ThreadPoolExecutor(
+            max_workers=self.workers, thread_name_prefix="process-pool-io"
+        )
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timed_out": 0,
+            "cancelled": 0,
+            "restarts": 0,
+            "shared_bytes": 0,
+        }
+
+    async def start(self):
+        """Spawn and preload every worker"""
+        if self._idle is not None:
+            return
+        self._idle = asyncio.Queue()
+        await asyncio.gather(*(self._spawn(slot) for slot in self._slots))
+        for slot in self._slots:
+            self._idle.put_nowait(slot)
+
+    async def run(
+        self,
+        function_path: str,
+        args: Iterable[Any] = (),
+        kwargs: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        memory_limit_mb: Optional[float] = None,
+    ) -> Any:
+        """Run a function by importable name in a worker process"""
+        if self._idle is None:
+            await self.start()
+
+        self.stats["submitted"] += 1
+        slot = await self._idle.get()
+        blocks: List[shared_memory.SharedMemory] = []
+        healthy = True
+        try:
+            if slot.process is None or not slot.process.is_alive():
+                await self._respawn(slot)
+
+            shared_args = share_arrays(tuple(args), blocks, self.share_threshold)
+            shared_kwargs = share_arrays(dict(kwargs or {}), blocks, self.share_threshold)
+            self.stats["shared_bytes"] += sum(block.size for block in blocks)
+            # Until the reply is read the slot is unhealthy: on any exit the
+            # worker may still be running the task or have a reply in the pipe
+            healthy = False
+            slot.conn.send((function_path, shared_args, shared_kwargs, memory_limit_mb))
+
+            loop = asyncio.get_running_loop()
+            try:
+                reply = await asyncio.wait_for(
+                    loop.run_in_executor(self._io, self._receive, slot.conn), timeout
+                )
+            except asyncio.TimeoutError:
+                self.stats["timed_out"] += 1
+                logger.warning(
+                    f"Task {function_path} exceeded {timeout}s; killing worker {slot.pid}"
+                )
+                raise
+            except asyncio.CancelledError:
+                self.stats["cancelled"] += 1
+                logger.warning(f"Task {function_path} cancelled; killing worker {slot.pid}")
+                raise
+            healthy = reply is not None
+
+            if reply is None:
+                self.stats["failed"] += 1
+                raise ProcessTaskError(f"Worker {slot.pid} died running {function_path}")
+            if reply[0] == "error":
+                self.stats["failed"] += 1
+                raise ProcessTaskError(reply[1], reply[2])
+
+            self.stats["completed"] += 1
+            return reply[1]
+
+        finally:
+            for block in blocks:
+                block.close()
+                block.unlink()
+            if not healthy:
+                self._kill(slot)
+            self._idle.put_nowait(slot)
+
+    def close(self):
+        """Stop every worker process"""
+        for slot in self._slots:
+            if slot.conn is not None:
+                try:
+                    slot.conn.send(None)
+                except (OSError, ValueError):
+                    pass
+            if slot.process is not None:
+                slot.process.join(timeout=1)
+            self._kill(slot)
+        self._io.shutdown(wait=False)
+        self._idle = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Task counters and live worker pids"""
+        return {
+            **self.stats,
+            "workers": self.workers,
+            "alive": sum(
+                1 for slot in self._slots if slot.process is not None and slot.process.is_alive()
+            ),
+        }
+
+    @staticmethod
+    def _receive(conn) -> Optional[tuple]:
+        try:
+            return conn.recv()
+        except (EOFError, OSError):
+            return None
+
+    async def _spawn(self, slot: _WorkerSlot):
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main,
+            args=(child_conn, self.model_paths, self.initializers),
+            name=f"task-worker-{slot.index}",
+            daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        slot.process, slot.conn = process, parent_conn
+
+        reply = await asyncio.get_running_loop().run_in_executor(
+            self._io, self._receive, parent_conn
+        )
+        if reply is None or reply[0] != "ready":
+            self._kill(slot)
+            detail = reply[1] if reply else "process exited"
+            raise ProcessTaskError(f"Worker {slot.index} failed to start: {detail}")
+        slot.pid = reply[1]
+
+    async def _respawn(self, slot: _WorkerSlot):
+        self._kill(slot)
+        self.stats["restarts"] += 1
+        await self._spawn(slot)
+
+    @staticmethod
+    def _kill(slot: _WorkerSlot):
+        if slot.process is not None and slot.process.is_alive():
+            slot.process.kill()
+            slot.process.join(timeout=5)
+        if slot.conn is not None:
+            slot.conn.close()
+        slot.process = slot.conn = slot.pid = None
@@ -5,16 +5,21 @@ High-frequency data processing, stream analytics, and real-time prediction updat
 import asyncio
 import json
 import logging
+import time
 import uuid
-from collections import defaultdict, deque
+from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Set
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
 
-import aioredis
+import redis.asyncio as redis
+from arbitrage_engine import ArbitrageEvent, ArbitrageEventType, ultra_arbitrage_engine
 from config import config_manager
 from ensemble_engine import PredictionContext, ultra_ensemble_engine
+from micro_batcher import MicroBatcher
+from stream_fanout import SendQueue, SlowConsumerPolicy, SubscriptionIndex
+from timer_wheel import TimerWheel
 
 logger = logging.getLogger(__name__)
 
@@ -43,6 +48,26 @@ class UpdatePriority(str, Enum):
     LOW = "low"  # Social sentiment, background data
 
 
+# Streams where a newer queued update for the same key supersedes an older one
+CONFLATABLE_STREAMS = {
+    StreamType.LIVE_SCORES,
+    StreamType.BETTING_ODDS,
+    StreamType.LINE_MOVEMENTS,
+    StreamType.PREDICTIONS,
+}
+
+# Subscription filter keys served by the subscription index, in lookup order
+FILTER_DIMENSIONS = ("event_ids", "sources", "priority")
+
+# Rank used to keep the most urgent trigger when merging per event
+PRIORITY_RANK = {
+    UpdatePriority.CRITICAL: 3,
+    UpdatePriority.HIGH: 2,
+    UpdatePriority.MEDIUM: 1,
+    UpdatePriority.LOW: 0,
+}
+
+
 @dataclass
 class StreamMessage:
     """Real-time stream message"""
@@ -70,15 +95,119 @@ class StreamSubscription:
     last_activity: datetime = field(default_factory=datetime.utcnow)
     message_count: int = 0
     created_at: datetime = field(default_factory=datetime.utcnow)
+    send_queue: Optional[SendQueue] = None
+
+
+@dataclass
+class AggregationBucket:
+    """Running aggregate of the messages buffered under one dedup key
+
+    Holds a fixed handful of message references and numeric sums, so memory
+    per key stays constant however many updates arrive in the window.
+    """
+
+    strategy: str
+    deadline: float
+    generation: int
+    first: StreamMessage  # Earliest by timestamp
+    latest: StreamMessage  # Latest by timestamp
+    last_arrived: StreamMessage
+    best: StreamMessage  # Highest odds
+    prior_sums: Dict[str, float] = field(default_factory=dict)
+    count: int = 1
+
+    @classmethod
+    def start(
+        cls, message: StreamMessage, strategy: str, deadline: float, generation: int
+    ) -> "AggregationBucket":
+        return cls(
+            strategy=strategy,
+            deadline=deadline,
+            generation=generation,
+            first=message,
+            latest=message,
+            last_arrived=message,
+            best=message,
+        )
+
+    def add(self, message: StreamMessage):
+        """Fold a message into the running aggregate"""
+        self.count += 1
+        if message.timestamp > self.latest.timestamp:
+            self.latest = message
+        if message.timestamp < self.first.timestamp:
+            self.first = message
+
+        if self.strategy == "best_odds":
+            if message.data.get("odds", 0) > self.best.data.get("odds", 0):
+                self.best = message
+        elif self.strategy == "accumulate":
+            # Sum everything but the newest arrival, whose data is the base
+            for key, value in self.last_arrived.data.items():
+                if isinstance(value, (int, float)) and key != "timestamp":
+                    self.prior_sums[key] = self.prior_sums.get(key, 0) + value
+        self.last_arrived = message
+
+    def result(self) -> StreamMessage:
+        """Aggregated message for the window"""
+        if self.count == 1:
+            return self.first
+
+        if self.strategy == "best_odds":
+            message = self.best
+
+        elif self.strategy == "track_movement":
+            message = self.latest
+            movement = message.data.get("line", 0) - self.first.data.get("line", 0)
+            message.data["line_movement"] = movement
+            message.data["movement_direction"] = (
+                "up" if movement > 0 else "down" if movement < 0 else "stable"
+            )
+            message.data["movement_magnitude"] = abs(movement)
+
+        elif self.strategy == "accumulate":
+            message = self.last_arrived
+            accumulated_data = message.data.copy()
+            for key, total in self.prior_sums.items():
+                accumulated_data[key] = accumulated_data.get(key, 0) + total
+            message.data = accumulated_data
+
+        else:
+            return self.latest
+
+        message.metadata["aggregated_from"] = self.count
+        message.metadata["aggregation_strategy"] = self.strategy
+        return message
 
 
 class StreamAggregator:
-    """Intelligent stream aggregation and deduplication"""
+    """Intelligent stream aggregation and deduplication
+
+    Messages with an aggregation rule are folded into a per-key bucket that
+    is flushed by a timer wheel once its buffer time elapses, whether or not
+    more messages arrive for the key. Flushed messages go to on_flush.
+    """
 
-    def __init__(self, window_size: int = 5):
+    def __init__(
+        self,
+        window_size: int = 5,
+        on_flush: Optional[Callable[[StreamMessage], Awaitable[None]]] = None,
+        tick: float = 0.05,
+        clock: Callable[[], float] = time.monotonic,
+    ):
         self.window_size = window_size  # seconds
-        self.message_buffer: Dict[str, deque] = defaultdict(lambda: deque(maxlen=100))
+        self.on_flush = on_flush
+        self.clock = clock
         self.aggregation_rules = self._initialize_aggregation_rules()
+        self.buckets: Dict[str, AggregationBucket] = {}
+        self.wheel = TimerWheel(tick=tick, slots=256, start=clock())
+        self._generation = 0
+        self._flush_latencies: deque = deque(maxlen=1000)
+        self.stats = {
+            "messages_buffered": 0,
+            "messages_conflated": 0,
+            "buckets_flushed": 0,
+        }
 
     def _initialize_aggregation_rules(self) -> Dict[StreamType, Dict]:
         """Initialize aggregation rules for different stream types"""
@@ -106,142 +235,89 @@ class StreamAggregator:
         }
 
     async def process_message(self, message: StreamMessage) -> Optional[StreamMessage]:
-        """Process and potentially aggregate incoming message"""
-        try:
-            stream_type = message.stream_type
+        """Process and potentially aggregate incoming message
 
-            if stream_type not in self.aggregation_rules:
+        Returns the message if it passes straight through, or None if it was
+        buffered; buffered keys are emitted through on_flush at their deadline.
+        """
+        try:
+            rule = self.aggregation_rules.get(message.stream_type)
+            if rule is None:
                 return message  # No aggregation rule, pass through
 
-            rule = self.aggregation_rules[stream_type]
             dedup_key = rule["dedup_key"](message)
-            buffer_time = rule["buffer_time"]
-
-            # Add to buffer
-            self.message_buffer[dedup_key].append(message)
-
-            # Check if we should aggregate
-            current_time = datetime.now(timezone.utc)
-            buffer_messages = list(self.message_buffer[dedup_key])
-
-            if not buffer_messages:
-                return message
-
-            # Check if oldest message is beyond buffer time
-            oldest_message = buffer_messages[0]
-            if (current_time - oldest_message.timestamp).total_seconds() < buffer_time:
-                return None  # Still buffering
-
-            # Aggregate messages
-            aggregated = await self._aggregate_messages(
-                buffer_messages, rule["merge_strategy"]
+            self.stats["messages_buffered"] += 1
+
+            bucket = self.buckets.get(dedup_key)
+            if bucket is not None:
+                bucket.add(message)
+                self.stats["messages_conflated"] += 1
+                return None
+
+            self._generation += 1
+            deadline = self.clock() + rule["buffer_time"]
+            self.buckets[dedup_key] = AggregationBucket.start(
+                message, rule["merge_strategy"], deadline, self._generation
             )
-
-            # Clear buffer for this key
-            self.message_buffer[dedup_key].clear()
-
-            return aggregated
+            self.wheel.schedule(deadline, (dedup_key, self._generation))
+            return None
 
         except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.error("Message aggregation failed: {e!s}")
+            logger.error(f"Message aggregation failed: {e!s}")
             return message  # Return original on error
 
-    async def _aggregate_messages(
-        self, messages: List[StreamMessage], strategy: str
-    ) -> StreamMessage:
-        """Aggregate messages based on strategy"""
-        if not messages:
-            raise ValueError("No messages to aggregate")
-
-        if len(messages) == 1:
-            return messages[0]
-
-        latest_message = max(messages, key=lambda m: m.timestamp)
-
-        if strategy == "latest":
-            return latest_message
-
-        elif strategy == "best_odds":
-            return await self._aggregate_best_odds(messages)
-
-        elif strategy == "track_movement":
-            return await self._aggregate_line_movement(messages)
-
-        elif strategy == "accumulate":
-            return await self._aggregate_accumulate(messages)
-
-        else:
-            return latest_message
-
-    async def _aggregate_best_odds(
-        self, messages: List[StreamMessage]
-    ) -> StreamMessage:
-        """Aggregate betting odds to find best odds"""
-        best_message = messages[0]
-        best_odds = best_message.data.get("odds", 0)
-
-        for message in messages[1:]:
-            odds = message.data.get("odds", 0)
-            if odds > best_odds:
-                best_odds = odds
-                best_message = message
-
-        # Add metadata about aggregation
-        best_message.metadata["aggregated_from"] = len(messages)
-        best_message.metadata["aggregation_strategy"] = "best_odds"
-
-        return best_message
-
-    async def _aggregate_line_movement(
-        self, messages: List[StreamMessage]
-    ) -> StreamMessage:
-        """Aggregate line movements to track direction and magnitude"""
-        if not messages:
-            return None
-
-        # Sort by timestamp
-        sorted_messages = sorted(messages, key=lambda m: m.timestamp)
-        latest = sorted_messages[-1]
-
-        # Calculate movement
-        if len(sorted_messages) > 1:
-            first_line = sorted_messages[0].data.get("line", 0)
-            last_line = latest.data.get("line", 0)
-            movement = last_line - first_line
-
-            latest.data["line_movement"] = movement
-            latest.data["movement_direction"] = (
-                "up" if movement > 0 else "down" if movement < 0 else "stable"
-            )
-            latest.data["movement_magnitude"] = abs(movement)
-
-        latest.metadata["aggregated_from"] = len(messages)
-        latest.metadata["aggregation_strategy"] = "track_movement"
-
-        return latest
-
-    async def _aggregate_accumulate(
-        self, messages: List[StreamMessage]
-    ) -> StreamMessage:
-        """Accumulate values (for stats updates)"""
-        if not messages:
-            return None
-
-        latest = messages[-1]
-
-        # Accumulate numerical values
-        accumulated_data = latest.data.copy()
-
-        for message in messages[:-1]:
-            for key, value in message.data.items():
-                if isinstance(value, (int, float)) and key != "timestamp":
-                    accumulated_data[key] = accumulated_data.get(key, 0) + value
+    def flush_due(self, now: Optional[float] = None) -> List[StreamMessage]:
+        """Close every bucket whose deadline has passed"""
+        now = self.clock() if now is None else now
+        flushed = []
+        for dedup_key, generation in self.wheel.advance(now):
+            bucket = self.buckets.get(dedup_key)
+            if bucket is None or bucket.generation != generation:
+                continue  # Superseded by a later window for the key
+            del self.buckets[dedup_key]
+            flushed.append(bucket.result())
+            self._flush_latencies.append(max(now - bucket.deadline, 0.0))
+        self.stats["buckets_flushed"] += len(flushed)
+        return flushed
+
+    def flush_all(self) -> List[StreamMessage]:
+        """Close every open bucket regardless of deadline"""
+        flushed = [bucket.result() for bucket in self.buckets.values()]
+        self.buckets.clear()
+        self.stats["buckets_flushed"] += len(flushed)
+        return flushed
+
+    async def run(self):
+        """Background tick that flushes buckets on deadline"""
+        try:
+            while True:
+                await asyncio.sleep(self.wheel.tick)
+                for message in self.flush_due():
+                    if self.on_flush is None:
+                        continue
+                    try:
+                        await self.on_flush(message)
+                    except Exception as e:  # pylint: disable=broad-exception-caught
+                        logger.error(f"Aggregated message flush failed: {e!s}")
 
-        latest.data = accumulated_data
-        latest.metadata["aggregated_from"] = len(messages)
-        latest.metadata["aggregation_strategy"] = "accumulate"
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"Aggregator tick error: {e!s}")
 
-        return latest
+    def get_stats(self) -> Dict[str, Any]:
+        """Buffered key counts and flush latency"""
+        latencies = sorted(self._flush_latencies)
+        return {
+            **self.stats,
+            "buffered_keys": len(self.buckets),
+            "scheduled_timers": len(self.wheel),
+            "flush_latency_ms": {
+                "avg": sum(latencies) / len(latencies) * 1000 if latencies else 0.0,
+                "p99": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+                "max": latencies[-1] * 1000 if latencies else 0.0,
+            },
+        }
 
 
 class PredictionTriggerEngine:
@@ -358,11 +434,19 @@ class RealTimeStreamManager:
     """Main real-time stream management system"""
 
     def __init__(self):
-        self.redis_client: Optional[aioredis.Redis] = None
+        self.redis_client: Optional[redis.Redis] = None
         self.subscribers: Dict[str, StreamSubscription] = {}
+        self.subscription_index = SubscriptionIndex(FILTER_DIMENSIONS)
         self.websocket_connections: Set[Any] = set()
-        self.stream_aggregator = StreamAggregator()
+        self.stream_aggregator = StreamAggregator(on_flush=self._dispatch_message)
         self.prediction_trigger = PredictionTriggerEngine()
+        self.prediction_batcher = MicroBatcher(
+            self._run_prediction_batch,
+            window=config_manager.config.prediction_batch_window_ms / 1000,
+            max_batch=config_manager.config.prediction_batch_size,
+            max_pending=config_manager.config.prediction_batch_max_pending,
+            merge=self._merge_triggers,
+        )
         self.message_queue = asyncio.Queue(maxsize=10000)
         self.processing_tasks: List[asyncio.Task] = []
         self.statistics = {
@@ -376,7 +460,7 @@ class RealTimeStreamManager:
         """Initialize the real-time stream manager"""
         try:
             # Initialize Redis for pub/sub
-            self.redis_client = aioredis.from_url(
+            self.redis_client = redis.from_url(
                 config_manager.get_redis_url(), decode_responses=True
             )
 
@@ -385,8 +469,9 @@ class RealTimeStreamManager:
                 asyncio.create_task(self._message_processor()),
                 asyncio.create_task(self._heartbeat_monitor()),
                 asyncio.create_task(self._statistics_updater()),
-                asyncio.create_task(self._cleanup_task()),
+                asyncio.create_task(self.stream_aggregator.run()),
             ]
+            self.prediction_batcher.start()
 
             # Subscribe to Redis channels
             await self._setup_redis_subscriptions()
@@ -466,65 +551,141 @@ class RealTimeStreamManager:
     async def _process_stream_message(self, message: StreamMessage):
         """Process individual stream message"""
         try:
+            # Odds ticks feed incremental arbitrage before aggregation drops them
+            if message.stream_type == StreamType.BETTING_ODDS:
+                await self._track_arbitrage(message)
+
             # Aggregate message if needed
             aggregated_message = await self.stream_aggregator.process_message(message)
 
             if aggregated_message is None:
-                return  # Message was buffered for aggregation
-
-            # Check for prediction triggers
-            triggers = await self.prediction_trigger.evaluate_triggers(
-                aggregated_message
-            )
-
-            # Process triggers
-            for trigger in triggers:
-                asyncio.create_task(self._handle_prediction_trigger(trigger))
+                return  # Buffered; the aggregator flushes it on deadline
 
-            # Broadcast to subscribers
-            await self._broadcast_message(aggregated_message)
+            await self._dispatch_message(aggregated_message)
 
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Stream message processing failed: {e!s}")
 
-    async def _handle_prediction_trigger(self, trigger: Dict[str, Any]):
-        """Handle prediction trigger"""
+    async def _dispatch_message(self, message: StreamMessage):
+        """Run prediction triggers for a message and broadcast it"""
+        # Check for prediction triggers
+        triggers = await self.prediction_trigger.evaluate_triggers(message)
+
+        # Queue triggers for batched inference; waits while the batcher is full
+        for trigger in triggers:
+            await self.prediction_batcher.submit(trigger["event_id"], trigger)
+
+        # Broadcast to subscribers
+        await self._broadcast_message(message)
+
+    async def _track_arbitrage(self, message: StreamMessage):
+        """Apply an odds tick to incremental arbitrage and broadcast changes"""
         try:
-            event_id = trigger["event_id"]
-            context = trigger["prediction_context"]
+            quote = dict(message.data)
+            quote.setdefault("event_id", message.event_id)
+            quote.setdefault("timestamp", message.timestamp)
 
-            # Get latest features for this event
-            features = await self._get_event_features(event_id)
+            for event in ultra_arbitrage_engine.apply_odds_update(quote):
+                await self._broadcast_message(self._arbitrage_event_message(event))
 
-            if features:
-                # Generate new prediction
-                prediction = await ultra_ensemble_engine.predict(
-                    features=features, context=context
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"Incremental arbitrage tracking failed: {e!s}")
+
+    def _arbitrage_event_message(self, event: ArbitrageEvent) -> StreamMessage:
+        """Convert an arbitrage lifecycle event into an opportunities message"""
+        opportunity = event.opportunity
+        return StreamMessage(
+            id=str(uuid.uuid4()),
+            stream_type=StreamType.OPPORTUNITIES,
+            priority=(
+                UpdatePriority.MEDIUM
+                if event.event_type == ArbitrageEventType.CLOSED
+                else UpdatePriority.HIGH
+            ),
+            data={
+                "event_type": event.event_type.value,
+                "arbitrage_type": event.arbitrage_type.value,
+                "event_id": event.event_id,
+                "market_type": event.market_type,
+                "outcomes": list(event.outcomes),
+                "inverse_sum": event.inverse_sum,
+                "profit_percentage": opportunity.profit_percentage,
+                "sportsbooks": opportunity.sportsbooks,
+                "stake_distribution": opportunity.stake_distribution,
+            },
+            timestamp=event.timestamp,
+            source="arbitrage_engine",
+            event_id=event.event_id,
+        )
+
+    @staticmethod
+    def _merge_triggers(pending: Dict[str, Any], trigger: Dict[str, Any]) -> Dict[str, Any]:
+        """Keep one trigger per event: the most urgent, newest on ties"""
+        if PRIORITY_RANK[trigger["priority"]] >= PRIORITY_RANK[pending["priority"]]:
+            return trigger
+        return pending
+
+    async def _run_prediction_batch(self, triggers: List[Dict[str, Any]]):
+        """Run one batched ensemble inference per context and broadcast results"""
+        features = await asyncio.gather(
+            *(self._get_event_features(trigger["event_id"]) for trigger in triggers)
+        )
+
+        by_context: Dict[PredictionContext, List[Tuple[Dict[str, Any], Dict[str, float]]]] = {}
+        for trigger, event_features in zip(triggers, features):
+            if event_features:
+                by_context.setdefault(trigger["prediction_context"], []).append(
+                    (trigger, event_features)
                 )
 
-                # Broadcast prediction update
-                prediction_message = StreamMessage(
-                    id=str(uuid.uuid4()),
-                    stream_type=StreamType.PREDICTIONS,
-                    priority=trigger["priority"],
-                    data={
-                        "event_id": event_id,
-                        "prediction": prediction.predicted_value,
-                        "confidence": prediction.prediction_probability,
-                        "trigger_type": trigger["trigger_type"],
-                        "models_used": prediction.metadata.get("selected_models", []),
-                        "context": context.value,
-                    },
-                    timestamp=datetime.now(timezone.utc),
-                    source="prediction_engine",
-                    event_id=event_id,
-                    metadata=trigger["metadata"],
+        for context, rows in by_context.items():
+            try:
+                predictions = await ultra_ensemble_engine.predict_batch(
+                    [event_features for _, event_features in rows], context=context
                 )
+                for (trigger, _), prediction in zip(rows, predictions):
+                    await self._broadcast_message(
+                        self._prediction_message(trigger, prediction)
+                    )
 
-                await self._broadcast_message(prediction_message)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error(
+                    f"Batched prediction failed for {len(rows)} {context.value} triggers: {e!s}"
+                )
 
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.error("Prediction trigger handling failed: {e!s}")
+    def _prediction_message(self, trigger: Dict[str, Any], prediction: Any) -> StreamMessage:
+        """Convert a triggered prediction into a predictions stream message
+
+        Accepts the engine's PredictionOutput or the plain dict the
+        ultra_ensemble_engine facade returns.
+        """
+        event_id = trigger["event_id"]
+        context = trigger["prediction_context"]
+        if isinstance(prediction, dict):
+            value = prediction.get("prediction")
+            confidence = prediction.get("confidence")
+            models_used = prediction.get("models_used", [])
+        else:
+            value = prediction.predicted_value
+            confidence = prediction.prediction_probability
+            models_used = prediction.metadata.get("selected_models", [])
+        return StreamMessage(
+            id=str(uuid.uuid4()),
+            stream_type=StreamType.PREDICTIONS,
+            priority=trigger["priority"],
+            data={
+                "event_id": event_id,
+                "prediction": value,
+                "confidence": confidence,
+                "trigger_type": trigger["trigger_type"],
+                "models_used": models_used,
+                "context": context.value,
+            },
+            timestamp=datetime.now(timezone.utc),
+            source="prediction_engine",
+            event_id=event_id,
+            metadata=trigger["metadata"],
+        )
 
     async def _get_event_features(self, event_id: str) -> Optional[Dict[str, float]]:
         """Get latest features for an event"""
@@ -546,69 +707,48 @@ class RealTimeStreamManager:
     async def _broadcast_message(self, message: StreamMessage):
         """Broadcast message to relevant subscribers"""
         try:
-            broadcast_count = 0
-
-            for subscriber_id, subscription in self.subscribers.items():
-                try:
-                    # Check if subscriber is interested in this stream type
-                    if message.stream_type not in subscription.stream_types:
-                        continue
-
-                    # Apply filters
-                    if not self._message_matches_filters(message, subscription.filters):
-                        continue
+            subscriber_ids = self.subscription_index.match(
+                message.stream_type,
+                (message.event_id, message.source, message.priority.value),
+            )
+            if not subscriber_ids:
+                return
 
-                    # Send message
-                    if subscription.websocket:
-                        await self._send_websocket_message(
-                            subscription.websocket, message
-                        )
-                    elif subscription.callback:
-                        await subscription.callback(message)
+            # Serialise once; every websocket gets the same payload object
+            item = (message, self._serialize_message(message))
+            conflation_key = self._conflation_key(message)
+            subscribers = self.subscribers
+            broadcast_count = 0
 
-                    subscription.message_count += 1
-                    subscription.last_activity = datetime.now(timezone.utc)
+            for subscriber_id in subscriber_ids:
+                subscription = subscribers.get(subscriber_id)
+                if subscription is None or subscription.send_queue is None:
+                    continue
+                if subscription.send_queue.offer(item, conflation_key):
                     broadcast_count += 1
 
-                except Exception as e:  # pylint: disable=broad-exception-caught
-                    logger.warning(
-                        f"Failed to send message to subscriber {subscriber_id}: {e!s}"
-                    )
-                    # Mark subscription for removal
-                    self._mark_subscription_for_removal(subscriber_id)
-
             self.statistics["messages_sent"] += broadcast_count
 
         except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.error("Message broadcast failed: {e!s}")
-
-    def _message_matches_filters(
-        self, message: StreamMessage, filters: Dict[str, Any]
-    ) -> bool:
-        """Check if message matches subscription filters"""
-        try:
-            for filter_key, filter_value in filters.items():
-                if filter_key == "event_ids":
-                    if message.event_id not in filter_value:
-                        return False
-                elif filter_key == "priority":
-                    if message.priority.value not in filter_value:
-                        return False
-                elif filter_key == "sources":
-                    if message.source not in filter_value:
-                        return False
-                # Add more filter types as needed
+            logger.error(f"Message broadcast failed: {e!s}")
 
-            return True
-
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.warning("Filter matching failed: {e!s}")
-            return True  # Default to allowing message
-
-    async def _send_websocket_message(self, websocket, message: StreamMessage):
-        """Send message via WebSocket"""
-        try:
-            message_data = {
+    def _conflation_key(self, message: StreamMessage) -> Optional[Tuple]:
+        """Key under which a queued update is replaced by a newer one"""
+        if message.stream_type not in CONFLATABLE_STREAMS:
+            return None
+        data = message.data
+        return (
+            message.stream_type,
+            message.event_id,
+            data.get("market_type"),
+            data.get("sportsbook"),
+            data.get("outcome"),
+        )
+
+    def _serialize_message(self, message: StreamMessage) -> str:
+        """Serialise a message for WebSocket delivery"""
+        return json.dumps(
+            {
                 "id": message.id,
                 "type": message.stream_type.value,
                 "priority": message.priority.value,
@@ -617,13 +757,34 @@ class RealTimeStreamManager:
                 "source": message.source,
                 "event_id": message.event_id,
                 "metadata": message.metadata,
-            }
+            },
+            default=str,
+        )
 
-            await websocket.send(json.dumps(message_data))
+    def _make_send_queue(
+        self,
+        subscription: StreamSubscription,
+        max_size: int,
+        policy: SlowConsumerPolicy,
+    ) -> SendQueue:
+        """Bounded send queue delivering to a subscription's websocket or callback"""
+
+        async def deliver(item: Tuple[StreamMessage, str]):
+            message, payload = item
+            if subscription.websocket:
+                await subscription.websocket.send(payload)
+            elif subscription.callback:
+                await subscription.callback(message)
+            subscription.message_count += 1
+            subscription.last_activity = datetime.now(timezone.utc)
+
+        def on_failure(error: Exception):
+            logger.warning(
+                f"Failed to send message to subscriber {subscription.subscriber_id}: {error!s}"
+            )
+            self._mark_subscription_for_removal(subscription.subscriber_id)
 
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.warning("WebSocket send failed: {e!s}")
-            raise
+        return SendQueue(deliver, max_size=max_size, policy=policy, on_failure=on_failure)
 
     def _mark_subscription_for_removal(self, subscriber_id: str):
         """Mark subscription for removal (cleanup task will handle it)"""
@@ -671,33 +832,6 @@ class RealTimeStreamManager:
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Statistics updater error: {e!s}")
 
-    async def _cleanup_task(self):
-        """Periodic cleanup of resources"""
-        try:
-            while True:
-                await asyncio.sleep(300)  # Cleanup every 5 minutes
-
-                # Cleanup expired messages in aggregator
-                current_time = datetime.now(timezone.utc)
-
-                for key, messages in list(
-                    self.stream_aggregator.message_buffer.items()
-                ):
-                    # Remove messages older than 1 hour
-                    while (
-                        messages
-                        and (current_time - messages[0].timestamp).total_seconds()
-                        > 3600
-                    ):
-                        messages.popleft()
-
-                    # Remove empty buffers
-                    if not messages:
-                        del self.stream_aggregator.message_buffer[key]
-
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.error("Cleanup task error: {e!s}")
-
     async def subscribe(
         self,
         subscriber_id: str,
@@ -705,8 +839,14 @@ class RealTimeStreamManager:
         filters: Optional[Dict[str, Any]] = None,
         websocket: Optional[Any] = None,
         callback: Optional[Callable] = None,
+        queue_size: int = 256,
+        slow_consumer_policy: SlowConsumerPolicy = SlowConsumerPolicy.CONFLATE,
     ) -> bool:
-        """Subscribe to real-time streams"""
+        """Subscribe to real-time streams
+
+        Messages are delivered through a bounded per-subscriber queue of
+        queue_size; slow_consumer_policy decides what happens when it fills.
+        """
         try:
             if subscriber_id in self.subscribers:
                 await self.unsubscribe(subscriber_id)
@@ -718,8 +858,15 @@ class RealTimeStreamManager:
                 websocket=websocket,
                 callback=callback,
             )
+            subscription.send_queue = self._make_send_queue(
+                subscription, queue_size, slow_consumer_policy
+            )
 
             self.subscribers[subscriber_id] = subscription
+            self.subscription_index.add(
+                subscriber_id, subscription.stream_types, subscription.filters
+            )
+            subscription.send_queue.start()
 
             if websocket:
                 self.websocket_connections.add(websocket)
@@ -743,6 +890,9 @@ class RealTimeStreamManager:
                 ):
                     self.websocket_connections.remove(subscription.websocket)
 
+                if subscription.send_queue:
+                    subscription.send_queue.close()
+                self.subscription_index.remove(subscriber_id)
                 del self.subscribers[subscriber_id]
                 logger.info("Unsubscribed: {subscriber_id}")
                 return True
@@ -791,14 +941,27 @@ class RealTimeStreamManager:
                     [t for t in self.processing_tasks if not t.done()]
                 ),
                 "redis_connected": self.redis_client is not None,
-                "aggregator_buffers": len(self.stream_aggregator.message_buffer),
+                "fanout": self._fanout_stats(),
+                "aggregator": self.stream_aggregator.get_stats(),
                 "trigger_cooldowns": len(self.prediction_trigger.last_predictions),
+                "prediction_batcher": self.prediction_batcher.get_stats(),
             }
 
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Stream health check failed: {e!s}")
             return {"status": "unhealthy", "error": str(e)}
 
+    def _fanout_stats(self) -> Dict[str, int]:
+        """Send queue totals across subscribers"""
+        totals = {"queued": 0, "sent": 0, "dropped": 0, "conflated": 0, "pending": 0}
+        for subscription in self.subscribers.values():
+            if subscription.send_queue is None:
+                continue
+            for key, value in subscription.send_queue.stats.items():
+                totals[key] += value
+            totals["pending"] += len(subscription.send_queue)
+        return totals
+
     async def shutdown(self):
         """Gracefully shutdown the stream manager"""
         try:
@@ -807,6 +970,26 @@ class RealTimeStreamManager:
             # Cancel processing tasks
             for task in self.processing_tasks:
                 task.cancel()
+            await asyncio.gather(*self.processing_tasks, return_exceptions=True)
+            self.prediction_batcher.close()
+
+            # Buckets still inside their buffer time go out rather than being dropped
+            for message in self.stream_aggregator.flush_all():
+                await self._broadcast_message(message)
+
+            send_queues = [
+                subscription.send_queue
+                for subscription in self.subscribers.values()
+                if subscription.send_queue
+            ]
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*[queue.drain() for queue in send_queues]), timeout=2.0
+                )
+            except asyncio.TimeoutError:
+                logger.warning("Undelivered updates discarded at shutdown")
+            for queue in send_queues:
+                queue.close()
 
             # Close WebSocket connections
             for websocket in list(self.websocket_connections):
@@ -0,0 +1,327 @@
+"""Streaming Risk Metrics
+Incremental return statistics for one portfolio, updated per settled return
+in O(1) amortised time and queried in time independent of history length.
+
+- Mean and volatility (overall and downside) from Welford / Chan moments
+- Maximum drawdown from running log-wealth and its peak (no cumprod, so
+  long histories cannot overflow)
+- VaR, expected shortfall and return percentiles from a merging t-digest;
+  exact while the history still fits the digest's buffer
+
+State serialises to a few kilobytes whatever the history length.
+"""
+
+import math
+import struct
+from dataclasses import dataclass
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+TRADING_DAYS = 252
+RISK_FREE_RATE = 0.02  # Annual
+
+# Frame layout: magic (2) | schema version (1) | header | centroid means | weights | buffer
+STATE_MAGIC = b"\xa1\x5d"
+STATE_VERSION = 1
+_STATE_HEADER = struct.Struct("<2sBdII12d")
+
+
+@dataclass
+class ReturnMetrics:
+    """Risk metrics of a return history, as RiskAssessmentEngine reports them"""
+
+    count: int
+    mean: float
+    volatility: float
+    value_at_risk_95: float
+    value_at_risk_99: float
+    expected_shortfall_95: float
+    max_drawdown: float
+    sharpe_ratio: float
+    sortino_ratio: float
+    calmar_ratio: float
+    confidence_interval: Tuple[float, float]
+
+
+class QuantileSketch:
+    """Merging t-digest over a stream of floats
+
+    Values collect in a fixed buffer; a full buffer is sorted into the
+    centroids, which are re-clustered so each spans at most about one unit
+    of the arcsine scale function. Centroids stay small in the tails, where
+    VaR and expected shortfall are read.
+    """
+
+    def __init__(self, compression: float = 300.0, buffer_size: int = 1024):
+        self.compression = compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self._buffer = np.empty(buffer_size)
+        self._buffered = 0
+        self._sorted: Optional[Tuple[np.ndarray, np.ndarray]] = None  # View until the next add
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value: float):
+        self._sorted = None
+        self._buffer[self._buffered] = value
+        self._buffered += 1
+        self.count += 1
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if self._buffered == len(self._buffer):
+            self._merge()
+
+    def update(self, values: np.ndarray):
+        if len(values) == 0:
+            return
+        self._sorted = None
+        self.count += len(values)
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        room = len(self._buffer) - self._buffered
+        if len(values) < room:
+            self._buffer[self._buffered : self._buffered + len(values)] = values
+            self._buffered += len(values)
+            return
+        self._merge(values)
+
+    def quantile(self, q: float) -> float:
+        """Value at quantile q, interpolated as np.percentile does"""
+        means, weights = self._view()
+        if len(means) == 0:
+            return 0.0
+        return float(np.interp(q * (self.count - 1), *self._rank_curve(means, weights)))
+
+    def tail_mean(self, q: float) -> float:
+        """Mean of the values at or below the q quantile"""
+        means, weights = self._view()
+        if len(means) == 0:
+            return 0.0
+        threshold = float(np.interp(q * (self.count - 1), *self._rank_curve(means, weights)))
+        cumulative = np.concatenate([[0.0], np.cumsum(weights)])
+        below = cumulative[np.searchsorted(means, threshold, side="right")]
+        k = max(math.floor(q * (self.count - 1)) + 1, below)
+        # Sum of the k smallest values, linear across each centroid
+        tail_sum = np.interp(k, cumulative, np.concatenate([[0.0], np.cumsum(weights * means)]))
+        return float(tail_sum / k)
+
+    def _rank_curve(self, means: np.ndarray, weights: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(rank, value) knots: each centroid sits at the middle rank it covers"""
+        centres = np.cumsum(weights) - (weights + 1) / 2
+        return (
+            np.concatenate([[0.0], centres, [self.count - 1.0]]),
+            np.concatenate([[self.min], means, [self.max]]),
+        )
+
+    def _view(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Sorted centroids with the buffered values as unit centroids"""
+        if self._buffered == 0:
+            return self.means, self.weights
+        if self._sorted is None:
+            means = np.concatenate([self.means, self._buffer[: self._buffered]])
+            weights = np.concatenate([self.weights, np.ones(self._buffered)])
+            order = np.argsort(means, kind="stable")
+            self._sorted = means[order], weights[order]
+        return self._sorted
+
+    def _merge(self, values: Optional[np.ndarray] = None):
+        means = np.concatenate([self.means, self._buffer[: self._buffered]])
+        weights = np.concatenate([self.weights, np.ones(self._buffered)])
+        if values is not None:
+            means = np.concatenate([means, values])
+            weights = np.concatenate([weights, np.ones(len(values))])
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order], weights[order]
+        total = weights.sum()
+        # Cluster by the integer part of the scale function at each left edge
+        before = np.cumsum(weights) - weights
+        scale = self.compression / (2 * math.pi) * np.arcsin(np.clip(2 * before / total - 1, -1.0, 1.0))
+        bucket = np.floor(scale)
+        cluster = np.concatenate([[0], np.cumsum(bucket[1:] != bucket[:-1])])
+        self.weights = np.bincount(cluster, weights=weights)
+        self.means = np.bincount(cluster, weights=weights * means) / self.weights
+        self._buffered = 0
+
+
+class RiskAccumulator:
+    """Streaming return statistics for one portfolio
+
+    add() takes one settled return, update() a block of them; metrics()
+    reads VaR, expected shortfall, drawdown and risk-adjusted ratios the
+    way RiskAssessmentEngine computes them from a full return array.
+    """
+
+    def __init__(self, compression: float = 300.0, buffer_size: int = 1024):
+        self.count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._down_count = 0
+        self._down_mean = 0.0
+        self._down_m2 = 0.0
+        self._log_wealth = 0.0
+        self._log_peak = -math.inf  # Peak of wealth after each return, as np.maximum.accumulate
+        self._max_drawdown = 0.0
+        self.sketch = QuantileSketch(compression, buffer_size)
+
+    def add(self, value: float):
+        value = float(value)
+        self.count += 1
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        if value < 0:
+            self._down_count += 1
+            delta = value - self._down_mean
+            self._down_mean += delta / self._down_count
+            self._down_m2 += delta * (value - self._down_mean)
+
+        self._log_wealth += math.log1p(value) if value > -1 else -math.inf
+        self._log_peak = max(self._log_peak, self._log_wealth)
+        self._max_drawdown = min(self._max_drawdown, self._drawdown(self._log_wealth, self._log_peak))
+        self.sketch.add(value)
+
+    def update(self, values: Iterable[float]):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(values) == 0:
+            return
+        self.count, self._mean, self._m2 = self._combine(self.count, self._mean, self._m2, values)
+        self._down_count, self._down_mean, self._down_m2 = self._combine(
+            self._down_count, self._down_mean, self._down_m2, values[values < 0]
+        )
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            steps = np.where(values > -1, np.log1p(np.maximum(values, -1.0)), -np.inf)
+            log_wealth = self._log_wealth + np.cumsum(steps)
+            log_peak = np.maximum(np.maximum.accumulate(log_wealth), self._log_peak)
+            drawdowns = np.where(np.isneginf(log_wealth), -1.0, np.expm1(log_wealth - log_peak))
+        self._log_wealth = float(log_wealth[-1])
+        self._log_peak = float(log_peak[-1])
+        self._max_drawdown = min(self._max_drawdown, float(np.nanmin(drawdowns)))
+        self.sketch.update(values)
+
+    @staticmethod
+    def _combine(count: int, mean: float, m2: float, values: np.ndarray) -> Tuple[int, float, float]:
+        """Chan et al. merge of running moments with a block"""
+        if len(values) == 0:
+            return count, mean, m2
+        block_mean = float(values.mean())
+        block_m2 = float(np.sum((values - block_mean) ** 2))
+        total = count + len(values)
+        delta = block_mean - mean
+        return (
+            total,
+            mean + delta * len(values) / total,
+            m2 + block_m2 + delta**2 * count * len(values) / total,
+        )
+
+    @staticmethod
+    def _drawdown(log_wealth: float, log_peak: float) -> float:
+        if log_wealth == -math.inf:
+            return -1.0
+        return math.expm1(log_wealth - log_peak)
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self.count else 0.0
+
+    @property
+    def volatility(self) -> float:
+        """Population standard deviation, as np.std"""
+        return math.sqrt(max(self._m2, 0.0) / self.count) if self.count else 0.0
+
+    def metrics(self) -> ReturnMetrics:
+        if self.count == 0:
+            return ReturnMetrics(0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, 0.0, (0.0, 0.0))
+        volatility = self.volatility
+        excess = self.mean - RISK_FREE_RATE / TRADING_DAYS
+        sharpe = excess / volatility * math.sqrt(TRADING_DAYS) if volatility > 0 else 0.0
+        if self._down_count == 0:
+            sortino = float("inf")
+        else:
+            downside = math.sqrt(max(self._down_m2, 0.0) / self._down_count)
+            sortino = excess / downside * math.sqrt(TRADING_DAYS) if downside > 0 else 0.0
+        max_drawdown = self._max_drawdown
+        calmar = self.mean * TRADING_DAYS / abs(max_drawdown) if max_drawdown != 0 else 0.0
+        return ReturnMetrics(
+            count=self.count,
+            mean=self.mean,
+            volatility=volatility,
+            value_at_risk_95=self.sketch.quantile(0.05),
+            value_at_risk_99=self.sketch.quantile(0.01),
+            expected_shortfall_95=self.sketch.tail_mean(0.05),
+            max_drawdown=max_drawdown,
+            sharpe_ratio=sharpe,
+            sortino_ratio=sortino,
+            calmar_ratio=calmar,
+            confidence_interval=(self.sketch.quantile(0.025), self.sketch.quantile(0.975)),
+        )
+
+    def to_bytes(self) -> bytes:
+        sketch = self.sketch
+        header = _STATE_HEADER.pack(
+            STATE_MAGIC,
+            STATE_VERSION,
+            sketch.compression,
+            len(sketch.means),
+            sketch._buffered,
+            float(self.count),
+            self._mean,
+            self._m2,
+            float(self._down_count),
+            self._down_mean,
+            self._down_m2,
+            self._log_wealth,
+            self._log_peak,
+            self._max_drawdown,
+            sketch.min,
+            sketch.max,
+            float(len(sketch._buffer)),
+        )
+        return (
+            header
+            + sketch.means.astype("<f8").tobytes()
+            + sketch.weights.astype("<f8").tobytes()
+            + sketch._buffer[: sketch._buffered].astype("<f8").tobytes()
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "RiskAccumulator":
+        (
+            magic,
+            version,
+            compression,
+            centroids,
+            buffered,
+            count,
+            mean,
+            m2,
+            down_count,
+            down_mean,
+            down_m2,
+            log_wealth,
+            log_peak,
+            max_drawdown,
+            low,
+            high,
+            buffer_size,
+        ) = _STATE_HEADER.unpack_from(data)
+        if magic != STATE_MAGIC or version != STATE_VERSION:
+            raise ValueError("Not a risk accumulator state")
+        accumulator = cls(compression, int(buffer_size))
+        accumulator.count = int(count)
+        accumulator._mean, accumulator._m2 = mean, m2
+        accumulator._down_count = int(down_count)
+        accumulator._down_mean, accumulator._down_m2 = down_mean, down_m2
+        accumulator._log_wealth, accumulator._log_peak = log_wealth, log_peak
+        accumulator._max_drawdown = max_drawdown
+        arrays = np.frombuffer(data, dtype="<f8", offset=_STATE_HEADER.size)
+        sketch = accumulator.sketch
+        sketch.means = arrays[:centroids].copy()
+        sketch.weights = arrays[centroids : 2 * centroids].copy()
+        sketch._buffer[:buffered] = arrays[2 * centroids : 2 * centroids + buffered]
+        sketch._buffered = buffered
+        sketch.count, sketch.min, sketch.max = int(count), low, high
+        return accumulator
@@ -0,0 +1,225 @@
+"""Stream Fan-out Primitives
+Subscription indexing and bounded per-subscriber send queues used by the
+real-time stream manager to deliver a message only to interested subscribers
+without letting one slow client hold up the rest.
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict, defaultdict
+from enum import Enum
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    Optional,
+    Sequence,
+    Set,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class SlowConsumerPolicy(str, Enum):
+    """What a full send queue does with a new message"""
+
+    CONFLATE = "conflate"  # Replace the queued update with the same key, else drop oldest
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+
+
+class SubscriptionIndex:
+    """Subscriber ids indexed by topic and filter values
+
+    A subscriber without a filter on a dimension matches every value of it.
+    Per (topic, dimension) the index keeps the unfiltered subscribers and the
+    subscribers allowed per value, so a lookup touches only candidate sets
+    rather than every subscription.
+    """
+
+    def __init__(self, dimensions: Sequence[str]):
+        self.dimensions = tuple(dimensions)
+        self._unfiltered: Dict[Any, Dict[str, Set[str]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+        self._filtered: Dict[Any, Dict[str, Set[str]]] = defaultdict(
+            lambda: defaultdict(set)
+        )
+        self._allowed: Dict[Any, Dict[str, Dict[Any, Set[str]]]] = defaultdict(
+            lambda: defaultdict(lambda: defaultdict(set))
+        )
+        self._entries: Dict[str, tuple] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def add(self, subscriber_id: str, topics: Iterable[Any], filters: Dict[str, Any]):
+        """Index a subscriber, replacing any previous entry"""
+        self.remove(subscriber_id)
+        topics = tuple(topics)
+        normalized = {
+            dimension: self._filter_values(filters[dimension])
+            for dimension in self.dimensions
+            if filters.get(dimension) is not None
+        }
+        self._entries[subscriber_id] = (topics, normalized)
+
+        for topic in topics:
+            for dimension in self.dimensions:
+                values = normalized.get(dimension)
+                if values is None:
+                    self._unfiltered[topic][dimension].add(subscriber_id)
+                    continue
+                self._filtered[topic][dimension].add(subscriber_id)
+                for value in values:
+                    self._allowed[topic][dimension][value].add(subscriber_id)
+
+    def remove(self, subscriber_id: str) -> bool:
+        """Drop a subscriber from the index"""
+        entry = self._entries.pop(subscriber_id, None)
+        if entry is None:
+            return False
+
+        topics, normalized = entry
+        for topic in topics:
+            for dimension in self.dimensions:
+                values = normalized.get(dimension)
+                if values is None:
+                    self._unfiltered[topic][dimension].discard(subscriber_id)
+                    continue
+                self._filtered[topic][dimension].discard(subscriber_id)
+                allowed = self._allowed[topic][dimension]
+                for value in values:
+                    allowed[value].discard(subscriber_id)
+                    if not allowed[value]:
+                        del allowed[value]
+        return True
+
+    def match(self, topic: Any, values: Sequence[Any]) -> Set[str]:
+        """Subscribers of topic whose filters accept values (one per dimension)"""
+        if topic not in self._unfiltered and topic not in self._filtered:
+            return set()
+
+        matched: Optional[Set[str]] = None
+        for dimension, value in zip(self.dimensions, values):
+            filtered = self._filtered[topic][dimension]
+            allowed = self._allowed[topic][dimension].get(value, ())
+            if matched is None:
+                # Seed from the first dimension's candidate sets only
+                matched = self._unfiltered[topic][dimension] | set(allowed)
+            elif filtered:
+                matched = {
+                    subscriber_id
+                    for subscriber_id in matched
+                    if subscriber_id not in filtered or subscriber_id in allowed
+                }
+            if not matched:
+                break
+        return matched or set()
+
+    @staticmethod
+    def _filter_values(values: Any) -> frozenset:
+        if isinstance(values, (list, tuple, set, frozenset)):
+            return frozenset(values)
+        return frozenset([values])
+
+
+class SendQueue:
+    """Bounded send queue for one subscriber, drained by its own task
+
+    offer() never blocks the publisher. A full queue applies the slow
+    consumer policy; with CONFLATE a keyed update replaces the queued update
+    for the same key in place, so the client always gets the latest state.
+    """
+
+    def __init__(
+        self,
+        deliver: Callable[[Any], Awaitable[None]],
+        max_size: int = 256,
+        policy: SlowConsumerPolicy = SlowConsumerPolicy.CONFLATE,
+        on_failure: Optional[Callable[[Exception], None]] = None,
+    ):
+        self.deliver = deliver
+        self.max_size = max_size
+        self.policy = policy
+        self.on_failure = on_failure
+        self._pending: "OrderedDict[Hashable, Any]" = OrderedDict()
+        # Future the drain task parks on while idle; cheaper to wake than an Event
+        self._waiter: Optional[asyncio.Future] = None
+        self._sequence = 0  # Keys for updates that are never conflated
+        self._task: Optional[asyncio.Task] = None
+        self.stats = {"queued": 0, "sent": 0, "dropped": 0, "conflated": 0}
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self):
+        """Start draining on the running event loop"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._drain())
+
+    async def drain(self):
+        """Wait until every queued update has been delivered"""
+        while self._task is not None and (self._pending or self._waiter is None):
+            await asyncio.sleep(0.01)
+
+    def close(self):
+        """Stop draining and discard queued updates"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self._waiter = None
+        self._pending.clear()
+
+    def offer(self, item: Any, conflation_key: Optional[Hashable] = None) -> bool:
+        """Queue an item; returns False if it was dropped"""
+        conflate = (
+            conflation_key is not None and self.policy == SlowConsumerPolicy.CONFLATE
+        )
+        if conflate and conflation_key in self._pending:
+            self._pending[conflation_key] = item
+            self.stats["conflated"] += 1
+            return True
+
+        if len(self._pending) >= self.max_size:
+            if self.policy == SlowConsumerPolicy.DROP_NEWEST:
+                self.stats["dropped"] += 1
+                return False
+            self._pending.popitem(last=False)
+            self.stats["dropped"] += 1
+
+        if not conflate:
+            self._sequence += 1
+            conflation_key = ("_seq", self._sequence)
+        self._pending[conflation_key] = item
+        self.stats["queued"] += 1
+        waiter = self._waiter
+        if waiter is not None:
+            self._waiter = None
+            if not waiter.done():
+                waiter.set_result(None)
+        return True
+
+    async def _drain(self):
+        try:
+            loop = asyncio.get_running_loop()
+            while True:
+                while self._pending:
+                    _, item = self._pending.popitem(last=False)
+                    await self.deliver(item)
+                    self.stats["sent"] += 1
+                self._waiter = loop.create_future()
+                await self._waiter
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.warning(f"Subscriber send failed: {e!s}")
+            self._pending.clear()
+            self._waiter = None
+            self._task = None
+            if self.on_failure:
+                self.on_failure(e)
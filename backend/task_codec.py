@@ -0,0 +1,309 @@
+"""Task Serialization
+Compact, schema-versioned msgpack envelopes for TaskDefinition and TaskResult.
+Large arguments are split out as content-addressed blobs so repeated payloads
+(the same market snapshot fanned out to many tasks) are stored once.
+"""
+
+import dataclasses
+import hashlib
+import logging
+import pickle
+import struct
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from cache_codecs import CacheCodec, CompressionType
+
+logger = logging.getLogger(__name__)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Frame layout: magic (2) | schema version (1) | kind (1) | compression id (1) | body
+FRAME_MAGIC = b"\xa1\x7a"
+SCHEMA_VERSION = 1
+_HEADER = struct.Struct("<2sBBB")
+
+KIND_TASK = 1
+KIND_RESULT = 2
+KIND_BLOB = 3
+KIND_CHUNK_MANIFEST = 4
+
+_COMPRESSION_IDS = {
+    CompressionType.NONE: 0,
+    CompressionType.GZIP: 1,
+    CompressionType.ZLIB: 2,
+    CompressionType.ZSTD: 3,
+    CompressionType.LZ4: 4,
+}
+_COMPRESSIONS_BY_ID = {v: k for k, v in _COMPRESSION_IDS.items()}
+
+# msgpack extension type codes
+EXT_NDARRAY = 1
+EXT_DATETIME = 2
+EXT_DATE = 3
+EXT_BLOB_REF = 4
+EXT_PICKLE = 5  # Anything msgpack cannot represent natively
+EXT_TUPLE = 6  # msgpack would otherwise decode tuples as lists
+
+
+@dataclasses.dataclass(frozen=True)
+class BlobRef:
+    """Placeholder for an argument stored separately under its content hash"""
+
+    digest: str
+
+
+class EncodedTask(NamedTuple):
+    """Task envelope plus the blobs it references, keyed by digest"""
+
+    payload: bytes
+    blobs: Dict[str, bytes]
+
+
+def _packb(value: Any) -> bytes:
+    # strict_types routes tuples and subclasses of builtins (enums, NumPy
+    # scalars) through _default instead of packing them as their base type
+    return msgpack.packb(value, default=_default, use_bin_type=True, strict_types=True)
+
+
+def _unpackb(body) -> Any:
+    return msgpack.unpackb(body, ext_hook=_ext_hook, raw=False, strict_map_key=False)
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if type(value) is tuple:  # Named tuples keep their class through pickle
+        return msgpack.ExtType(EXT_TUPLE, _packb(list(value)))
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        array = np.ascontiguousarray(value)
+        header = msgpack.packb([array.dtype.str, list(array.shape)])
+        return msgpack.ExtType(EXT_NDARRAY, header + array.tobytes())
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, datetime):
+        return msgpack.ExtType(EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(EXT_DATE, value.isoformat().encode())
+    if isinstance(value, BlobRef):
+        return msgpack.ExtType(EXT_BLOB_REF, bytes.fromhex(value.digest))
+    return msgpack.ExtType(EXT_PICKLE, pickle.dumps(value, protocol=5))
+
+
+def _ext_hook(code: int, data: bytes) -> Any:
+    if code == EXT_NDARRAY:
+        unpacker = msgpack.Unpacker(raw=False)
+        unpacker.feed(data)
+        dtype, shape = unpacker.unpack()
+        offset = unpacker.tell()
+        # A copy, so tasks can modify their arguments as they could unpickled ones
+        return np.frombuffer(data, dtype=np.dtype(dtype), offset=offset).reshape(shape).copy()
+    if code == EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    if code == EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == EXT_BLOB_REF:
+        return BlobRef(data.hex())
+    if code == EXT_PICKLE:
+        return pickle.loads(data)
+    if code == EXT_TUPLE:
+        return tuple(_unpackb(data))
+    return msgpack.ExtType(code, data)
+
+
+_REQUIRED = object()
+
+
+class _Schema(NamedTuple):
+    """Per-dataclass field order, defaults and enum converters"""
+
+    fields: List[Tuple[str, Any]]
+    enums: Dict[str, type]
+    names: Set[str]
+
+
+def _schema(cls) -> _Schema:
+    fields = []
+    enums = {}
+    for item in dataclasses.fields(cls):
+        if item.default is not dataclasses.MISSING:
+            default = item.default
+        elif item.default_factory is not dataclasses.MISSING:
+            default = item.default_factory()
+        else:
+            default = _REQUIRED
+        fields.append((item.name, default))
+        if isinstance(item.type, type) and issubclass(item.type, Enum):
+            enums[item.name] = item.type
+    return _Schema(fields, enums, {name for name, _ in fields})
+
+
+class TaskCodec:
+    """Encode tasks and results as compressed msgpack with an explicit schema version
+
+    Only fields that differ from their dataclass defaults are written, so
+    adding a field is backward compatible. Top-level task arguments that
+    pack to at least blob_threshold bytes are replaced by BlobRef
+    placeholders and returned separately for content-addressed storage.
+    Payloads without the frame header are read as legacy pickles.
+    """
+
+    def __init__(
+        self,
+        compression: CompressionType = CompressionType.LZ4,
+        compression_threshold: int = 1024,
+        blob_threshold: int = 32 * 1024,
+    ):
+        if msgpack is None:
+            raise RuntimeError("msgpack is required for task serialization")
+        self.compressor = CacheCodec(compression=compression)
+        self.compression_threshold = compression_threshold
+        self.blob_threshold = blob_threshold
+        self._schemas: Dict[type, _Schema] = {}
+
+    def encode_task(self, task) -> EncodedTask:
+        """Encode a TaskDefinition, splitting large arguments into blobs"""
+        blobs: Dict[str, bytes] = {}
+        fields = self._fields(task)
+        if "args" in fields:
+            fields["args"] = [self._maybe_blob(value, blobs) for value in task.args]
+        if "kwargs" in fields:
+            fields["kwargs"] = {
+                key: self._maybe_blob(value, blobs) for key, value in task.kwargs.items()
+            }
+        return EncodedTask(self._frame(KIND_TASK, self._pack(fields)), blobs)
+
+    def decode_task(self, payload: bytes, task_cls):
+        """Decode a task envelope; large arguments come back as BlobRef"""
+        if not payload.startswith(FRAME_MAGIC):
+            return pickle.loads(payload)
+        return self._build(task_cls, self._unframe(payload, KIND_TASK))
+
+    def encode_result(self, result) -> bytes:
+        """Encode a TaskResult"""
+        return self._frame(KIND_RESULT, self._pack(self._fields(result)))
+
+    def decode_result(self, payload: bytes, result_cls):
+        """Decode a result envelope (or a legacy pickle)"""
+        if not payload.startswith(FRAME_MAGIC):
+            return pickle.loads(payload)
+        return self._build(result_cls, self._unframe(payload, KIND_RESULT))
+
+    def decode_blob(self, payload: bytes) -> Any:
+        """Decode a blob produced by encode_task"""
+        return self._unframe(payload, KIND_BLOB)
+
+    def encode_manifest(self, chunks: int, size: int) -> bytes:
+        """Small record pointing at a result stored as chunks"""
+        return self._frame(KIND_CHUNK_MANIFEST, self._pack({"chunks": chunks, "size": size}))
+
+    def read_manifest(self, payload: bytes) -> Optional[Dict[str, int]]:
+        """Chunk manifest fields, or None if payload is a complete record"""
+        if not payload.startswith(FRAME_MAGIC) or payload[3] != KIND_CHUNK_MANIFEST:
+            return None
+        return self._unframe(payload, KIND_CHUNK_MANIFEST)
+
+    @staticmethod
+    def find_refs(values: Iterable[Any]) -> Set[str]:
+        """Digests of the BlobRef placeholders among values"""
+        return {value.digest for value in values if isinstance(value, BlobRef)}
+
+    @staticmethod
+    def resolve(task, blobs: Dict[str, Any]):
+        """Replace a task's BlobRef arguments with their decoded values in place"""
+        task.args = [blobs[v.digest] if isinstance(v, BlobRef) else v for v in task.args]
+        task.kwargs = {
+            key: blobs[v.digest] if isinstance(v, BlobRef) else v
+            for key, v in task.kwargs.items()
+        }
+        return task
+
+    def _maybe_blob(self, value: Any, blobs: Dict[str, bytes]) -> Any:
+        if isinstance(value, (bool, int, float)) or value is None:
+            return value
+        if isinstance(value, (str, bytes)) and len(value) < self.blob_threshold:
+            return value
+        body = self._pack(value)
+        if len(body) < self.blob_threshold:
+            return value
+        digest = hashlib.sha256(body).digest()[:16].hex()  # Hardware accelerated on most CPUs
+        if digest not in blobs:
+            blobs[digest] = self._frame(KIND_BLOB, body)
+        return BlobRef(digest)
+
+    def _schema(self, cls) -> _Schema:
+        schema = self._schemas.get(cls)
+        if schema is None:
+            schema = self._schemas[cls] = _schema(cls)
+        return schema
+
+    def _fields(self, record) -> Dict[str, Any]:
+        fields = {}
+        for name, default in self._schema(type(record)).fields:
+            value = getattr(record, name)
+            if default is _REQUIRED or not _same(value, default):
+                fields[name] = value
+        return fields
+
+    def _build(self, cls, fields: Dict[str, Any]):
+        schema = self._schema(cls)
+        kwargs = {}
+        for name, value in fields.items():
+            if name not in schema.names:
+                continue  # Written by a newer schema
+            if name in schema.enums:
+                value = schema.enums[name](value)
+            kwargs[name] = value
+        return cls(**kwargs)
+
+    @staticmethod
+    def _pack(value: Any) -> bytes:
+        return _packb(value)
+
+    @staticmethod
+    def _unpack(body) -> Any:
+        return _unpackb(body)
+
+    def _frame(self, kind: int, body: bytes) -> bytes:
+        compression = CompressionType.NONE
+        if len(body) > self.compression_threshold:
+            packed = self.compressor.compress(body, self.compressor.compression)
+            if len(packed) < len(body):
+                body = packed
+                compression = self.compressor.compression
+        header = _HEADER.pack(FRAME_MAGIC, SCHEMA_VERSION, kind, _COMPRESSION_IDS[compression])
+        return header + body
+
+    def _unframe(self, payload: bytes, kind: int) -> Any:
+        _, version, payload_kind, compression_id = _HEADER.unpack_from(payload)
+        if version > SCHEMA_VERSION:
+            raise ValueError(f"Task payload schema {version} is newer than {SCHEMA_VERSION}")
+        if payload_kind != kind:
+            raise ValueError(f"Expected task payload kind {kind}, got {payload_kind}")
+        body = memoryview(payload)[_HEADER.size :]
+        compression = _COMPRESSIONS_BY_ID[compression_id]
+        if compression != CompressionType.NONE:
+            body = self.compressor.decompress(body, compression)
+        return self._unpack(body)
+
+
+def _same(value: Any, default: Any) -> bool:
+    if value is default:
+        return True
+    if type(value) is not type(default) or isinstance(value, np.ndarray):
+        return False
+    try:
+        return bool(value == default)
+    except Exception:  # pylint: disable=broad-exception-caught
+        return False
+
+
+def split_chunks(payload: bytes, chunk_size: int) -> List[bytes]:
+    """Split a payload into chunk_size pieces"""
+    return [payload[offset : offset + chunk_size] for offset in range(0, len(payload), chunk_size)]
@@ -3,19 +3,27 @@ High-performance task queue system with priority scheduling, distributed process
 """
 
 import asyncio
+import heapq
 import logging
 import multiprocessing as mp
-import pickle
+import os
+import socket
 import time
 import traceback
-from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import uuid
+import zlib
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from enum import Enum, IntEnum
-from typing import Any, Callable, Dict, List, Optional
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
 
 import redis.asyncio as redis
 from config import config_manager
+from cron_schedule import Schedule, parse_schedule
+from process_pool import ProcessTaskError, ProcessTaskPool
+from task_codec import TaskCodec, split_chunks
 
 logger = logging.getLogger(__name__)
 
@@ -49,6 +57,7 @@ class TaskType(str, Enum):
     DATA_INGESTION = "data_ingestion"
     PREDICTION_BATCH = "prediction_batch"
     RISK_ANALYSIS = "risk_analysis"
+    BET_SETTLEMENT = "bet_settlement"
     ARBITRAGE_SCAN = "arbitrage_scan"
     PERFORMANCE_ANALYSIS = "performance_analysis"
     DATA_CLEANUP = "data_cleanup"
@@ -59,6 +68,14 @@ class TaskType(str, Enum):
     ANALYTICS_COMPUTATION = "analytics_computation"
 
 
+class MisfirePolicy(str, Enum):
+    """What a recurring task does about fire times that were missed"""
+
+    FIRE_ONCE = "fire_once"  # Coalesce missed runs into a single run
+    FIRE_ALL = "fire_all"  # Run every missed occurrence, up to a catch-up limit
+    SKIP = "skip"  # Drop runs later than the misfire grace period
+
+
 @dataclass
 class TaskDefinition:
     """Comprehensive task definition"""
@@ -80,7 +97,9 @@ class TaskDefinition:
     scheduled_at: Optional[datetime] = None
     expires_at: Optional[datetime] = None
     recurring: bool = False
-    cron_expression: Optional[str] = None
+    cron_expression: Optional[str] = None  # Cron, @macro or "@every 30s"
+    misfire_policy: str = "fire_once"  # See MisfirePolicy
+    jitter_seconds: float = 0.0  # Spread fire times of co-scheduled tasks
 
     # Dependencies
     depends_on: List[str] = field(default_factory=list)
@@ -128,27 +147,105 @@ class TaskResult:
     metadata: Dict[str, Any] = field(default_factory=dict)
 
 
+# Claims up to ARGV[4] ready tasks, highest priority queue first, in one round
+# trip: lock (lease) each task, drop it from its queue and return its payload.
+# KEYS: priority queues, highest first
+# ARGV: now, worker id, lease seconds, max tasks, task key prefix, lock key prefix
+# Returns: [earliest future score or "", task id, payload, task id, payload, ...]
+CLAIM_TASKS_SCRIPT = """
+local now = tonumber(ARGV[1])
+local limit = tonumber(ARGV[4])
+local claimed = {""}
+local count = 0
+for _, queue in ipairs(KEYS) do
+    local offset = 0
+    while count < limit do
+        local ids = redis.call("ZRANGEBYSCORE", queue, "-inf", now, "LIMIT", offset, limit - count)
+        if #ids == 0 then
+            break
+        end
+        for _, id in ipairs(ids) do
+            local lock_key = ARGV[6] .. id
+            if redis.call("SET", lock_key, ARGV[2], "NX", "EX", ARGV[3]) then
+                redis.call("ZREM", queue, id)
+                local payload = redis.call("GET", ARGV[5] .. id)
+                if payload then
+                    claimed[#claimed + 1] = id
+                    claimed[#claimed + 1] = payload
+                    count = count + 1
+                else
+                    redis.call("DEL", lock_key)
+                end
+            else
+                offset = offset + 1 -- Leased elsewhere; leave it queued
+            end
+        end
+    end
+    if count >= limit then
+        break
+    end
+end
+if count == 0 then
+    local next_ready = nil
+    for _, queue in ipairs(KEYS) do
+        local head = redis.call("ZRANGEBYSCORE", queue, "(" .. ARGV[1], "+inf", "WITHSCORES", "LIMIT", 0, 1)
+        if #head > 0 and (next_ready == nil or tonumber(head[2]) < next_ready) then
+            next_ready = tonumber(head[2])
+        end
+    end
+    if next_ready then
+        claimed[1] = tostring(next_ready)
+    end
+end
+return claimed
+"""
+
+
 class TaskQueue:
     """High-performance priority task queue with Redis backend"""
 
-    def __init__(self, queue_name: str = "a1betting_tasks"):
+    def __init__(
+        self,
+        queue_name: str = "a1betting_tasks",
+        redis_client: Optional[redis.Redis] = None,
+        lease_seconds: int = 3600,
+        codec: Optional[TaskCodec] = None,
+        result_chunk_size: int = 256 * 1024,
+    ):
         self.queue_name = queue_name
-        self.redis_client: Optional[redis.Redis] = None
+        self.redis_client: Optional[redis.Redis] = redis_client
+        self.lease_seconds = lease_seconds
+        self.codec = codec or TaskCodec()
+        self.result_chunk_size = result_chunk_size
         self.priority_queues = {
             priority: f"{queue_name}:priority:{priority.value}"
             for priority in TaskPriority
         }
+        self.claim_order = [
+            self.priority_queues[priority]
+            for priority in sorted(TaskPriority, reverse=True)
+        ]
         self.result_store = f"{queue_name}:results"
+        self.result_chunks = f"{queue_name}:result_chunks"
         self.lock_prefix = f"{queue_name}:locks"
+        # Large task arguments, stored once by content hash
+        self.blob_prefix = f"{queue_name}:blob"
+        self.blob_ttl = 86400
+        # Enqueues push a token here so idle workers wake without polling
+        self.signal_key = f"{queue_name}:signal"
+        self.max_signals = 1024
+        self._claim_script = None
 
     async def initialize(self):
         """Initialize Redis connection"""
         try:
-            self.redis_client = redis.from_url(
-                config_manager.get_redis_url(),
-                decode_responses=False,  # We'll handle encoding ourselves for pickle
-            )
+            if self.redis_client is None:
+                self.redis_client = redis.from_url(
+                    config_manager.get_redis_url(),
+                    decode_responses=False,  # Payloads are binary task envelopes
+                )
             await self.redis_client.ping()
+            self._claim_script = self.redis_client.register_script(CLAIM_TASKS_SCRIPT)
             logger.info("Task queue Redis connection established")
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Failed to connect to Redis: {e!s}")
@@ -156,92 +253,136 @@ class TaskQueue:
 
     async def enqueue(self, task: TaskDefinition) -> bool:
         """Add task to appropriate priority queue"""
+        return await self.enqueue_many([task])
+
+    async def enqueue_many(self, tasks: List[TaskDefinition]) -> bool:
+        """Add tasks to their priority queues in a single round trip"""
+        if not tasks:
+            return True
         try:
             if not self.redis_client:
                 await self.initialize()
 
-            # Serialize task
-            task_data = pickle.dumps(task)
-
-            # Add to priority queue
-            queue_key = self.priority_queues[task.priority]
-
-            # Use timestamp as score for FIFO within same priority
-            score = time.time()
-            if task.scheduled_at:
-                score = task.scheduled_at.timestamp()
-
-            await self.redis_client.zadd(queue_key, {task.id: score})
-
-            # Store task data
-            task_key = f"{self.queue_name}:task:{task.id}"
-            await self.redis_client.setex(task_key, 86400, task_data)  # 24 hours TTL
+            encoded = [self.codec.encode_task(task) for task in tasks]
+            blobs: Dict[str, bytes] = {}
+            for item in encoded:
+                blobs.update(item.blobs)
+            await self._store_blobs(blobs)
+
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                for task, item in zip(tasks, encoded):
+                    # Serialize task
+                    task_data = item.payload
+
+                    # Add to priority queue
+                    queue_key = self.priority_queues[task.priority]
+
+                    # Use timestamp as score for FIFO within same priority
+                    score = time.time()
+                    if task.scheduled_at:
+                        score = task.scheduled_at.timestamp()
+
+                    # Store task data before it becomes claimable
+                    task_key = f"{self.queue_name}:task:{task.id}"
+                    pipe.setex(task_key, 86400, task_data)  # 24 hours TTL
+                    pipe.zadd(queue_key, {task.id: score})
+
+                    # Set expiry if specified
+                    if task.expires_at:
+                        expire_key = f"{self.queue_name}:expire:{task.id}"
+                        pipe.setex(
+                            expire_key,
+                            int((task.expires_at - datetime.now(timezone.utc)).total_seconds()),
+                            "expired",
+                        )
 
-            # Set expiry if specified
-            if task.expires_at:
-                expire_key = f"{self.queue_name}:expire:{task.id}"
-                await self.redis_client.setex(
-                    expire_key,
-                    int((task.expires_at - datetime.now(timezone.utc)).total_seconds()),
-                    "expired",
-                )
+                # Wake one blocked worker per task
+                signals = min(len(tasks), self.max_signals)
+                pipe.lpush(self.signal_key, *([1] * signals))
+                pipe.ltrim(self.signal_key, 0, self.max_signals - 1)
+                await pipe.execute()
 
-            logger.debug("Enqueued task {task.id} with priority {task.priority}")
+            logger.debug(f"Enqueued {len(tasks)} tasks")
             return True
 
         except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.error("Failed to enqueue task {task.id}: {e!s}")
+            logger.error(f"Failed to enqueue {len(tasks)} tasks: {e!s}")
             return False
 
     async def dequeue(self, worker_id: str) -> Optional[TaskDefinition]:
         """Dequeue highest priority task"""
-        try:
-            if not self.redis_client:
-                await self.initialize()
-
-            # Check priority queues from highest to lowest
-            for priority in sorted(TaskPriority, reverse=True):
-                queue_key = self.priority_queues[priority]
-
-                # Get next task (FIFO within priority)
-                now = time.time()
-                result = await self.redis_client.zrangebyscore(
-                    queue_key, 0, now, start=0, num=1, withscores=True
-                )
-
-                if result:
-                    task_id, score = result[0]
-                    task_id = task_id.decode("utf-8")
-
-                    # Try to acquire lock on this task
-                    lock_key = f"{self.lock_prefix}:{task_id}"
-                    lock_acquired = await self.redis_client.set(
-                        lock_key, worker_id, nx=True, ex=3600  # 1 hour lock
-                    )
-
-                    if lock_acquired:
-                        # Remove from queue
-                        await self.redis_client.zrem(queue_key, task_id)
-
-                        # Get task data
-                        task_key = f"{self.queue_name}:task:{task_id}"
-                        task_data = await self.redis_client.get(task_key)
+        tasks = await self.dequeue_batch(worker_id, max_tasks=1)
+        return tasks[0] if tasks else None
+
+    async def dequeue_batch(
+        self, worker_id: str, max_tasks: int = 1, timeout: float = 0.0
+    ) -> List[TaskDefinition]:
+        """Claim up to max_tasks ready tasks, highest priority first
+
+        With a timeout, waits for an enqueue (or the next scheduled task to
+        come due) instead of returning empty-handed straight away. Redis
+        errors propagate so the caller can back off.
+        """
+        if not self.redis_client or self._claim_script is None:
+            await self.initialize()
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            next_ready, tasks = await self._claim(worker_id, max_tasks)
+            if tasks:
+                return tasks
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return []
+            wait = remaining
+            if next_ready is not None:
+                wait = min(wait, max(next_ready - time.time(), 0.001))
+            await self.redis_client.blpop(self.signal_key, timeout=wait)
+
+    async def _claim(
+        self, worker_id: str, max_tasks: int
+    ) -> Tuple[Optional[float], List[TaskDefinition]]:
+        """Run the claim script; returns the next future ready time and tasks"""
+        reply = await self._claim_script(
+            keys=self.claim_order,
+            args=[
+                repr(time.time()),
+                worker_id,
+                self.lease_seconds,
+                max_tasks,
+                f"{self.queue_name}:task:",
+                f"{self.lock_prefix}:",
+            ],
+        )
+        next_ready = float(reply[0]) if reply[0] else None
 
-                        if task_data:
-                            task = pickle.loads(task_data)
-                            logger.debug(
-                                f"Dequeued task {task_id} by worker {worker_id}"
-                            )
-                            return task
-                        else:
-                            # Task data not found, release lock
-                            await self.redis_client.delete(lock_key)
+        decoded = []
+        for task_id, task_data in zip(reply[1::2], reply[2::2]):
+            task_id = task_id.decode("utf-8") if isinstance(task_id, bytes) else task_id
+            try:
+                decoded.append((task_id, self.codec.decode_task(task_data, TaskDefinition)))
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                logger.error(f"Dropping undecodable task {task_id}: {e!s}")
+                await self.redis_client.delete(f"{self.lock_prefix}:{task_id}")
 
-            return None
+        # Fetch each referenced blob once for the whole batch
+        refs = set()
+        for _, task in decoded:
+            refs |= self.codec.find_refs([*task.args, *task.kwargs.values()])
+        blobs = await self._load_blobs(refs)
 
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.error("Failed to dequeue task: {e!s}")
-            return None
+        tasks = []
+        for task_id, task in decoded:
+            try:
+                tasks.append(self.codec.resolve(task, blobs))
+            except KeyError as e:
+                logger.error(f"Dropping task {task_id}: argument blob {e!s} expired")
+                await self.redis_client.delete(f"{self.lock_prefix}:{task_id}")
+        if tasks:
+            logger.debug(f"Claimed {len(tasks)} tasks for worker {worker_id}")
+        return next_ready, tasks
 
     async def store_result(self, result: TaskResult):
         """Store task execution result"""
@@ -249,11 +390,20 @@ class TaskQueue:
             if not self.redis_client:
                 await self.initialize()
 
-            result_data = pickle.dumps(result)
+            result_data = self.codec.encode_result(result)
             result_key = f"{self.result_store}:{result.task_id}"
-
-            # Store result with 7 days TTL
-            await self.redis_client.setex(result_key, 604800, result_data)
+            chunks_key = f"{self.result_chunks}:{result.task_id}"
+
+            # Store result with 7 days TTL; large outputs go in chunks
+            async with self.redis_client.pipeline(transaction=True) as pipe:
+                pipe.delete(chunks_key)
+                if len(result_data) > self.result_chunk_size:
+                    chunks = split_chunks(result_data, self.result_chunk_size)
+                    pipe.rpush(chunks_key, *chunks)
+                    pipe.expire(chunks_key, 604800)
+                    result_data = self.codec.encode_manifest(len(chunks), len(result_data))
+                pipe.setex(result_key, 604800, result_data)
+                await pipe.execute()
 
             # Release task lock
             lock_key = f"{self.lock_prefix}:{result.task_id}"
@@ -277,13 +427,68 @@ class TaskQueue:
             result_data = await self.redis_client.get(result_key)
 
             if result_data:
-                return pickle.loads(result_data)
+                if self.codec.read_manifest(result_data) is not None:
+                    result_data = b"".join(
+                        [chunk async for chunk in self.iter_result_chunks(task_id)]
+                    )
+                return self.codec.decode_result(result_data, TaskResult)
             return None
 
         except Exception as e:  # pylint: disable=broad-exception-caught
             logger.error("Failed to get result for task {task_id}: {e!s}")
             return None
 
+    async def iter_result_chunks(self, task_id: str, window: int = 8):
+        """Yield a stored result's encoded bytes chunk by chunk"""
+        if not self.redis_client:
+            await self.initialize()
+
+        result_data = await self.redis_client.get(f"{self.result_store}:{task_id}")
+        if not result_data:
+            return
+        manifest = self.codec.read_manifest(result_data)
+        if manifest is None:
+            yield result_data
+            return
+
+        chunks_key = f"{self.result_chunks}:{task_id}"
+        for start in range(0, manifest["chunks"], window):
+            chunks = await self.redis_client.lrange(chunks_key, start, start + window - 1)
+            if not chunks:
+                raise KeyError(f"Result chunks for task {task_id} expired")
+            for chunk in chunks:
+                yield chunk
+
+    async def _store_blobs(self, blobs: Dict[str, bytes]):
+        """Store argument blobs, uploading only digests Redis does not hold yet"""
+        if not blobs:
+            return
+        digests = list(blobs)
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for digest in digests:
+                pipe.expire(f"{self.blob_prefix}:{digest}", self.blob_ttl)
+            present = await pipe.execute()
+
+        missing = [digest for digest, found in zip(digests, present) if not found]
+        if missing:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for digest in missing:
+                    pipe.set(f"{self.blob_prefix}:{digest}", blobs[digest], ex=self.blob_ttl)
+                await pipe.execute()
+
+    async def _load_blobs(self, digests: Set[str]) -> Dict[str, Any]:
+        if not digests:
+            return {}
+        digests = list(digests)
+        payloads = await self.redis_client.mget(
+            [f"{self.blob_prefix}:{digest}" for digest in digests]
+        )
+        return {
+            digest: self.codec.decode_blob(payload)
+            for digest, payload in zip(digests, payloads)
+            if payload is not None
+        }
+
     async def get_queue_stats(self) -> Dict[str, Any]:
         """Get comprehensive queue statistics"""
         try:
@@ -345,14 +550,36 @@ class TaskQueue:
 class TaskWorker:
     """High-performance task worker with resource monitoring"""
 
-    def __init__(self, worker_id: str, concurrency: int = 4):
+    def __init__(
+        self,
+        worker_id: str,
+        concurrency: int = 4,
+        task_queue: Optional[TaskQueue] = None,
+        claim_batch_size: int = 8,
+        claim_timeout: float = 5.0,
+        process_workers: Optional[int] = None,
+        preload_models: Optional[Dict[str, str]] = None,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+    ):
         self.worker_id = worker_id
         self.concurrency = concurrency
         self.is_running = False
-        self.task_queue = TaskQueue()
+        self.task_queue = task_queue or TaskQueue()
+        self.claim_batch_size = claim_batch_size
+        self.claim_timeout = claim_timeout  # Longest single blocking wait
+        self.retry_delay = retry_delay  # First pause after a failed claim, doubling
+        self.max_retry_delay = max_retry_delay
+        # Per-portfolio return statistics, shared by workers and kept across restarts
+        self.risk_state_prefix = f"{self.task_queue.queue_name}:risk:returns"
+        self._free_slots: List[int] = list(range(concurrency))
+        self._slot_freed: Optional[asyncio.Future] = None
+        self._running_tasks: Set[asyncio.Task] = set()
         self.thread_executor = ThreadPoolExecutor(max_workers=concurrency)
-        self.process_executor = ProcessPoolExecutor(
-            max_workers=max(1, mp.cpu_count() // 2)
+        self.process_pool = ProcessTaskPool(
+            workers=process_workers or max(1, mp.cpu_count() // 2),
+            model_paths=preload_models,
+            initializers=["cpu_tasks:warm_up"],
         )
 
         # Performance tracking
@@ -361,8 +588,9 @@ class TaskWorker:
         self.total_execution_time = 0.0
         self.start_time = None
 
-        # Task registry
+        # Task registry; process tasks map to importable function paths
         self.task_functions = {}
+        self.process_tasks: Dict[str, str] = {}
         self._register_default_tasks()
 
     def _register_default_tasks(self):
@@ -370,15 +598,20 @@ class TaskWorker:
         self.task_functions.update(
             {
                 "data_ingestion_task": self._data_ingestion_task,
-                "model_training_task": self._model_training_task,
                 "prediction_batch_task": self._prediction_batch_task,
                 "risk_analysis_task": self._risk_analysis_task,
+                "bet_settlement_task": self._bet_settlement_task,
                 "arbitrage_scan_task": self._arbitrage_scan_task,
-                "performance_analysis_task": self._performance_analysis_task,
                 "cleanup_task": self._cleanup_task,
                 "backup_task": self._backup_task,
                 "cache_warming_task": self._cache_warming_task,
-                "analytics_computation_task": self._analytics_computation_task,
+            }
+        )
+        self.process_tasks.update(
+            {
+                "model_training_task": "cpu_tasks:model_training_task",
+                "performance_analysis_task": "cpu_tasks:performance_analysis_task",
+                "analytics_computation_task": "cpu_tasks:analytics_computation_task",
             }
         )
 
@@ -387,6 +620,11 @@ class TaskWorker:
         self.task_functions[name] = function
         logger.info("Registered task function: {name}")
 
+    def register_process_task(self, name: str, function_path: str):
+        """Register a CPU-bound task by importable name ("module:function")"""
+        self.process_tasks[name] = function_path
+        logger.info(f"Registered process task function: {name} -> {function_path}")
+
     async def start(self):
         """Start the worker"""
         if self.is_running:
@@ -395,16 +633,15 @@ class TaskWorker:
         self.is_running = True
         self.start_time = datetime.now(timezone.utc)
         await self.task_queue.initialize()
+        if self.process_tasks:
+            await self.process_pool.start()  # Warm workers before claiming
 
         logger.info(
             f"Starting task worker {self.worker_id} with concurrency {self.concurrency}"
         )
 
-        # Create worker tasks
-        worker_tasks = []
-        for i in range(self.concurrency):
-            task = asyncio.create_task(self._worker_loop(f"{self.worker_id}_{i}"))
-            worker_tasks.append(task)
+        # One claim loop fills the execution slots in batches
+        worker_tasks = [asyncio.create_task(self._worker_loop())]
 
         # Start monitoring task
         monitor_task = asyncio.create_task(self._monitor_loop())
@@ -422,37 +659,69 @@ class TaskWorker:
         logger.info("Stopping task worker {self.worker_id}")
         self.is_running = False
 
+        # Let claimed tasks finish so their results are stored
+        if self._running_tasks:
+            await asyncio.gather(*self._running_tasks, return_exceptions=True)
+
         # Shutdown executors
         self.thread_executor.shutdown(wait=True)
-        self.process_executor.shutdown(wait=True)
+        self.process_pool.close()
 
-    async def _worker_loop(self, worker_thread_id: str):
-        """Main worker processing loop"""
+    async def _worker_loop(self):
+        """Claim tasks for free slots, blocking on the queue while it is empty"""
+        loop = asyncio.get_running_loop()
+        backoff = 0.0
         while self.is_running:
             try:
-                # Get next task
-                task = await self.task_queue.dequeue(worker_thread_id)
+                if not self._free_slots:
+                    self._slot_freed = loop.create_future()
+                    await self._slot_freed
+                    continue
+
+                tasks = await self.task_queue.dequeue_batch(
+                    self.worker_id,
+                    max_tasks=min(len(self._free_slots), self.claim_batch_size),
+                    timeout=self.claim_timeout,
+                )
+                backoff = 0.0
+                for task in tasks:
+                    slot = self._free_slots.pop()
+                    running = asyncio.create_task(
+                        self._run_claimed_task(task, f"{self.worker_id}_{slot}", slot)
+                    )
+                    self._running_tasks.add(running)
+                    running.add_done_callback(self._running_tasks.discard)
 
-                if task:
-                    # Execute task
-                    result = await self._execute_task(task, worker_thread_id)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                # Exponential backoff while the queue is unreachable
+                backoff = min(max(backoff * 2, self.retry_delay), self.max_retry_delay)
+                logger.error(f"Worker loop error, retrying in {backoff:.0f}s: {e!s}")
+                await asyncio.sleep(backoff)
 
-                    # Store result
-                    await self.task_queue.store_result(result)
+    async def _run_claimed_task(
+        self, task: TaskDefinition, worker_thread_id: str, slot: int
+    ):
+        """Execute a claimed task in a slot and store its result"""
+        try:
+            result = await self._execute_task(task, worker_thread_id)
 
-                    # Update stats
-                    self.tasks_processed += 1
-                    if result.status == TaskStatus.FAILED:
-                        self.tasks_failed += 1
-                    self.total_execution_time += result.execution_time
+            # Store result
+            await self.task_queue.store_result(result)
 
-                else:
-                    # No tasks available, wait before checking again
-                    await asyncio.sleep(1)
+            # Update stats
+            self.tasks_processed += 1
+            if result.status == TaskStatus.FAILED:
+                self.tasks_failed += 1
+            self.total_execution_time += result.execution_time
 
-            except Exception as e:  # pylint: disable=broad-exception-caught
-                logger.error("Worker loop error: {e!s}")
-                await asyncio.sleep(5)  # Wait before retrying
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"Task {task.id} handling failed: {e!s}")
+
+        finally:
+            self._free_slots.append(slot)
+            waiter = self._slot_freed
+            if waiter is not None and not waiter.done():
+                waiter.set_result(None)
 
     async def _execute_task(
         self, task: TaskDefinition, worker_thread_id: str
@@ -468,26 +737,32 @@ class TaskWorker:
 
         try:
             # Check if task function exists
-            if task.function_name not in self.task_functions:
+            if task.function_name in self.process_tasks:
+                function = None
+            elif task.function_name in self.task_functions:
+                function = self.task_functions[task.function_name]
+            else:
                 raise ValueError(f"Unknown task function: {task.function_name}")
 
-            function = self.task_functions[task.function_name]
-
             # Execute with timeout
             try:
-                if task.cpu_requirement > 2.0:
-                    # CPU-intensive task, use process executor
-                    loop = asyncio.get_event_loop()
+                if function is None:
+                    # CPU-bound task: worker process, killed if it overruns
+                    task_result = await self.process_pool.run(
+                        self.process_tasks[task.function_name],
+                        task.args,
+                        task.kwargs,
+                        timeout=task.timeout_seconds,
+                        memory_limit_mb=task.memory_requirement,
+                    )
+                elif asyncio.iscoroutinefunction(function):
                     task_result = await asyncio.wait_for(
-                        loop.run_in_executor(
-                            self.process_executor,
-                            lambda: function(*task.args, **task.kwargs),
-                        ),
+                        function(*task.args, **task.kwargs),
                         timeout=task.timeout_seconds,
                     )
                 else:
                     # Regular task, use thread executor
-                    loop = asyncio.get_event_loop()
+                    loop = asyncio.get_running_loop()
                     task_result = await asyncio.wait_for(
                         loop.run_in_executor(
                             self.thread_executor,
@@ -503,6 +778,11 @@ class TaskWorker:
                 result.status = TaskStatus.TIMEOUT
                 result.error = f"Task timed out after {task.timeout_seconds} seconds"
 
+            except ProcessTaskError as e:
+                result.status = TaskStatus.FAILED
+                result.error = str(e)
+                result.traceback = e.remote_traceback
+
             except Exception as e:  # pylint: disable=broad-exception-caught
                 result.status = TaskStatus.FAILED
                 result.error = str(e)
@@ -575,28 +855,6 @@ class TaskWorker:
             logger.error("Data ingestion task failed: {e!s}")
             return {"status": "failed", "error": str(e)}
 
-    def _model_training_task(
-        self, model_name: str, training_data: Dict[str, Any], **kwargs
-    ):
-        """Model training task"""
-        logger.info("Executing model training task for {model_name}")
-
-        try:
-            # Simulate model training
-            time.sleep(kwargs.get("training_duration", 10))  # Simulate training time
-
-            return {
-                "status": "success",
-                "model_name": model_name,
-                "training_samples": training_data.get("sample_count", 0),
-                "accuracy": 0.85 + (hash(model_name) % 100) / 1000,  # Mock accuracy
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
-
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.error("Model training task failed: {e!s}")
-            return {"status": "failed", "error": str(e)}
-
     async def _prediction_batch_task(self, event_ids: List[str], **kwargs):
         """Batch prediction task"""
         logger.info("Executing batch prediction task for {len(event_ids)} events")
@@ -645,10 +903,25 @@ class TaskWorker:
             # Import here to avoid circular imports
             from risk_management import ultra_risk_engine
 
-            risk_metrics = await ultra_risk_engine.risk_assessor.assess_portfolio_risk(
+            assessor = ultra_risk_engine.risk_assessor
+            portfolio_id = portfolio.get("portfolio_id")
+            if portfolio_id is not None:
+                # Returns arrive through bet settlement; load the latest statistics
+                state = await self.task_queue.redis_client.get(
+                    f"{self.risk_state_prefix}:{portfolio_id}"
+                )
+                if state is not None:
+                    assessor.restore_accumulator(portfolio_id, state)
+
+            risk_metrics = await assessor.assess_portfolio_risk(
                 positions=portfolio.get("positions", []),
                 bankroll=portfolio.get("bankroll", 10000),
-                historical_returns=portfolio.get("historical_returns", []),
+                # Only portfolios without an id pass their whole history
+                historical_returns=(
+                    portfolio.get("historical_returns") if portfolio_id is None else None
+                ),
+                portfolio_id=portfolio_id,
+                simulate=portfolio.get("simulate", False),
             )
 
             return {
@@ -664,6 +937,59 @@ class TaskWorker:
             logger.error("Risk analysis task failed: {e!s}")
             return {"status": "failed", "error": str(e)}
 
+    async def _bet_settlement_task(
+        self,
+        portfolio_id: str,
+        returns: List[float],
+        bets: Optional[List[Dict[str, Any]]] = None,
+        **kwargs,
+    ):
+        """Bet settlement task: add settled returns, oldest first, to a portfolio's risk statistics
+
+        The statistics are read, updated and written back under WATCH, so
+        workers settling the same portfolio at once retry instead of losing
+        each other's returns. bets, the settled bets themselves (see
+        PortfolioOptimizer.record_settled_bet), feed empirical correlations.
+        """
+        logger.info(f"Executing bet settlement task for portfolio {portfolio_id}")
+
+        try:
+            # Import here to avoid circular imports
+            from risk_management import ultra_risk_engine
+
+            assessor = ultra_risk_engine.risk_assessor
+            key = f"{self.risk_state_prefix}:{portfolio_id}"
+            async with self.task_queue.redis_client.pipeline(transaction=True) as pipe:
+                while True:
+                    try:
+                        await pipe.watch(key)
+                        state = await pipe.get(key)
+                        if state is not None:
+                            assessor.restore_accumulator(portfolio_id, state)
+                        else:
+                            assessor.accumulators.pop(portfolio_id, None)
+                        assessor.record_returns(portfolio_id, returns)
+                        pipe.multi()
+                        pipe.set(key, assessor.export_accumulator(portfolio_id))
+                        await pipe.execute()
+                        break
+                    except redis.WatchError:
+                        continue  # Another settlement won; start again from its state
+
+            for bet in bets or []:
+                ultra_risk_engine.portfolio_optimizer.record_settled_bet(bet)
+
+            return {
+                "status": "success",
+                "portfolio_id": portfolio_id,
+                "settled": len(returns),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
+
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"Bet settlement task failed: {e!s}")
+            return {"status": "failed", "error": str(e)}
+
     async def _arbitrage_scan_task(self, market_data: List[Dict[str, Any]], **kwargs):
         """Arbitrage scanning task"""
         logger.info("Executing arbitrage scan task")
@@ -696,25 +1022,6 @@ class TaskWorker:
             logger.error("Arbitrage scan task failed: {e!s}")
             return {"status": "failed", "error": str(e)}
 
-    def _performance_analysis_task(self, analysis_type: str, **kwargs):
-        """Performance analysis task"""
-        logger.info("Executing performance analysis task: {analysis_type}")
-
-        try:
-            # Simulate performance analysis
-            time.sleep(kwargs.get("analysis_duration", 5))
-
-            return {
-                "status": "success",
-                "analysis_type": analysis_type,
-                "metrics_computed": kwargs.get("metrics_count", 10),
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
-
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.error("Performance analysis task failed: {e!s}")
-            return {"status": "failed", "error": str(e)}
-
     def _cleanup_task(self, cleanup_type: str, **kwargs):
         """Data cleanup task"""
         logger.info("Executing cleanup task: {cleanup_type}")
@@ -775,34 +1082,96 @@ class TaskWorker:
             logger.error("Cache warming task failed: {e!s}")
             return {"status": "failed", "error": str(e)}
 
-    def _analytics_computation_task(self, metrics: List[str], **kwargs):
-        """Analytics computation task"""
-        logger.info("Executing analytics computation task for {len(metrics)} metrics")
 
-        try:
-            # Simulate analytics computation
-            computation_time = len(metrics) * kwargs.get("time_per_metric", 1)
-            time.sleep(computation_time)
+# Extends the leader lock only if this replica still holds it
+RENEW_LEADER_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("PEXPIRE", KEYS[1], ARGV[2])
+end
+return 0
+"""
 
-            return {
-                "status": "success",
-                "metrics_computed": len(metrics),
-                "computation_time": computation_time,
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
+RELEASE_LEADER_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
 
-        except Exception as e:  # pylint: disable=broad-exception-caught
-            logger.error("Analytics computation task failed: {e!s}")
-            return {"status": "failed", "error": str(e)}
+# KEYS: occurrence guards; ARGV: replica id, TTL (ms). 1 per occurrence this replica holds
+CLAIM_OCCURRENCES_SCRIPT = """
+local claimed = {}
+for i, key in ipairs(KEYS) do
+    if redis.call("SET", key, ARGV[1], "NX", "PX", ARGV[2]) or redis.call("GET", key) == ARGV[1] then
+        claimed[i] = 1
+    else
+        claimed[i] = 0
+    end
+end
+return claimed
+"""
 
+RELEASE_OCCURRENCES_SCRIPT = """
+for _, key in ipairs(KEYS) do
+    if redis.call("GET", key) == ARGV[1] then
+        redis.call("DEL", key)
+    end
+end
+return 1
+"""
 
-class TaskScheduler:
-    """Advanced task scheduler with cron-like functionality"""
 
-    def __init__(self):
-        self.task_queue = TaskQueue()
-        self.scheduled_tasks = {}
+class TaskScheduler:
+    """Heap-based recurring task scheduler with a distributed leader lock
+
+    Next fire times are precomputed into a heap, so the loop sleeps until
+    exactly the earliest one. Only the replica holding the leader lock
+    enqueues. The last fire time of every schedule is kept in Redis so a new
+    leader catches up according to each task's misfire policy. Occurrence
+    ids derive from the nominal fire time and each is claimed with SET NX
+    before enqueueing, so a lagging former leader cannot enqueue it again.
+    Occurrences whose enqueue fails stay in the heap and are retried.
+    """
+
+    def __init__(
+        self,
+        task_queue: Optional[TaskQueue] = None,
+        clock: Callable[[], float] = time.time,
+        replica_id: Optional[str] = None,
+        leader_ttl: float = 15.0,
+        misfire_grace_seconds: float = 60.0,
+        max_catch_up: int = 100,
+        occurrence_ttl: float = 86400.0,
+        retry_delay: float = 5.0,
+    ):
+        self.task_queue = task_queue or TaskQueue()
+        self.scheduled_tasks: Dict[str, TaskDefinition] = {}
+        self.schedules: Dict[str, Schedule] = {}
         self.is_running = False
+        self.is_leader = False
+        self.clock = clock
+        self.replica_id = replica_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.leader_ttl = leader_ttl
+        self.misfire_grace_seconds = misfire_grace_seconds
+        self.max_catch_up = max_catch_up
+        self.occurrence_ttl = occurrence_ttl
+        self.retry_delay = retry_delay
+        self.leader_key = f"{self.task_queue.queue_name}:scheduler:leader"
+        self.last_fire_key = f"{self.task_queue.queue_name}:scheduler:last_fire"
+        self.occurrence_prefix = f"{self.task_queue.queue_name}:scheduler:occurrence:"
+        # (due time incl. jitter, nominal fire time, task id, version)
+        self._heap: List[Tuple[float, float, str, int]] = []
+        self._versions: Dict[str, int] = {}
+        self._wakeup: Optional[asyncio.Future] = None
+        self._retry_at = 0.0  # No tick before this after a failed enqueue
+        self.stats = {
+            "fired": 0,
+            "caught_up": 0,
+            "skipped": 0,
+            "duplicates": 0,
+            "enqueue_failures": 0,
+            "leader_changes": 0,
+        }
 
     async def initialize(self):
         """Initialize task scheduler"""
@@ -811,61 +1180,255 @@ class TaskScheduler:
     async def schedule_task(self, task: TaskDefinition):
         """Schedule a task for future execution"""
         if task.recurring and task.cron_expression:
+            schedule = parse_schedule(task.cron_expression)
+            MisfirePolicy(task.misfire_policy)  # Reject unknown policies up front
             self.scheduled_tasks[task.id] = task
+            self.schedules[task.id] = schedule
+            self._push(task.id, self.clock())
+            self._wake()
             logger.info(
                 f"Scheduled recurring task {task.id} with cron: {task.cron_expression}"
             )
         elif task.scheduled_at:
             await self.task_queue.enqueue(task)
-            logger.info("Scheduled one-time task {task.id} for {task.scheduled_at}")
+            logger.info(f"Scheduled one-time task {task.id} for {task.scheduled_at}")
         else:
             # Immediate execution
             await self.task_queue.enqueue(task)
 
+    def unschedule_task(self, task_id: str) -> bool:
+        """Stop a recurring task"""
+        if self.scheduled_tasks.pop(task_id, None) is None:
+            return False
+        self.schedules.pop(task_id, None)
+        self._versions.pop(task_id, None)  # Orphans its heap entry
+        return True
+
+    def next_fire_time(self, task_id: str) -> Optional[float]:
+        """Due time (with jitter) of a recurring task's next run"""
+        version = self._versions.get(task_id)
+        due = [
+            entry[0] for entry in self._heap if entry[2] == task_id and entry[3] == version
+        ]
+        return min(due) if due else None
+
     async def start_scheduler(self):
         """Start the task scheduler"""
         self.is_running = True
+        loop = asyncio.get_running_loop()
 
         while self.is_running:
             try:
-                await asyncio.sleep(60)  # Check every minute
-
-                # Check scheduled tasks
-                current_time = datetime.now(timezone.utc)
-
-                for task_id, task in list(self.scheduled_tasks.items()):
-                    if self._should_run_task(task, current_time):
-                        # Create new instance for execution
-                        new_task = TaskDefinition(
-                            id=f"{task.id}_{int(current_time.timestamp())}",
-                            task_type=task.task_type,
-                            priority=task.priority,
-                            function_name=task.function_name,
-                            args=task.args.copy(),
-                            kwargs=task.kwargs.copy(),
-                            max_retries=task.max_retries,
-                            timeout_seconds=task.timeout_seconds,
-                            created_at=current_time,
-                        )
-
-                        await self.task_queue.enqueue(new_task)
-                        logger.info("Triggered scheduled task {new_task.id}")
+                await self.step()
+
+                # Sleep until the next fire time, but renew the lock in time
+                wait = self.leader_ttl / 3
+                if self.is_leader and self._heap:
+                    next_tick = max(self._heap[0][0], self._retry_at)
+                    wait = min(wait, max(next_tick - self.clock(), 0.0))
+                self._wakeup = loop.create_future()
+                try:
+                    await asyncio.wait_for(self._wakeup, wait)
+                except asyncio.TimeoutError:
+                    pass
 
             except Exception as e:  # pylint: disable=broad-exception-caught
-                logger.error("Scheduler error: {e!s}")
+                logger.error(f"Scheduler error: {e!s}")
                 await asyncio.sleep(5)
 
-    def _should_run_task(self, task: TaskDefinition, current_time: datetime) -> bool:
-        """Check if a scheduled task should run"""
-        # Simplified cron check - in production would use proper cron parsing
-        if task.cron_expression == "0 */6 * * *":  # Every 6 hours
-            return current_time.minute == 0 and current_time.hour % 6 == 0
-        elif task.cron_expression == "0 0 * * *":  # Daily at midnight
-            return current_time.hour == 0 and current_time.minute == 0
-        elif task.cron_expression == "*/15 * * * *":  # Every 15 minutes
-            return current_time.minute % 15 == 0
+    async def stop_scheduler(self):
+        """Stop the loop and hand leadership to another replica"""
+        self.is_running = False
+        self._wake()
+        if self.is_leader:
+            await self.task_queue.redis_client.eval(
+                RELEASE_LEADER_SCRIPT, 1, self.leader_key, self.replica_id
+            )
+            self.is_leader = False
+
+    async def step(self, now: Optional[float] = None) -> List[TaskDefinition]:
+        """Refresh leadership and, as leader, enqueue every due occurrence"""
+        if not await self._refresh_leadership():
+            return []
+        return await self.tick(now)
+
+    async def tick(self, now: Optional[float] = None) -> List[TaskDefinition]:
+        """Enqueue every occurrence due by now and schedule the next ones"""
+        now = self.clock() if now is None else now
+        due_tasks: List[TaskDefinition] = []
+        last_fire: Dict[str, float] = {}
+        first_popped: Dict[str, Tuple[float, float]] = {}  # Restored if the enqueue fails
+        catch_up: Dict[str, int] = defaultdict(int)
+
+        while self._heap and self._heap[0][0] <= now:
+            due, nominal, task_id, version = heapq.heappop(self._heap)
+            if self._versions.get(task_id) != version:
+                continue  # Unscheduled or rescheduled
+            task = self.scheduled_tasks[task_id]
+            policy = MisfirePolicy(task.misfire_policy)
+            late = now - due > self.misfire_grace_seconds
+
+            if policy == MisfirePolicy.SKIP and late:
+                self.stats["skipped"] += 1
+                next_from = now
+            elif policy == MisfirePolicy.FIRE_ALL:
+                due_tasks.append(self._instantiate(task, nominal, due))
+                first_popped.setdefault(task_id, (due, nominal))
+                if late:
+                    catch_up[task_id] += 1
+                    self.stats["caught_up"] += 1
+                next_from = now if catch_up[task_id] >= self.max_catch_up else nominal
+            else:
+                due_tasks.append(self._instantiate(task, nominal, due))
+                first_popped.setdefault(task_id, (due, nominal))
+                next_from = max(nominal, now)  # Later missed runs coalesce into this one
+
+            last_fire[task_id] = nominal
+            self._push(task_id, next_from)
+
+        claimed: List[TaskDefinition] = []
+        try:
+            claimed = await self._claim_occurrences(due_tasks)
+            enqueued = await self.task_queue.enqueue_many(claimed)
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            logger.error(f"Failed to claim scheduled occurrences: {e!s}")
+            enqueued = False
+
+        if not enqueued:
+            await self._release_occurrences(claimed)
+            for task_id, (due, nominal) in first_popped.items():
+                if task_id in self.scheduled_tasks:
+                    self._versions[task_id] += 1  # Orphans the advanced entry
+                    heapq.heappush(self._heap, (due, nominal, task_id, self._versions[task_id]))
+            self._retry_at = now + self.retry_delay
+            self.stats["enqueue_failures"] += 1
+            logger.warning(f"Will retry {len(due_tasks)} scheduled task occurrences")
+            return []
+
+        if last_fire:
+            await self.task_queue.redis_client.hset(self.last_fire_key, mapping=last_fire)
+
+        self.stats["duplicates"] += len(due_tasks) - len(claimed)
+        due_tasks = claimed
+        self.stats["fired"] += len(due_tasks)
+        if due_tasks:
+            logger.info(f"Triggered {len(due_tasks)} scheduled task occurrences")
+        return due_tasks
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Scheduler counters and leadership"""
+        return {
+            **self.stats,
+            "recurring_tasks": len(self.scheduled_tasks),
+            "is_leader": self.is_leader,
+            "next_fire_in": max(self._heap[0][0] - self.clock(), 0.0) if self._heap else None,
+        }
+
+    async def _refresh_leadership(self) -> bool:
+        """Renew or try to take the leader lock"""
+        if not self.task_queue.redis_client:
+            await self.task_queue.initialize()
+        client = self.task_queue.redis_client
+        ttl_ms = int(self.leader_ttl * 1000)
+
+        if self.is_leader:
+            renewed = await client.eval(
+                RENEW_LEADER_SCRIPT, 1, self.leader_key, self.replica_id, ttl_ms
+            )
+            if not renewed:
+                self.is_leader = False
+                logger.warning(f"Scheduler {self.replica_id} lost leadership")
+
+        if not self.is_leader and await client.set(
+            self.leader_key, self.replica_id, nx=True, px=ttl_ms
+        ):
+            self.is_leader = True
+            self.stats["leader_changes"] += 1
+            await self._restore_last_fire_times()
+            logger.info(f"Scheduler {self.replica_id} is now leader")
+
+        return self.is_leader
+
+    async def _claim_occurrences(self, tasks: List[TaskDefinition]) -> List[TaskDefinition]:
+        """Occurrences no other replica has already enqueued"""
+        if not tasks:
+            return []
+        claimed = await self.task_queue.redis_client.eval(
+            CLAIM_OCCURRENCES_SCRIPT,
+            len(tasks),
+            *[self.occurrence_prefix + task.id for task in tasks],
+            self.replica_id,
+            int(self.occurrence_ttl * 1000),
+        )
+        return [task for task, won in zip(tasks, claimed) if won]
+
+    async def _release_occurrences(self, tasks: List[TaskDefinition]):
+        """Drop this replica's claims so a retry can enqueue them"""
+        if not tasks:
+            return
+        try:
+            await self.task_queue.redis_client.eval(
+                RELEASE_OCCURRENCES_SCRIPT,
+                len(tasks),
+                *[self.occurrence_prefix + task.id for task in tasks],
+                self.replica_id,
+            )
+        except Exception as e:  # pylint: disable=broad-exception-caught
+            # Claims are per replica, so this replica's retry still wins them
+            logger.warning(f"Failed to release scheduled occurrence claims: {e!s}")
+
+    async def _restore_last_fire_times(self):
+        """Rebuild the heap from the fire times the previous leader recorded"""
+        recorded = await self.task_queue.redis_client.hgetall(self.last_fire_key)
+        last_fire = {
+            (key.decode("utf-8") if isinstance(key, bytes) else key): float(value)
+            for key, value in recorded.items()
+        }
+        now = self.clock()
+        self._heap = []
+        for task_id in self.scheduled_tasks:
+            self._push(task_id, last_fire.get(task_id, now))
+
+    def _push(self, task_id: str, after: float):
+        version = self._versions.get(task_id, 0) + 1
+        self._versions[task_id] = version
+        nominal = self.schedules[task_id].next_after(after)
+        due = nominal + self._jitter(self.scheduled_tasks[task_id], nominal)
+        heapq.heappush(self._heap, (due, nominal, task_id, version))
+
+    @staticmethod
+    def _jitter(task: TaskDefinition, nominal: float) -> float:
+        """Deterministic per-occurrence delay, identical on every replica"""
+        if task.jitter_seconds <= 0:
+            return 0.0
+        spread = zlib.crc32(f"{task.id}:{nominal}".encode()) / 0xFFFFFFFF
+        return spread * task.jitter_seconds
+
+    def _instantiate(
+        self, task: TaskDefinition, nominal: float, due: float
+    ) -> TaskDefinition:
+        """Create the one-off task for an occurrence"""
+        return TaskDefinition(
+            id=f"{task.id}_{int(nominal)}",
+            task_type=task.task_type,
+            priority=task.priority,
+            function_name=task.function_name,
+            args=task.args.copy(),
+            kwargs=task.kwargs.copy(),
+            max_retries=task.max_retries,
+            timeout_seconds=task.timeout_seconds,
+            scheduled_at=datetime.fromtimestamp(due, tz=timezone.utc),
+            cpu_requirement=task.cpu_requirement,
+            memory_requirement=task.memory_requirement,
+            created_at=datetime.now(timezone.utc),
+            tags=list(task.tags),
+            metadata={**task.metadata, "recurring_task_id": task.id, "nominal_fire_time": nominal},
+        )
 
-        return False
+    def _wake(self):
+        waiter = self._wakeup
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
 
 
 class UltraTaskProcessor:
@@ -938,6 +1501,7 @@ class UltraTaskProcessor:
             "queue_stats": queue_stats,
             "worker_stats": worker_stats,
             "scheduled_tasks": len(self.scheduler.scheduled_tasks),
+            "scheduler": self.scheduler.get_stats(),
             "system_running": self.is_running,
             "timestamp": datetime.now(timezone.utc).isoformat(),
         }
@@ -962,6 +1526,7 @@ class UltraTaskProcessor:
                 kwargs={"backup_type": "incremental", "data_size_mb": 2000},
                 recurring=True,
                 cron_expression="0 0 * * *",  # Daily at midnight
+                jitter_seconds=300,  # Keep clear of the cleanup run
             ),
             TaskDefinition(
                 id="cache_warming_periodic",
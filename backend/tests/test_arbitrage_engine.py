@@ -0,0 +1,373 @@
+"""Tests for arbitrage detection in arbitrage_engine."""
+
+import asyncio
+import itertools
+import os
+import random
+import sys
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from arbitrage_graph import find_cover_cycles, quote_interval
+from arbitrage_engine import (
+    ArbitrageCalculator,
+    ArbitrageEventType,
+    ArbitrageType,
+    IncrementalArbitrageTracker,
+)
+
+
+def _quote(event_id, market_type, outcome, sportsbook, odds):
+    return {
+        "event_id": event_id,
+        "market_type": market_type,
+        "outcome": outcome,
+        "sportsbook": sportsbook,
+        "odds": odds,
+    }
+
+
+def _random_slate(seed, events=100, books=8):
+    rng = random.Random(seed)
+    markets = {
+        "totals": ("over", "under"),
+        "moneyline": ("home", "away"),
+        "match_result": ("home", "draw", "away"),
+    }
+    quotes = []
+    for event in range(events):
+        for market, outcomes in markets.items():
+            for book in range(books):
+                for outcome in outcomes:
+                    odds = len(outcomes) * rng.uniform(0.85, 1.12)
+                    quotes.append(_quote(f"e{event}", market, outcome, f"b{book}", odds))
+    return quotes
+
+
+def test_best_price_scan_flags_two_and_three_way_arbitrage():
+    """Test the vectorised scan finds best-price arbitrage only."""
+    quotes = [
+        _quote("e1", "totals", "over", "book_a", 2.10),
+        _quote("e1", "totals", "over", "book_b", 1.95),
+        _quote("e1", "totals", "under", "book_b", 2.05),
+        _quote("e1", "totals", "under", "book_c", 1.90),
+        _quote("e2", "totals", "over", "book_a", 1.90),
+        _quote("e2", "totals", "under", "book_b", 1.90),
+        _quote("e3", "1x2", "1", "book_a", 3.2),
+        _quote("e3", "1x2", "X", "book_b", 3.6),
+        _quote("e3", "1x2", "2", "book_c", 3.4),
+    ]
+
+    opportunities = asyncio.run(ArbitrageCalculator().detect_arbitrage_opportunities(quotes))
+    found = {(opp.event_id, opp.arbitrage_type): opp for opp in opportunities}
+
+    assert set(found) == {("e1", ArbitrageType.TWO_WAY), ("e3", ArbitrageType.THREE_WAY)}
+    assert set(found[("e1", ArbitrageType.TWO_WAY)].sportsbooks) == {"book_a", "book_b"}
+    assert found[("e3", ArbitrageType.THREE_WAY)].guaranteed_profit > 0
+
+
+def test_best_price_scan_avoids_single_book_legs():
+    """Test both legs at one book fall back to the runner-up price."""
+    quotes = [
+        _quote("e1", "totals", "over", "book_a", 2.20),
+        _quote("e1", "totals", "under", "book_a", 2.10),
+        _quote("e1", "totals", "under", "book_b", 2.00),
+    ]
+
+    opportunities = asyncio.run(ArbitrageCalculator().detect_arbitrage_opportunities(quotes))
+
+    assert len(opportunities) == 1
+    assert opportunities[0].sportsbooks == ["book_a", "book_b"]
+
+
+def test_vectorised_scan_matches_pairwise_best_profit():
+    """Test every market flagged pairwise is flagged with the same best profit."""
+    for seed in range(3):
+        quotes = _random_slate(seed)
+        vectorised = asyncio.run(
+            ArbitrageCalculator().detect_arbitrage_opportunities(quotes)
+        )
+        pairwise = asyncio.run(
+            ArbitrageCalculator(use_vectorized=False).detect_arbitrage_opportunities(quotes)
+        )
+
+        best_pairwise = {}
+        for opp in pairwise:
+            key = (opp.event_id, opp.market_type, opp.arbitrage_type)
+            best_pairwise[key] = max(best_pairwise.get(key, 0.0), opp.profit_percentage)
+
+        assert {
+            (opp.event_id, opp.market_type, opp.arbitrage_type) for opp in vectorised
+        } == set(best_pairwise)
+        for opp in vectorised:
+            key = (opp.event_id, opp.market_type, opp.arbitrage_type)
+            assert abs(opp.profit_percentage - best_pairwise[key]) < 1e-9
+
+
+def test_incremental_tracker_emits_opened_updated_closed():
+    """Test odds ticks open, update and close a two-way arbitrage."""
+    tracker = IncrementalArbitrageTracker(ArbitrageCalculator())
+
+    assert tracker.apply_quote(_quote("e1", "totals", "over", "book_a", 1.95)) == []
+    assert tracker.apply_quote(_quote("e1", "totals", "under", "book_b", 1.95)) == []
+
+    opened = tracker.apply_quote(_quote("e1", "totals", "over", "book_c", 2.15))
+    assert [e.event_type for e in opened] == [ArbitrageEventType.OPENED]
+    assert opened[0].opportunity.sportsbooks == ["book_c", "book_b"]
+
+    # A quote below the best price changes nothing
+    assert tracker.apply_quote(_quote("e1", "totals", "over", "book_a", 2.00)) == []
+
+    updated = tracker.apply_quote(_quote("e1", "totals", "under", "book_b", 2.05))
+    assert [e.event_type for e in updated] == [ArbitrageEventType.UPDATED]
+
+    # Pulling the best over quote falls back to book_a, still an arbitrage
+    assert tracker.remove_quote("e1", "totals", "over", "book_c")[0].event_type == (
+        ArbitrageEventType.UPDATED
+    )
+    closed = tracker.apply_quote(_quote("e1", "totals", "under", "book_b", 1.90))
+    assert [e.event_type for e in closed] == [ArbitrageEventType.CLOSED]
+    assert closed[0].inverse_sum >= 1.0
+    assert tracker.open_opportunities() == []
+
+
+def test_incremental_tracker_matches_full_scan_after_random_ticks():
+    """Test the arbitrage open after a stream of ticks equals a full rescan."""
+    rng = random.Random(7)
+    calculator = ArbitrageCalculator()
+    tracker = IncrementalArbitrageTracker(calculator)
+    current = {}
+    slate = _random_slate(0, events=20, books=6)
+
+    for quote in slate:
+        tracker.apply_quote(quote)
+        current[(quote["event_id"], quote["market_type"], quote["outcome"], quote["sportsbook"])] = quote
+
+    keys = list(current)
+    for _ in range(5000):
+        key = rng.choice(keys)
+        odds = 0.0 if rng.random() < 0.05 else current[key]["odds"] * rng.uniform(0.95, 1.05)
+        quote = _quote(*key, odds)
+        tracker.apply_quote(quote)
+        current[key] = quote
+
+    live_quotes = [quote for quote in current.values() if quote["odds"] > 1.0]
+    scanned = asyncio.run(calculator.detect_arbitrage_opportunities(live_quotes))
+
+    def summary(opportunities):
+        return {
+            (opp.event_id, opp.market_type, opp.arbitrage_type): round(opp.profit_percentage, 9)
+            for opp in opportunities
+            if opp.arbitrage_type in (ArbitrageType.TWO_WAY, ArbitrageType.THREE_WAY)
+        }
+
+    assert summary(tracker.open_opportunities()) == summary(scanned)
+    assert tracker.get_stats()["ticks"] == len(slate) + 5000
+
+
+def _line_quote(event_id, market_type, outcome, sportsbook, odds, line=None):
+    quote = _quote(event_id, market_type, outcome, sportsbook, odds)
+    quote["line"] = line
+    return quote
+
+
+def _payouts(opportunity, axis_values):
+    """Payout of the opportunity's stakes for each possible axis result."""
+    payouts = []
+    for value in axis_values:
+        payout = 0.0
+        for leg in opportunity.metadata["legs"]:
+            _, low, high = quote_interval(leg["market_type"], leg["outcome"], leg["line"])
+            if low < value < high:
+                payout += leg["stake"] * leg["odds"]
+        payouts.append(payout)
+    return payouts
+
+
+def test_graph_search_finds_cross_market_triangular_and_synthetic_covers():
+    """Test each cover type is found and pays out on every result."""
+    quotes = [
+        # Moneyline home + double chance draw-or-away
+        _line_quote("e1", "1x2", "1", "book_a", 2.50),
+        _line_quote("e1", "double_chance", "x2", "book_b", 1.75),
+        # Home, draw, and away via the -0.5 handicap
+        _line_quote("e2", "1x2", "1", "book_a", 2.50),
+        _line_quote("e2", "1x2", "x", "book_b", 3.60),
+        _line_quote("e2", "spread", "away", "book_c", 3.30, line=-0.5),
+        # Middle between two totals lines of one market
+        _line_quote("e3", "totals", "over", "book_a", 2.20, line=2.5),
+        _line_quote("e3", "totals", "under", "book_b", 2.00, line=3.5),
+        # Fair cross-market prices: no arbitrage
+        _line_quote("e4", "1x2", "1", "book_a", 2.00),
+        _line_quote("e4", "double_chance", "x2", "book_b", 1.90),
+    ]
+
+    opportunities = asyncio.run(ArbitrageCalculator().detect_arbitrage_opportunities(quotes))
+    found = {
+        (opp.event_id, opp.arbitrage_type): opp
+        for opp in opportunities
+        if opp.metadata.get("calculation_method") == "cover_graph"
+    }
+
+    assert set(found) == {
+        ("e1", ArbitrageType.CROSS_MARKET),
+        ("e2", ArbitrageType.TRIANGULAR),
+        ("e3", ArbitrageType.SYNTHETIC),
+    }
+    for opp in found.values():
+        assert opp.guaranteed_profit > 0
+        for payout in _payouts(opp, [x + 0.0 for x in range(-6, 7)]):
+            assert payout >= opp.total_stake_required + opp.guaranteed_profit - 1e-9
+
+
+def test_graph_search_matches_brute_force_covers():
+    """Test the bounded search finds the cheapest mixed cover."""
+    rng = random.Random(3)
+    menu = [
+        ("1x2", "1", None),
+        ("1x2", "x", None),
+        ("1x2", "2", None),
+        ("double_chance", "1x", None),
+        ("double_chance", "x2", None),
+        ("spread", "home", -0.5),
+        ("spread", "away", 0.5),
+        ("spread", "home", 1.5),
+        ("spread", "away", -1.5),
+    ]
+    fair = {"1": 2.6, "x": 3.4, "2": 3.0, "1x": 1.45, "x2": 1.6}
+
+    for trial in range(30):
+        quotes = []
+        for market, outcome, line in menu:
+            base = fair.get(outcome) or (2.6 if (outcome == "home") == (line < 0) else 1.6)
+            quotes.append(
+                _line_quote("e", market, outcome, f"b{trial}", base * rng.uniform(0.85, 1.2), line)
+            )
+
+        expected = {}
+        for size in (2, 3, 4):
+            for legs in itertools.combinations(range(len(quotes)), size):
+                families = {
+                    (quotes[i]["market_type"], abs(quotes[i]["line"] or 0)) for i in legs
+                }
+                cost = sum(1 / quotes[i]["odds"] for i in legs)
+                if len(families) < 2 or cost >= 1.0:
+                    continue
+                intervals = [
+                    quote_interval(quotes[i]["market_type"], quotes[i]["outcome"], quotes[i]["line"])[1:]
+                    for i in legs
+                ]
+                covers = all(
+                    any(low < x < high for low, high in intervals) for x in range(-4, 5)
+                )
+                if covers:
+                    expected[size] = min(expected.get(size, 1.0), cost)
+
+        graph_quotes = ArbitrageCalculator()._graph_quotes(quotes)
+        found = {
+            len(cycle.quote_indexes): cycle.implied_total
+            for cycle in find_cover_cycles(graph_quotes, max_depth=4)
+        }
+
+        assert set(found) <= set(expected)
+        for size, cost in found.items():
+            assert cost >= expected[size] - 1e-12
+        if expected:
+            assert abs(min(found.values()) - min(expected.values())) < 1e-12
+
+
+def test_graph_search_process_pool_matches_inline():
+    """Test the pooled search returns the same covers as the inline one."""
+    quotes = []
+    for event in range(40):
+        quotes.extend(
+            [
+                _line_quote(f"e{event}", "1x2", "1", "book_a", 2.50 + event / 100),
+                _line_quote(f"e{event}", "double_chance", "x2", "book_b", 1.75),
+                _line_quote(f"e{event}", "totals", "over", "book_a", 2.20, line=2.5),
+                _line_quote(f"e{event}", "totals", "under", "book_b", 2.00, line=3.5),
+            ]
+        )
+
+    pooled_calculator = ArbitrageCalculator(graph_workers=2, graph_pool_threshold=0)
+    try:
+        pooled = asyncio.run(pooled_calculator.detect_arbitrage_opportunities(quotes))
+    finally:
+        pooled_calculator.close()
+    inline = asyncio.run(ArbitrageCalculator().detect_arbitrage_opportunities(quotes))
+
+    def summary(opportunities):
+        return sorted(
+            (opp.event_id, opp.arbitrage_type.value, round(opp.profit_percentage, 9))
+            for opp in opportunities
+            if opp.metadata.get("calculation_method") == "cover_graph"
+        )
+
+    assert len(summary(pooled)) == 80
+    assert summary(pooled) == summary(inline)
+
+
+def test_small_graph_search_runs_off_the_event_loop_and_engine_closes_pool(monkeypatch):
+    """Test inline-sized searches use an executor thread and close() stops the workers."""
+    import arbitrage_engine
+
+    search_threads = []
+    find = arbitrage_engine.find_cover_cycles
+
+    def recording_find(quotes, depth):
+        search_threads.append(threading.current_thread())
+        return find(quotes, depth)
+
+    monkeypatch.setattr(arbitrage_engine, "find_cover_cycles", recording_find)
+    quotes = [
+        _line_quote("e0", "1x2", "1", "book_a", 2.60),
+        _line_quote("e0", "double_chance", "x2", "book_b", 1.75),
+    ]
+
+    async def run():
+        await ArbitrageCalculator().detect_arbitrage_opportunities(quotes)
+        return threading.current_thread()
+
+    loop_thread = asyncio.run(run())
+    assert search_threads and all(thread is not loop_thread for thread in search_threads)
+
+    engine = arbitrage_engine.UltraArbitrageEngine()
+    engine.arbitrage_calculator._graph_pool = pool = ProcessPoolExecutor(max_workers=1)
+    engine.close()
+    assert engine.arbitrage_calculator._graph_pool is None
+    with pytest.raises(RuntimeError):
+        pool.submit(abs, -1)
+
+
+def test_pool_failure_falls_back_to_thread_search(monkeypatch):
+    """Test a search that fails in the pool for any reason is redone in a thread."""
+    import arbitrage_engine
+
+    find = arbitrage_engine.find_cover_cycles
+    calls = []
+
+    def local_find(quotes, depth):  # A local function cannot be sent to a worker
+        calls.append(len(quotes))
+        return find(quotes, depth)
+
+    monkeypatch.setattr(arbitrage_engine, "find_cover_cycles", local_find)
+    quotes = [
+        _line_quote("e0", "1x2", "1", "book_a", 2.60),
+        _line_quote("e0", "double_chance", "x2", "book_b", 1.75),
+    ]
+
+    calculator = ArbitrageCalculator(graph_workers=1, graph_pool_threshold=0)
+    try:
+        opportunities = asyncio.run(calculator.detect_arbitrage_opportunities(quotes))
+        assert calculator._graph_pool is not None  # Still healthy, kept for later searches
+    finally:
+        calculator.close()
+
+    assert calls == [2]
+    assert any(
+        opp.metadata.get("calculation_method") == "cover_graph" for opp in opportunities
+    )
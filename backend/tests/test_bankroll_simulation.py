@@ -0,0 +1,107 @@
+"""Tests for bankroll_simulation.BankrollSimulator."""
+
+import asyncio
+import math
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from bankroll_simulation import BankrollSimulator, SimulationPosition, StakingRule, simulate_chunk
+from process_pool import ProcessTaskPool
+
+SLATE = [
+    SimulationPosition(odds=2.1, win_probability=0.5, stake=20.0),
+    SimulationPosition(odds=1.8, win_probability=0.58, stake=30.0),
+    SimulationPosition(odds=3.5, win_probability=0.3, stake=10.0),
+]
+
+
+def test_certain_outcomes_give_exact_paths():
+    """Test sure wins and sure losses produce the closed-form bankroll, ruin round and drawdown."""
+    winner = BankrollSimulator([SimulationPosition(2.5, 1.0, 10.0)], 100.0)
+    result = winner.run(paths=50, rounds=20, seed=0)
+    assert result.ruin_probability == 0.0 and result.mean_max_drawdown == 0.0
+    assert result.mean_final_bankroll == pytest.approx(100.0 + 20 * 15.0)
+
+    loser = BankrollSimulator([SimulationPosition(2.5, 0.0, 10.0)], 100.0)
+    result = loser.run(paths=50, rounds=20, seed=0)
+    # After ten losses nothing is left to stake
+    assert result.ruin_probability == 1.0 and result.rounds_to_ruin_quantiles["p50"] == 10
+    assert result.max_drawdown_quantiles["p99"] == pytest.approx(1.0)
+    np.testing.assert_allclose(loser.sample_path(12)[-3:], [0.0, 0.0, 0.0])
+
+    fraction = BankrollSimulator(
+        [SimulationPosition(2.5, 0.0)], 100.0, StakingRule.FRACTION, fraction=0.2
+    )
+    result = fraction.run(paths=50, rounds=40, seed=0)
+    assert result.mean_rounds_to_ruin == math.ceil(math.log(0.01) / math.log(0.8))
+
+
+def test_flat_staking_matches_expected_value_and_kelly_sizes_by_edge():
+    """Test the simulated mean matches the slate's expected value and Kelly stakes follow edges."""
+    simulator = BankrollSimulator(SLATE, 100_000.0)
+    result = simulator.run(paths=100_000, rounds=50, seed=3)
+    expected = sum(p.stake * (p.win_probability * p.odds - 1) for p in SLATE) * 50
+    round_std = math.sqrt(
+        sum((p.stake * p.odds) ** 2 * p.win_probability * (1 - p.win_probability) for p in SLATE)
+    )
+    std_error = round_std * math.sqrt(50 / 100_000)
+    assert abs(result.mean_final_bankroll - 100_000.0 - expected) < 5 * std_error
+
+    kelly = BankrollSimulator(SLATE, 1000.0, StakingRule.KELLY, kelly_multiplier=1.0)
+    edges = [(p.win_probability * p.odds - 1) / (p.odds - 1) for p in SLATE]
+    np.testing.assert_allclose(kelly.stake_fractions(), np.clip(edges, 0, None))
+
+    with pytest.raises(ValueError):
+        BankrollSimulator(SLATE, 50.0)  # Cannot cover the slate
+
+
+def test_seeded_runs_repeat_and_pool_matches_serial():
+    """Test a seed fixes the result and chunks run in worker processes give the same one."""
+    simulator = BankrollSimulator(SLATE, 1000.0, max_chunk_bytes=1 << 20)
+    serial = simulator.run(paths=20_000, rounds=100, seed=11)
+    repeat = simulator.run(paths=20_000, rounds=100, seed=11)
+    assert repeat.mean_final_bankroll == serial.mean_final_bankroll
+    assert serial.metadata["chunks"] > 1 and 0 < serial.ruin_probability < 1
+
+    async def run():
+        pool = ProcessTaskPool(workers=2)
+        try:
+            return await simulator.run_parallel(pool, paths=20_000, rounds=100, seed=11)
+        finally:
+            pool.close()
+
+    parallel = asyncio.run(run())
+    for name in ("ruin_probability", "mean_final_bankroll", "max_drawdown_quantiles"):
+        assert getattr(parallel, name) == getattr(serial, name)
+
+
+def test_risk_assessment_simulates_priced_positions():
+    """Test priced positions drive bankruptcy probability and time to ruin by simulation."""
+    risk_management = pytest.importorskip("risk_management", exc_type=ImportError)
+    engine = risk_management.RiskAssessmentEngine()
+    positions = [{"odds": 2.0, "win_probability": 0.0, "stake": 25.0}]
+    metrics = asyncio.run(
+        engine.assess_portfolio_risk(positions, 100.0, [0.01, -0.02], simulate=True)
+    )
+    assert metrics.bankruptcy_probability == 1.0 and metrics.time_to_ruin == 4
+
+    # Without opting in the assessment keeps to the closed-form estimates
+    quick = asyncio.run(engine.assess_portfolio_risk(positions, 100.0, [0.01, -0.02]))
+    assert quick.time_to_ruin != 4
+
+
+def test_sample_path_is_the_first_simulated_path():
+    """Test the plotted path comes from the same seeded stream as the summary run."""
+    for staking in (StakingRule.FLAT, StakingRule.KELLY):
+        simulator = BankrollSimulator(SLATE, 1000.0, staking, max_chunk_bytes=1 << 16)
+        spec = simulator.spec()
+        _, chunk_seed = simulator.chunks(5_000, 200, seed=5)[0]
+        _, _, final = simulate_chunk(spec, 3, 200, chunk_seed)
+        path = simulator.sample_path(200, seed=5)
+        assert len(path) == 200
+        assert path[-1] == final[0]
@@ -0,0 +1,98 @@
+"""Tests for the O(1) cache eviction policies."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cache_eviction import (
+    EvictionPolicy,
+    FIFOPolicy,
+    LFUPolicy,
+    LRUPolicy,
+    WTinyLFUPolicy,
+    create_eviction_policy,
+)
+
+
+def test_lru_evicts_least_recently_used():
+    """Test LRU victim is the key untouched for longest."""
+    policy = LRUPolicy(3)
+    for key in ("a", "b", "c"):
+        policy.record_insert(key)
+    policy.record_access("a")
+    assert policy.select_victim() == "b"
+
+
+def test_fifo_ignores_access():
+    """Test FIFO victim is the oldest insert regardless of hits."""
+    policy = FIFOPolicy(3)
+    for key in ("a", "b", "c"):
+        policy.record_insert(key)
+    policy.record_access("a")
+    assert policy.select_victim() == "a"
+
+
+def test_lfu_evicts_least_frequent_and_recovers_after_remove():
+    """Test LFU victim selection across bucket changes."""
+    policy = LFUPolicy(3)
+    for key in ("a", "b", "c"):
+        policy.record_insert(key)
+    policy.record_access("a")
+    policy.record_access("b")
+    assert policy.select_victim() == "c"
+
+    policy.remove("c")
+    assert policy.select_victim() == "a"
+    assert len(policy) == 2
+
+
+def test_w_tinylfu_keeps_hot_keys_under_scan():
+    """Test W-TinyLFU does not let a one-off scan flush popular keys."""
+    policy = WTinyLFUPolicy(100)
+    resident = set()
+
+    def touch(key):
+        if key in resident:
+            policy.record_access(key)
+            return
+        while len(resident) >= 100:
+            victim = policy.select_victim()
+            resident.discard(victim)
+            policy.remove(victim)
+        resident.add(key)
+        policy.record_insert(key)
+
+    hot_keys = [f"hot:{i}" for i in range(50)]
+    for _ in range(10):
+        for key in hot_keys:
+            touch(key)
+    for i in range(1000):
+        touch(f"scan:{i}")
+
+    assert len(policy) == len(resident) == 100
+    assert sum(key in resident for key in hot_keys) >= 45
+
+
+@pytest.mark.parametrize(
+    "strategy,expected",
+    [("lru", "lru"), ("lfu", "lfu"), ("fifo", "fifo"), ("adaptive", "w_tinylfu"), ("ttl", "lru")],
+)
+def test_create_eviction_policy(strategy, expected):
+    """Test CacheStrategy values map onto policies."""
+    assert create_eviction_policy(strategy, 10).name == expected
+
+
+def test_incomplete_policies_fail_at_construction():
+    """Test the base class and policies missing an operation cannot be instantiated."""
+
+    class NoVictim(EvictionPolicy):
+        def record_insert(self, key):
+            pass
+
+    with pytest.raises(TypeError):
+        EvictionPolicy(10)
+    with pytest.raises(TypeError):
+        NoVictim(10)
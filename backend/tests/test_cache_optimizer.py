@@ -0,0 +1,280 @@
+"""Tests for the multi-tier cache in cache_optimizer."""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from cache_codecs import CacheCodec, CompressionType, SerializerType
+from cache_optimizer import (
+    CacheLayer,
+    CacheStrategy,
+    InMemoryCache,
+    MultiTierCache,
+    ShardedInMemoryCache,
+)
+
+
+def test_sharded_cache_round_trip_and_capacity():
+    """Test sharded L1 stores, evicts per shard and reports shard stats."""
+    cache = ShardedInMemoryCache(max_size=64, max_memory_mb=8, num_shards=4)
+    for i in range(200):
+        assert cache.set(f"odds:{i}", {"price": i})
+
+    assert len(cache) <= 64
+    assert cache.get("odds:199") == {"price": 199}
+
+    stats = cache.get_stats()
+    assert stats["num_shards"] == 4
+    assert len(stats["shards"]) == 4
+    assert stats["evictions"] >= 200 - 64
+    assert stats["writes"] == 200
+
+
+def test_sharded_cache_is_thread_safe():
+    """Test concurrent readers and writers keep shard bookkeeping consistent."""
+    cache = ShardedInMemoryCache(
+        max_size=500, max_memory_mb=8, num_shards=8, strategy=CacheStrategy.LFU
+    )
+
+    def worker(offset):
+        for i in range(5000):
+            key = f"prediction:{(i * 7 + offset) % 1500}"
+            if cache.get(key) is None:
+                cache.set(key, i)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.get_stats()
+    assert stats["errors"] == 0
+    assert stats["hits"] + stats["misses"] == 20000
+    for shard in cache.shards:
+        assert len(shard.cache) == len(shard.eviction_policy)
+
+
+class _DictL2Cache:
+    """In-process stand-in for RedisCache."""
+
+    def __init__(self):
+        self.store = {}
+        self.payloads = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def set(self, key, value, ttl=None, encoded=None):
+        self.store[key] = value
+        self.payloads[key] = encoded
+        return True
+
+    async def delete(self, key):
+        return self.store.pop(key, None) is not None
+
+    async def clear(self, pattern="*"):
+        self.store.clear()
+
+    async def get_stats(self):
+        return {"hits": 0, "misses": 0, "hit_rate": 0}
+
+
+def _make_multi_tier_cache():
+    cache = MultiTierCache(l1_shards=4)
+    cache.l2_cache = _DictL2Cache()
+    return cache
+
+
+def test_get_or_compute_coalesces_concurrent_misses():
+    """Load test: 1000 concurrent identical requests trigger one upstream call."""
+    cache = _make_multi_tier_cache()
+    upstream_calls = 0
+
+    async def fetch_odds():
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.05)
+        return {"event_id": "event_1", "home": 1.91}
+
+    async def run():
+        return await asyncio.gather(
+            *[
+                cache.get_or_compute("odds:event_1", fetch_odds, ttl=60)
+                for _ in range(1000)
+            ]
+        )
+
+    results = asyncio.run(run())
+
+    assert upstream_calls == 1
+    assert all(result == {"event_id": "event_1", "home": 1.91} for result in results)
+    assert cache.flight_stats["coalesced_requests"] == 999
+    assert not cache._inflight
+
+
+def test_get_or_compute_serves_stale_while_revalidating():
+    """Test an expired value is served while a single refresh runs."""
+    cache = _make_multi_tier_cache()
+    versions = iter(range(1, 100))
+    upstream_calls = 0
+
+    async def compute():
+        nonlocal upstream_calls
+        upstream_calls += 1
+        await asyncio.sleep(0.01)
+        return {"version": next(versions)}
+
+    async def run():
+        first = await cache.get_or_compute("prediction:1", compute, ttl=60, stale_ttl=300)
+        # Force the soft deadline into the past
+        _, expires_at = cache._fresh_until["prediction:1"]
+        cache._fresh_until["prediction:1"] = (time.time() - 1, expires_at)
+
+        stale = await asyncio.gather(
+            *[
+                cache.get_or_compute("prediction:1", compute, ttl=60, stale_ttl=300)
+                for _ in range(100)
+            ]
+        )
+        await asyncio.sleep(0.05)
+        refreshed = await cache.get_or_compute(
+            "prediction:1", compute, ttl=60, stale_ttl=300
+        )
+        return first, stale, refreshed
+
+    first, stale, refreshed = asyncio.run(run())
+
+    assert first == {"version": 1}
+    assert all(value == {"version": 1} for value in stale)
+    assert refreshed == {"version": 2}
+    assert upstream_calls == 2
+    assert cache.flight_stats["stale_served"] == 100
+
+
+def test_failed_refresh_keeps_serving_the_stale_value():
+    """Test a failing background refresh is counted apart from failed computes."""
+    cache = _make_multi_tier_cache()
+    outcomes = iter([{"version": 1}, RuntimeError("upstream down")])
+
+    async def compute():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def run():
+        await cache.get_or_compute("prediction:2", compute, ttl=60, stale_ttl=300)
+        _, expires_at = cache._fresh_until["prediction:2"]
+        cache._fresh_until["prediction:2"] = (time.time() - 1, expires_at)
+        stale = await cache.get_or_compute("prediction:2", compute, ttl=60, stale_ttl=300)
+        await asyncio.sleep(0.01)
+        return stale
+
+    assert asyncio.run(run()) == {"version": 1}
+    assert cache.flight_stats["refresh_failures"] == 1
+    assert cache.flight_stats["compute_failures"] == 0
+
+def test_get_or_compute_propagates_errors_and_retries():
+    """Test a failed computation reaches all waiters and is not cached."""
+    cache = _make_multi_tier_cache()
+    attempts = 0
+
+    async def flaky():
+        nonlocal attempts
+        attempts += 1
+        await asyncio.sleep(0.01)
+        if attempts == 1:
+            raise RuntimeError("upstream down")
+        return 42
+
+    async def run():
+        first = await asyncio.gather(
+            *[cache.get_or_compute("flaky", flaky, ttl=60) for _ in range(10)],
+            return_exceptions=True,
+        )
+        second = await cache.get_or_compute("flaky", flaky, ttl=60)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert all(isinstance(result, RuntimeError) for result in first)
+    assert second == 42
+    assert attempts == 2
+    assert cache.flight_stats["compute_failures"] == 1
+    assert cache.flight_stats["refresh_failures"] == 0
+
+
+def test_codec_round_trip_and_legacy_pickle():
+    """Test framed payloads decode across codecs and legacy pickles still load."""
+    import pickle
+
+    value = {"event_id": "event_1", "odds": [1.91, 2.05] * 500}
+    for compression in (CompressionType.NONE, CompressionType.GZIP, CompressionType.ZSTD):
+        codec = CacheCodec(compression=compression)
+        encoded = codec.encode(value)
+        assert CacheCodec(serializer=SerializerType.MSGPACK).decode(encoded.payload) == value
+    assert CacheCodec().decode(pickle.dumps(value)) == value
+
+    codec = CacheCodec(serializer=SerializerType.MSGPACK)
+    by_id = {1: [1.91, 2.05], 2: {"home": 1.5}}
+    encoded = codec.encode(by_id)
+    assert encoded.serializer == SerializerType.MSGPACK and codec.decode(encoded.payload) == by_id
+
+
+def test_values_are_compressed_only_on_their_way_to_redis():
+    """Test L1 writes skip compression and L2 writes get the same frame encode would make."""
+    cache = _make_multi_tier_cache()
+    compressions = []
+    compress = cache.codec.compress
+    cache.codec.compress = lambda body, compression: compressions.append(1) or compress(body, compression)
+    value = {"markets": ["moneyline"] * 500}
+
+    try:
+        assert asyncio.run(cache.set("l1", value, tier=CacheLayer.L1_MEMORY))
+        assert compressions == [] and cache.l1_cache.get("l1") == value
+
+        assert asyncio.run(cache.set("l2", value, tier=CacheLayer.L2_REDIS))
+        payload = cache.l2_cache.payloads["l2"]
+        assert compressions == [1] and payload.compressed
+        assert payload.payload == cache.codec.encode(value).payload
+        assert cache.codec.decode(payload.payload) == value
+    finally:
+        del cache.codec.compress
+
+
+def test_codec_shared_across_threads():
+    """Test one zstd codec encodes and decodes concurrently without corrupting frames."""
+    codec = CacheCodec(compression=CompressionType.ZSTD)
+    failures = []
+
+    def worker(n):
+        for i in range(200):
+            value = {"worker": n, "odds": [n + i / 100] * 400}
+            encoded = codec.encode(value, compress=True)
+            if codec.decode(encoded.payload) != value:
+                failures.append((n, i))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+
+
+def test_in_memory_cache_returns_decompressed_values():
+    """Test compressed L1 entries are transparently decoded on get."""
+    cache = InMemoryCache(max_size=10, max_memory_mb=1)
+    value = {"markets": ["moneyline"] * 1000}
+    assert cache.set("big", value, compress=True)
+
+    entry = cache.cache["big"]
+    assert entry.compressed
+    assert entry.size < len(str(value))
+    assert cache.get("big") == value
@@ -0,0 +1,78 @@
+"""Tests for batched inference in ensemble_engine.UltraAdvancedEnsembleEngine."""
+
+import asyncio
+import os
+import sys
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import LinearRegression
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# The engine pulls in the database layer; skip where that is not importable
+ensemble_engine = pytest.importorskip("ensemble_engine", exc_type=ImportError)
+
+
+class PassThroughFeatures:
+    def preprocess_features(self, features):
+        return {"features": features}
+
+
+def test_batch_matrix_leaves_missing_features_to_model_layouts():
+    """Test rows with different keys share one matrix and each model fills its own defaults."""
+    engine = ensemble_engine.UltraAdvancedEnsembleEngine()
+    matrix, columns = engine._batch_matrix([{"a": 1.0, "b": 2.0}, {"b": 3.0, "c": 4.0}])
+    assert columns == ("a", "b", "c")
+    np.testing.assert_array_equal(matrix, [[1, 2, np.nan], [np.nan, 3, 4]])
+
+    engine.feature_layouts.register("m", ["c", "unknown", "a"], {"unknown": -1.0, "a": 0.5})
+    np.testing.assert_array_equal(
+        engine._model_features("m", matrix, columns), [[0, -1, 1], [4, -1, 0.5]]
+    )
+    np.testing.assert_array_equal(
+        engine._model_features("unregistered", matrix, columns), [[1, 2, 0], [0, 3, 4]]
+    )
+
+
+def test_predict_batch_matches_looped_predict(tmp_path):
+    """Test one batch call reproduces per-event predictions across models with shuffled features."""
+    rng = np.random.default_rng(3)
+    features = [f"f{i}" for i in range(6)]
+    X = rng.normal(size=(200, len(features)))
+    y = X @ np.arange(1, 7)
+
+    async def run():
+        engine = ensemble_engine.UltraAdvancedEnsembleEngine()
+        engine.feature_engineer = PassThroughFeatures()
+        engine.cache_enabled = False
+        engine.model_registry.models_directory = tmp_path
+        for n, names in enumerate([features, features[::-1], features[1:4]]):
+            columns = [features.index(name) for name in names]
+            joblib.dump(LinearRegression().fit(X[:, columns], y), tmp_path / f"m{n}.joblib")
+            await engine.model_registry.register_model(
+                f"m{n}",
+                ensemble_engine.ModelType.LINEAR_REGRESSION,
+                f"m{n}.joblib",
+                {"feature_names": names, "cv_scores": [0.1 * (n + 1)] * 3},
+            )
+
+        events = [dict(zip(features, map(float, row))) for row in rng.normal(size=(25, 6))]
+        context = ensemble_engine.PredictionContext.PRE_GAME
+        batched = await engine.predict_batch(events, context)
+        looped = [await engine.predict(event, context) for event in events]
+        return batched, looped
+
+    batched, looped = asyncio.run(run())
+    assert len(batched) == 25
+    assert batched[0].metadata["selected_models"] == ["m0", "m1", "m2"]
+    np.testing.assert_allclose(
+        [output.predicted_value for output in batched],
+        [output.predicted_value for output in looped],
+    )
+    np.testing.assert_allclose(
+        [output.uncertainty_metrics["std_dev"] for output in batched],
+        [output.uncertainty_metrics["std_dev"] for output in looped],
+        atol=1e-9,
+    )
@@ -0,0 +1,62 @@
+"""Tests for feature_layout.FeatureLayout and FeatureLayoutRegistry."""
+
+import logging
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from feature_layout import FeatureLayout, FeatureLayoutRegistry
+
+
+def test_row_and_matrix_follow_model_order_with_defaults():
+    """Test request dicts gather into model order and absent features take defaults."""
+    layout = FeatureLayout(["odds", "rest_days", "elo"], defaults={"elo": 1500.0})
+    np.testing.assert_array_equal(
+        layout.row({"elo": 1610, "odds": 1.9, "rest_days": 3, "extra": 7}), [[1.9, 3, 1610]]
+    )
+    np.testing.assert_array_equal(
+        layout.matrix([{"odds": 2.1}, {"rest_days": 1, "elo": 1400}]),
+        [[2.1, 0, 1500], [0, 1, 1400]],
+    )
+
+
+def test_missing_features_are_counted_and_logged_once(caplog):
+    """Test misses land in the stats while each feature warns a single time."""
+    layout = FeatureLayout(["a", "b", "c"])
+    with caplog.at_level(logging.WARNING, logger="feature_layout"):
+        for _ in range(50):
+            layout.row({"a": 1.0})
+        layout.row({"a": None, "b": "2.5", "c": 3})  # Coercion path
+
+    stats = layout.get_stats()
+    assert stats["requests"] == 51 and stats["rows_with_missing"] == 51
+    assert stats["missing"] == {"a": 1, "b": 50, "c": 50}
+    assert len(caplog.records) == 3
+
+
+def test_gather_from_shared_matrix_fills_nan_and_absent_columns():
+    """Test a named batch matrix maps onto the layout, reusing the cached index."""
+    layout = FeatureLayout(["x", "y", "z"], defaults={"y": -1.0, "z": 9.0}, dtype=np.float32)
+    columns = ("z", "x", "w")
+    matrix = np.array([[1.0, 2.0, 0.0], [np.nan, 4.0, 0.0]])
+
+    gathered = layout.gather(matrix, columns)
+    assert gathered.dtype == np.float32
+    np.testing.assert_array_equal(gathered, [[2, -1, 1], [4, -1, 9]])
+    assert layout.column_index(columns) is layout.column_index(columns)
+    assert layout.get_stats()["missing"] == {"y": 2, "z": 1}
+
+
+def test_registry_compiles_per_model_layouts():
+    """Test models register their own layouts and models without features get none."""
+    registry = FeatureLayoutRegistry(dtype=np.float32)
+    layout = registry.register("ridge", ["a", "b"], {"b": 2.0})
+    assert "ridge" in registry and registry.get("ridge") is layout
+    assert layout.row({"a": 1}).dtype == np.float32
+    assert registry.register("raw", []) is None and "raw" not in registry
+
+    registry.unregister("ridge")
+    assert registry.get("ridge") is None and registry.get_stats() == {}
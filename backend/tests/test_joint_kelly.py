@@ -0,0 +1,209 @@
+"""Tests for joint_kelly."""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+import scipy.optimize as opt
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from joint_kelly import (
+    JointKellySolver,
+    KellyBet,
+    enumerate_scenarios,
+    project_capped,
+    sample_scenarios,
+)
+
+
+def uncapped(kelly_multiplier=1.0, **kwargs):
+    return JointKellySolver(
+        kelly_multiplier=kelly_multiplier, max_position=1.0, max_total=1.0, max_cluster=1.0, **kwargs
+    )
+
+
+def test_single_bet_matches_closed_form():
+    """Test one bet gets p - (1 - p) / (odds - 1), scaled by the multiplier."""
+    bet = KellyBet(odds=2.2, win_probability=0.5)
+    full = 0.5 - 0.5 / 1.2
+    assert uncapped().solve([bet]).fractions[0] == pytest.approx(full, abs=1e-6)
+    half = uncapped(kelly_multiplier=0.5).solve([bet])
+    assert half.fractions[0] == pytest.approx(full / 2, abs=1e-6)
+    assert half.full_kelly[0] == pytest.approx(full, abs=1e-6)
+    assert half.method == "enumerated"
+
+
+def test_enumerated_scenarios_and_slsqp_agreement():
+    """Test enumeration covers each joint outcome once and the optimum matches SLSQP."""
+    bets = [
+        KellyBet(odds=2.1, win_probability=0.52),
+        KellyBet(odds=3.4, win_probability=0.33),
+        KellyBet(odds=3.0, win_probability=0.36, exclusive_group="match"),
+        KellyBet(odds=2.4, win_probability=0.45, exclusive_group="match"),
+    ]
+    wins, probabilities = enumerate_scenarios(bets)
+    assert len(probabilities) == 2 * 2 * 3 and probabilities.sum() == pytest.approx(1.0)
+    assert not np.any(wins[:, 2] & wins[:, 3])
+    np.testing.assert_allclose(probabilities @ wins, [bet.win_probability for bet in bets])
+    assert enumerate_scenarios(bets, max_scenarios=8) is None
+
+    result = uncapped().solve(bets)
+    returns = np.where(wins, np.array([bet.odds for bet in bets]) - 1.0, -1.0)
+    reference = opt.minimize(
+        lambda f: -probabilities @ np.log(1.0 + returns @ f),
+        np.full(4, 0.01),
+        jac=lambda f: -returns.T @ (probabilities / (1.0 + returns @ f)),
+        method="SLSQP",
+        bounds=[(0, 0.95)] * 4,
+        options={"ftol": 1e-14, "maxiter": 500},
+    )
+    np.testing.assert_allclose(result.fractions, reference.x, atol=1e-5)
+    assert result.expected_log_growth >= -reference.fun - 1e-10
+
+
+def test_sampled_marginals_are_stratified_and_correlation_kept():
+    """Test sampled win rates are exact to 1/samples and correlated groups move together."""
+    bets = [KellyBet(odds=2.0, win_probability=p) for p in (0.3, 0.55, 0.71)]
+    bets += [KellyBet(odds=4.0, win_probability=0.25, exclusive_group="g") for _ in range(3)]
+    correlation = np.eye(4)
+    correlation[0, 1] = correlation[1, 0] = 0.8
+    for matrix in (None, correlation):
+        wins, probabilities = sample_scenarios(bets, 1000, matrix, seed=3)
+        rates = probabilities @ wins
+        np.testing.assert_allclose(rates, [bet.win_probability for bet in bets], atol=1e-3)
+        assert not np.any(wins[:, 3:].sum(axis=1) > 1)
+    wins, _ = sample_scenarios(bets, 5000, correlation, seed=4)
+    assert np.corrcoef(wins[:, 0], wins[:, 1])[0, 1] > 0.4
+    assert abs(np.corrcoef(wins[:, 0], wins[:, 2])[0, 1]) < 0.1
+
+
+def test_nothing_to_stake_gives_exact_zeros():
+    """Test batches with no positive edge, zero caps or exhausted limits size to exactly zero."""
+    solver = JointKellySolver()
+    for bets, kwargs in (
+        ([KellyBet(2.0, 0.4)], {}),
+        ([KellyBet(2.0, 0.6, cap=0.0), KellyBet(3.0, 0.5, cap=0.0)], {}),
+        ([KellyBet(2.0, 0.6, cluster="e"), KellyBet(2.1, 0.6, cluster="e")], {"cluster_used": {"e": 0.15}}),
+        ([KellyBet(2.0, 0.6)], {"held": 0.25}),
+    ):
+        result = solver.solve(bets, **kwargs)
+        assert result.converged
+        assert np.all(result.fractions == 0.0) and np.all(result.full_kelly == 0.0)
+
+
+def test_projection_meets_nested_caps():
+    """Test the projection is feasible and equals the constrained least-squares point."""
+    rng = np.random.default_rng(5)
+    v = rng.normal(0.1, 0.2, 8)
+    upper = np.full(8, 0.2)
+    cluster = np.array([0, 0, 0, 1, 1, 2, 3, 3])
+    caps = np.array([0.25, np.inf, 0.1, 0.3])
+    projected = project_capped(v, upper, cluster, caps, 0.5)
+    assert projected.min() >= 0 and projected.max() <= 0.2 + 1e-12 and projected.sum() <= 0.5 + 1e-12
+    assert np.all(np.bincount(cluster, weights=projected) <= caps + 1e-12)
+    finite = np.isfinite(caps)
+    reference = opt.minimize(
+        lambda x: np.sum((x - v) ** 2),
+        np.zeros(8),
+        method="SLSQP",
+        bounds=[(0, 0.2)] * 8,
+        constraints=[
+            {"type": "ineq", "fun": lambda x: 0.5 - x.sum()},
+            {"type": "ineq", "fun": lambda x: caps[finite] - np.bincount(cluster, weights=x)[finite]},
+        ],
+        options={"ftol": 1e-14},
+    )
+    np.testing.assert_allclose(projected, reference.x, atol=1e-6)
+
+
+def test_correlated_bets_share_a_stake_under_caps():
+    """Test correlated legs get less than independent sizing and every cap holds."""
+    bets = [KellyBet(odds=2.1, win_probability=0.55, cluster=f"e{i // 2}") for i in range(6)]
+    solver = JointKellySolver(kelly_multiplier=0.5, max_position=0.05, max_total=0.25, max_cluster=0.08)
+    independent = solver.solve(bets)
+    correlation = np.full((6, 6), 0.6) + 0.4 * np.eye(6)
+    correlated = solver.solve(bets, correlation, seed=1)
+    assert correlated.method == "sampled" and independent.method == "enumerated"
+    assert correlated.fractions.sum() < independent.fractions.sum()
+    for result in (independent, correlated):
+        assert result.fractions.max() <= 0.05 + 1e-9
+        assert np.all(result.fractions.reshape(3, 2).sum(axis=1) <= 0.08 + 1e-9)
+
+    # Open positions use up the total and cluster caps
+    held = solver.solve(bets, fixed=[(KellyBet(2.0, 0.5, cluster="e0"), 0.06)], held=0.1)
+    assert held.fractions[:2].sum() <= 0.02 + 1e-9
+    assert held.fractions.sum() <= 0.25 - 0.16 + 1e-9
+
+
+def test_engine_sizes_batches_within_risk_limits():
+    """Test UltraRiskManagementEngine joint sizing honours its risk limits."""
+    risk_management = pytest.importorskip("risk_management", exc_type=ImportError)
+    engine = risk_management.UltraRiskManagementEngine()
+    single = asyncio.run(
+        engine.calculate_joint_position_sizes(
+            [{"id": "a", "probability": 0.55, "odds": 2.0, "event_id": "x"}], 1000.0, []
+        )
+    )
+    assert single[0].recommended_stake == pytest.approx(50.0, abs=1e-3)  # Half of full Kelly 0.1
+    assert single[0].kelly_stake == pytest.approx(100.0, abs=1e-3)
+
+    # win_probability alone is used for sizing, the EV filter and reporting alike
+    keyed = asyncio.run(
+        engine.calculate_joint_position_sizes(
+            [
+                {"id": "a", "win_probability": 0.55, "odds": 2.0, "event_id": "x"},
+                {"id": "b", "win_probability": 0.45, "probability": 0.6, "odds": 2.0, "event_id": "y"},
+            ],
+            1000.0,
+            [],
+        )
+    )
+    assert keyed[0].recommended_stake == pytest.approx(single[0].recommended_stake)
+    assert keyed[0].expected_value == pytest.approx(0.1)
+    assert keyed[0].expected_return == pytest.approx(0.1 * keyed[0].recommended_stake)
+    assert keyed[1].recommended_stake == 0.0
+
+    # Every bet capped by the concentration limit: zero stakes, not an error
+    limit = engine.risk_limits["position_concentration_limit"]
+    engine.risk_limits["position_concentration_limit"] = 1
+    capped = asyncio.run(
+        engine.calculate_joint_position_sizes(
+            [{"id": "a", "probability": 0.55, "odds": 2.0, "event_id": "x"}],
+            1000.0,
+            [{"stake": 10.0, "event_id": "x"}],
+        )
+    )
+    assert capped[0].recommended_stake == 0.0
+    assert "error" not in capped[0].reasoning.lower()
+    engine.risk_limits["position_concentration_limit"] = limit
+
+    rng = np.random.default_rng(0)
+    opportunities = []
+    for i in range(40):
+        probability = float(rng.uniform(0.35, 0.65))
+        opportunities.append(
+            {
+                "id": f"o{i}",
+                "probability": probability,
+                "odds": float(rng.uniform(1.0, 1.12) / probability),
+                "confidence": 0.7,
+                "event_id": f"e{i // 4}",
+                "sport": "nba",
+                "market_type": "prop",
+                "player": f"p{i}",
+            }
+        )
+    opportunities.append({"id": "neg", "probability": 0.4, "odds": 2.0, "event_id": "e0"})
+    sizes = asyncio.run(
+        engine.calculate_joint_position_sizes(opportunities, 10000.0, [], seed=2)
+    )
+    stakes = np.array([size.recommended_stake for size in sizes]) / 10000.0
+    limits = engine.risk_limits
+    assert stakes[-1] == 0.0
+    assert stakes.max() <= limits["max_single_position"] + 1e-9
+    assert stakes.sum() <= limits["max_daily_risk"] + 1e-9
+    assert np.all(stakes[:40].reshape(10, 4).sum(axis=1) <= limits["max_correlation_exposure"] + 1e-9)
+    assert sizes[0].constraints["method"] == "sampled"
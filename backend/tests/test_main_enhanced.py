@@ -195,6 +195,14 @@ class TestUserManagement:
         assert "final_bankroll" in data
         assert "history" in data
         assert len(data["history"]) == 10
+        assert 0 <= data["seed"] < 2**53
+
+    def test_bankroll_simulation_limits_total_steps(self):
+        """Test a run whose paths * n exceeds the limit is rejected"""
+        response = client.get(
+            "/api/v4/user/bankroll-simulation?user_id=test_user&n=5000&paths=200000"
+        )
+        assert response.status_code == 422
 
 
 class TestModelManagement:
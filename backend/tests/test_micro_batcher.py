@@ -0,0 +1,129 @@
+"""Tests for the micro-batching dispatcher."""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from micro_batcher import MicroBatcher
+
+
+def test_items_within_window_share_a_batch_and_dedup_by_key():
+    """Test a burst becomes one batch with a single merged entry per key."""
+    batches = []
+
+    async def process(batch):
+        batches.append(batch)
+
+    async def run():
+        batcher = MicroBatcher(process, window=0.02, merge=lambda old, new: old + new)
+        batcher.start()
+        for n in range(30):
+            await batcher.submit(f"event_{n % 10}", [n])
+        await asyncio.sleep(0.05)
+        stats = batcher.get_stats()
+        batcher.close()
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert len(batches) == 1
+    assert sorted(batches[0]) == sorted([n, n + 10, n + 20] for n in range(10))
+    assert stats["deduplicated"] == 20
+    assert stats["dispatched"] == 10
+
+
+def test_full_batch_dispatches_without_waiting_for_window():
+    """Test max_batch closes a batch early and splits larger bursts."""
+    sizes = []
+
+    async def process(batch):
+        sizes.append(len(batch))
+
+    async def run():
+        batcher = MicroBatcher(process, window=5.0, max_batch=8, max_pending=64)
+        batcher.start()
+        for n in range(20):
+            batcher.offer(n, n)
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+        batcher.close()
+
+    asyncio.run(run())
+
+    assert sizes == [8, 8]  # The remaining four wait for the window
+
+
+def test_saturated_queue_applies_backpressure():
+    """Test producers wait (or are rejected) while a slow batch is in flight."""
+    gate = None
+    seen = []
+
+    async def process(batch):
+        await gate.wait()
+        seen.extend(batch)
+
+    async def run():
+        nonlocal gate
+        gate = asyncio.Event()
+        batcher = MicroBatcher(process, window=0.0, max_batch=4, max_pending=4)
+        batcher.start()
+
+        for n in range(4):
+            await batcher.submit(n, n)
+        await asyncio.sleep(0)  # First batch taken, now blocked in process
+        for n in range(4, 8):
+            await batcher.submit(n, n)
+        assert batcher.offer(99, 99) is False
+
+        producer = asyncio.create_task(batcher.submit(8, 8))
+        await asyncio.sleep(0.01)
+        assert not producer.done()  # Blocked until the queue drains
+
+        gate.set()
+        await asyncio.wait_for(producer, 1.0)
+        await asyncio.sleep(0.01)
+        stats = batcher.get_stats()
+        batcher.close()
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert seen == list(range(9))
+    assert stats["rejected"] == 1
+    assert stats["blocked"] >= 1
+
+
+def test_failed_batch_does_not_stop_dispatch():
+    """Test an exception in one bulk call is contained."""
+    calls = []
+
+    async def process(batch):
+        calls.append(batch)
+        if len(calls) == 1:
+            raise RuntimeError("model unavailable")
+
+    async def run():
+        batcher = MicroBatcher(process, window=0.001)
+        batcher.start()
+        batcher.offer("a", 1)
+        await asyncio.sleep(0.01)
+        batcher.offer("b", 2)
+        await asyncio.sleep(0.01)
+        stats = batcher.get_stats()
+        batcher.close()
+        return stats
+
+    stats = asyncio.run(run())
+
+    assert calls == [[1], [2]]
+    assert stats["failed_batches"] == 1
+
+
+def test_rejects_max_batch_above_max_pending():
+    """Test a batch larger than the queue is rejected."""
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda batch: None, max_batch=10, max_pending=5)
@@ -0,0 +1,145 @@
+"""Tests for model_host.ModelHostServer and ModelHostClient."""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from model_host import ModelHostClient, ModelHostError, ModelHostServer
+
+
+class RecordingModels:
+    def __init__(self):
+        self.calls = []
+
+    async def predict_rows(self, model_name, rows):
+        self.calls.append((model_name, len(rows)))
+        if model_name == "broken":
+            raise ValueError("model file is corrupt")
+        scale = 2.0 if model_name == "double" else 1.0
+        return np.column_stack([rows.sum(axis=1) * scale, np.full(len(rows), 0.8)])
+
+
+def test_concurrent_requests_are_batched_per_model(tmp_path):
+    """Test requests from several connections share one model call per batch."""
+    models = RecordingModels()
+    socket_path = str(tmp_path / "host.sock")
+
+    async def run():
+        server = ModelHostServer(models.predict_rows, socket_path, window=0.02)
+        await server.start()
+        clients = [ModelHostClient(socket_path) for _ in range(3)]
+        rows = [np.arange(i, i + 4, dtype=float).reshape(1, 4) for i in range(30)]
+        results = await asyncio.gather(
+            *[
+                clients[i % 3].predict("double" if i % 2 else "single", row)
+                for i, row in enumerate(rows)
+            ]
+        )
+        for client in clients:
+            await client.close()
+        await server.close()
+        return rows, results, server.get_stats()
+
+    rows, results, stats = asyncio.run(run())
+    for i, (row, result) in enumerate(zip(rows, results)):
+        np.testing.assert_allclose(result, [[row.sum() * (2.0 if i % 2 else 1.0), 0.8]])
+    assert stats["requests"] == 30 and stats["connections"] == 3
+    assert stats["model_calls"] == 2 and sorted(models.calls) == [("double", 15), ("single", 15)]
+    assert not os.path.exists(socket_path)
+
+
+def test_failures_stay_per_model_and_clients_reconnect(tmp_path):
+    """Test a failing model errors only its requests and a restarted host is picked up."""
+    models = RecordingModels()
+    socket_path = str(tmp_path / "host.sock")
+
+    async def run():
+        server = ModelHostServer(models.predict_rows, socket_path, window=0.02)
+        await server.start()
+        client = ModelHostClient(socket_path)
+        good, bad = await asyncio.gather(
+            client.predict("single", np.ones((2, 3))),
+            client.predict("broken", np.ones((1, 3))),
+            return_exceptions=True,
+        )
+        await server.close()
+        await asyncio.sleep(0.05)  # Let the client see the connection drop
+
+        server = ModelHostServer(models.predict_rows, socket_path)
+        await server.start()
+        again = await client.predict("single", np.ones((1, 3)))
+        await client.close()
+        await server.close()
+        return good, bad, again, client.get_stats()
+
+    good, bad, again, stats = asyncio.run(run())
+    np.testing.assert_allclose(good, [[3.0, 0.8], [3.0, 0.8]])
+    assert isinstance(bad, ModelHostError) and "corrupt" in str(bad)
+    np.testing.assert_allclose(again, [[3.0, 0.8]])
+    assert stats["reconnects"] == 1 and stats["errors"] == 1
+
+
+def test_mixed_width_batch_fails_only_that_model(tmp_path):
+    """Test rows of different widths for one model fail its requests, not the batch."""
+    models = RecordingModels()
+    socket_path = str(tmp_path / "host.sock")
+
+    async def run():
+        server = ModelHostServer(models.predict_rows, socket_path, window=0.02)
+        await server.start()
+        client = ModelHostClient(socket_path, timeout=2.0)
+        results = await asyncio.gather(
+            client.predict("single", np.ones((1, 3))),
+            client.predict("single", np.ones((1, 4))),
+            client.predict("double", np.ones((2, 3))),
+            return_exceptions=True,
+        )
+        await client.close()
+        await server.close()
+        return results
+
+    narrow, wide, other = asyncio.run(run())
+    assert isinstance(narrow, ModelHostError) and isinstance(wide, ModelHostError)
+    np.testing.assert_allclose(other, [[6.0, 0.8], [6.0, 0.8]])
+
+
+def test_service_rows_match_single_predictions(tmp_path):
+    """Test the host's batched inference gives the same values as per-request inference."""
+    model_service = pytest.importorskip("model_service", exc_type=ImportError)
+    ensemble = pytest.importorskip("sklearn.ensemble")
+    joblib = pytest.importorskip("joblib")
+
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(300, 3))
+    joblib.dump(
+        ensemble.RandomForestRegressor(n_estimators=10, random_state=0).fit(X, X[:, 0]),
+        tmp_path / "rf.joblib",
+    )
+    loader = model_service.ModelLoader(str(tmp_path))
+    engine = model_service.ModelInferenceEngine(loader)
+    metadata = model_service.ModelMetadata(
+        name="rf",
+        version="1",
+        model_type="random_forest",
+        file_path="rf.joblib",
+        features=["a", "b", "c"],
+        target="y",
+        training_date=None,
+    )
+
+    async def run():
+        await loader.load_model(metadata)
+        rows = await engine.predict_rows("rf", X[:20])
+        singles = [
+            await engine.predict_single_model("rf", dict(zip("abc", row))) for row in X[:20]
+        ]
+        return rows, singles
+
+    rows, singles = asyncio.run(run())
+    np.testing.assert_allclose(rows[:, 0], [p.predicted_value for p in singles])
+    np.testing.assert_allclose(rows[:, 1], [p.confidence for p in singles])
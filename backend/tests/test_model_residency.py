@@ -0,0 +1,118 @@
+"""Tests for model_residency.ModelResidency and model footprints."""
+
+import asyncio
+import os
+import sys
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.linear_model import Ridge
+from sklearn.tree import DecisionTreeRegressor
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from model_residency import ModelResidency, load_model_file, model_footprint
+
+
+def _dump_ridge(path, padding=250_000):
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(200, 4))
+    model = Ridge().fit(X, X.sum(axis=1))
+    model.lookup_ = np.arange(padding, dtype=np.float64)  # A large fitted array
+    joblib.dump(model, path)
+    return model
+
+
+def test_memory_mapped_arrays_are_shared_not_private(tmp_path):
+    """Test arrays of uncompressed dumps are mapped and excluded from private bytes."""
+    original = _dump_ridge(tmp_path / "ridge.joblib")
+    private, mapped = model_footprint(load_model_file(str(tmp_path / "ridge.joblib")))
+    assert mapped >= original.lookup_.nbytes and private < 10_000
+
+    private, mapped = model_footprint(load_model_file(str(tmp_path / "ridge.joblib"), None))
+    assert mapped == 0 and private >= original.lookup_.nbytes
+
+    joblib.dump(original, tmp_path / "packed.joblib", compress=3)
+    loaded = load_model_file(str(tmp_path / "packed.joblib"))  # Falls back to a plain load
+    np.testing.assert_array_equal(loaded.lookup_, original.lookup_)
+
+
+def test_footprint_counts_cython_tree_state():
+    """Test tree node arrays reached through __getstate__ are counted once per tree."""
+    X = np.random.default_rng(1).normal(size=(2000, 5))
+    trees = [DecisionTreeRegressor(random_state=i).fit(X, X[:, 0]) for i in range(3)]
+    nodes = sum(tree.tree_.__getstate__()["nodes"].nbytes for tree in trees)
+    private, _ = model_footprint(trees)
+    assert nodes < private < nodes * 3
+
+
+def test_lru_unloads_coldest_models_to_fit_budget():
+    """Test the budget holds, recently used models survive and oversize models still load."""
+    residency = ModelResidency(budget_bytes=100)
+    for name in "abc":
+        residency.put(name, object(), private_bytes=40)
+    assert residency.resident_models() == ["b", "c"]
+
+    residency.get("b")
+    residency.put("d", object(), private_bytes=40)
+    assert residency.resident_models() == ["b", "d"] and residency.resident_bytes == 80
+    assert residency.fits("c") is False  # Last seen at 40 bytes
+
+    residency.put("huge", object(), private_bytes=500)
+    assert residency.resident_models() == ["huge"]
+    stats = residency.get_stats()
+    assert stats["evictions"] == 4 and stats["resident_bytes"] == 500
+
+
+def test_concurrent_requests_share_one_load(tmp_path):
+    """Test callers racing for a cold model trigger a single load."""
+    _dump_ridge(tmp_path / "ridge.joblib")
+    calls = []
+
+    def loader(path):
+        calls.append(path)
+        return load_model_file(path)
+
+    async def run():
+        residency = ModelResidency()
+        models = await asyncio.gather(
+            *[residency.load("ridge", str(tmp_path / "ridge.joblib"), loader=loader) for _ in range(5)]
+        )
+        with pytest.raises(FileNotFoundError):
+            await residency.load("missing", str(tmp_path / "missing.joblib"))
+        return residency, models
+
+    residency, models = asyncio.run(run())
+    assert len(calls) == 1 and all(model is models[0] for model in models)
+    assert residency.get_stats()["loads"] == 1 and "missing" not in residency
+
+
+def test_cancelled_caller_does_not_cancel_a_shared_load(tmp_path):
+    """Test the load finishes for other waiters, and becomes resident, when its first caller is cancelled."""
+    _dump_ridge(tmp_path / "ridge.joblib")
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        started, release = asyncio.Event(), asyncio.Event()
+
+        def loader(path):
+            loop.call_soon_threadsafe(started.set)
+            asyncio.run_coroutine_threadsafe(release.wait(), loop).result()
+            return load_model_file(path)
+
+        residency = ModelResidency()
+        path = str(tmp_path / "ridge.joblib")
+        first = asyncio.create_task(residency.load("ridge", path, loader=loader))
+        await started.wait()
+        second = asyncio.create_task(residency.load("ridge", path, loader=loader))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return residency, await second
+
+    residency, model = asyncio.run(run())
+    assert isinstance(model, Ridge)
+    assert "ridge" in residency and residency.get_stats()["loads"] == 1
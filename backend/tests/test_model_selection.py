@@ -0,0 +1,185 @@
+"""Tests for model_selection.ModelSelectionIndex."""
+
+import math
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from model_selection import ModelSelectionIndex
+from utils.prediction_utils import feature_compatibility, model_correlation
+
+NOW = 1_700_000_040.0  # On a recency tick, so quantisation does not shift scores
+FEATURES = [f"f{i}" for i in range(12)]
+
+
+def _build(n_models, seed=0):
+    rng = np.random.default_rng(seed)
+    index = ModelSelectionIndex(clock=lambda: NOW)
+    models = {}
+    for i in range(n_models):
+        cv = rng.uniform(0.4, 0.9, size=rng.integers(0, 6)).tolist()
+        if i % 7 == 3:
+            cv = [0.7, 0.7, 0.7]  # Constant scores correlate as 1 with everything
+        model = {
+            "performance": rng.uniform(),
+            "uncertainty": rng.uniform(),
+            "updated_at": NOW - rng.uniform(0, 300) * 3600,
+            "cv_scores": cv,
+            "feature_names": rng.choice(FEATURES, size=rng.integers(0, 6), replace=False).tolist(),
+            "active": i % 9 != 5,
+        }
+        models[f"m{i}"] = model
+        index.upsert(f"m{i}", **model)
+    return index, models
+
+
+def _reference(models, history, schema, strategy, max_models, min_models, threshold, half_life):
+    """The per-model scoring and pairwise diversity loop the index replaces"""
+    scores = {}
+    for name, model in models.items():
+        if not model["active"]:
+            continue
+        recent = history.get(name, [])[-10:]
+        scores[name] = (
+            model["performance"] * 0.4
+            + (np.mean(recent) if recent else 0.5) * 0.25
+            + feature_compatibility(model["feature_names"], list(schema)) * 0.15
+            + math.exp(-(NOW - model["updated_at"]) / 3600 / half_life) * 0.1
+            + model["uncertainty"] * 0.1
+        )
+    if len(scores) <= min_models:
+        return list(scores), scores
+    ranking = dict(scores)
+    if strategy == "stacking":
+        ranking = {
+            name: score * 0.5 + float(np.mean(models[name]["cv_scores"] or [0.0])) * 0.5
+            for name, score in scores.items()
+        }
+    ranked = [name for name, _ in sorted(ranking.items(), key=lambda x: x[1], reverse=True)]
+    ranked = ranked[:max_models]
+    if len(ranked) <= 2:
+        return ranked, scores
+    kept = [ranked[0]]
+    for name in ranked[1:]:
+        if all(
+            model_correlation(models[name]["cv_scores"], models[other]["cv_scores"]) <= 1 - threshold
+            for other in kept
+        ):
+            kept.append(name)
+    return kept, scores
+
+
+@pytest.mark.parametrize("strategy", ["performance", "stacking"])
+def test_selection_matches_per_model_scoring(strategy):
+    """Test vectorised scores, top-k and diversity agree with the pairwise reference."""
+    index, models = _build(80, seed=3)
+    rng = np.random.default_rng(4)
+    history = {}
+    for name in rng.choice(list(models), size=30):
+        score = float(rng.uniform())
+        history.setdefault(name, []).append(score)
+        index.record_context_score("pre_game", name, score)
+
+    for schema, max_models, threshold in [(FEATURES[:6], 10, 0.1), (FEATURES, 25, 0.5), ((), 3, 0.9)]:
+        selection = index.select(
+            "pre_game",
+            schema,
+            strategy=strategy,
+            max_models=max_models,
+            min_models=2,
+            diversity_threshold=threshold,
+            half_life_hours=72.0,
+        )
+        expected, scores = _reference(models, history, schema, strategy, max_models, 2, threshold, 72.0)
+        assert selection.models == expected
+        assert selection.scores == pytest.approx([scores[name] for name in expected])
+
+
+def test_memo_is_invalidated_by_metrics_context_outcomes_and_clock():
+    """Test repeated selections hit the memo until an input changes."""
+    clock = [NOW]
+    index = ModelSelectionIndex(clock=lambda: clock[0])
+    for i, perf in enumerate([0.9, 0.8, 0.7, 0.6]):
+        index.upsert(f"m{i}", performance=perf, uncertainty=0.0, updated_at=NOW)
+
+    def select(context="pre_game"):
+        return index.select(
+            context,
+            ["a"],
+            strategy="performance",
+            max_models=2,
+            min_models=1,
+            diversity_threshold=0.1,
+            half_life_hours=72.0,
+        ).models
+
+    assert select() == ["m0", "m1"]
+    assert select() == ["m0", "m1"] and index.stats["memo_hits"] == 1
+
+    index.update_metrics("m3", performance=1.0, uncertainty=0.0, updated_at=NOW)
+    assert select() == ["m3", "m0"]
+
+    for _ in range(3):
+        index.record_context_score("live_game", "m2", 1.0)
+    assert select("live_game") == ["m2", "m3"] and select() == ["m3", "m0"]
+
+    index.upsert("m4", performance=0.95, uncertainty=0.0, updated_at=NOW + 3600)
+    clock[0] += 3600  # The clock moves on; m4 displaces m0
+    assert select() == ["m3", "m4"]
+    assert index.get_stats()["memo_hits"] == 2
+
+
+def test_selection_over_500_models_is_fast():
+    """Test memoised selections take microseconds and cold ones at most a couple of milliseconds."""
+    index, _ = _build(500, seed=9)
+
+    def select(context):
+        return index.select(
+            context,
+            FEATURES[:8],
+            strategy="performance",
+            max_models=10,
+            min_models=2,
+            diversity_threshold=0.1,
+            half_life_hours=72.0,
+        )
+
+    start = time.perf_counter()
+    for n in range(200):
+        select(f"cold-{n}")
+    cold = (time.perf_counter() - start) / 200
+
+    start = time.perf_counter()
+    for _ in range(10_000):
+        select("cold-0")
+    warm = (time.perf_counter() - start) / 10_000
+
+    assert cold < 2e-3 and warm < 50e-6
+
+
+def test_registration_grows_capacity_geometrically():
+    """Test rows keep their values across regrowth and buffers are reallocated O(log n) times."""
+    index, models = _build(5)
+    index.record_context_score("nba", "m1", 0.9)
+    grows = []
+    grow = index._grow
+    index._grow = lambda capacity: grows.append(capacity) or grow(capacity)
+    rng = np.random.default_rng(1)
+    for i in range(5, 300):
+        cv = rng.uniform(size=4).tolist()
+        models[f"m{i}"] = {"performance": 0.5, "uncertainty": 0.5, "updated_at": NOW, "cv_scores": cv}
+        index.upsert(f"m{i}", **models[f"m{i}"])
+
+    assert grows == [32, 64, 128, 256, 512]
+    assert len(index.performance) == len(index.active) == 300
+    assert index.correlation.shape == (300, 300)
+    context = index._context_row("nba")
+    assert context[1] == 0.9 and np.all(np.delete(context, 1) == 0.5)
+    for i, j in ((1, 7), (20, 299), (150, 151)):
+        expected = model_correlation(models[f"m{i}"]["cv_scores"], models[f"m{j}"]["cv_scores"])
+        assert index.correlation[i, j] == index.correlation[j, i] == pytest.approx(expected)
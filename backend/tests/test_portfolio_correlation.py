@@ -0,0 +1,137 @@
+"""Tests for portfolio_correlation."""
+
+import asyncio
+import itertools
+import os
+import sys
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from portfolio_correlation import (
+    CorrelationEstimator,
+    blend_correlation,
+    empirical_correlation,
+    estimate_correlation,
+    heuristic_correlation,
+    nearest_correlation,
+)
+
+
+def random_slate(n, seed=0):
+    rng = np.random.default_rng(seed)
+    slate = []
+    for i in range(n):
+        opp = {
+            "id": f"o{i}",
+            "event_id": f"e{rng.integers(n // 3 + 1)}",
+            "sport": ["nba", "nfl", "mlb"][rng.integers(3)],
+            "market_type": ["spread", "total", "prop"][rng.integers(3)],
+        }
+        if rng.random() < 0.6:
+            opp["team"] = f"t{rng.integers(8)}"
+        else:
+            opp["player"] = f"p{rng.integers(12)}"
+        if rng.random() < 0.1:
+            del opp["event_id"]
+        slate.append(opp)
+    return slate
+
+
+def pairwise(opp1, opp2):
+    """Reference heuristic; missing fields never match"""
+
+    def same(field):
+        return opp1.get(field) is not None and opp1.get(field) == opp2.get(field)
+
+    correlation = 0.7 if same("event_id") else 0.3 if same("sport") else 0.0
+    correlation += 0.2 * same("market_type") + 0.5 * (same("team") or same("player"))
+    return min(correlation, 0.9)
+
+
+def test_heuristic_matches_pairwise_reference():
+    """Test the broadcast heuristic equals the pair-by-pair heuristic for every pair."""
+    slate = random_slate(60)
+    matrix = heuristic_correlation(slate)
+    assert np.array_equal(np.diag(matrix), np.ones(60))
+    for i, j in itertools.combinations(range(60), 2):
+        assert matrix[i, j] == matrix[j, i] == pytest.approx(pairwise(slate[i], slate[j]))
+    # Two opportunities with no fields in common (or at all) are uncorrelated
+    assert heuristic_correlation([{}, {}])[0, 1] == 0.0
+
+
+def test_nearest_correlation_repairs_indefinite_matrices():
+    """Test repair yields a unit-diagonal PSD matrix close to the input and leaves valid ones alone."""
+    broken = np.array([[1.0, 0.9, 0.9], [0.9, 1.0, -0.9], [0.9, -0.9, 1.0]])
+    assert np.linalg.eigvalsh(broken)[0] < 0
+    repaired, iterations = nearest_correlation(broken)
+    assert iterations > 0
+    np.testing.assert_allclose(repaired, repaired.T)
+    np.testing.assert_allclose(np.diag(repaired), 1.0)
+    assert np.linalg.eigvalsh(repaired)[0] >= -1e-10
+    assert np.linalg.norm(repaired - broken) < np.linalg.norm(np.eye(3) - broken)
+
+    valid = np.array([[1.0, 0.3], [0.3, 1.0]])
+    assert nearest_correlation(valid)[1] == 0
+    np.testing.assert_array_equal(nearest_correlation(valid)[0], valid)
+
+    estimator = CorrelationEstimator()
+    slate = random_slate(200, seed=3)
+    slate_matrix = estimator.estimate(slate)
+    np.testing.assert_allclose(np.diag(slate_matrix), 1.0)
+    assert np.linalg.eigvalsh(slate_matrix)[0] >= -1e-10
+    # Accelerated repair lands where plain alternating projections converge
+    plain, _ = nearest_correlation(estimate_correlation(slate), tol=1e-9, max_iter=500, history=0)
+    np.testing.assert_allclose(slate_matrix, plain, atol=1e-3)
+    # Repeating the slate reuses the repair
+    np.testing.assert_array_equal(estimator.estimate(slate), slate_matrix)
+    assert estimator.get_stats()["memo_hits"] == 1 and estimator.get_stats()["repairs"] == 1
+
+
+def test_empirical_correlation_over_shared_periods():
+    """Test empirical correlations use only shared periods and blend in by overlap."""
+    rng = np.random.default_rng(1)
+    a, b = rng.normal(size=30), rng.normal(size=30)
+    settled = [{"correlation_key": "A", "period": t, "return": a[t]} for t in range(30)]
+    # B only settled on even periods, with two bets on some of them
+    for t in range(0, 30, 2):
+        settled.append({"correlation_key": "B", "period": t, "return": b[t] - 1.0})
+        settled.append({"correlation_key": "B", "period": t, "return": b[t] + 1.0})
+    settled.append({"correlation_key": "C", "period": 0, "return": 1.0})
+
+    corr, overlap = empirical_correlation(settled, ["A", "B", "C", "B"])
+    expected = np.corrcoef(a[::2], b[::2])[0, 1]
+    assert corr[0, 1] == pytest.approx(expected) and overlap[0, 1] == 15
+    assert corr[0, 3] == corr[0, 1] and corr[1, 3] == 1.0
+    # A single shared period carries no information
+    assert corr[0, 2] == 0.0 and overlap[0, 2] == 0.0
+
+    heuristic = np.full((2, 2), 0.5)
+    blended = blend_correlation(heuristic, corr[:2, :2], overlap[:2, :2], shrinkage=15.0)
+    assert blended[0, 1] == pytest.approx(0.5 + 0.5 * (expected - 0.5))
+    assert blended[0, 0] == 1.0
+
+
+def test_optimizer_blends_settled_history():
+    """Test PortfolioOptimizer fills every pair and pulls towards recorded settlements."""
+    risk_management = pytest.importorskip("risk_management", exc_type=ImportError)
+    optimizer = risk_management.PortfolioOptimizer()
+    slate = [
+        {"id": "x", "event_id": "e1", "sport": "nba", "market_type": "spread", "team": "LAL"},
+        {"id": "y", "event_id": "e2", "sport": "nba", "market_type": "total", "team": "BOS"},
+        {"id": "z", "event_id": "e1", "sport": "nba", "market_type": "total", "team": "GSW"},
+    ]
+    before = asyncio.run(optimizer._estimate_correlation_matrix(slate))
+    np.testing.assert_allclose(before, [[1.0, 0.3, 0.7], [0.3, 1.0, 0.5], [0.7, 0.5, 1.0]])
+
+    for day in range(1, 29):
+        outcome = 1.0 if day % 3 else -1.0
+        for opp in slate[:2]:
+            optimizer.record_settled_bet(
+                {**opp, "settled_at": f"2026-02-{day:02d}T20:00:00", "return": outcome}
+            )
+    after = asyncio.run(optimizer._estimate_correlation_matrix(slate))
+    assert after[0, 1] == pytest.approx(0.3 + 28 / 48 * 0.7)
+    assert after[0, 2] == pytest.approx(0.7)
@@ -0,0 +1,168 @@
+"""Tests for portfolio_qp."""
+
+import asyncio
+import os
+import sys
+
+import numpy as np
+import pytest
+import scipy.optimize as opt
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from portfolio_qp import (
+    POLISH_EVERY,
+    project_box_budget,
+    risk_parity_gradient,
+    risk_parity_objective,
+    solve_box_budget_qp,
+    solve_box_budget_qp_batch,
+    solve_risk_parity,
+)
+
+
+def random_problem(n, seed, risk_aversion=5.0):
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(size=(n, 3))
+    correlations = factors @ factors.T + np.diag(rng.uniform(0.5, 2.0, n))
+    scale = 1.0 / np.sqrt(np.diag(correlations))
+    risks = rng.uniform(0.1, 0.5, n)
+    cov = correlations * np.outer(scale, scale) * np.outer(risks, risks)
+    return risk_aversion * cov, rng.normal(0.03, 0.05, n)
+
+
+def slsqp(Q, c, upper):
+    n = len(c)
+    result = opt.minimize(
+        lambda w: 0.5 * w @ Q @ w - c @ w,
+        np.ones(n) / n,
+        jac=lambda w: Q @ w - c,
+        method="SLSQP",
+        bounds=[(0, upper)] * n,
+        constraints=[{"type": "eq", "fun": lambda w: w.sum() - 1.0}],
+        options={"ftol": 1e-12, "maxiter": 500},
+    )
+    return result.x
+
+
+def test_projection_hits_budget_and_box():
+    """Test each projected row sums to its budget within its box and is the closest such point."""
+    rng = np.random.default_rng(0)
+    v = rng.normal(size=(4, 6))
+    lower = np.zeros((4, 6))
+    upper = np.full((4, 6), 0.5)
+    upper[3, 4:] = 0.0  # Padding pinned at zero
+    budget = np.array([1.0, 0.3, 2.5, 1.0])
+    projected = project_box_budget(v, lower, upper, budget)
+    np.testing.assert_allclose(projected.sum(axis=1), budget)
+    assert np.all(projected >= lower) and np.all(projected <= upper)
+    assert np.all(projected[3, 4:] == 0.0)
+    # Optimality: projected = clip(v - tau) for one tau per row
+    for row in range(4):
+        free = (projected[row] > 0) & (projected[row] < upper[row])
+        shifts = v[row, free] - projected[row, free]
+        np.testing.assert_allclose(shifts, shifts[0])
+
+
+@pytest.mark.parametrize("n, upper", [(3, 0.5), (12, 0.5), (40, 0.2), (80, 0.5)])
+def test_box_budget_qp_matches_slsqp(n, upper):
+    """Test the QP solution is feasible, exact and at least as good as SLSQP's."""
+    Q, c = random_problem(n, seed=n)
+    result = solve_box_budget_qp(Q, c, np.zeros(n), np.full(n, upper))
+    weights = result.weights
+    assert result.exact and result.converged
+    assert weights.sum() == pytest.approx(1.0) and weights.min() >= 0 and weights.max() <= upper + 1e-12
+    reference = slsqp(Q, c, upper)
+    objective = lambda w: 0.5 * w @ Q @ w - c @ w  # noqa: E731
+    assert result.objective == pytest.approx(objective(weights))
+    assert objective(weights) <= objective(reference) + 1e-10
+    np.testing.assert_allclose(weights, reference, atol=1e-4)
+
+    with pytest.raises(ValueError):
+        solve_box_budget_qp(Q, c, np.zeros(n), np.full(n, 0.5 / n))
+
+
+def test_batch_matches_single_solves_and_warm_starts():
+    """Test a padded batch of mixed sizes equals separate solves, and warm starts finish fast."""
+    problems = [random_problem(n, seed=100 + n) for n in (2, 7, 25, 60)]
+    lowers = [np.zeros(len(c)) for _, c in problems]
+    uppers = [np.full(len(c), 0.5) for _, c in problems]
+    batch = solve_box_budget_qp_batch(
+        [Q for Q, _ in problems], [c for _, c in problems], lowers, uppers, [1.0] * 4
+    )
+    for (Q, c), lower, upper, solved in zip(problems, lowers, uppers, batch):
+        single = solve_box_budget_qp(Q, c, lower, upper)
+        np.testing.assert_allclose(solved.weights, single.weights, atol=1e-9)
+
+    # Nudge the returns and restart from the previous solution
+    Q, c = problems[-1]
+    previous = batch[-1].weights
+    nudged = c + np.random.default_rng(1).normal(0, 0.002, len(c))
+    cold = solve_box_budget_qp(Q, nudged, lowers[-1], uppers[-1])
+    warm = solve_box_budget_qp(Q, nudged, lowers[-1], uppers[-1], x0=previous)
+    np.testing.assert_allclose(warm.weights, cold.weights, atol=1e-9)
+    assert warm.iterations <= POLISH_EVERY <= cold.iterations
+
+
+def test_risk_parity_newton_and_capped_fallback():
+    """Test Newton risk parity equalises contributions and the gradient is analytic."""
+    Q, _ = random_problem(30, seed=5, risk_aversion=1.0)
+    result = solve_risk_parity(Q)
+    contributions = result.weights * (Q @ result.weights)
+    np.testing.assert_allclose(contributions / contributions.sum(), np.full(30, 1 / 30), atol=1e-8)
+    assert result.exact and result.iterations < 20
+
+    weights = np.random.default_rng(2).dirichlet(np.ones(30))
+    numeric = opt.approx_fprime(weights, risk_parity_objective, 1e-8, Q)
+    np.testing.assert_allclose(risk_parity_gradient(weights, Q), numeric, rtol=1e-4, atol=1e-8)
+
+    # One near-riskless position would take more than the cap
+    cov = np.diag([1e-4, 1.0, 1.0, 1.0])
+    capped = solve_risk_parity(cov, upper=0.5)
+    assert not capped.exact
+    assert capped.weights.max() <= 0.5 + 1e-9 and capped.weights.sum() == pytest.approx(1.0)
+    assert capped.weights[0] == pytest.approx(0.5, abs=1e-6)
+
+
+def test_optimizer_warm_starts_and_batches():
+    """Test PortfolioOptimizer reuses a user's weights and batches users consistently."""
+    risk_management = pytest.importorskip("risk_management", exc_type=ImportError)
+    rng = np.random.default_rng(3)
+
+    def slate(n, prefix):
+        return [
+            {
+                "id": f"{prefix}{i}",
+                "event_id": f"e{i // 2}",
+                "sport": "nba",
+                "market_type": ["spread", "total"][i % 2],
+                "team": f"t{i % 5}",
+                "expected_value": float(rng.normal(0.03, 0.04)),
+                "risk": float(rng.uniform(0.1, 0.4)),
+            }
+            for i in range(n)
+        ]
+
+    optimizer = risk_management.PortfolioOptimizer()
+    opportunities = slate(20, "a")
+    first = asyncio.run(optimizer.optimize_portfolio(opportunities, 1000.0, user_id="u1"))
+    second = asyncio.run(optimizer.optimize_portfolio(opportunities, 1000.0, user_id="u1"))
+    assert not first.metadata["warm_started"] and second.metadata["warm_started"]
+    assert second.optimal_weights == pytest.approx(first.optimal_weights, abs=1e-9)
+
+    requests = [
+        {"opportunities": slate(n, f"r{k}"), "bankroll": 500.0, "user_id": f"user{k}"}
+        for k, n in enumerate([2, 9, 30])
+    ]
+    requests.append({"opportunities": slate(6, "rp"), "bankroll": 500.0, "method": "risk_parity"})
+    requests.append({"opportunities": [], "bankroll": 500.0})
+    batched = asyncio.run(optimizer.optimize_portfolios(requests))
+    fresh = risk_management.PortfolioOptimizer()
+    for request, result in zip(requests[:4], batched):
+        single = asyncio.run(
+            fresh.optimize_portfolio(
+                request["opportunities"], 500.0, method=request.get("method", "mean_variance")
+            )
+        )
+        assert result.optimal_weights == pytest.approx(single.optimal_weights, abs=1e-7)
+    assert batched[4].optimization_method == "none"
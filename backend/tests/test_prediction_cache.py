@@ -0,0 +1,143 @@
+"""Tests for prediction_cache keys and the two-tier PredictionCache."""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import textwrap
+import threading
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, BACKEND_DIR)
+
+from prediction_cache import PredictionCache, fingerprint, prediction_cache_key
+
+FEATURES = {"home_elo": 1612.4, "away_elo": 1544.0, "rest_days": 3.0, "line": -0.0}
+
+
+def _run_worker(code, hash_seed, port=None):
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed), PYTHONPATH=BACKEND_DIR)
+    if port is not None:
+        env["CACHE_TEST_PORT"] = str(port)
+    completed = subprocess.run(
+        [sys.executable, "-c", textwrap.dedent(code)],
+        env=env,
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    )
+    return completed.stdout.strip().splitlines()[-1]
+
+
+def test_keys_are_stable_across_processes_and_quantised():
+    """Test keys ignore hash seeds, key order and sub-precision noise but not real changes."""
+    code = f"""
+        from prediction_cache import prediction_cache_key
+        print(prediction_cache_key({FEATURES!r}, "pre_game", "cfg", "models"))
+    """
+    keys = {_run_worker(code, seed) for seed in (1, 2, 3)}
+    assert keys == {prediction_cache_key(FEATURES, "pre_game", "cfg", "models")}
+
+    noisy = {name: value + 1e-9 for name, value in reversed(FEATURES.items())}
+    noisy["line"] = 0.0
+    assert prediction_cache_key(noisy, "pre_game", "cfg", "models") in keys
+
+    moved = dict(FEATURES, rest_days=4.0)
+    assert prediction_cache_key(moved, "pre_game", "cfg", "models") not in keys
+    assert prediction_cache_key(FEATURES, "live_game", "cfg", "models") not in keys
+    assert prediction_cache_key(FEATURES, "pre_game", "cfg", "models-v2") not in keys
+    assert fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"b": [1, 2], "a": 1})
+
+
+def test_local_tier_is_bounded_and_counts_hits_per_context():
+    """Test the local tier evicts past its size and reports hit rates per context."""
+
+    async def run():
+        cache = PredictionCache(local_max_size=2, ttl_seconds=60)
+        for n in range(3):
+            await cache.set(f"k{n}", {"value": n})
+        results = [await cache.get(f"k{n}", "pre_game") for n in range(3)]
+        await cache.get("k2", "live_game")
+        return cache, results
+
+    cache, results = asyncio.run(run())
+    assert results == [(None, None), ({"value": 1}, "local"), ({"value": 2}, "local")]
+    stats = cache.get_stats()
+    assert stats["local_entries"] == 2 and stats["local_evictions"] == 1
+    assert stats["contexts"]["pre_game"]["hit_rate"] == pytest.approx(2 / 3)
+    assert stats["contexts"]["live_game"]["local_hits"] == 1
+
+
+def test_worker_processes_share_hits_through_redis():
+    """Test a prediction cached by one process is a Redis hit in another."""
+    fakeredis = pytest.importorskip("fakeredis")
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = fakeredis.TcpFakeServer(("127.0.0.1", port))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    code = f"""
+        import asyncio, os
+        import redis.asyncio as redis
+        from prediction_cache import PredictionCache, prediction_cache_key
+
+        async def main():
+            client = redis.Redis(port=int(os.environ["CACHE_TEST_PORT"]))
+            cache = PredictionCache(redis_client=client)
+            key = prediction_cache_key({FEATURES!r}, "pre_game", "cfg", "models")
+            value, tier = await cache.get(key, "pre_game")
+            if value is None:
+                await cache.set(key, {{"predicted_value": 0.61, "pid": os.getpid()}})
+            await client.aclose()
+            print(tier, value and value["pid"] != os.getpid())
+
+        asyncio.run(main())
+    """
+    try:
+        first = _run_worker(code, 11, port)
+        second = _run_worker(code, 22, port)
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert first == "None None"
+    assert second == "redis True"
+
+
+def test_engine_predict_hits_local_tier(tmp_path):
+    """Test repeated ensemble predictions are served from the cache."""
+    ensemble_engine = pytest.importorskip("ensemble_engine", exc_type=ImportError)
+    joblib = pytest.importorskip("joblib")
+    np = pytest.importorskip("numpy")
+    linear_model = pytest.importorskip("sklearn.linear_model")
+
+    class PassThroughFeatures:
+        def preprocess_features(self, features):
+            return {"features": features}
+
+    async def run():
+        engine = ensemble_engine.UltraAdvancedEnsembleEngine()
+        engine.feature_engineer = PassThroughFeatures()
+        engine.cache_enabled = True
+        engine.model_registry.models_directory = tmp_path
+        X = np.arange(12.0).reshape(6, 2)
+        joblib.dump(linear_model.LinearRegression().fit(X, X.sum(axis=1)), tmp_path / "m.joblib")
+        await engine.model_registry.register_model(
+            "m",
+            ensemble_engine.ModelType.LINEAR_REGRESSION,
+            "m.joblib",
+            {"feature_names": ["a", "b"], "cv_scores": [0.5]},
+        )
+        context = ensemble_engine.PredictionContext.PRE_GAME
+        first = await engine.predict({"a": 1.0, "b": 2.0}, context)
+        second = await engine.predict({"b": 2.0 + 1e-9, "a": 1.0}, context)
+        return first, second, engine.prediction_result_cache.get_stats()
+
+    first, second, stats = asyncio.run(run())
+    assert second.predicted_value == first.predicted_value
+    assert stats["contexts"]["pre_game"]["local_hits"] == 1
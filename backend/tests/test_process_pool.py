@@ -0,0 +1,158 @@
+"""Tests for the CPU task process pool."""
+
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from process_pool import ProcessTaskError, ProcessTaskPool, SharedArray, share_arrays
+
+HERE = __name__
+
+
+def column_sums(matrix, scale=1.0):
+    """Sum columns; also reports whether the matrix arrived as a shared view."""
+    return (matrix.sum(axis=0) * scale, matrix.base is not None and not matrix.flags.owndata)
+
+
+def sleep_for(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def allocate_mb(megabytes):
+    return len(bytearray(int(megabytes * 1024 * 1024)))
+
+
+def fail():
+    raise KeyError("missing feature")
+
+
+def _run(coro):
+    return asyncio.run(coro)
+
+
+def test_large_arrays_travel_through_shared_memory():
+    """Test big arrays arrive as views of shared memory and results match."""
+    matrix = np.arange(200_000, dtype=np.float64).reshape(-1, 4)
+
+    async def run():
+        pool = ProcessTaskPool(workers=1, share_threshold=1024)
+        try:
+            result = await pool.run(f"{HERE}:column_sums", (matrix,), {"scale": 2.0})
+            return result, pool.get_stats()
+        finally:
+            pool.close()
+
+    (sums, shared_view), stats = _run(run())
+
+    np.testing.assert_allclose(sums, matrix.sum(axis=0) * 2.0)
+    assert shared_view
+    assert stats["shared_bytes"] >= matrix.nbytes
+
+
+def test_share_arrays_leaves_small_values_inline():
+    """Test only arrays over the threshold become shared references."""
+    blocks = []
+    try:
+        shared = share_arrays(
+            {"big": np.zeros(1000), "small": np.zeros(3), "rows": [np.ones(1000), 5]},
+            blocks,
+            threshold=4096,
+        )
+        assert isinstance(shared["big"], SharedArray)
+        assert isinstance(shared["rows"][0], SharedArray)
+        assert isinstance(shared["small"], np.ndarray)
+        assert len(blocks) == 2
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def test_timeout_kills_the_worker_and_pool_recovers():
+    """Test an overrunning task is cancelled by replacing its process."""
+
+    async def run():
+        pool = ProcessTaskPool(workers=1)
+        try:
+            first_pid = await pool.run(f"{HERE}:sleep_for", (0,))
+            start = time.perf_counter()
+            with pytest.raises(asyncio.TimeoutError):
+                await pool.run(f"{HERE}:sleep_for", (30,), timeout=0.2)
+            elapsed = time.perf_counter() - start
+            second_pid = await pool.run(f"{HERE}:sleep_for", (0,))
+            return first_pid, second_pid, elapsed, pool.get_stats()
+        finally:
+            pool.close()
+
+    first_pid, second_pid, elapsed, stats = _run(run())
+
+    assert elapsed < 5
+    assert first_pid != second_pid
+    assert stats["timed_out"] == 1 and stats["restarts"] == 1
+
+
+def test_cancelled_caller_does_not_leak_its_reply_to_the_next_task():
+    """Test cancelling a waiting caller replaces the worker instead of returning it busy."""
+
+    async def run():
+        pool = ProcessTaskPool(workers=1)
+        try:
+            await pool.run(f"{HERE}:sleep_for", (0,))
+            waiting = asyncio.create_task(pool.run(f"{HERE}:sleep_for", (0.3,)))
+            await asyncio.sleep(0.1)
+            waiting.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiting
+            await asyncio.sleep(0.4)  # The stale reply would be in the pipe by now
+            next_result = await pool.run(f"{HERE}:column_sums", (np.ones((2, 2)),))
+            return next_result, pool.get_stats()
+        finally:
+            pool.close()
+
+    next_result, stats = _run(run())
+
+    np.testing.assert_array_equal(next_result[0], [2.0, 2.0])
+    assert stats["cancelled"] == 1 and stats["restarts"] == 1
+
+
+@pytest.mark.skipif(not os.path.exists("/proc/self/statm"), reason="needs /proc and RLIMIT_AS")
+def test_memory_cap_fails_the_task_not_the_worker():
+    """Test a task allocating past its cap fails with MemoryError and the worker survives."""
+
+    async def run():
+        pool = ProcessTaskPool(workers=1)
+        try:
+            with pytest.raises(ProcessTaskError, match="MemoryError"):
+                await pool.run(f"{HERE}:allocate_mb", (256,), memory_limit_mb=64)
+            allowed = await pool.run(f"{HERE}:allocate_mb", (16,), memory_limit_mb=64)
+            return allowed, pool.get_stats()
+        finally:
+            pool.close()
+
+    allowed, stats = _run(run())
+
+    assert allowed == 16 * 1024 * 1024
+    assert stats["restarts"] == 0
+
+
+def test_task_errors_carry_the_remote_traceback():
+    """Test exceptions raised in a worker surface with their traceback."""
+
+    async def run():
+        pool = ProcessTaskPool(workers=1)
+        try:
+            await pool.run(f"{HERE}:fail")
+        finally:
+            pool.close()
+
+    with pytest.raises(ProcessTaskError) as error:
+        _run(run())
+    assert "KeyError" in str(error.value)
+    assert "raise KeyError" in error.value.remote_traceback
@@ -0,0 +1,92 @@
+"""Tests for triggered predictions in the real-time stream manager."""
+
+import asyncio
+import os
+import sys
+import uuid
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+
+def test_score_change_trigger_broadcasts_a_prediction():
+    """Test a live score update is batched, predicted and broadcast to prediction subscribers."""
+    realtime_engine = pytest.importorskip("realtime_engine", exc_type=ImportError)
+    StreamType = realtime_engine.StreamType
+
+    async def run():
+        manager = realtime_engine.RealTimeStreamManager()
+        received = []
+
+        async def callback(message):
+            received.append(message)
+
+        await manager.subscribe("sub", [StreamType.PREDICTIONS], callback=callback)
+        manager.prediction_batcher.start()
+        try:
+            await manager._dispatch_message(
+                realtime_engine.StreamMessage(
+                    id=str(uuid.uuid4()),
+                    stream_type=StreamType.LIVE_SCORES,
+                    priority=realtime_engine.UpdatePriority.HIGH,
+                    data={"score_change": 3},
+                    timestamp=datetime.now(timezone.utc),
+                    source="scores_feed",
+                    event_id="game_1",
+                )
+            )
+            for _ in range(200):
+                if received:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            manager.prediction_batcher.close()
+            await manager.unsubscribe("sub")
+        return received
+
+    received = asyncio.run(run())
+
+    assert len(received) == 1
+    message = received[0]
+    assert message.stream_type == StreamType.PREDICTIONS
+    assert message.event_id == "game_1"
+    assert message.data["trigger_type"] == "live_score_update"
+    assert message.data["context"] == "live_game"
+    assert message.data["prediction"] is not None
+
+
+def test_shutdown_emits_buckets_still_buffered():
+    """Test updates waiting out their aggregation buffer reach subscribers on shutdown."""
+    realtime_engine = pytest.importorskip("realtime_engine", exc_type=ImportError)
+    StreamType = realtime_engine.StreamType
+
+    async def run():
+        manager = realtime_engine.RealTimeStreamManager()
+        received = []
+
+        async def callback(message):
+            received.append(message)
+
+        await manager.subscribe("sub", [StreamType.LIVE_SCORES], callback=callback)
+        for score in (1, 2):
+            await manager._process_stream_message(
+                realtime_engine.StreamMessage(
+                    id=str(uuid.uuid4()),
+                    stream_type=StreamType.LIVE_SCORES,
+                    priority=realtime_engine.UpdatePriority.HIGH,
+                    data={"period": 1, "home_score": score},
+                    timestamp=datetime.now(timezone.utc),
+                    source="scores_feed",
+                    event_id="game_1",
+                )
+            )
+        buffered = list(received)
+        await manager.shutdown()
+        return buffered, received
+
+    buffered, received = asyncio.run(run())
+
+    assert buffered == []
+    assert len(received) == 1 and received[0].data["home_score"] == 2
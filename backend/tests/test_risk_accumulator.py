@@ -0,0 +1,155 @@
+"""Tests for risk_accumulator."""
+
+import asyncio
+import os
+import sys
+from collections import deque
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from risk_accumulator import RiskAccumulator
+
+
+def betting_returns(n, seed):
+    rng = np.random.default_rng(seed)
+    returns = np.where(rng.random(n) < 0.52, rng.uniform(0, 0.05, n), -rng.uniform(0, 0.05, n))
+    returns[rng.random(n) < 0.1] = -0.02  # Repeated flat losses
+    return returns
+
+
+def reference(returns):
+    """The metrics as computed from the full return array"""
+    var_95 = np.percentile(returns, 5)
+    cumulative = np.cumprod(1 + returns)
+    running_max = np.maximum.accumulate(cumulative)
+    max_drawdown = np.min((cumulative - running_max) / running_max)
+    excess = np.mean(returns) - 0.02 / 252
+    downside = np.std(returns[returns < 0])
+    return {
+        "value_at_risk_95": var_95,
+        "value_at_risk_99": np.percentile(returns, 1),
+        "expected_shortfall_95": np.mean(returns[returns <= var_95]),
+        "max_drawdown": max_drawdown,
+        "sharpe_ratio": excess / np.std(returns) * np.sqrt(252),
+        "sortino_ratio": excess / downside * np.sqrt(252) if downside > 0 else 0.0,
+        "calmar_ratio": np.mean(returns) * 252 / abs(max_drawdown),
+        "confidence_interval": (np.percentile(returns, 2.5), np.percentile(returns, 97.5)),
+    }
+
+
+@pytest.mark.parametrize("n", [3, 250, 1023])
+def test_exact_while_history_fits_buffer(n):
+    """Test single adds and block updates reproduce the full-array metrics exactly."""
+    returns = betting_returns(n, seed=n)
+    accumulator = RiskAccumulator()
+    for value in returns[: n // 2]:
+        accumulator.add(value)
+    accumulator.update(returns[n // 2 :])
+    metrics = accumulator.metrics()
+    for name, expected in reference(returns).items():
+        assert getattr(metrics, name) == pytest.approx(expected, rel=1e-9, abs=1e-12), name
+    assert metrics.volatility == pytest.approx(np.std(returns))
+
+
+def test_sketch_tails_on_long_history():
+    """Test VaR and expected shortfall stay accurate once the digest compresses."""
+    returns = betting_returns(200_000, seed=1)
+    accumulator = RiskAccumulator()
+    for block in np.array_split(returns, 37):
+        accumulator.update(block)
+    metrics = accumulator.metrics()
+    ordered = np.sort(returns)
+    for q, var in ((0.05, metrics.value_at_risk_95), (0.01, metrics.value_at_risk_99)):
+        rank = np.searchsorted(ordered, var) / len(returns)
+        assert abs(rank - q) < 1e-3
+    expected = reference(returns)
+    assert metrics.expected_shortfall_95 == pytest.approx(expected["expected_shortfall_95"], rel=5e-3)
+    assert metrics.max_drawdown == pytest.approx(expected["max_drawdown"], rel=1e-9)
+    assert metrics.sharpe_ratio == pytest.approx(expected["sharpe_ratio"], rel=1e-9)
+    assert len(accumulator.sketch.means) < 300
+
+
+def test_drawdown_without_overflow_and_after_wipe_out():
+    """Test drawdown stays finite where cumprod overflows, and a total loss is -100%."""
+    accumulator = RiskAccumulator()
+    accumulator.update(np.full(3000, 0.5))  # 1.5 ** 3000 overflows a float
+    accumulator.update([-0.2, 0.1, -0.3])
+    assert accumulator.metrics().max_drawdown == pytest.approx(0.8 * 1.1 * 0.7 - 1)
+    accumulator.add(-1.0)
+    accumulator.add(0.2)
+    assert accumulator.metrics().max_drawdown == -1.0
+
+
+def test_state_round_trip_is_compact_and_resumable():
+    """Test serialised state restores the same metrics and keeps accumulating identically."""
+    returns = betting_returns(50_000, seed=2)
+    accumulator = RiskAccumulator()
+    accumulator.update(returns[:49_500])
+    for value in returns[49_500:49_900]:
+        accumulator.add(value)
+    state = accumulator.to_bytes()
+    assert len(state) < 8 * 1024
+    restored = RiskAccumulator.from_bytes(state)
+    assert restored.metrics() == accumulator.metrics()
+    for target in (accumulator, restored):
+        target.update(returns[49_900:])
+    assert restored.metrics() == accumulator.metrics()
+    with pytest.raises(ValueError):
+        RiskAccumulator.from_bytes(b"\x00" * len(state))
+
+
+def test_engine_serves_assessment_from_accumulator():
+    """Test a portfolio's assessment comes from the returns recorded for it."""
+    risk_management = pytest.importorskip("risk_management", exc_type=ImportError)
+    engine = risk_management.RiskAssessmentEngine()
+    positions = [{"stake": 10.0, "market_type": "standard"}]
+    history = list(betting_returns(3000, seed=3))
+
+    def assess(returns, portfolio_id=None):
+        return asyncio.run(engine.assess_portfolio_risk(positions, 1000.0, returns, portfolio_id))
+
+    engine.record_returns("p1", history[:2000])
+    for value in history[2000:]:
+        engine.record_return("p1", value)
+    incremental = assess(None, "p1")
+    assert engine.accumulators["p1"].count == 3000
+    expected = RiskAccumulator()
+    expected.update(history[:2000])
+    for value in history[2000:]:
+        expected.add(value)
+    assert engine.accumulators["p1"].metrics() == expected.metrics()
+    assert incremental.value_at_risk_95 == expected.metrics().value_at_risk_95
+    fresh = assess(history)
+    assert fresh.max_drawdown == pytest.approx(incremental.max_drawdown)
+    assert fresh.value_at_risk_95 == pytest.approx(incremental.value_at_risk_95, rel=1e-2)
+
+    # A passed history is assessed as given and leaves the accumulator alone
+    short = assess(history[:100], "p1")
+    assert short.value_at_risk_95 == pytest.approx(np.percentile(history[:100], 5))
+    assert engine.accumulators["p1"].count == 3000
+
+    engine.record_return("p1", -0.5)
+    state = engine.export_accumulator("p1")
+    engine.restore_accumulator("p2", state)
+    assert assess(None, "p2").max_drawdown == assess(None, "p1").max_drawdown < -0.5
+
+
+def test_engine_assesses_rolling_window_as_given():
+    """Test a full rolling window keeps tracking its contents instead of freezing."""
+    risk_management = pytest.importorskip("risk_management", exc_type=ImportError)
+    engine = risk_management.RiskAssessmentEngine()
+    positions = [{"stake": 10.0, "market_type": "standard"}]
+    window = deque(maxlen=50)
+
+    def assess():
+        return asyncio.run(engine.assess_portfolio_risk(positions, 1000.0, window, portfolio_id="p"))
+
+    window.extend([0.01] * 50)
+    assert assess().value_at_risk_95 == pytest.approx(0.01)
+    window.extend([-0.2] * 50)
+    rolled = assess()
+    assert rolled.value_at_risk_95 == pytest.approx(-0.2)
+    assert rolled.max_drawdown == pytest.approx(reference(np.array(window))["max_drawdown"])
@@ -0,0 +1,176 @@
+"""Tests for subscription indexing and send queues in stream_fanout."""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from stream_fanout import SendQueue, SlowConsumerPolicy, SubscriptionIndex
+
+DIMENSIONS = ("event_ids", "sources", "priority")
+
+
+def _matches(topics, filters, topic, values):
+    """Reference per-subscriber filter check the index replaces."""
+    if topic not in topics:
+        return False
+    return all(
+        filters.get(dimension) is None or value in filters[dimension]
+        for dimension, value in zip(DIMENSIONS, values)
+    )
+
+
+def test_subscription_index_matches_filter_scan():
+    """Test index lookups agree with checking every subscription's filters."""
+    rng = random.Random(11)
+    topics = ["betting_odds", "live_scores", "predictions"]
+    events = [f"e{i}" for i in range(20)]
+    sources = ["feed_a", "feed_b", "feed_c"]
+    priorities = ["critical", "high", "medium", "low"]
+
+    index = SubscriptionIndex(DIMENSIONS)
+    subscriptions = {}
+    for i in range(500):
+        filters = {}
+        if rng.random() < 0.6:
+            filters["event_ids"] = rng.sample(events, rng.randint(1, 3))
+        if rng.random() < 0.3:
+            filters["sources"] = rng.sample(sources, rng.randint(1, 2))
+        if rng.random() < 0.3:
+            filters["priority"] = rng.sample(priorities, rng.randint(1, 2))
+        subscribed = set(rng.sample(topics, rng.randint(1, 2)))
+        subscriptions[f"s{i}"] = (subscribed, filters)
+        index.add(f"s{i}", subscribed, filters)
+
+    for subscriber_id in [f"s{i}" for i in range(0, 500, 7)]:
+        index.remove(subscriber_id)
+        del subscriptions[subscriber_id]
+    assert len(index) == len(subscriptions)
+
+    for _ in range(300):
+        topic = rng.choice(topics)
+        values = (rng.choice(events), rng.choice(sources), rng.choice(priorities))
+        expected = {
+            subscriber_id
+            for subscriber_id, (subscribed, filters) in subscriptions.items()
+            if _matches(subscribed, filters, topic, values)
+        }
+        assert index.match(topic, values) == expected
+
+
+def test_send_queue_conflates_and_bounds_slow_consumers():
+    """Test a full queue conflates keyed updates and drops the oldest otherwise."""
+    delivered = []
+
+    async def run():
+        gate = asyncio.Event()
+
+        async def deliver(item):
+            await gate.wait()
+            delivered.append(item)
+
+        queue = SendQueue(deliver, max_size=3)
+        queue.start()
+        await asyncio.sleep(0)
+
+        queue.offer("odds e1 v1", ("odds", "e1"))
+        await asyncio.sleep(0)  # v1 is now in flight, blocked on the gate
+        for version in range(2, 6):
+            queue.offer(f"odds e1 v{version}", ("odds", "e1"))
+        for i in range(4):
+            queue.offer(f"alert {i}")
+
+        gate.set()
+        await asyncio.sleep(0.01)
+        queue.close()
+        return queue.stats
+
+    stats = asyncio.run(run())
+
+    # v1 was sent before the queue filled; v5 conflated v2-v4 and was later
+    # dropped as the oldest entry when the fourth alert arrived
+    assert delivered == ["odds e1 v1", "alert 1", "alert 2", "alert 3"]
+    assert stats["conflated"] == 3
+    assert stats["dropped"] == 2
+
+
+def test_slow_subscriber_does_not_stall_others():
+    """Test fan-out to fast subscribers completes while one client hangs."""
+    received = {}
+
+    async def run():
+        queues = []
+        for i in range(100):
+
+            async def deliver(item, subscriber=i):
+                if subscriber == 0:
+                    await asyncio.sleep(10)  # Hung client
+                received[subscriber] = received.get(subscriber, 0) + 1
+
+            queue = SendQueue(deliver, max_size=8, policy=SlowConsumerPolicy.DROP_NEWEST)
+            queue.start()
+            queues.append(queue)
+
+        start = time.perf_counter()
+        for n in range(20):
+            for queue in queues:
+                queue.offer(n)
+            await asyncio.sleep(0)  # Next message arrives on a later loop turn
+        await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - start
+
+        for queue in queues:
+            queue.close()
+        return elapsed, queues[0].stats
+
+    elapsed, slow_stats = asyncio.run(run())
+
+    assert elapsed < 1.0
+    assert all(received.get(i) == 20 for i in range(1, 100))
+    assert 0 not in received
+    assert slow_stats["dropped"] == 20 - 1 - 8  # One in flight, eight queued
+
+
+def test_send_queue_reports_failures():
+    """Test a failing delivery stops the queue and notifies the owner."""
+    failures = []
+
+    async def deliver(item):
+        raise ConnectionError("socket closed")
+
+    async def run():
+        queue = SendQueue(deliver, on_failure=failures.append)
+        queue.start()
+        queue.offer("message")
+        await asyncio.sleep(0.01)
+        return queue
+
+    queue = asyncio.run(run())
+
+    assert len(failures) == 1 and isinstance(failures[0], ConnectionError)
+    assert len(queue) == 0
+
+
+def test_send_queue_drain_waits_for_delivery():
+    """Test drain returns once queued updates, including one in flight, are delivered."""
+    delivered = []
+
+    async def deliver(item):
+        await asyncio.sleep(0.02)
+        delivered.append(item)
+
+    async def run():
+        queue = SendQueue(deliver)
+        await queue.drain()  # Not started: nothing to wait for
+        queue.start()
+        for n in range(3):
+            queue.offer(n)
+        await asyncio.wait_for(queue.drain(), timeout=1.0)
+        drained = list(delivered)
+        queue.close()
+        return drained
+
+    assert asyncio.run(run()) == [0, 1, 2]
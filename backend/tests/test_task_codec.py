@@ -0,0 +1,155 @@
+"""Tests for task_codec envelopes and their use in task_processor.TaskQueue."""
+
+import asyncio
+import os
+import pickle
+import sys
+import uuid
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+pytest.importorskip("msgpack")
+
+from task_codec import FRAME_MAGIC, BlobRef, TaskCodec
+from task_processor import (
+    TaskDefinition,
+    TaskPriority,
+    TaskQueue,
+    TaskResult,
+    TaskStatus,
+    TaskType,
+)
+
+
+def _market_data(n=2000):
+    return [
+        {"event_id": f"evt_{i}", "sportsbook": "book_a", "odds": {"home": 1.9, "away": 2.0 + i / 1e4}}
+        for i in range(n)
+    ]
+
+
+def _task(**kwargs):
+    return TaskDefinition(
+        id=kwargs.pop("id", str(uuid.uuid4())),
+        task_type=TaskType.ARBITRAGE_SCAN,
+        priority=TaskPriority.HIGH,
+        function_name="arbitrage_scan_task",
+        **kwargs,
+    )
+
+
+def test_task_and_result_round_trip_with_arrays_dates_and_enums():
+    """Test fields, NumPy arrays, datetimes and enums survive and the envelope beats pickle."""
+    codec = TaskCodec()
+    task = _task(
+        args=[["evt_1", "evt_2"]],
+        kwargs={"weights": np.linspace(0, 1, 50), "tags": {"a", "b"}},
+        scheduled_at=datetime(2024, 5, 1, 12, tzinfo=timezone.utc),
+        max_retries=5,
+    )
+    decoded = codec.decode_task(codec.encode_task(task).payload, TaskDefinition)
+
+    assert decoded.priority is TaskPriority.HIGH
+    assert decoded.task_type is TaskType.ARBITRAGE_SCAN
+    assert decoded.scheduled_at == task.scheduled_at
+    assert decoded.created_at == task.created_at
+    assert decoded.max_retries == 5 and decoded.kwargs["tags"] == {"a", "b"}
+    np.testing.assert_array_equal(decoded.kwargs["weights"], task.kwargs["weights"])
+
+    result = TaskResult(
+        task_id=task.id, status=TaskStatus.COMPLETED, result={"scores": np.ones(4)}
+    )
+    payload = codec.encode_result(result)
+    restored = codec.decode_result(payload, TaskResult)
+    assert restored.status is TaskStatus.COMPLETED
+    np.testing.assert_array_equal(restored.result["scores"], np.ones(4))
+    assert len(payload) < len(pickle.dumps(result))
+
+
+def test_arguments_decode_as_writable_arrays_and_tuples():
+    """Test decoded arrays can be modified and tuples stay tuples, as they did with pickle."""
+    codec = TaskCodec()
+    task = _task(
+        args=[(1, 2), [("evt_1", 1.9)]],
+        kwargs={"k": (1, (2, 3)), "weights": np.arange(6.0).reshape(2, 3), "by_pair": {(1, 2): "x"}},
+    )
+    decoded = codec.decode_task(codec.encode_task(task).payload, TaskDefinition)
+
+    assert decoded.args == [(1, 2), [("evt_1", 1.9)]]
+    assert type(decoded.args[0]) is tuple and type(decoded.args[1][0]) is tuple
+    assert decoded.kwargs["k"] == (1, (2, 3)) and type(decoded.kwargs["k"][1]) is tuple
+    assert decoded.kwargs["by_pair"] == {(1, 2): "x"}
+
+    weights = decoded.kwargs["weights"]
+    assert weights.flags.writeable
+    weights[0, 0] = 42.0
+    np.testing.assert_array_equal(task.kwargs["weights"][0], [0.0, 1.0, 2.0])
+
+
+def test_legacy_pickles_decode_and_newer_schemas_are_rejected():
+    """Test payloads queued before the codec still load, and future schemas fail loudly."""
+    codec = TaskCodec()
+    task = _task(args=[1, 2])
+    assert codec.decode_task(pickle.dumps(task), TaskDefinition) == task
+
+    payload = bytearray(codec.encode_task(task).payload)
+    assert payload.startswith(FRAME_MAGIC)
+    payload[2] = 99  # Schema version byte
+    with pytest.raises(ValueError):
+        codec.decode_task(bytes(payload), TaskDefinition)
+
+
+def test_large_arguments_become_content_addressed_blobs():
+    """Test identical large arguments share one blob and small ones stay inline."""
+    codec = TaskCodec(blob_threshold=4096)
+    market_data = _market_data()
+    first = codec.encode_task(_task(args=[market_data], kwargs={"min_profit": 0.01}))
+    second = codec.encode_task(_task(args=[market_data]))
+
+    assert list(first.blobs) == list(second.blobs)
+    assert len(first.payload) < 512
+
+    decoded = codec.decode_task(first.payload, TaskDefinition)
+    assert isinstance(decoded.args[0], BlobRef) and decoded.kwargs == {"min_profit": 0.01}
+    blobs = {digest: codec.decode_blob(blob) for digest, blob in first.blobs.items()}
+    assert codec.resolve(decoded, blobs).args[0] == market_data
+
+
+def test_queue_stores_shared_blobs_once_and_chunks_large_results():
+    """Test claims resolve blob arguments and big results stream back in chunks."""
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+
+    async def run():
+        queue = TaskQueue(
+            "codec_tasks",
+            redis_client=fakeredis.FakeAsyncRedis(),
+            result_chunk_size=4096,
+        )
+        await queue.initialize()
+        market_data = _market_data()
+        tasks = [_task(args=[market_data]) for _ in range(5)]
+        await queue.enqueue_many(tasks)
+
+        blob_keys = await queue.redis_client.keys(f"{queue.blob_prefix}:*")
+        claimed = await queue.dequeue_batch("w1", max_tasks=5)
+
+        result = TaskResult(
+            task_id=tasks[0].id,
+            status=TaskStatus.COMPLETED,
+            result={"matrix": np.arange(20000, dtype=np.float64)},
+        )
+        await queue.store_result(result)
+        chunks = [chunk async for chunk in queue.iter_result_chunks(result.task_id)]
+        restored = await queue.get_result(result.task_id)
+        return blob_keys, claimed, chunks, restored
+
+    blob_keys, claimed, chunks, restored = asyncio.run(run())
+    assert len(blob_keys) == 1
+    assert len(claimed) == 5 and all(task.args[0][-1]["event_id"] == "evt_1999" for task in claimed)
+    assert len(chunks) > 1 and all(len(chunk) <= 4096 for chunk in chunks)
+    np.testing.assert_array_equal(restored.result["matrix"], np.arange(20000, dtype=np.float64))
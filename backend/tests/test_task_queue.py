@@ -0,0 +1,317 @@
+"""Tests for atomic, blocking task claims in task_processor.TaskQueue."""
+
+import asyncio
+import os
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")  # fakeredis needs it for EVALSHA
+
+from task_processor import (
+    TaskDefinition,
+    TaskPriority,
+    TaskQueue,
+    TaskStatus,
+    TaskType,
+    TaskWorker,
+)
+
+
+def _task(priority=TaskPriority.MEDIUM, scheduled_at=None, **kwargs):
+    return TaskDefinition(
+        id=str(uuid.uuid4()),
+        task_type=TaskType.ANALYTICS_COMPUTATION,
+        priority=priority,
+        function_name=kwargs.pop("function_name", "noop"),
+        scheduled_at=scheduled_at,
+        **kwargs,
+    )
+
+
+def _queue(server):
+    return TaskQueue("test_tasks", redis_client=fakeredis.FakeAsyncRedis(server=server))
+
+
+def test_batch_claim_takes_highest_priority_ready_tasks_first():
+    """Test one claim drains priorities in order, FIFO within each, skipping future tasks."""
+
+    async def run():
+        queue = _queue(fakeredis.FakeServer())
+        await queue.initialize()
+        low = [_task(TaskPriority.LOW) for _ in range(3)]
+        critical = [_task(TaskPriority.CRITICAL) for _ in range(2)]
+        later = _task(
+            TaskPriority.CRITICAL,
+            scheduled_at=datetime.now(timezone.utc) + timedelta(hours=1),
+        )
+        for task in low + [later] + critical:
+            await queue.enqueue(task)
+
+        first = await queue.dequeue_batch("w1", max_tasks=4)
+        rest = await queue.dequeue_batch("w1", max_tasks=4)
+        empty = await queue.dequeue("w1")
+        locks = await queue.redis_client.keys(f"{queue.lock_prefix}:*")
+        return [t.id for t in first], [t.id for t in rest], empty, len(locks), low, critical
+
+    first, rest, empty, n_locks, low, critical = asyncio.run(run())
+
+    assert first == [t.id for t in critical] + [t.id for t in low[:2]]
+    assert rest == [low[2].id]
+    assert empty is None
+    assert n_locks == 5  # Each claimed task holds a lease until its result is stored
+
+
+def test_concurrent_claims_never_hand_out_a_task_twice():
+    """Test many workers racing for tasks each get a disjoint set."""
+
+    async def run():
+        server = fakeredis.FakeServer()
+        producer = _queue(server)
+        await producer.initialize()
+        tasks = [_task(priority) for priority in TaskPriority for _ in range(40)]
+        for task in tasks:
+            await producer.enqueue(task)
+
+        async def claim_all(worker_id):
+            queue = _queue(server)
+            claimed = []
+            while True:
+                batch = await queue.dequeue_batch(worker_id, max_tasks=7)
+                if not batch:
+                    return claimed
+                claimed.extend(t.id for t in batch)
+
+        claims = await asyncio.gather(*(claim_all(f"w{i}") for i in range(8)))
+        return {t.id for t in tasks}, claims
+
+    expected, claims = asyncio.run(run())
+
+    flat = [task_id for claimed in claims for task_id in claimed]
+    assert len(flat) == len(set(flat))
+    assert set(flat) == expected
+
+
+def test_blocking_claim_wakes_on_enqueue_and_on_schedule():
+    """Test a blocked claim returns promptly on enqueue and when a scheduled task comes due."""
+
+    async def run():
+        server = fakeredis.FakeServer()
+        consumer = _queue(server)
+        producer = _queue(server)
+        await producer.initialize()
+
+        async def enqueue_later():
+            await asyncio.sleep(0.05)
+            await producer.enqueue(_task())
+
+        start = time.perf_counter()
+        asyncio.create_task(enqueue_later())
+        woken = await consumer.dequeue_batch("w1", timeout=5.0)
+        wake_latency = time.perf_counter() - start
+
+        await producer.enqueue(
+            _task(scheduled_at=datetime.now(timezone.utc) + timedelta(seconds=0.2))
+        )
+        start = time.perf_counter()
+        scheduled = await consumer.dequeue_batch("w1", timeout=5.0)
+        scheduled_latency = time.perf_counter() - start
+
+        start = time.perf_counter()
+        timed_out = await consumer.dequeue_batch("w1", timeout=0.1)
+        return woken, wake_latency, scheduled, scheduled_latency, timed_out, time.perf_counter() - start
+
+    woken, wake_latency, scheduled, scheduled_latency, timed_out, waited = asyncio.run(run())
+
+    assert len(woken) == 1 and wake_latency < 1.0
+    assert len(scheduled) == 1 and 0.1 < scheduled_latency < 1.0
+    assert timed_out == [] and waited >= 0.1
+
+
+def test_worker_executes_claimed_tasks_and_stores_results():
+    """Test a worker drains the queue through its slots and records results."""
+
+    def double(value):
+        return value * 2
+
+    async def run():
+        server = fakeredis.FakeServer()
+        producer = _queue(server)
+        await producer.initialize()
+        worker = TaskWorker(
+            "worker_test", concurrency=3, task_queue=_queue(server), claim_timeout=0.05
+        )
+        worker.register_task("double", double)
+        tasks = [_task(function_name="double", args=[n]) for n in range(10)]
+        for task in tasks:
+            await producer.enqueue(task)
+
+        runner = asyncio.create_task(worker.start())
+        for _ in range(1000):  # Includes warming the process pool
+            if worker.tasks_processed == len(tasks):
+                break
+            await asyncio.sleep(0.01)
+        await worker.stop()
+        runner.cancel()  # The monitor loop only wakes once a minute
+        await asyncio.gather(runner, return_exceptions=True)
+
+        results = [await producer.get_result(task.id) for task in tasks]
+        locks = await producer.redis_client.keys(f"{producer.lock_prefix}:*")
+        return results, locks
+
+    results, locks = asyncio.run(run())
+
+    assert [r.status for r in results] == [TaskStatus.COMPLETED] * 10
+    assert [r.result for r in results] == [n * 2 for n in range(10)]
+    assert locks == []
+
+
+def test_worker_backs_off_while_redis_is_unreachable():
+    """Test claim errors reach the worker loop, which pauses exponentially between retries."""
+
+    async def run():
+        queue = _queue(fakeredis.FakeServer())
+        await queue.initialize()
+        claims = []
+
+        async def unreachable(worker_id, max_tasks):
+            claims.append(time.monotonic())
+            raise ConnectionError("Redis unreachable")
+
+        queue._claim = unreachable
+        with pytest.raises(ConnectionError):
+            await queue.dequeue_batch("w1")
+
+        worker = TaskWorker(
+            "worker_backoff", concurrency=1, task_queue=queue, retry_delay=0.05, max_retry_delay=0.2
+        )
+        worker.is_running = True
+        loop_task = asyncio.create_task(worker._worker_loop())
+        await asyncio.sleep(0.5)
+        worker.is_running = False
+        loop_task.cancel()
+        await asyncio.gather(loop_task, return_exceptions=True)
+        worker.process_pool.close()
+        return np.diff(claims[1:])
+
+    gaps = asyncio.run(run())
+    # Claims at about 0, 0.05, 0.15, 0.35 s instead of back to back
+    assert 2 <= len(gaps) <= 4
+    assert gaps[0] > 0.04 and gaps[1] > 0.09 and all(gap > 0.19 for gap in gaps[2:])
+
+
+def test_settled_returns_feed_risk_analysis_across_restarts():
+    """Test settlements update a portfolio's statistics in Redis, which a restarted worker serves from."""
+    risk_management = pytest.importorskip("risk_management", exc_type=ImportError)
+    from risk_accumulator import RiskAccumulator
+
+    engine = risk_management.ultra_risk_engine.risk_assessor
+    rng = np.random.default_rng(5)
+    returns = list(rng.normal(0.002, 0.03, 600))
+    portfolio = {"portfolio_id": "p_settle", "positions": [{"stake": 10.0}], "bankroll": 1000.0}
+
+    async def run():
+        server = fakeredis.FakeServer()
+        worker = TaskWorker("worker_settle", task_queue=_queue(server))
+        await worker.task_queue.initialize()
+        settled = await asyncio.gather(
+            *[worker._bet_settlement_task("p_settle", returns[i : i + 100]) for i in range(0, 600, 100)]
+        )
+        engine.accumulators.clear()  # A restart loses everything held in memory
+
+        restarted = TaskWorker("worker_restarted", task_queue=_queue(server))
+        await restarted.task_queue.initialize()
+        report = await restarted._risk_analysis_task({**portfolio, "historical_returns": [0.5]})
+        worker.process_pool.close()
+        restarted.process_pool.close()
+        return settled, report
+
+    settled, report = asyncio.run(run())
+    assert [result["status"] for result in settled] == ["success"] * 6
+    assert engine.accumulators["p_settle"].count == 600
+    assert report["status"] == "success"
+    assert report["var_95"] == pytest.approx(np.percentile(returns, 5))
+    engine.accumulators.clear()
+
+
+def test_settled_bets_feed_empirical_correlations():
+    """Test bets passed to settlement reach the portfolio optimizer's correlation history."""
+    risk_management = pytest.importorskip("risk_management", exc_type=ImportError)
+    optimizer = risk_management.ultra_risk_engine.portfolio_optimizer
+    bets = [
+        {"sport": "nba", "market_type": "moneyline", "team": "LAL", "return": 0.9, "settled_at": "2026-10-01T21:00:00"},
+        {"sport": "nba", "market_type": "moneyline", "team": "BOS", "return": -1.0, "settled_at": "2026-10-01T22:00:00"},
+    ]
+
+    async def run():
+        worker = TaskWorker("worker_bets", task_queue=_queue(fakeredis.FakeServer()))
+        await worker.task_queue.initialize()
+        result = await worker._bet_settlement_task("p_bets", [0.01, -0.02], bets=bets)
+        worker.process_pool.close()
+        return result
+
+    before = len(optimizer.settled_bets)
+    assert asyncio.run(run())["status"] == "success"
+    recorded = list(optimizer.settled_bets)[before:]
+    assert [bet["period"] for bet in recorded] == ["2026-10-01", "2026-10-01"]
+    assert [bet["team"] for bet in recorded] == ["LAL", "BOS"]
+    for _ in recorded:
+        optimizer.settled_bets.pop()
+    risk_management.ultra_risk_engine.risk_assessor.accumulators.pop("p_bets", None)
+
+
+def test_worker_runs_cpu_tasks_in_its_process_pool():
+    """Test registered CPU tasks reach a worker process and overruns time out."""
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(400, 5))
+    targets = features @ np.arange(1, 6) + rng.normal(scale=0.1, size=400)
+
+    async def run():
+        server = fakeredis.FakeServer()
+        producer = _queue(server)
+        await producer.initialize()
+        worker = TaskWorker(
+            "worker_cpu",
+            concurrency=2,
+            task_queue=_queue(server),
+            claim_timeout=0.05,
+            process_workers=1,
+        )
+        training = _task(
+            function_name="model_training_task",
+            args=["rf_test", {"features": features, "targets": targets}],
+            kwargs={"n_estimators": 10},
+        )
+        overrun = _task(
+            function_name="analytics_computation_task",
+            args=[["roi"]],
+            kwargs={"time_per_metric": 30},
+            timeout_seconds=1,
+        )
+        await producer.enqueue(training)
+        await producer.enqueue(overrun)
+
+        runner = asyncio.create_task(worker.start())
+        for _ in range(1000):
+            if worker.tasks_processed == 2:
+                break
+            await asyncio.sleep(0.01)
+        stats = worker.process_pool.get_stats()
+        await worker.stop()
+        runner.cancel()
+        await asyncio.gather(runner, return_exceptions=True)
+        return await producer.get_result(training.id), await producer.get_result(overrun.id), stats
+
+    trained, timed_out, stats = asyncio.run(run())
+
+    assert trained.status == TaskStatus.COMPLETED
+    assert trained.result["status"] == "success" and trained.result["accuracy"] > 0.5
+    assert timed_out.status == TaskStatus.TIMEOUT
+    assert stats["timed_out"] == 1
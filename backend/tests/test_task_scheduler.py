@@ -0,0 +1,260 @@
+"""Tests for cron parsing and the heap-based task_processor.TaskScheduler."""
+
+import asyncio
+import os
+import random
+import sys
+from datetime import datetime, timezone
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")  # fakeredis needs it for EVAL
+
+from cron_schedule import CronSchedule, parse_schedule
+from task_processor import (
+    MisfirePolicy,
+    TaskDefinition,
+    TaskPriority,
+    TaskQueue,
+    TaskScheduler,
+    TaskType,
+)
+
+# Monday 2024-01-01 00:00:00 UTC
+START = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+
+
+class FakeClock:
+    def __init__(self, now=START):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def _recurring(task_id, expression, **kwargs):
+    return TaskDefinition(
+        id=task_id,
+        task_type=TaskType.CACHE_WARMING,
+        priority=TaskPriority.LOW,
+        function_name="cache_warming_task",
+        recurring=True,
+        cron_expression=expression,
+        **kwargs,
+    )
+
+
+def _scheduler(server, clock, replica_id="a", **kwargs):
+    queue = TaskQueue("sched_tasks", redis_client=fakeredis.FakeAsyncRedis(server=server))
+    return TaskScheduler(queue, clock=clock, replica_id=replica_id, **kwargs)
+
+
+def _brute_force_next(schedule, timestamp):
+    candidate = int(timestamp) + 1
+    while True:
+        moment = datetime.fromtimestamp(candidate, tz=timezone.utc)
+        weekday = (moment.weekday() + 1) % 7
+        day_ok = moment.day in schedule.days
+        weekday_ok = weekday in schedule.weekdays
+        if schedule.days_restricted and schedule.weekdays_restricted:
+            date_ok = day_ok or weekday_ok
+        else:
+            date_ok = day_ok and weekday_ok
+        if not (
+            date_ok
+            and moment.month in schedule.months
+            and moment.hour in schedule.hours
+            and moment.minute in schedule.minutes
+        ):
+            candidate += 60 - moment.second  # No second of this minute can match
+            continue
+        if moment.second in schedule.seconds:
+            return candidate
+        candidate += 1
+
+
+def test_cron_next_after_matches_brute_force():
+    """Test next fire times agree with a second-by-second scan."""
+    rng = random.Random(7)
+    expressions = [
+        "*/15 * * * *",
+        "30 */10 * * * *",
+        "0 9-17 * * mon-fri",
+        "0 0 13 * fri",
+        "0 12 */2 * sun",
+        "5,35 2 * feb,mar *",
+        "@hourly",
+    ]
+    for expression in expressions:
+        schedule = CronSchedule(expression)
+        for _ in range(10):
+            timestamp = START + rng.uniform(0, 20 * 86400)
+            assert schedule.next_after(timestamp) == _brute_force_next(schedule, timestamp)
+
+    # Stepped "*" day-of-month still ANDs with day-of-week: odd-day Mondays only
+    stepped = CronSchedule("0 0 */2 * mon")
+    assert not stepped.days_restricted and stepped.weekdays_restricted
+    assert stepped.next_after(START) == START + 14 * 86400
+    assert CronSchedule("0 0 1-31 * mon").next_after(START) == START + 7 * 86400
+    assert CronSchedule("0 0 13 * fri").days_restricted
+
+    assert parse_schedule("@every 90s").next_after(START + 1) == START + 90
+    with pytest.raises(ValueError):
+        parse_schedule("61 * * * *")
+
+
+def test_thousands_of_schedules_fire_on_time_with_fake_clock():
+    """Test the heap fires every schedule exactly at its due time, second precision."""
+
+    async def run():
+        clock = FakeClock()
+        scheduler = _scheduler(fakeredis.FakeServer(), clock)
+        periods = [5 + index % 55 for index in range(2000)]
+        for index, period in enumerate(periods):
+            await scheduler.schedule_task(_recurring(f"t{index}", f"@every {period}s"))
+        assert await scheduler.step(START) == []
+
+        fired = 0
+        for second in range(1, 121):
+            clock.now = START + second
+            occurrences = await scheduler.step()
+            expected = sum(1 for period in periods if clock.now % period == 0)
+            assert len(occurrences) == expected
+            fired += len(occurrences)
+
+        assert scheduler.stats["fired"] == fired
+        stats = await scheduler.task_queue.get_queue_stats()
+        return fired, stats["total_pending"]
+
+    fired, queued = asyncio.run(run())
+    assert queued == fired > 2000
+
+
+def test_misfire_policies_after_downtime():
+    """Test fire_once coalesces, fire_all catches up (bounded) and skip drops late runs."""
+
+    async def run():
+        clock = FakeClock()
+        scheduler = _scheduler(
+            fakeredis.FakeServer(), clock, misfire_grace_seconds=5, max_catch_up=4
+        )
+        await scheduler.schedule_task(
+            _recurring("once", "@every 10s", misfire_policy=MisfirePolicy.FIRE_ONCE)
+        )
+        await scheduler.schedule_task(
+            _recurring("all", "@every 10s", misfire_policy=MisfirePolicy.FIRE_ALL)
+        )
+        await scheduler.schedule_task(
+            _recurring("skip", "@every 10s", misfire_policy=MisfirePolicy.SKIP)
+        )
+        await scheduler.step(START)
+
+        # The scheduler was stalled for 95 seconds
+        fired = await scheduler.step(START + 95)
+        by_task = {}
+        for occurrence in fired:
+            by_task.setdefault(occurrence.metadata["recurring_task_id"], []).append(occurrence)
+        return scheduler, by_task
+
+    scheduler, by_task = asyncio.run(run())
+    assert [task.id for task in by_task["once"]] == [f"once_{int(START) + 10}"]
+    assert len(by_task["all"]) == 4
+    assert "skip" not in by_task
+    assert scheduler.next_fire_time("skip") == START + 100
+    assert scheduler.next_fire_time("once") == START + 100
+
+
+def test_jitter_is_deterministic_and_bounded():
+    """Test every replica computes the same jittered due time."""
+    task = _recurring("jittered", "0 0 * * *", jitter_seconds=300)
+    delays = {TaskScheduler._jitter(task, START + day * 86400) for day in range(20)}
+    assert all(0 <= delay <= 300 for delay in delays)
+    assert len(delays) > 1
+    assert TaskScheduler._jitter(task, START) == TaskScheduler._jitter(task, START)
+
+
+def test_only_leader_enqueues_and_successor_resumes():
+    """Test two replicas fire each occurrence once, and a new leader catches up."""
+
+    async def run():
+        server = fakeredis.FakeServer()
+        clock = FakeClock()
+        replicas = [_scheduler(server, clock, replica_id=name) for name in ("a", "b")]
+        for replica in replicas:
+            await replica.schedule_task(_recurring("heartbeat", "@every 10s"))
+            await replica.step(START)
+
+        ids = []
+        for second in range(10, 41, 10):
+            clock.now = START + second
+            for replica in replicas:
+                ids.extend(task.id for task in await replica.step())
+
+        leader, follower = replicas
+        assert leader.is_leader and not follower.is_leader
+        await leader.stop_scheduler()
+
+        clock.now = START + 55
+        resumed = [task.id for task in await follower.step()]
+        return ids, resumed, follower.is_leader
+
+    ids, resumed, follower_leads = asyncio.run(run())
+    assert ids == [f"heartbeat_{int(START) + second}" for second in (10, 20, 30, 40)]
+    assert follower_leads
+    assert resumed == [f"heartbeat_{int(START) + 50}"]
+
+
+def test_failed_enqueue_keeps_occurrences_for_retry():
+    """Test occurrences whose enqueue fails are retried instead of lost."""
+
+    async def run():
+        clock = FakeClock()
+        scheduler = _scheduler(fakeredis.FakeServer(), clock)
+        await scheduler.schedule_task(_recurring("heartbeat", "@every 10s"))
+        await scheduler.step(START)
+
+        enqueue_many = scheduler.task_queue.enqueue_many
+
+        async def redis_down(tasks):
+            return False
+
+        scheduler.task_queue.enqueue_many = redis_down
+        failed = await scheduler.step(START + 10)
+        scheduler.task_queue.enqueue_many = enqueue_many
+        retried = [task.id for task in await scheduler.step(START + 15)]
+        return scheduler, failed, retried
+
+    scheduler, failed, retried = asyncio.run(run())
+    assert failed == []
+    assert retried == [f"heartbeat_{int(START) + 10}"]
+    assert scheduler.stats["enqueue_failures"] == 1
+    assert scheduler.next_fire_time("heartbeat") == START + 20
+
+
+def test_lagging_replica_cannot_enqueue_a_claimed_occurrence():
+    """Test an occurrence already enqueued, even if since claimed by a worker, is not enqueued again."""
+
+    async def run():
+        server = fakeredis.FakeServer()
+        clock = FakeClock()
+        replicas = [_scheduler(server, clock, replica_id=name) for name in ("a", "b")]
+        for replica in replicas:
+            await replica.schedule_task(_recurring("heartbeat", "@every 10s"))
+            await replica.tick(START)
+
+        leader, lagging = replicas
+        first = [task.id for task in await leader.tick(START + 10)]
+        claimed = await leader.task_queue.dequeue("worker")
+        # The former leader still believes it leads and ticks late
+        second = await lagging.tick(START + 12)
+        stats = await leader.task_queue.get_queue_stats()
+        return first, claimed.id, second, lagging.stats["duplicates"], stats["total_pending"]
+
+    first, claimed_id, second, duplicates, pending = asyncio.run(run())
+    assert first == [claimed_id] == [f"heartbeat_{int(START) + 10}"]
+    assert second == []
+    assert duplicates == 1
+    assert pending == 0
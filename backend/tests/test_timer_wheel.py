@@ -0,0 +1,65 @@
+"""Tests for the hashed timer wheel."""
+
+import math
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from timer_wheel import TimerWheel
+
+
+def test_timers_fire_once_in_deadline_order():
+    """Test every timer fires exactly once, no earlier than its deadline."""
+    rng = random.Random(3)
+    wheel = TimerWheel(tick=0.0625, slots=32)  # 2s per rotation
+    deadlines = {i: rng.uniform(0.0, 5.0) for i in range(2000)}
+    for item, deadline in deadlines.items():
+        wheel.schedule(deadline, item)
+    assert len(wheel) == 2000
+
+    fired = {}
+    now = 0.0
+    while now < 6.0:
+        now += rng.uniform(0.01, 0.2)
+        due = wheel.advance(now)
+        ticks = [math.ceil(deadlines[item] / wheel.tick) for item in due]
+        assert ticks == sorted(ticks)
+        for item in due:
+            assert item not in fired
+            fired[item] = now
+
+    assert fired.keys() == deadlines.keys()
+    assert len(wheel) == 0
+    for item, deadline in deadlines.items():
+        assert fired[item] >= deadline - 1e-9
+
+
+def test_late_advance_past_several_rotations_expires_everything_due():
+    """Test a stalled driver catches up without losing timers from later rounds."""
+    wheel = TimerWheel(tick=0.125, slots=8)  # 1s per rotation
+    wheel.schedule(0.3, "soon")
+    wheel.schedule(3.1, "later")
+    wheel.schedule(9.0, "much later")
+
+    assert wheel.advance(0.25) == []
+    assert wheel.advance(5.0) == ["soon", "later"]
+    assert len(wheel) == 1
+    assert wheel.advance(9.0) == ["much later"]
+
+
+def test_past_deadline_fires_on_next_tick():
+    """Test scheduling in the past does not land behind the wheel."""
+    wheel = TimerWheel(tick=0.125, slots=8, start=10.0)
+    wheel.schedule(2.0, "overdue")
+    assert wheel.advance(10.0625) == []
+    assert wheel.advance(10.125) == ["overdue"]
+
+
+def test_rejects_non_positive_tick():
+    """Test a zero tick is rejected."""
+    with pytest.raises(ValueError):
+        TimerWheel(tick=0)
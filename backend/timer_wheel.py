@@ -0,0 +1,63 @@
+"""Hashed Timer Wheel
+Coarse-grained deadline scheduling for large numbers of short-lived timers,
+such as per-key stream aggregation windows.
+"""
+
+import math
+from typing import Any, List, Tuple
+
+
+class TimerWheel:
+    """Hashed timing wheel with O(1) scheduling and amortised O(1) expiry
+
+    Deadlines round up to the next tick, so a timer fires at most one tick
+    after its deadline plus driver delay. Timers more than one rotation out
+    stay in their slot until the wheel reaches their tick.
+    """
+
+    def __init__(self, tick: float = 0.05, slots: int = 256, start: float = 0.0):
+        if tick <= 0 or slots <= 0:
+            raise ValueError("tick and slots must be positive")
+        self.tick = tick
+        self._slots: List[List[Tuple[int, Any]]] = [[] for _ in range(slots)]
+        self._current = math.floor(start / tick)  # Last tick processed
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def span(self) -> float:
+        """Seconds covered by one rotation"""
+        return self.tick * len(self._slots)
+
+    def schedule(self, deadline: float, item: Any):
+        """Fire item once the wheel advances past deadline"""
+        tick_index = max(math.ceil(deadline / self.tick), self._current + 1)
+        self._slots[tick_index % len(self._slots)].append((tick_index, item))
+        self._count += 1
+
+    def advance(self, now: float) -> List[Any]:
+        """Expire timers due by now, returned in deadline order"""
+        target = math.floor(now / self.tick)
+        if target <= self._current:
+            return []
+
+        n_slots = len(self._slots)
+        expired: List[Tuple[int, Any]] = []
+        # Visiting one full rotation reaches every slot; later rounds stay put
+        steps = min(target - self._current, n_slots)
+        for offset in range(1, steps + 1):
+            slot_index = (self._current + offset) % n_slots
+            slot = self._slots[slot_index]
+            if not slot:
+                continue
+            keep = []
+            for entry in slot:
+                (expired if entry[0] <= target else keep).append(entry)
+            self._slots[slot_index] = keep
+
+        self._current = target
+        self._count -= len(expired)
+        expired.sort(key=lambda entry: entry[0])
+        return [item for _, item in expired]